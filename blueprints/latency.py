@@ -3,6 +3,7 @@ from database.latency_db import OrderLatency, latency_session
 from utils.session import check_session_validity
 from limiter import limiter
 from utils.logging import get_logger
+from utils.order_dispatch import get_dispatch_metrics
 from sqlalchemy import func
 from collections import defaultdict
 import numpy as np
@@ -214,6 +215,17 @@ def get_stats():
         logger.error(f"Error fetching latency stats: {e}")
         return jsonify({'error': str(e)}), 500
 
+@latency_bp.route('/api/dispatch', methods=['GET'])
+@check_session_validity
+@limiter.limit("60/minute")
+def get_dispatch_stats():
+    """API endpoint to get order rate limit queue depth and wait times per broker"""
+    try:
+        return jsonify(get_dispatch_metrics())
+    except Exception as e:
+        logger.error(f"Error fetching order dispatch metrics: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @latency_bp.route('/api/broker/<broker>/stats', methods=['GET'])
 @check_session_validity
 @limiter.limit("60/minute")
@@ -3,14 +3,18 @@ import json
 import os
 import pandas as pd
 import time
-from datetime import datetime, timedelta
+from datetime import datetime
 import urllib.parse
 from database.token_db import get_br_symbol, get_token, get_oa_symbol
 from utils.httpx_client import get_httpx_client
+from utils.history_chunks import plan_chunks, fetch_chunks
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Angel historical candle / OI APIs, paced as the previous 0.5s delay between chunks
+HISTORY_RATE_LIMIT = 2
+
 
 def get_api_response(endpoint, auth, method="GET", payload=''):
     """Helper function to make API calls to Angel One"""
@@ -376,9 +380,6 @@ class BrokerData:
                 # For past dates, set end time to 23:59
                 to_date = to_date.replace(hour=23, minute=59)
             
-            # Initialize empty list to store DataFrames
-            dfs = []
-            
             # Set chunk size based on interval as per Angel API documentation
             interval_limits = {
                 '1m': 30,    # ONE_MINUTE
@@ -396,12 +397,7 @@ class BrokerData:
                 supported = list(interval_limits.keys())
                 raise Exception(f"Interval '{interval}' not supported. Supported intervals: {', '.join(supported)}")
             
-            # Process data in chunks
-            current_start = from_date
-            while current_start <= to_date:
-                # Calculate chunk end date
-                current_end = min(current_start + timedelta(days=chunk_days-1), to_date)
-                
+            def fetch_chunk(current_start, current_end):
                 # Prepare payload for historical data API
                 payload = {
                     "exchange": exchange,
@@ -412,48 +408,38 @@ class BrokerData:
                 }
                 logger.debug(f"Debug - Fetching chunk from {current_start} to {current_end}")
                 logger.debug(f"Debug - API Payload: {payload}")
-                
+
                 try:
                     response = get_api_response("/rest/secure/angelbroking/historical/v1/getCandleData",
                                               self.auth_token,
                                               "POST",
                                               payload)
                     logger.info(f"Debug - API Response Status: {response.get('status')}")
-                    
+
                     # Check if response is empty or invalid
                     if not response:
                         logger.debug(f"Debug - Empty response for chunk {current_start} to {current_end}")
-                        current_start = current_end + timedelta(days=1)
-                        continue
-                    
+                        return None
+
                     if not response.get('status'):
                         logger.info(f"Debug - Error response: {response.get('message', 'Unknown error')}")
-                        current_start = current_end + timedelta(days=1)
-                        continue
-                        
+                        return None
+
                 except Exception as chunk_error:
                     logger.error(f"Debug - Error fetching chunk {current_start} to {current_end}: {str(chunk_error)}")
-                    current_start = current_end + timedelta(days=1)
-                    continue
-                
-                if not response.get('status'):
-                    raise Exception(f"Error from Angel API: {response.get('message', 'Unknown error')}")
-                
+                    return None
+
                 # Extract candle data and create DataFrame
                 data = response.get('data', [])
                 if data:
-                    chunk_df = pd.DataFrame(data, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-                    dfs.append(chunk_df)
                     logger.debug(f"Debug - Received {len(data)} candles for chunk")
-                else:
-                    logger.debug("Debug - No data received for chunk")
-                
-                # Move to next chunk
-                current_start = current_end + timedelta(days=1)
+                    return pd.DataFrame(data, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+                logger.debug("Debug - No data received for chunk")
+                return None
 
-                # Rate limit delay between chunks (0.5 seconds)
-                if current_start <= to_date:
-                    time.sleep(0.5)
+            # Fetch the chunks concurrently within Angel's historical API rate limit
+            chunks = plan_chunks(from_date, to_date, chunk_days)
+            dfs = [df for df in fetch_chunks(fetch_chunk, chunks, 'angel', HISTORY_RATE_LIMIT) if df is not None]
 
             # If no data was found, return empty DataFrame
             if not dfs:
@@ -543,9 +529,6 @@ class BrokerData:
                 # For past dates, set end time to 23:59
                 to_date = to_date.replace(hour=23, minute=59)
             
-            # Initialize empty list to store DataFrames
-            dfs = []
-            
             # Set chunk size based on interval (same as candle data)
             interval_limits = {
                 '1m': 30,    # ONE_MINUTE
@@ -562,12 +545,7 @@ class BrokerData:
             if not chunk_days:
                 raise Exception(f"Interval '{interval}' not supported for OI data")
             
-            # Process data in chunks
-            current_start = from_date
-            while current_start <= to_date:
-                # Calculate chunk end date
-                current_end = min(current_start + timedelta(days=chunk_days-1), to_date)
-                
+            def fetch_chunk(current_start, current_end):
                 # Prepare payload for OI data API
                 payload = {
                     "exchange": exchange,
@@ -576,37 +554,33 @@ class BrokerData:
                     "fromdate": current_start.strftime('%Y-%m-%d %H:%M'),
                     "todate": current_end.strftime('%Y-%m-%d %H:%M')
                 }
-                
+
                 try:
                     response = get_api_response("/rest/secure/angelbroking/historical/v1/getOIData",
                                               self.auth_token,
                                               "POST",
                                               payload)
-                    
+
                     if not response or not response.get('status'):
                         logger.debug(f"Debug - No OI data for chunk {current_start} to {current_end}")
-                        current_start = current_end + timedelta(days=1)
-                        continue
-                        
+                        return None
+
                 except Exception as chunk_error:
                     logger.error(f"Debug - Error fetching OI chunk: {str(chunk_error)}")
-                    current_start = current_end + timedelta(days=1)
-                    continue
-                
+                    return None
+
                 # Extract OI data and create DataFrame
                 data = response.get('data', [])
                 if data:
                     chunk_df = pd.DataFrame(data)
                     # Rename 'time' to 'timestamp' for consistency
                     chunk_df.rename(columns={'time': 'timestamp'}, inplace=True)
-                    dfs.append(chunk_df)
-                
-                # Move to next chunk
-                current_start = current_end + timedelta(days=1)
+                    return chunk_df
+                return None
 
-                # Rate limit delay between chunks (0.5 seconds)
-                if current_start <= to_date:
-                    time.sleep(0.5)
+            # Fetch the chunks concurrently within Angel's historical API rate limit
+            chunks = plan_chunks(from_date, to_date, chunk_days)
+            dfs = [df for df in fetch_chunks(fetch_chunk, chunks, 'angel', HISTORY_RATE_LIMIT) if df is not None]
 
             # If no data was found, return empty DataFrame
             if not dfs:
@@ -6,6 +6,7 @@ from database.token_db import get_token , get_br_symbol, get_symbol
 from broker.angel.mapping.transform_data import transform_data , map_product_type, reverse_map_product_type, transform_modify_order_data
 from utils.httpx_client import get_httpx_client
 from utils.logging import get_logger
+from utils.order_dispatch import dispatch_bulk
 
 logger = get_logger(__name__)
 
@@ -237,7 +238,8 @@ def close_all_positions(current_api_key,auth):
         return {"message": "No Open Positions Found"}, 200
 
     if positions_response['status']:
-        # Loop through each position to close
+        # Build one squareoff order per open position
+        squareoff_orders = []
         for position in positions_response['data']:
             # Skip if net quantity is zero
             if int(position['netqty']) == 0:
@@ -265,17 +267,13 @@ def close_all_positions(current_api_key,auth):
             }
 
             logger.info(f"{place_order_payload}")
+            squareoff_orders.append(place_order_payload)
 
-            # Place the order to close the position
-            res, response, orderid =   place_order_api(place_order_payload,auth)
-
-            # logger.info(f"{res}")
-            # logger.info(f"{response}")
-            # logger.info(f"{orderid}")
-
-
-            
-            # Note: Ensure place_order_api handles any errors and logs accordingly
+        # Place the squareoff orders concurrently under the broker rate limit
+        results = dispatch_bulk(lambda payload: place_order_api(payload, auth), squareoff_orders, 'angel')
+        for payload, (result, error) in zip(squareoff_orders, results):
+            if error is not None or result[0].status != 200:
+                logger.error(f"Failed to close position {payload['symbol']}: {error or result[1]}")
 
     return {'status': 'success', "message": "All Open Positions SquaredOff"}, 200
 
@@ -391,11 +389,11 @@ def cancel_all_orders_api(data,auth):
     canceled_orders = []
     failed_cancellations = []
 
-    # Cancel the filtered orders
-    for order in orders_to_cancel:
+    # Cancel the filtered orders concurrently under the broker rate limit
+    results = dispatch_bulk(lambda order: cancel_order(order['orderid'], auth), orders_to_cancel, 'angel')
+    for order, (result, error) in zip(orders_to_cancel, results):
         orderid = order['orderid']
-        cancel_response, status_code = cancel_order(orderid,auth)
-        if status_code == 200:
+        if error is None and result[1] == 200:
             canceled_orders.append(orderid)
         else:
             failed_cancellations.append(orderid)
@@ -175,8 +175,9 @@ class AngelWebSocketAdapter(BaseBrokerWebSocketAdapter):
                 )
         
         # Create token list for Angel API
+        exchange_type = AngelExchangeMapper.get_exchange_type(brexchange)
         token_list = [{
-            "exchangeType": AngelExchangeMapper.get_exchange_type(brexchange),
+            "exchangeType": exchange_type,
             "tokens": [token]
         }]
         
@@ -197,8 +198,13 @@ class AngelWebSocketAdapter(BaseBrokerWebSocketAdapter):
                 'depth_level': depth_level,
                 'actual_depth': actual_depth,
                 'token_list': token_list,
-                'is_fallback': is_fallback
+                'is_fallback': is_fallback,
+                'exchange_type': exchange_type,
+                # ZeroMQ topics by message mode, built once instead of per tick
+                'topics': {msg_mode: f"{exchange}_{symbol}_{mode_str}"
+                           for msg_mode, mode_str in ((1, 'LTP'), (2, 'QUOTE'), (3, 'DEPTH'))}
             }
+            self._index_subscription((exchange_type, token), correlation_id)
         
         # Subscribe if connected
         if self.connected and self.ws_client:
@@ -252,7 +258,8 @@ class AngelWebSocketAdapter(BaseBrokerWebSocketAdapter):
         # Remove from subscriptions
         with self.lock:
             if correlation_id in self.subscriptions:
-                del self.subscriptions[correlation_id]
+                sub = self.subscriptions.pop(correlation_id)
+                self._unindex_subscription((sub['exchange_type'], sub['token']), correlation_id)
         
         # Unsubscribe if connected
         if self.connected and self.ws_client:
@@ -298,17 +305,18 @@ class AngelWebSocketAdapter(BaseBrokerWebSocketAdapter):
     
     def _on_message(self, wsapp, message) -> None:
         """Callback for text messages from the WebSocket"""
-        self.logger.debug(f"Received message: {message}")
+        self.logger.debug("Received message: %s", message)
     
     def _on_data(self, wsapp, message) -> None:
         """Callback for market data from the WebSocket"""
         try:
-            # Debug log the raw message data to see what we're actually receiving
-            self.logger.debug(f"RAW ANGEL DATA: Type: {type(message)}, Data: {message}")
+            # Lazy %-formatting: this runs for every tick, and the message is
+            # only rendered when debug logging is actually enabled
+            self.logger.debug("RAW ANGEL DATA: Type: %s, Data: %s", type(message), message)
             
             # Check if we're getting binary data as per Angel's documentation
             if isinstance(message, bytes) or isinstance(message, bytearray):
-                self.logger.debug(f"Received binary data of length: {len(message)}")
+                self.logger.debug("Received binary data of length: %s", len(message))
                 # We need to parse the binary data according to Angel's format
                 # For now, we'll log what we have and exit early
                 return
@@ -322,19 +330,16 @@ class AngelWebSocketAdapter(BaseBrokerWebSocketAdapter):
             token = message.get('token')
             exchange_type = message.get('exchange_type')
             
-            self.logger.debug(f"Processing message with token: {token}, exchange_type: {exchange_type}")
+            self.logger.debug("Processing message with token: %s, exchange_type: %s", token, exchange_type)
             
-            # Find the subscription that matches this token
-            subscription = None
+            # Find the subscription that matches this token (first subscribed wins)
             with self.lock:
-                for sub in self.subscriptions.values():
-                    if sub['token'] == token and AngelExchangeMapper.get_exchange_type(sub['brexchange']) == exchange_type:
-                        subscription = sub
-                        break
+                subscriptions = self._subscriptions_for_token((exchange_type, token))
             
-            if not subscription:
-                self.logger.warning(f"Received data for unsubscribed token: {token}")
+            if not subscriptions:
+                self.logger.warning("Received data for unsubscribed token: %s", token)
                 return
+            subscription = subscriptions[0]
             
             # Create topic for ZeroMQ
             symbol = subscription['symbol']
@@ -344,8 +349,7 @@ class AngelWebSocketAdapter(BaseBrokerWebSocketAdapter):
             # Important: Always use the actual mode from the message rather than the subscription
             # This ensures data is published with the correct mode identifier
             actual_msg_mode = message.get('subscription_mode')
-            mode_str = {1: 'LTP', 2: 'QUOTE', 3: 'DEPTH'}[actual_msg_mode]  # Mode 3 is Snap Quote (includes depth data)
-            topic = f"{exchange}_{symbol}_{mode_str}"
+            topic = subscription['topics'][actual_msg_mode]  # Mode 3 is Snap Quote (includes depth data)
             
             # Normalize the data based on the actual message mode, not subscription mode
             market_data = self._normalize_market_data(message, actual_msg_mode)
@@ -357,8 +361,8 @@ class AngelWebSocketAdapter(BaseBrokerWebSocketAdapter):
                 'mode': mode,
                 'timestamp': int(time.time() * 1000)  # Current timestamp in ms
             })
-            # Log the market data we're sendingAdd commentMore actions
-            self.logger.debug(f"Publishing market data: {market_data}")
+            # Log the market data we're sending
+            self.logger.debug("Publishing market data: %s", market_data)
             
             # Publish to ZeroMQ
             self.publish_market_data(topic, market_data)
@@ -454,7 +458,7 @@ class AngelWebSocketAdapter(BaseBrokerWebSocketAdapter):
         side_label = 'Buy' if is_buy else 'Sell'
         
         # Log the raw message structure to help debug
-        self.logger.debug(f"Extracting {side_label} depth data from message: {message.keys()}")
+        self.logger.debug("Extracting %s depth data from message: %s", side_label, message.keys())
         
         # Check for different possible depth data formats that Angel might send
         # Angel can send depth data in different formats depending on the request:
@@ -466,7 +470,7 @@ class AngelWebSocketAdapter(BaseBrokerWebSocketAdapter):
         best_5_key = 'best_5_buy_data' if is_buy else 'best_5_sell_data'
         if best_5_key in message and isinstance(message[best_5_key], list):
             depth_data = message.get(best_5_key, [])
-            self.logger.debug(f"Found {side_label} depth data using {best_5_key}: {len(depth_data)} levels")
+            self.logger.debug("Found %s depth data using %s: %s levels", side_label, best_5_key, len(depth_data))
             
             for level in depth_data:
                 if isinstance(level, dict):
@@ -484,7 +488,7 @@ class AngelWebSocketAdapter(BaseBrokerWebSocketAdapter):
         # Then check for depth_20 data
         elif 'depth_20_buy_data' in message and is_buy:
             depth_data = message.get('depth_20_buy_data', [])
-            self.logger.debug(f"Found {side_label} depth data using depth_20_buy_data: {len(depth_data)} levels")
+            self.logger.debug("Found %s depth data using depth_20_buy_data: %s levels", side_label, len(depth_data))
             
             for level in depth_data:
                 if isinstance(level, dict):
@@ -501,7 +505,7 @@ class AngelWebSocketAdapter(BaseBrokerWebSocketAdapter):
                     
         elif 'depth_20_sell_data' in message and not is_buy:
             depth_data = message.get('depth_20_sell_data', [])
-            self.logger.debug(f"Found {side_label} depth data using depth_20_sell_data: {len(depth_data)} levels")
+            self.logger.debug("Found %s depth data using depth_20_sell_data: %s levels", side_label, len(depth_data))
             
             for level in depth_data:
                 if isinstance(level, dict):
@@ -527,8 +531,8 @@ class AngelWebSocketAdapter(BaseBrokerWebSocketAdapter):
                 })
         else:
             # Log the depth data being returned for debugging
-            self.logger.debug(f"{side_label} depth data found: {len(depth)} levels")
+            self.logger.debug("%s depth data found: %s levels", side_label, len(depth))
             if depth and depth[0]['price'] > 0:
-                self.logger.debug(f"{side_label} depth first level: Price={depth[0]['price']}, Qty={depth[0]['quantity']}")
+                self.logger.debug("%s depth first level: Price=%s, Qty=%s", side_label, depth[0]['price'], depth[0]['quantity'])
             
         return depth
\ No newline at end of file
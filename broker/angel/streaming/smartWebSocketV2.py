@@ -6,8 +6,32 @@ import websocket
 import os
 import logging
 import logzero
+import numpy
 from logzero import logger
 
+# Precompiled little-endian packet layouts, decoded with unpack_from at fixed offsets
+# Header (all modes, bytes 0-51): mode, exchange type, 25 byte NUL padded token, sequence, exchange time, LTP
+_HEADER = struct.Struct("<BB25sqqq")
+# Quote / SnapQuote (bytes 51-123)
+_QUOTE = struct.Struct("<qqqddqqqq")
+_QUOTE_FIELDS = (
+    "last_traded_quantity", "average_traded_price", "volume_trade_for_the_day",
+    "total_buy_quantity", "total_sell_quantity", "open_price_of_the_day",
+    "high_price_of_the_day", "low_price_of_the_day", "closed_price"
+)
+# SnapQuote (bytes 123-147 and 347-379, best 5 levels in between)
+_SNAP_QUOTE = struct.Struct("<qqq")
+_SNAP_QUOTE_FIELDS = ("last_traded_timestamp", "open_interest", "open_interest_change_percentage")
+_CIRCUITS = struct.Struct("<qqqq")
+_CIRCUIT_FIELDS = ("upper_circuit_limit", "lower_circuit_limit", "52_week_high_price", "52_week_low_price")
+_BEST_5_LEVEL = struct.Struct("<HqqH")
+# Depth 20 (bytes 43-443): quantity, price, orders
+_DEPTH_20_LEVEL = struct.Struct("<iih")
+
+# Same level layouts as NumPy structured dtypes (see depth_as_numpy)
+BEST_5_DTYPE = numpy.dtype([("flag", "<u2"), ("quantity", "<i8"), ("price", "<i8"), ("no of orders", "<u2")])
+DEPTH_20_DTYPE = numpy.dtype([("quantity", "<i4"), ("price", "<i4"), ("num_of_orders", "<i2")])
+
 class SmartWebSocketV2(object):
     """
     SmartAPI Web Socket version 2
@@ -48,10 +72,11 @@ class SmartWebSocketV2(object):
     }
 
     wsapp = None
+    depth_as_numpy = False
     input_request_dict = {}
     current_retry_attempt = 0
 
-    def __init__(self, auth_token, api_key, client_code, feed_token, max_retry_attempt=1,retry_strategy=0, retry_delay=10, retry_multiplier=2, retry_duration=60):
+    def __init__(self, auth_token, api_key, client_code, feed_token, max_retry_attempt=1,retry_strategy=0, retry_delay=10, retry_multiplier=2, retry_duration=60, depth_as_numpy=False):
         """
             Initialise the SmartWebSocketV2 instance
             Parameters
@@ -64,6 +89,9 @@ class SmartWebSocketV2(object):
                 angel one account id
             feed_token: string
                 feed token received from Login API
+            depth_as_numpy: bool
+                decode best 5 / depth 20 ladders into NumPy structured arrays
+                (BEST_5_DTYPE / DEPTH_20_DTYPE) instead of lists of dicts
         """
         self.auth_token = auth_token
         self.api_key = api_key
@@ -75,7 +103,8 @@ class SmartWebSocketV2(object):
         self.retry_strategy = retry_strategy
         self.retry_delay = retry_delay
         self.retry_multiplier = retry_multiplier
-        self.retry_duration = retry_duration        
+        self.retry_duration = retry_duration
+        self.depth_as_numpy = depth_as_numpy
         # Create a log folder based on the current date
         log_folder = time.strftime("%Y-%m-%d", time.localtime())
         log_folder_path = os.path.join("logs", log_folder)  # Construct the full path to the log folder
@@ -347,47 +376,40 @@ class SmartWebSocketV2(object):
         self.on_close(wsapp)
 
     def _parse_binary_data(self, binary_data):
+        """
+            Decode a binary market data packet with the precompiled layouts
+            below. Fields are read with unpack_from at fixed offsets, so the
+            packet is never sliced into per-field copies.
+        """
+        subscription_mode, exchange_type, raw_token, sequence_number, exchange_timestamp, last_traded_price = \
+            _HEADER.unpack_from(binary_data, 0)
         parsed_data = {
-            "subscription_mode": self._unpack_data(binary_data, 0, 1, byte_format="B")[0],
-            "exchange_type": self._unpack_data(binary_data, 1, 2, byte_format="B")[0],
-            "token": SmartWebSocketV2._parse_token_value(binary_data[2:27]),
-            "sequence_number": self._unpack_data(binary_data, 27, 35, byte_format="q")[0],
-            "exchange_timestamp": self._unpack_data(binary_data, 35, 43, byte_format="q")[0],
-            "last_traded_price": self._unpack_data(binary_data, 43, 51, byte_format="q")[0]
+            "subscription_mode": subscription_mode,
+            "exchange_type": exchange_type,
+            "token": raw_token.split(b"\x00", 1)[0].decode("latin-1"),
+            "sequence_number": sequence_number,
+            "exchange_timestamp": exchange_timestamp,
+            "last_traded_price": last_traded_price
         }
         try:
-            parsed_data["subscription_mode_val"] = self.SUBSCRIPTION_MODE_MAP.get(parsed_data["subscription_mode"])
-
-            if parsed_data["subscription_mode"] in [self.QUOTE, self.SNAP_QUOTE]:
-                parsed_data["last_traded_quantity"] = self._unpack_data(binary_data, 51, 59, byte_format="q")[0]
-                parsed_data["average_traded_price"] = self._unpack_data(binary_data, 59, 67, byte_format="q")[0]
-                parsed_data["volume_trade_for_the_day"] = self._unpack_data(binary_data, 67, 75, byte_format="q")[0]
-                parsed_data["total_buy_quantity"] = self._unpack_data(binary_data, 75, 83, byte_format="d")[0]
-                parsed_data["total_sell_quantity"] = self._unpack_data(binary_data, 83, 91, byte_format="d")[0]
-                parsed_data["open_price_of_the_day"] = self._unpack_data(binary_data, 91, 99, byte_format="q")[0]
-                parsed_data["high_price_of_the_day"] = self._unpack_data(binary_data, 99, 107, byte_format="q")[0]
-                parsed_data["low_price_of_the_day"] = self._unpack_data(binary_data, 107, 115, byte_format="q")[0]
-                parsed_data["closed_price"] = self._unpack_data(binary_data, 115, 123, byte_format="q")[0]
-
-            if parsed_data["subscription_mode"] == self.SNAP_QUOTE:
-                parsed_data["last_traded_timestamp"] = self._unpack_data(binary_data, 123, 131, byte_format="q")[0]
-                parsed_data["open_interest"] = self._unpack_data(binary_data, 131, 139, byte_format="q")[0]
-                parsed_data["open_interest_change_percentage"] = self._unpack_data(binary_data, 139, 147, byte_format="q")[0]
-                parsed_data["upper_circuit_limit"] = self._unpack_data(binary_data, 347, 355, byte_format="q")[0]
-                parsed_data["lower_circuit_limit"] = self._unpack_data(binary_data, 355, 363, byte_format="q")[0]
-                parsed_data["52_week_high_price"] = self._unpack_data(binary_data, 363, 371, byte_format="q")[0]
-                parsed_data["52_week_low_price"] = self._unpack_data(binary_data, 371, 379, byte_format="q")[0]
-                best_5_buy_and_sell_data = self._parse_best_5_buy_and_sell_data(binary_data[147:347])
+            parsed_data["subscription_mode_val"] = self.SUBSCRIPTION_MODE_MAP.get(subscription_mode)
+
+            if subscription_mode in (self.QUOTE, self.SNAP_QUOTE):
+                parsed_data.update(zip(_QUOTE_FIELDS, _QUOTE.unpack_from(binary_data, 51)))
+
+            if subscription_mode == self.SNAP_QUOTE:
+                parsed_data.update(zip(_SNAP_QUOTE_FIELDS, _SNAP_QUOTE.unpack_from(binary_data, 123)))
+                parsed_data.update(zip(_CIRCUIT_FIELDS, _CIRCUITS.unpack_from(binary_data, 347)))
+                best_5_buy_and_sell_data = self._parse_best_5_buy_and_sell_data(binary_data)
                 parsed_data["best_5_buy_data"] = best_5_buy_and_sell_data["best_5_sell_data"]
                 parsed_data["best_5_sell_data"] = best_5_buy_and_sell_data["best_5_buy_data"]
 
-            if parsed_data["subscription_mode"] == self.DEPTH:
+            if subscription_mode == self.DEPTH:
                 parsed_data.pop("sequence_number", None)
                 parsed_data.pop("last_traded_price", None)
                 parsed_data.pop("subscription_mode_val", None)
-                parsed_data["packet_received_time"]=self._unpack_data(binary_data, 35, 43, byte_format="q")[0]
-                depth_data_start_index = 43
-                depth_20_data = self._parse_depth_20_buy_and_sell_data(binary_data[depth_data_start_index:])
+                parsed_data["packet_received_time"] = exchange_timestamp
+                depth_20_data = self._parse_depth_20_buy_and_sell_data(binary_data)
                 parsed_data["depth_20_buy_data"] = depth_20_data["depth_20_buy_data"]
                 parsed_data["depth_20_sell_data"] = depth_20_data["depth_20_sell_data"]
 
@@ -405,38 +427,27 @@ class SmartWebSocketV2(object):
 
     @staticmethod
     def _parse_token_value(binary_packet):
-        token = ""
-        for i in range(len(binary_packet)):
-            if chr(binary_packet[i]) == '\x00':
-                return token
-            token += chr(binary_packet[i])
-        return token
+        return bytes(binary_packet).split(b"\x00", 1)[0].decode("latin-1")
 
     def _parse_best_5_buy_and_sell_data(self, binary_data):
-
-        def split_packets(binary_packets):
-            packets = []
-
-            i = 0
-            while i < len(binary_packets):
-                packets.append(binary_packets[i: i + 20])
-                i += 20
-            return packets
-
-        best_5_buy_sell_packets = split_packets(binary_data)
+        """
+            Best 5 bid/ask levels of a SnapQuote packet (bytes 147-347): ten
+            20 byte levels, flag 0 = buy. Returns structured arrays instead of
+            lists of dicts when depth_as_numpy is set.
+        """
+        if self.depth_as_numpy:
+            levels = numpy.frombuffer(binary_data, dtype=BEST_5_DTYPE, count=10, offset=147)
+            return {
+                "best_5_buy_data": levels[levels["flag"] == 0],
+                "best_5_sell_data": levels[levels["flag"] != 0]
+            }
 
         best_5_buy_data = []
         best_5_sell_data = []
 
-        for packet in best_5_buy_sell_packets:
-            each_data = {
-                "flag": self._unpack_data(packet, 0, 2, byte_format="H")[0],
-                "quantity": self._unpack_data(packet, 2, 10, byte_format="q")[0],
-                "price": self._unpack_data(packet, 10, 18, byte_format="q")[0],
-                "no of orders": self._unpack_data(packet, 18, 20, byte_format="H")[0]
-            }
-
-            if each_data["flag"] == 0:
+        for flag, quantity, price, orders in _BEST_5_LEVEL.iter_unpack(memoryview(binary_data)[147:347]):
+            each_data = {"flag": flag, "quantity": quantity, "price": price, "no of orders": orders}
+            if flag == 0:
                 best_5_buy_data.append(each_data)
             else:
                 best_5_sell_data.append(each_data)
@@ -447,33 +458,24 @@ class SmartWebSocketV2(object):
         }
 
     def _parse_depth_20_buy_and_sell_data(self, binary_data):
-        depth_20_buy_data = []
-        depth_20_sell_data = []
-
-        for i in range(20):
-            buy_start_idx = i * 10
-            sell_start_idx = 200 + i * 10
-
-            # Parse buy data
-            buy_packet_data = {
-                "quantity": self._unpack_data(binary_data, buy_start_idx, buy_start_idx + 4, byte_format="i")[0],
-                "price": self._unpack_data(binary_data, buy_start_idx + 4, buy_start_idx + 8, byte_format="i")[0],
-                "num_of_orders": self._unpack_data(binary_data, buy_start_idx + 8, buy_start_idx + 10, byte_format="h")[0],
-            }
-
-            # Parse sell data
-            sell_packet_data = {
-                "quantity": self._unpack_data(binary_data, sell_start_idx, sell_start_idx + 4, byte_format="i")[0],
-                "price": self._unpack_data(binary_data, sell_start_idx + 4, sell_start_idx + 8, byte_format="i")[0],
-                "num_of_orders": self._unpack_data(binary_data, sell_start_idx + 8, sell_start_idx + 10, byte_format="h")[0],
+        """
+            20 level depth of a Depth packet: 20 buy levels at byte 43 followed
+            by 20 sell levels, 10 bytes each. Returns structured arrays instead
+            of lists of dicts when depth_as_numpy is set.
+        """
+        if self.depth_as_numpy:
+            return {
+                "depth_20_buy_data": numpy.frombuffer(binary_data, dtype=DEPTH_20_DTYPE, count=20, offset=43),
+                "depth_20_sell_data": numpy.frombuffer(binary_data, dtype=DEPTH_20_DTYPE, count=20, offset=243)
             }
 
-            depth_20_buy_data.append(buy_packet_data)
-            depth_20_sell_data.append(sell_packet_data)
-
+        levels = [
+            {"quantity": quantity, "price": price, "num_of_orders": orders}
+            for quantity, price, orders in _DEPTH_20_LEVEL.iter_unpack(memoryview(binary_data)[43:443])
+        ]
         return {
-            "depth_20_buy_data": depth_20_buy_data,
-            "depth_20_sell_data": depth_20_sell_data
+            "depth_20_buy_data": levels[:20],
+            "depth_20_sell_data": levels[20:]
         }
 
     def on_message(self, wsapp, message):
@@ -242,6 +242,7 @@ class DefinedgeWebSocketAdapter(BaseBrokerWebSocketAdapter):
         with self.lock:
             subscription_count = len(self.subscriptions)
             self.subscriptions.clear()
+            self.token_index.clear()
             self.logger.info(f"Cleared {subscription_count} active subscriptions")
         
         # Disconnect WebSocket client
@@ -353,6 +354,8 @@ class DefinedgeWebSocketAdapter(BaseBrokerWebSocketAdapter):
         else:
             self.logger.info(f"[SUBSCRIBE] New WebSocket subscription needed for {correlation_id}")
 
+        mode_str = {1: 'LTP', 2: 'QUOTE', 3: 'DEPTH'}[mode]
+
         # Store subscription for reconnection
         with self.lock:
             self.subscriptions[correlation_id] = {
@@ -365,8 +368,11 @@ class DefinedgeWebSocketAdapter(BaseBrokerWebSocketAdapter):
                 'depth_level': depth_level,
                 'actual_depth': actual_depth,
                 'tokens': tokens,
-                'is_fallback': is_fallback
+                'is_fallback': is_fallback,
+                # ZeroMQ topic, built once instead of per tick
+                'topic': f"{exchange}_{symbol}_{mode_str}"
             }
+            self._index_subscription((definedge_exchange, token), correlation_id)
             # Track token to symbol mapping for cache management
             self.token_to_symbol[token] = (symbol, exchange)
 
@@ -461,6 +467,7 @@ class DefinedgeWebSocketAdapter(BaseBrokerWebSocketAdapter):
 
             # Remove the subscription
             del self.subscriptions[correlation_id]
+            self._unindex_subscription((subscription['definedge_exchange'], subscription['token']), correlation_id)
 
             # Clean up token mapping and cache if no other subscriptions use this token
             if not any(sub['token'] == token for sub in self.subscriptions.values()):
@@ -606,25 +613,21 @@ class DefinedgeWebSocketAdapter(BaseBrokerWebSocketAdapter):
             token = message.get('tk')
             exchange = message.get('e')
             
-            # Find the subscription that matches this token
-            subscription = None
+            # Find the subscription that matches this token (first subscribed wins)
             with self.lock:
-                for sub in self.subscriptions.values():
-                    if sub['token'] == token and sub['definedge_exchange'] == exchange:
-                        subscription = sub
-                        break
+                subscriptions = self._subscriptions_for_token((exchange, token))
             
-            if not subscription:
+            if not subscriptions:
                 self.logger.warning(f"Received data for unsubscribed token: {exchange}|{token}")
                 return
+            subscription = subscriptions[0]
             
             # Create topic for ZeroMQ
             symbol = subscription['symbol']
             orig_exchange = subscription['exchange']
             mode = subscription['mode']
             
-            mode_str = {1: 'LTP', 2: 'QUOTE', 3: 'DEPTH'}[mode]
-            topic = f"{orig_exchange}_{symbol}_{mode_str}"
+            topic = subscription['topic']
             
             # Use cache BEFORE normalization (like Shoonya does)
             # This preserves raw field names for cache logic
@@ -642,7 +645,7 @@ class DefinedgeWebSocketAdapter(BaseBrokerWebSocketAdapter):
             })
             
             # Log the market data we're sending
-            self.logger.debug(f"Publishing market data on topic {topic}: {market_data}")
+            self.logger.debug("Publishing market data on topic %s: %s", topic, market_data)
             
             # Publish to ZeroMQ
             self.publish_market_data(topic, market_data)
@@ -737,17 +740,14 @@ class DefinedgeWebSocketAdapter(BaseBrokerWebSocketAdapter):
                     else:
                         self.logger.warning(f"✗ Depth feed has NO OHLC for {exchange}|{token}")
             
-            # Find the subscription
-            subscription = None
+            # Find the subscription (first subscribed wins)
             with self.lock:
-                for sub in self.subscriptions.values():
-                    if sub['token'] == token and sub['definedge_exchange'] == exchange:
-                        subscription = sub
-                        break
+                subscriptions = self._subscriptions_for_token((exchange, token))
             
-            if not subscription:
+            if not subscriptions:
                 self.logger.warning(f"Received depth data for unsubscribed token: {exchange}|{token}")
                 return
+            subscription = subscriptions[0]
             
             # Create topic for ZeroMQ
             symbol = subscription['symbol']
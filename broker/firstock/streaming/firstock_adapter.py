@@ -167,6 +167,9 @@ class FirstockWebSocketAdapter(BaseBrokerWebSocketAdapter):
 
         # Firstock provides full market data including depth in a single feed
         # Mode parameter is maintained for API consistency but all data is provided
+        if mode not in [1, 2, 3]:
+            return self._create_error_response("INVALID_MODE",
+                                              f"Invalid mode {mode}. Must be 1 (LTP), 2 (Quote), or 3 (Depth)")
 
         # Map symbol to token using symbol mapper
         token_info = SymbolMapper.get_token_from_symbol(symbol, exchange)
@@ -198,6 +201,8 @@ class FirstockWebSocketAdapter(BaseBrokerWebSocketAdapter):
         else:
             self.logger.info(f"[SUBSCRIBE] New WebSocket subscription needed for {correlation_id}")
 
+        mode_str = {1: 'LTP', 2: 'QUOTE', 3: 'DEPTH'}[mode]
+
         # Always store the subscription (each client gets their own entry)
         with self.lock:
             self.subscriptions[correlation_id] = {
@@ -207,8 +212,11 @@ class FirstockWebSocketAdapter(BaseBrokerWebSocketAdapter):
                 'token': token,
                 'subscription_token': subscription_token,
                 'mode': mode,
-                'depth_level': depth_level
+                'depth_level': depth_level,
+                # ZeroMQ topic, built once instead of per tick
+                'topic': f"{exchange}_{symbol}_{mode_str}"
             }
+            self._index_subscription((brexchange, token), correlation_id)
 
         # Subscribe via WebSocket (reference counting will handle duplicates)
         if self.ws_client and self.ws_client.is_connected():
@@ -289,6 +297,7 @@ class FirstockWebSocketAdapter(BaseBrokerWebSocketAdapter):
 
             # Remove the subscription
             del self.subscriptions[correlation_id]
+            self._unindex_subscription((subscription['brexchange'], subscription['token']), correlation_id)
 
             # Only unsubscribe from WebSocket if this was the last subscription
             if is_last and self._should_ws_unsubscribe(subscription_token, mode):
@@ -436,12 +445,13 @@ class FirstockWebSocketAdapter(BaseBrokerWebSocketAdapter):
     
     def _on_message(self, ws, message) -> None:
         """Callback for text messages from the WebSocket"""
-        self.logger.debug(f"Received text message: {message}")
+        self.logger.debug("Received text message: %s", message)
     
     def _on_data(self, ws, data) -> None:
         """Callback for data messages from the WebSocket"""
         try:
-            self.logger.info(f"Received data from Firstock WebSocket: {data}")
+            # Per-tick logging stays at debug with lazy %-formatting
+            self.logger.debug("Received data from Firstock WebSocket: %s", data)
             
             # Handle market data
             if isinstance(data, dict) and 'c_symbol' in data:
@@ -453,7 +463,7 @@ class FirstockWebSocketAdapter(BaseBrokerWebSocketAdapter):
             elif isinstance(data, dict) and 'netqty' in data and 'pcode' in data:
                 self._process_position_update(data)
             else:
-                self.logger.debug(f"Received unknown data type: {data}")
+                self.logger.debug("Received unknown data type: %s", data)
                 
         except Exception as e:
             self.logger.error(f"Error processing data: {e}", exc_info=True)
@@ -560,19 +570,16 @@ class FirstockWebSocketAdapter(BaseBrokerWebSocketAdapter):
             token = data.get('c_symbol', '')
             exchange_seg = data.get('c_exch_seg', '')
             
-            self.logger.debug(f"Processing market data for token: {token}, exchange: {exchange_seg}")
-            self.logger.debug(f"Raw data keys: {list(data.keys())}")
+            self.logger.debug("Processing market data for token: %s, exchange: %s", token, exchange_seg)
+            self.logger.debug("Raw data keys: %s", data.keys())
             
             # Find ALL subscriptions that match this token - we need to publish for each mode
-            matching_subscriptions = []
             with self.lock:
-                for sub in self.subscriptions.values():
-                    if sub['token'] == token and sub['brexchange'] == exchange_seg:
-                        matching_subscriptions.append(sub)
+                matching_subscriptions = self._subscriptions_for_token((exchange_seg, token))
             
             if not matching_subscriptions:
                 self.logger.warning(f"Received data for unsubscribed token: {token} on {exchange_seg}")
-                self.logger.debug(f"Available subscriptions: {list(self.subscriptions.keys())}")
+                self.logger.debug("Available subscriptions: %s", self.subscriptions.keys())
                 return
             
             # Update snapshot with current data (retains previous values for invalid/zero fields)
@@ -585,8 +592,7 @@ class FirstockWebSocketAdapter(BaseBrokerWebSocketAdapter):
                 mode = subscription['mode']
                 
                 # Firstock provides all data in one feed, so we publish based on requested mode
-                mode_str = {1: 'LTP', 2: 'QUOTE', 3: 'DEPTH'}[mode]
-                topic = f"{exchange}_{symbol}_{mode_str}"
+                topic = subscription['topic']
                 
                 # Normalize the data based on the requested mode using processed snapshot
                 market_data = self._normalize_market_data(processed_data, mode)
@@ -599,7 +605,7 @@ class FirstockWebSocketAdapter(BaseBrokerWebSocketAdapter):
                     'timestamp': int(time.time() * 1000)  # Current timestamp in ms
                 })
                 
-                self.logger.info(f"Publishing {mode_str} data for {symbol}.{exchange}: {market_data}")
+                self.logger.debug("Publishing %s data: %s", topic, market_data)
                 
                 # Publish to ZeroMQ
                 self.publish_market_data(topic, market_data)
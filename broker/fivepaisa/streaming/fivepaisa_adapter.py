@@ -190,6 +190,8 @@ class FivepaisaWebSocketAdapter(BaseBrokerWebSocketAdapter):
         if mode == 3:
             correlation_id = f"{correlation_id}_{depth_level}"
 
+        mode_str = {1: 'LTP', 2: 'QUOTE', 3: 'DEPTH'}[mode]
+
         # Store subscription for reconnection
         with self.lock:
             self.subscriptions[correlation_id] = {
@@ -200,8 +202,11 @@ class FivepaisaWebSocketAdapter(BaseBrokerWebSocketAdapter):
                 'mode': mode,
                 'depth_level': depth_level,
                 'method': method,
-                'scrip_data': scrip_data
+                'scrip_data': scrip_data,
+                # ZeroMQ topic, built once instead of per tick
+                'topic': f"{exchange}_{symbol}_{mode_str}"
             }
+            self._index_subscription(str(token), correlation_id)
 
         # Subscribe if connected
         if self.connected and self.ws_client:
@@ -263,7 +268,8 @@ class FivepaisaWebSocketAdapter(BaseBrokerWebSocketAdapter):
         # Remove from subscriptions
         with self.lock:
             if correlation_id in self.subscriptions:
-                del self.subscriptions[correlation_id]
+                sub = self.subscriptions.pop(correlation_id)
+                self._unindex_subscription(str(sub['token']), correlation_id)
 
         # Unsubscribe if connected
         if self.connected and self.ws_client:
@@ -309,26 +315,24 @@ class FivepaisaWebSocketAdapter(BaseBrokerWebSocketAdapter):
 
     def _on_message(self, wsapp, message) -> None:
         """Callback for text messages from the WebSocket"""
-        self.logger.debug(f"Received message: {message}")
+        self.logger.debug("Received message: %s", message)
 
     def _on_data(self, wsapp, message: Dict) -> None:
         """Callback for market data from the WebSocket"""
         try:
-            self.logger.debug(f"RAW 5PAISA DATA: {message}")
+            # Lazy %-formatting: only rendered when debug logging is enabled
+            self.logger.debug("RAW 5PAISA DATA: %s", message)
 
             # Extract token from message
             token = str(message.get('Token'))
 
             # Find ALL subscriptions that match this token
             # Fivepaisa sends one message that should update all modes subscribed to that token
-            matching_subscriptions = []
             with self.lock:
-                for sub in self.subscriptions.values():
-                    if str(sub['token']) == token:
-                        matching_subscriptions.append(sub)
+                matching_subscriptions = self._subscriptions_for_token(token)
 
             if not matching_subscriptions:
-                self.logger.warning(f"Received data for unsubscribed token: {token}")
+                self.logger.warning("Received data for unsubscribed token: %s", token)
                 return
 
             # Publish data to ALL matching subscriptions
@@ -338,8 +342,7 @@ class FivepaisaWebSocketAdapter(BaseBrokerWebSocketAdapter):
                 exchange = subscription['exchange']
                 mode = subscription['mode']
 
-                mode_str = {1: 'LTP', 2: 'QUOTE', 3: 'DEPTH'}[mode]
-                topic = f"{exchange}_{symbol}_{mode_str}"
+                topic = subscription['topic']
 
                 # Apply snapshot logic - merge current message with last known values
                 token_key = f"{token}_{mode}"
@@ -357,8 +360,9 @@ class FivepaisaWebSocketAdapter(BaseBrokerWebSocketAdapter):
                 })
 
                 # Log the market data we're sending
-                self.logger.debug(f"Publishing to topic '{topic}': symbol={symbol}, exchange={exchange}, mode={mode}, ltp={market_data.get('ltp', 'N/A')}")
-                self.logger.debug(f"Full market data: {market_data}")
+                self.logger.debug("Publishing to topic '%s': symbol=%s, exchange=%s, mode=%s, ltp=%s",
+                                  topic, symbol, exchange, mode, market_data.get('ltp', 'N/A'))
+                self.logger.debug("Full market data: %s", market_data)
 
                 # Publish to ZeroMQ
                 self.publish_market_data(topic, market_data)
@@ -397,7 +401,7 @@ class FivepaisaWebSocketAdapter(BaseBrokerWebSocketAdapter):
             if current_value == 0 or current_value is None:
                 if field in last_snapshot and last_snapshot[field] != 0:
                     merged_message[field] = last_snapshot[field]
-                    self.logger.debug(f"Using snapshot value for {field}: {last_snapshot[field]}")
+                    self.logger.debug("Using snapshot value for %s: %s", field, last_snapshot[field])
             else:
                 # Update snapshot with new non-zero value
                 last_snapshot[field] = current_value
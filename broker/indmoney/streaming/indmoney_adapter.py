@@ -174,8 +174,11 @@ class IndmoneyWebSocketAdapter(BaseBrokerWebSocketAdapter):
                 'instrument_token': instrument_token,
                 'mode': mode,
                 'indmoney_mode': indmoney_mode,
-                'depth_level': depth_level
+                'depth_level': depth_level,
+                # ZeroMQ topics by feed mode, built once instead of per tick
+                'topics': {mode_str: f"{exchange}_{symbol}_{mode_str}" for mode_str in ('LTP', 'QUOTE')}
             }
+            self._index_subscription(token, correlation_id)
 
         # Subscribe if connected
         self.logger.info(f"Checking connection status: connected={self.connected}, ws_client={self.ws_client is not None}")
@@ -238,7 +241,8 @@ class IndmoneyWebSocketAdapter(BaseBrokerWebSocketAdapter):
         should_disconnect = False
         with self.lock:
             if correlation_id in self.subscriptions:
-                del self.subscriptions[correlation_id]
+                sub = self.subscriptions.pop(correlation_id)
+                self._unindex_subscription(sub['token'], correlation_id)
             # Check if all subscriptions are removed
             if len(self.subscriptions) == 0:
                 should_disconnect = True
@@ -330,18 +334,18 @@ class IndmoneyWebSocketAdapter(BaseBrokerWebSocketAdapter):
 
     def _on_message(self, wsapp, message) -> None:
         """Callback for text messages from the WebSocket"""
-        self.logger.debug(f"Received message: {message}")
+        self.logger.debug("Received message: %s", message)
 
     def _on_data(self, wsapp, message) -> None:
         """Callback for market data from the WebSocket"""
         try:
             # Parse JSON if message comes as string
             if isinstance(message, str):
-                self.logger.debug(f"Parsing JSON string: {message[:100]}...")
+                self.logger.debug("Parsing JSON string: %s...", message[:100])
                 message = json.loads(message)
 
-            # Log all incoming messages for debugging
-            self.logger.info(f">> RAW INDMONEY DATA: {message}")
+            # Per-tick logging stays at debug with lazy %-formatting
+            self.logger.debug(">> RAW INDMONEY DATA: %s", message)
 
             # INDmoney sends data in JSON format
             # Expected format from API doc:
@@ -361,32 +365,28 @@ class IndmoneyWebSocketAdapter(BaseBrokerWebSocketAdapter):
             mode = message.get('mode')
             data = message.get('data', {})
 
-            self.logger.info(f"[DATA] Instrument={instrument}, Mode={mode}, Data={data}")
+            self.logger.debug("[DATA] Instrument=%s, Mode=%s, Data=%s", instrument, mode, data)
 
             if not instrument or not mode:
                 self.logger.warning(f"[WARN] Message missing instrument or mode: {message}")
                 return
 
-            # Find the subscription that matches this instrument
-            subscription = None
+            # Find the subscription that matches this instrument (first subscribed wins)
+            # INDmoney returns only the token part, not the full SEGMENT:TOKEN
             with self.lock:
-                for sub in self.subscriptions.values():
-                    # INDmoney returns only the token part, not the full SEGMENT:TOKEN
-                    if sub['token'] == instrument:
-                        subscription = sub
-                        break
-
-            if not subscription:
-                self.logger.debug(f"Received data for unsubscribed instrument: {instrument}")
+                subscriptions = self._subscriptions_for_token(instrument)
+
+            if not subscriptions:
+                self.logger.debug("Received data for unsubscribed instrument: %s", instrument)
                 return
+            subscription = subscriptions[0]
 
             # Create topic for ZeroMQ
             symbol = subscription['symbol']
             exchange = subscription['exchange']
 
             # Map INDmoney mode to OpenAlgo mode string
-            mode_str = 'LTP' if mode == 'ltp' else 'QUOTE'
-            topic = f"{exchange}_{symbol}_{mode_str}"
+            topic = subscription['topics']['LTP' if mode == 'ltp' else 'QUOTE']
 
             # Normalize the data with caching for value retention
             cache_key = f"{symbol}_{exchange}"
@@ -401,7 +401,7 @@ class IndmoneyWebSocketAdapter(BaseBrokerWebSocketAdapter):
             })
 
             # Log and publish
-            self.logger.debug(f"Publishing market data: topic={topic}, data={market_data}")
+            self.logger.debug("Publishing market data: topic=%s, data=%s", topic, market_data)
             self.publish_market_data(topic, market_data)
 
         except Exception as e:
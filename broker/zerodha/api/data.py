@@ -5,12 +5,16 @@ import urllib.parse
 from database.token_db import get_br_symbol, get_oa_symbol
 from broker.zerodha.database.master_contract_db import SymToken, db_session
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 from utils.httpx_client import get_httpx_client
+from utils.history_chunks import plan_chunks, fetch_chunks
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Zerodha historical candle API: 3 requests per second
+HISTORY_RATE_LIMIT = 3
+
 
 
 
@@ -439,42 +443,35 @@ class BrokerData:
             start_date = pd.to_datetime(from_date)
             end_date = pd.to_datetime(to_date)
             
-            # Initialize empty list to store DataFrames
-            dfs = []
-            
-            # Process data in 60-day chunks
-            current_start = start_date
-            while current_start <= end_date:
-                # Calculate chunk end date (60 days or remaining period)
-                current_end = min(current_start + timedelta(days=59), end_date)
-                
+            def fetch_chunk(current_start, current_end):
                 # Format dates for API call
                 from_str = current_start.strftime('%Y-%m-%d+00:00:00')
                 to_str = current_end.strftime('%Y-%m-%d+23:59:59')
-                
+
                 # Log the request details
                 logger.debug(f"Fetching {resolution} data for {exchange}:{symbol} from {from_str} to {to_str}")
-                
+
                 # Construct endpoint
                 endpoint = f"/instruments/historical/{instrument_token}/{resolution}?from={from_str}&to={to_str}&oi=1"
                 logger.debug(f"Making request to endpoint: {endpoint}")
-                
+
                 # Use get_api_response
                 response = get_api_response(endpoint, self.auth_token)
-                
+
                 if not response or response.get('status') != 'success':
                     logger.error(f"API Response: {response}")
                     raise Exception(f"Error from Zerodha API: {response.get('message', 'Unknown error')}")
-                
+
                 # Convert to DataFrame
                 candles = response.get('data', {}).get('candles', [])
                 if candles:
-                    df = pd.DataFrame(candles, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume', 'oi'])
-                    dfs.append(df)
-                
-                # Move to next chunk
-                current_start = current_end + timedelta(days=1)
-                
+                    return pd.DataFrame(candles, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume', 'oi'])
+                return None
+
+            # Fetch the 60-day chunks concurrently within Zerodha's historical API rate limit
+            chunks = plan_chunks(start_date, end_date, 60)
+            dfs = [df for df in fetch_chunks(fetch_chunk, chunks, 'zerodha', HISTORY_RATE_LIMIT) if df is not None]
+
             # If no data was found, return empty DataFrame
             if not dfs:
                 return pd.DataFrame(columns=['timestamp', 'open', 'high', 'low', 'close', 'volume', 'oi'])
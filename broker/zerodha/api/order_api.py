@@ -7,6 +7,7 @@ from database.token_db import get_br_symbol, get_oa_symbol
 from broker.zerodha.mapping.transform_data import transform_data, map_product_type, reverse_map_product_type, transform_modify_order_data
 from utils.httpx_client import get_httpx_client
 from utils.logging import get_logger
+from utils.order_dispatch import dispatch_bulk
 
 logger = get_logger(__name__)
 
@@ -260,7 +261,8 @@ def close_all_positions(current_api_key,auth):
         return {"message": "No Open Positions Found"}, 200
 
     if positions_response['status']:
-        # Loop through each position to close
+        # Build one squareoff order per open position
+        squareoff_orders = []
         for position in positions_response['data']['net']:
             # Skip if net quantity is zero
             if int(position['quantity']) == 0:
@@ -285,13 +287,15 @@ def close_all_positions(current_api_key,auth):
             }
 
             logger.info(f"Close position payload: {place_order_payload}")
+            squareoff_orders.append(place_order_payload)
 
-            # Place the order to close the position
-            _, api_response, _ =   place_order_api(place_order_payload,AUTH_TOKEN)
-
-            logger.info(f"Close position response: {api_response}")
-            
-            # Note: Ensure place_order_api handles any errors and logs accordingly
+        # Place the squareoff orders concurrently under the broker rate limit
+        results = dispatch_bulk(lambda payload: place_order_api(payload, AUTH_TOKEN), squareoff_orders, 'zerodha')
+        for payload, (result, error) in zip(squareoff_orders, results):
+            if error is not None or result[0].status != 200:
+                logger.error(f"Failed to close position {payload['symbol']}: {error or result[1]}")
+            else:
+                logger.info(f"Close position response: {result[1]}")
 
     return {'status': 'success', "message": "All Open Positions SquaredOff"}, 200
 
@@ -407,11 +411,11 @@ def cancel_all_orders_api(data,auth):
     canceled_orders = []
     failed_cancellations = []
 
-    # Cancel the filtered orders
-    for order in orders_to_cancel:
+    # Cancel the filtered orders concurrently under the broker rate limit
+    results = dispatch_bulk(lambda order: cancel_order(order['order_id'], AUTH_TOKEN), orders_to_cancel, 'zerodha')
+    for order, (result, error) in zip(orders_to_cancel, results):
         orderid = order['order_id']
-        cancel_response, status_code = cancel_order(orderid,AUTH_TOKEN)
-        if status_code == 200:
+        if error is None and result[1] == 200:
             canceled_orders.append(orderid)
         else:
             failed_cancellations.append(orderid)
@@ -2,6 +2,9 @@
 
 import os
 import base64
+import hashlib
+import hmac
+import time
 from sqlalchemy import create_engine, UniqueConstraint, Index
 from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
@@ -14,6 +17,7 @@ from argon2.exceptions import VerifyMismatchError
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from database.shared_auth_cache import create_shared_cache
 from utils.logging import get_logger
 
 # Initialize logger
@@ -105,6 +109,15 @@ verified_api_key_cache = TTLCache(maxsize=1024, ttl=36000)  # 10 hours
 # Define a cache for invalid API keys with shorter 5-minute TTL (prevent cache poisoning)
 invalid_api_key_cache = TTLCache(maxsize=512, ttl=300)  # 5 minutes
 
+# Verified API keys shared with the other workers and the next restart (database/shared_auth_cache.py)
+shared_cache = create_shared_cache()
+
+# Seconds between reads of the shared cache generations; another worker's
+# invalidation reaches this process's caches within this interval
+GENERATION_CHECK_INTERVAL = 1.0
+_seen_generations = {}
+_generations_checked_at = 0.0
+
 # Conditionally create engine based on DB type
 if DATABASE_URL and 'sqlite' in DATABASE_URL:
     # SQLite: Use NullPool to prevent connection pool exhaustion
@@ -150,6 +163,7 @@ class ApiKeys(Base):
     user_id = Column(String, nullable=False, unique=True)
     api_key_hash = Column(Text, nullable=False)  # For verification
     api_key_encrypted = Column(Text, nullable=False)  # For retrieval
+    api_key_fingerprint = Column(String(64))  # HMAC-SHA256(pepper, key) for lookup, NULL until backfilled
     created_at = Column(DateTime(timezone=True), default=func.now())
     order_mode = Column(String(20), default='auto')  # 'auto' or 'semi_auto'
 
@@ -157,6 +171,7 @@ class ApiKeys(Base):
     __table_args__ = (
         Index('idx_api_keys_order_mode', 'order_mode'),    # Speeds up filtering by order mode
         Index('idx_api_keys_created_at', 'created_at'),    # Speeds up time-based queries
+        Index('idx_api_keys_fingerprint', 'api_key_fingerprint'),  # Finds the row to verify an API key against
     )
 
 def init_db():
@@ -196,6 +211,9 @@ def upsert_auth(name, auth_token, broker, feed_token=None, user_id=None, revoke=
         db_session.add(auth_obj)
     db_session.commit()
 
+    # Tokens cached by this and every other process are stale now
+    _invalidate_shared_cache('auth')
+
     # Update cache after successful database operation
     cache_key_auth = f"auth-{name}"
     cache_key_feed = f"feed-{name}"
@@ -223,6 +241,7 @@ def get_auth_token(name):
         logger.debug("get_auth_token called with empty/None name, returning None")
         return None
         
+    _sync_shared_cache()
     cache_key = f"auth-{name}"
     if cache_key in auth_cache:
         auth_obj = auth_cache[cache_key]
@@ -264,6 +283,7 @@ def get_feed_token(name):
         logger.debug("get_feed_token called with empty/None name, returning None")
         return None
         
+    _sync_shared_cache()
     cache_key = f"feed-{name}"
     if cache_key in feed_token_cache:
         auth_obj = feed_token_cache[cache_key]
@@ -321,13 +341,57 @@ def invalidate_user_cache(user_id):
     Invalidate all cached data for a user when their credentials change.
     Security: Ensures old API keys/tokens are not usable after regeneration.
     """
-    # Clear all caches that might contain this user's data
+    # Clear all caches that might contain this user's data, in every process
+    _invalidate_shared_cache('api_key', 'auth')
+    logger.info(f"Cleared all caches for user_id: {user_id}")
+
+def _clear_local_caches(namespace):
+    """Clear this process's caches covered by a shared cache namespace"""
     auth_cache.clear()
-    broker_cache.clear()
     feed_token_cache.clear()
-    verified_api_key_cache.clear()
-    invalid_api_key_cache.clear()
-    logger.info(f"Cleared all caches for user_id: {user_id}")
+    broker_cache.clear()
+    if namespace == 'api_key':
+        verified_api_key_cache.clear()
+        invalid_api_key_cache.clear()
+
+def _invalidate_shared_cache(*namespaces):
+    """Clear the local caches and bump the shared generations so other processes clear theirs"""
+    for namespace in namespaces:
+        _clear_local_caches(namespace)
+    generations = shared_cache.bump(*namespaces)
+    for namespace in namespaces:
+        if namespace in generations:
+            _seen_generations[namespace] = generations[namespace]
+
+def _sync_shared_cache():
+    """
+    Clear the local caches of namespaces another process has invalidated.
+    Reads the shared generations at most every GENERATION_CHECK_INTERVAL seconds.
+    """
+    global _generations_checked_at
+    now = time.monotonic()
+    if now - _generations_checked_at < GENERATION_CHECK_INTERVAL:
+        return
+    _generations_checked_at = now
+
+    generations = shared_cache.generations()
+    for namespace, generation in generations.items():
+        if namespace in _seen_generations and _seen_generations[namespace] != generation:
+            _clear_local_caches(namespace)
+            logger.debug(f"Cleared local {namespace} caches after invalidation by another process")
+    _seen_generations.update(generations)
+
+def _api_key_hash_digest(api_key_hash):
+    """Short digest of a stored Argon2 hash, recorded with shared API key verifications"""
+    return hashlib.sha256(api_key_hash.encode()).hexdigest()
+
+def api_key_fingerprint(api_key):
+    """
+    Keyed lookup fingerprint of an API key: HMAC-SHA256 with the pepper.
+    Indexed in api_keys so verification only runs Argon2 against one row;
+    without the pepper it cannot be used to test candidate keys offline.
+    """
+    return hmac.new(PEPPER.encode(), api_key.encode(), hashlib.sha256).hexdigest()
 
 def upsert_api_key(user_id, api_key):
     """Store both hashed and encrypted API key"""
@@ -337,16 +401,19 @@ def upsert_api_key(user_id, api_key):
 
     # Encrypt for retrieval
     encrypted_key = encrypt_token(api_key)
+    fingerprint = api_key_fingerprint(api_key)
 
     api_key_obj = ApiKeys.query.filter_by(user_id=user_id).first()
     if api_key_obj:
         api_key_obj.api_key_hash = hashed_key
         api_key_obj.api_key_encrypted = encrypted_key
+        api_key_obj.api_key_fingerprint = fingerprint
     else:
         api_key_obj = ApiKeys(
             user_id=user_id,
             api_key_hash=hashed_key,
-            api_key_encrypted=encrypted_key
+            api_key_encrypted=encrypted_key,
+            api_key_fingerprint=fingerprint
         )
         db_session.add(api_key_obj)
     db_session.commit()
@@ -376,6 +443,39 @@ def get_api_key_for_tradingview(user_id):
         logger.error(f"Error while querying the database for API key: {e}")
         return None
 
+# Set once every api_keys row in this database has a fingerprint
+_fingerprints_backfilled = False
+
+def _backfill_api_key_fingerprints():
+    """
+    Lazily fingerprint API keys stored before api_key_fingerprint existed.
+    The plaintext comes from api_key_encrypted, so no Argon2 work is needed;
+    rows that cannot be decrypted keep a NULL fingerprint and are verified
+    the old way by _unfingerprinted_api_keys().
+    """
+    global _fingerprints_backfilled
+    if _fingerprints_backfilled:
+        return
+
+    pending = ApiKeys.query.filter(ApiKeys.api_key_fingerprint.is_(None)).all()
+    undecryptable = 0
+    for api_key_obj in pending:
+        api_key = decrypt_token(api_key_obj.api_key_encrypted)
+        if api_key:
+            api_key_obj.api_key_fingerprint = api_key_fingerprint(api_key)
+        else:
+            undecryptable += 1
+    if len(pending) > undecryptable:
+        db_session.commit()
+        logger.info(f"Backfilled API key fingerprints for {len(pending) - undecryptable} users")
+    _fingerprints_backfilled = undecryptable == 0
+
+def _unfingerprinted_api_keys():
+    """API keys still without a fingerprint, which have to be verified one by one"""
+    if _fingerprints_backfilled:
+        return []
+    return ApiKeys.query.filter(ApiKeys.api_key_fingerprint.is_(None)).all()
+
 def verify_api_key(provided_api_key):
     """
     Verify an API key using Argon2 with intelligent caching.
@@ -386,6 +486,11 @@ def verify_api_key(provided_api_key):
     - Invalid keys cached for 5min (prevents brute force)
     - Valid keys cached for 1hr (balances security vs performance)
     - Cache invalidated on key regeneration
+    - Verifications are shared with other workers and restarts through
+      shared_cache, and are only reused while the user's stored hash is the
+      one the key was verified against
+    - Cache misses run Argon2 against the one row found by the keyed
+      (HMAC-with-pepper) fingerprint, not against every user's hash
     """
     from flask import request, has_request_context
     from utils.ip_helper import get_real_ip
@@ -395,6 +500,10 @@ def verify_api_key(provided_api_key):
     # Generate secure cache key (SHA256 hash of API key)
     # Security: Never store plaintext API key in cache
     cache_key = hashlib.sha256(provided_api_key.encode()).hexdigest()
+    # The shared cache is a file on disk, so its entries are keyed by the
+    # peppered fingerprint: a copy of the file cannot be used to test candidate keys
+    fingerprint = api_key_fingerprint(provided_api_key)
+    _sync_shared_cache()
 
     # Step 1: Check invalid cache first (fast rejection of known bad keys)
     if cache_key in invalid_api_key_cache:
@@ -407,18 +516,41 @@ def verify_api_key(provided_api_key):
         logger.debug(f"API key verified from cache for user_id: {user_id}")
         return user_id
 
-    # Step 3: Cache miss - perform expensive Argon2 verification
+    # Generation the result will be shared under, read before the lookup so a
+    # concurrent key regeneration cannot be overwritten with a stale result
+    generation = _seen_generations.get('api_key')
+
+    # Step 3: Check the shared cache (verified by another worker or before a restart)
+    shared_entry = shared_cache.get('api_key', fingerprint)
+    if shared_entry:
+        try:
+            # The shared file can outlive the database (reset or restore), so
+            # only trust it while the user's stored hash is the one verified
+            api_key_obj = ApiKeys.query.filter_by(user_id=shared_entry['user_id']).first()
+            if api_key_obj and _api_key_hash_digest(api_key_obj.api_key_hash) == shared_entry['verified_hash']:
+                verified_api_key_cache[cache_key] = api_key_obj.user_id
+                logger.debug(f"API key verified from shared cache for user_id: {api_key_obj.user_id}")
+                return api_key_obj.user_id
+        except Exception as e:
+            logger.error(f"Error checking shared API key cache entry: {e}")
+
+    # Step 4: Cache miss - find the key's row by fingerprint and verify it with Argon2
     peppered_key = provided_api_key + PEPPER
     try:
-        # Query all API keys
-        api_keys = ApiKeys.query.all()
+        _backfill_api_key_fingerprints()
+
+        api_key_obj = ApiKeys.query.filter_by(api_key_fingerprint=fingerprint).first()
+        candidates = [api_key_obj] if api_key_obj else _unfingerprinted_api_keys()
 
-        # Try to verify against each stored hash
-        for api_key_obj in api_keys:
+        for api_key_obj in candidates:
             try:
                 ph.verify(api_key_obj.api_key_hash, peppered_key)
                 # Valid key found - cache it
                 verified_api_key_cache[cache_key] = api_key_obj.user_id
+                shared_cache.set('api_key', fingerprint, {
+                    'user_id': api_key_obj.user_id,
+                    'verified_hash': _api_key_hash_digest(api_key_obj.api_key_hash)
+                }, verified_api_key_cache.ttl, generation)
                 logger.debug(f"API key verified and cached for user_id: {api_key_obj.user_id}")
                 return api_key_obj.user_id
             except VerifyMismatchError:
@@ -457,6 +589,7 @@ def get_username_by_apikey(provided_api_key):
 
 def get_broker_name(provided_api_key):
     """Get only the broker name for a valid API key with caching"""
+    _sync_shared_cache()
     # Check if broker name is in cache
     if provided_api_key in broker_cache:
         return broker_cache[provided_api_key]
@@ -492,6 +625,7 @@ def get_auth_token_broker(provided_api_key, include_feed_token=False):
 
     # Generate cache key
     cache_key = f"{hashlib.sha256(provided_api_key.encode()).hexdigest()}_{include_feed_token}"
+    _sync_shared_cache()
 
     # Check cache first (but still verify revocation status)
     if cache_key in auth_cache:
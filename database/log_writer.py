@@ -0,0 +1,145 @@
+# database/log_writer.py
+"""
+Batched background writer for log tables (traffic, latency and API order logs)
+
+Request handlers hand their log rows to the shared `log_writer` instead of
+committing them one at a time. Rows go into a bounded in-memory queue that a
+single daemon thread drains, bulk-inserting everything collected in the last
+flush interval (or up to batch_size rows) with one INSERT ... executemany and
+one commit per table, so the commit/fsync cost is shared by the whole batch
+and never paid on the request path.
+
+When the queue is full the row is dropped and counted rather than blocking
+the request; stats() exposes the submitted/written/dropped/failed counters.
+Rows still queued at interpreter exit are flushed by an atexit hook.
+"""
+
+import atexit
+import queue
+import threading
+import time
+
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Queue capacity, rows per INSERT and the longest a row waits before it is written
+MAX_QUEUE_SIZE = 20000
+BATCH_SIZE = 500
+FLUSH_INTERVAL_MS = 200
+
+# Seconds between warnings while rows are being dropped
+DROP_WARNING_INTERVAL = 10
+
+
+class BatchLogWriter:
+    """Bounded queue of log rows drained by one writer thread in batched inserts"""
+
+    def __init__(self, max_queue_size=MAX_QUEUE_SIZE, batch_size=BATCH_SIZE, flush_interval_ms=FLUSH_INTERVAL_MS):
+        """
+        Args:
+            max_queue_size: rows held in memory before new rows are dropped
+            batch_size: most rows written by one flush
+            flush_interval_ms: longest a queued row waits for its batch to fill
+        """
+        self.queue = queue.Queue(maxsize=max_queue_size)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.enabled = True
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self._last_drop_warning = 0.0
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, engine, table, row):
+        """
+        Queue one row for `table` (a SQLAlchemy Table) on `engine`.
+
+        Returns:
+            bool: False if the row was dropped because the queue is full
+        """
+        if self._thread is None:
+            self._start()
+        try:
+            self.queue.put_nowait((engine, table, row))
+        except queue.Full:
+            self.dropped += 1
+            now = time.monotonic()
+            if now - self._last_drop_warning >= DROP_WARNING_INTERVAL:
+                self._last_drop_warning = now
+                logger.warning(f"Log writer queue full, {self.dropped} log rows dropped so far")
+            return False
+        self.submitted += 1
+        return True
+
+    def flush(self):
+        """Block until every row queued so far has been written (or has failed)"""
+        if self._thread is not None:
+            self.queue.join()
+
+    def stats(self):
+        return {
+            'queued': self.queue.qsize(),
+            'submitted': self.submitted,
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'batches': self.batches
+        }
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="LogWriter", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        get = self.queue.get
+        while True:
+            # Wait for the first row, then collect for at most one flush interval
+            batch = [get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(get(timeout=timeout))
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _write(self, batch):
+        # One executemany INSERT and one commit per (engine, table) in the batch
+        groups = {}
+        for engine, table, row in batch:
+            groups.setdefault((engine, table), []).append(row)
+
+        for (engine, table), rows in groups.items():
+            try:
+                with engine.begin() as conn:
+                    conn.execute(table.insert(), rows)
+                self.written += len(rows)
+            except Exception as e:
+                self.failed += len(rows)
+                logger.error(f"Error writing {len(rows)} rows to {table.name}: {e}")
+        self.batches += 1
+
+        for _ in batch:
+            self.queue.task_done()
+
+
+# Shared by traffic_db, latency_db and apilog_db
+log_writer = BatchLogWriter()
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        log_writer.flush()
+    except Exception:
+        pass
@@ -0,0 +1,248 @@
+"""
+Auth cache shared by every worker process on the host.
+
+database/auth_db.py keeps per-process TTLCaches in front of the database. This
+module adds a second level behind them that all Gunicorn workers, and the next
+process after a restart, can read. It holds API key verifications (keyed
+fingerprint of the key, see auth_db.api_key_fingerprint -> user_id), so a new worker does not repeat the Argon2 verification
+for keys that another worker already checked.
+
+Invalidation is generation based. Each namespace has a counter in the shared
+store:
+- 'api_key' is bumped when an API key is regenerated (invalidate_user_cache)
+- 'auth' is bumped when broker tokens change (upsert_auth)
+
+Entries are stored with the generation current when they were written and are
+ignored once it moves on. Workers also poll the counters (see
+auth_db._sync_shared_cache) and clear their own TTLCaches when they change.
+
+Broker tokens are never written here, decrypted or not; they stay in the
+per-process caches.
+
+AUTH_CACHE_BACKEND selects the backend:
+    sqlite  (default) a SQLite file only the owner can read, next to a
+            SQLite DATABASE_URL or in the app's db/ directory, or
+            AUTH_CACHE_PATH if set
+    memory  no shared level, only the per-process caches
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+SHARED_CACHE_FILENAME = 'auth_cache.db'
+
+# Default directory for the cache file when the database is not SQLite
+APP_DB_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'db')
+
+# Namespaces with their own generation counter
+NAMESPACES = ('api_key', 'auth')
+
+# Seconds to wait for another process holding the write lock
+BUSY_TIMEOUT_SECONDS = 5
+
+
+class AuthCacheBackend:
+    """
+    Shared auth cache interface. This base class is the 'memory' backend: it
+    stores nothing, so only the per-process caches are used.
+    """
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """
+        Get a live entry
+
+        Args:
+            namespace: One of NAMESPACES
+            key: Entry key (never a plaintext credential)
+
+        Returns:
+            The stored JSON value, or None if missing, expired or from an older generation
+        """
+        return None
+
+    def set(self, namespace: str, key: str, value: Any, ttl: int, generation: Optional[int] = None) -> bool:
+        """
+        Store an entry
+
+        Args:
+            namespace: One of NAMESPACES
+            key: Entry key (never a plaintext credential)
+            value: JSON serializable value
+            ttl: Seconds the entry stays valid
+            generation: Generation read before the value was looked up; the
+                entry is only stored if it is still current
+
+        Returns:
+            bool: True if the entry was stored
+        """
+        return False
+
+    def generations(self) -> Dict[str, int]:
+        """Current generation of every namespace"""
+        return {}
+
+    def bump(self, *namespaces: str) -> Dict[str, int]:
+        """
+        Invalidate every entry in the given namespaces, in all processes
+
+        Returns:
+            dict: Current generation of every namespace after the bump
+        """
+        return {}
+
+
+class SQLiteAuthCacheBackend(AuthCacheBackend):
+    """Shared auth cache in a local SQLite file (WAL mode, one connection per thread)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._create()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _create(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        # The file holds user_id mappings only, but keep it private to the
+        # owner; create it that way so it is never readable by others, and
+        # refuse a file whose permissions cannot be fixed (create_shared_cache
+        # then falls back to the per-process caches). SQLite gives the -wal
+        # and -shm files the same permissions.
+        os.close(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600))
+        os.chmod(self.path, 0o600)
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_generation (
+                namespace TEXT PRIMARY KEY,
+                generation INTEGER NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_entry (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                generation INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+        """)
+        conn.executemany(
+            "INSERT OR IGNORE INTO cache_generation (namespace, generation) VALUES (?, 0)",
+            [(namespace,) for namespace in NAMESPACES]
+        )
+
+    def get(self, namespace, key):
+        try:
+            row = self._connect().execute("""
+                SELECT e.value FROM cache_entry e
+                JOIN cache_generation g ON g.namespace = e.namespace AND g.generation = e.generation
+                WHERE e.namespace = ? AND e.key = ? AND e.expires_at > ?
+            """, (namespace, key, time.time())).fetchone()
+            return json.loads(row[0]) if row else None
+        except Exception as e:
+            logger.warning(f"Shared auth cache read failed: {e}")
+            return None
+
+    def set(self, namespace, key, value, ttl, generation=None):
+        try:
+            cursor = self._connect().execute("""
+                INSERT OR REPLACE INTO cache_entry (namespace, key, value, generation, expires_at)
+                SELECT namespace, ?, ?, generation, ? FROM cache_generation
+                WHERE namespace = ? AND (? IS NULL OR generation = ?)
+            """, (key, json.dumps(value), time.time() + ttl, namespace, generation, generation))
+            return cursor.rowcount > 0
+        except Exception as e:
+            logger.warning(f"Shared auth cache write failed: {e}")
+            return False
+
+    def generations(self):
+        try:
+            return dict(self._connect().execute("SELECT namespace, generation FROM cache_generation").fetchall())
+        except Exception as e:
+            logger.warning(f"Shared auth cache generation read failed: {e}")
+            return {}
+
+    def bump(self, *namespaces):
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            for namespace in namespaces:
+                conn.execute("UPDATE cache_generation SET generation = generation + 1 WHERE namespace = ?", (namespace,))
+                # Entries of older generations can never be served again
+                conn.execute("DELETE FROM cache_entry WHERE namespace = ?", (namespace,))
+            conn.execute("DELETE FROM cache_entry WHERE expires_at <= ?", (time.time(),))
+            conn.execute('COMMIT')
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            logger.error(f"Shared auth cache invalidation failed: {e}")
+        return self.generations()
+
+
+def get_shared_cache_path() -> Optional[str]:
+    """
+    Get the shared cache file location
+
+    AUTH_CACHE_PATH overrides the location. By default the file sits next to a
+    SQLite DATABASE_URL, or in the app's db/ directory (named after the
+    database) for other databases. Never in the shared temp directory, where
+    another local user could create the file first.
+
+    Returns:
+        str: Cache file path, or None for an in-memory or unconfigured database
+    """
+    path = os.getenv('AUTH_CACHE_PATH', '').strip()
+    if path:
+        return path
+
+    database_url = os.getenv('DATABASE_URL', '').strip()
+    if not database_url:
+        # No database to name the file after (e.g. a module imported without .env)
+        return None
+    if database_url.startswith('sqlite:///'):
+        db_file = database_url[len('sqlite:///'):]
+        if not db_file or db_file == ':memory:':
+            return None
+        return os.path.join(os.path.dirname(db_file) or '.', SHARED_CACHE_FILENAME)
+    source_id = hashlib.sha256(database_url.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(APP_DB_DIR, f"{source_id}_{SHARED_CACHE_FILENAME}")
+
+
+def create_shared_cache() -> AuthCacheBackend:
+    """Create the backend selected by AUTH_CACHE_BACKEND, falling back to 'memory' on errors"""
+    backend = os.getenv('AUTH_CACHE_BACKEND', 'sqlite').strip().lower()
+    if backend == 'memory':
+        return AuthCacheBackend()
+    if backend != 'sqlite':
+        logger.warning(f"Unknown AUTH_CACHE_BACKEND '{backend}', using per-process auth caches only")
+        return AuthCacheBackend()
+
+    path = get_shared_cache_path()
+    if not path:
+        return AuthCacheBackend()
+    try:
+        cache = SQLiteAuthCacheBackend(path)
+        logger.debug(f"Shared auth cache at {path}")
+        return cache
+    except Exception as e:
+        logger.warning(f"Could not open shared auth cache at {path}, using per-process auth caches only: {e}")
+        return AuthCacheBackend()
@@ -0,0 +1,400 @@
+"""
+Search index for the in-memory symbol cache.
+
+Built once per SymbolTable and used by BrokerSymbolCache.search_symbols and
+fno_search_symbols instead of scanning every row:
+
+- Bigram/trigram postings over the uppercased symbol, brsymbol and token, so
+  substring terms are answered by intersecting sorted row-id arrays
+- Rows sorted by uppercased symbol for prefix ranges (used for ranking)
+- Rows grouped by (underlying, expiry) with strikes sorted inside each group,
+  for underlying/expiry/strike-range filters, and CE/PE strike ladders per
+  (underlying, expiry, exchange) built from them for option chains
+- A per-row instrument kind (FUT/CE/PE) taken from the symbol suffix
+
+The index only narrows and ranks candidates; the caller verifies candidates
+in rank order with its exact match rules, so results are the same as a full
+scan while touching little more than `limit` rows.
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Instrument kinds derived from the symbol suffix, as used by the FNO filter
+KIND_OTHER, KIND_FUT, KIND_CE, KIND_PE = 0, 1, 2, 3
+KIND_CODES = {'FUT': KIND_FUT, 'CE': KIND_CE, 'PE': KIND_PE}
+
+# Bigram codes are tagged so they never collide with 24-bit trigram codes
+_BIGRAM_FLAG = 1 << 24
+
+_EMPTY = np.empty(0, dtype=np.int32)
+
+_build_lock = threading.Lock()
+
+
+def get_search_index(table) -> 'SymbolSearchIndex':
+    """Get the search index of a SymbolTable, building it on first use"""
+    index = getattr(table, '_search_index', None)
+    if index is None:
+        with _build_lock:
+            index = getattr(table, '_search_index', None)
+            if index is None:
+                index = SymbolSearchIndex(table)
+                table._search_index = index
+    return index
+
+
+def intersect_sorted(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Intersection of two sorted, duplicate-free row arrays"""
+    if len(a) > len(b):
+        a, b = b, a
+    if not len(a):
+        return a
+    idx = np.searchsorted(b, a)
+    idx[idx == len(b)] = 0
+    return a[b[idx] == a]
+
+
+class SymbolSearchIndex:
+    """
+    Prebuilt search structures for one SymbolTable
+    """
+
+    def __init__(self, table):
+        """
+        Build the index
+
+        Args:
+            table: SymbolTable (or MappedSymbolTable) to index
+        """
+        self.table = table
+        self.size = size = table.size
+
+        symbols = list(table.symbol)
+        upper_symbols = [_upper(symbol) for symbol in symbols]
+        # brsymbols only contribute grams where they differ from the symbol
+        upper_brsymbols = [
+            upper_brsymbol if upper_brsymbol != upper_symbol else ''
+            for upper_symbol, upper_brsymbol in zip(upper_symbols, (_upper(value) for value in table.brsymbol))
+        ]
+        upper_tokens = [_upper(token) if token else '' for token in table.token]
+        self._build_grams((upper_symbols, upper_brsymbols, upper_tokens))
+
+        self.names_upper = [name.upper() if name else None for name in table.names]
+
+        # Ranking: each row's position in symbol order, ties kept in load order
+        order = sorted(range(size), key=symbols.__getitem__)
+        self.symbol_rank = np.empty(size, dtype=np.int32)
+        self.symbol_rank[order] = np.arange(size, dtype=np.int32)
+
+        # Prefix ranges over the uppercased symbols
+        upper_order = sorted(range(size), key=upper_symbols.__getitem__)
+        self.upper_order = np.array(upper_order, dtype=np.int32)
+        self.sorted_upper = [upper_symbols[row] for row in upper_order]
+
+        self.kinds = np.fromiter(
+            (KIND_FUT if s.endswith('FUT') else KIND_CE if s.endswith('CE') else
+             KIND_PE if s.endswith('PE') else KIND_OTHER for s in upper_symbols),
+            dtype=np.uint8,
+            count=size
+        )
+
+        self._build_chain_groups()
+        # (underlying, expiry, exchange) -> option_ladder() result, filled on demand
+        self.option_ladders: Dict[Tuple[str, str, str], Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+    def _build_grams(self, columns: Tuple[List[str], ...]):
+        """Build sorted (gram, row) postings for bigrams and trigrams of every column"""
+        codes_parts = []
+        rows_parts = []
+        for column in columns:
+            encoded = [value.encode('utf-8') for value in column]
+            lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+            data = np.frombuffer(b''.join(encoded), dtype=np.uint8).astype(np.int64)
+            row_of = np.repeat(np.arange(len(encoded), dtype=np.int64), lengths)
+            row_end = np.cumsum(lengths)[row_of]
+            positions = np.arange(len(data), dtype=np.int64)
+
+            # Bigrams
+            p = positions[positions + 2 <= row_end]
+            codes_parts.append((data[p] << 8 | data[p + 1]) | _BIGRAM_FLAG)
+            rows_parts.append(row_of[p])
+
+            # Trigrams
+            p = positions[positions + 3 <= row_end]
+            codes_parts.append(data[p] << 16 | data[p + 1] << 8 | data[p + 2])
+            rows_parts.append(row_of[p])
+
+        # Sort and deduplicate (gram, row) pairs; grams then form contiguous runs.
+        # Row ids are stored as int32 like the rest of the table's columns
+        keys = (np.concatenate(codes_parts) << 32) | np.concatenate(rows_parts)
+        keys.sort()
+        keys = keys[np.r_[True, keys[1:] != keys[:-1]]]
+        grams = keys >> 32
+        starts = np.flatnonzero(np.r_[True, grams[1:] != grams[:-1]])
+        self.gram_keys = grams[starts].astype(np.int32)
+        self.gram_starts = np.append(starts, len(keys))
+        self.gram_rows = (keys & 0xFFFFFFFF).astype(np.int32)
+
+    def _build_chain_groups(self):
+        """Sort rows by (underlying, expiry, strike) and record each group's slice"""
+        table = self.table
+        size = self.size
+        self.chain_order = np.lexsort((
+            np.arange(size), table.strike, table.expiry_codes, table.name_codes
+        )).astype(np.int32)
+        self.chain_strikes = table.strike[self.chain_order]
+
+        names = table.name_codes[self.chain_order].astype(np.int64)
+        expiries = table.expiry_codes[self.chain_order].astype(np.int64)
+        self.name_groups = _group_slices(names, names)
+        self.expiry_groups = _group_slices(names << 32 | expiries, names, expiries)
+
+    def _postings(self, code: int) -> np.ndarray:
+        """Rows containing one gram"""
+        i = np.searchsorted(self.gram_keys, code)
+        if i == len(self.gram_keys) or self.gram_keys[i] != code:
+            return _EMPTY
+        return self.gram_rows[self.gram_starts[i]:self.gram_starts[i + 1]]
+
+    def text_mask(self, term: str) -> Optional[np.ndarray]:
+        """
+        Candidate rows for a substring term on symbol, brsymbol, name or token
+
+        Returns:
+            Boolean row mask that covers every row containing the term (exact
+            for terms of two or three bytes), or None if the term is too short
+            to narrow
+        """
+        encoded = term.encode('utf-8')
+        if len(encoded) < 2:
+            return None
+        if len(encoded) == 2:
+            codes = {encoded[0] << 8 | encoded[1] | _BIGRAM_FLAG}
+        else:
+            codes = {encoded[i] << 16 | encoded[i + 1] << 8 | encoded[i + 2] for i in range(len(encoded) - 2)}
+
+        rows = None
+        for postings in sorted((self._postings(code) for code in codes), key=len):
+            rows = postings if rows is None else intersect_sorted(rows, postings)
+            if not len(rows):
+                break
+
+        mask = np.zeros(self.size, dtype=bool)
+        mask[rows] = True
+        for code, name in enumerate(self.names_upper):
+            if name and term in name:
+                mask[self.name_rows(code)] = True
+        return mask
+
+    def strike_mask(self, strike: float) -> np.ndarray:
+        """Boolean row mask of rows with exactly this strike"""
+        return self.table.strike == strike
+
+    def name_rows(self, name_code: int) -> np.ndarray:
+        """Rows of one underlying, ordered by expiry and strike"""
+        return self.chain_order[slice(*self.name_groups.get((name_code,), (0, 0)))]
+
+    def prefix_rows(self, prefix: str) -> np.ndarray:
+        """Rows whose uppercased symbol starts with prefix"""
+        lo = bisect_left(self.sorted_upper, prefix)
+        hi = bisect_left(self.sorted_upper, prefix + '\U0010FFFF', lo)
+        return self.upper_order[lo:hi]
+
+    def filter_rows(
+        self,
+        exchange: Optional[str] = None,
+        underlying: Optional[str] = None,
+        expiry: Optional[str] = None,
+        strike_min: Optional[float] = None,
+        strike_max: Optional[float] = None,
+        kind: Optional[int] = None,
+        mask: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Rows passing the exact-match filters, sorted by row id
+
+        Args:
+            exchange: Exchange code
+            underlying: Uppercased underlying name
+            expiry: Expiry string
+            strike_min: Minimum strike (rows without a strike are excluded)
+            strike_max: Maximum strike (rows without a strike are excluded)
+            kind: KIND_FUT, KIND_CE or KIND_PE
+            mask: Optional boolean row mask the rows must also pass
+
+        Returns:
+            np.ndarray: Row ids
+        """
+        table = self.table
+        if not underlying:
+            combined = table.filter_mask(exchange=exchange, expiry=expiry)
+            if strike_min is not None:
+                combined &= table.strike >= strike_min
+            if strike_max is not None:
+                combined &= table.strike <= strike_max
+            if kind is not None:
+                combined &= self.kinds == kind
+            if mask is not None:
+                combined &= mask
+            return np.flatnonzero(combined)
+
+        # Underlying given: start from its prebuilt groups instead of the whole table
+        parts = []
+        for name_code in (code for code, name in enumerate(self.names_upper) if name == underlying):
+            if expiry:
+                for expiry_code in (code for code, value in enumerate(table.expiries) if value == expiry):
+                    parts.append(self.ladder_rows(name_code, expiry_code, strike_min, strike_max))
+            else:
+                parts.append(self.name_rows(name_code))
+        rows = np.sort(np.concatenate(parts)) if parts else _EMPTY
+        if not expiry:
+            if strike_min is not None:
+                rows = rows[table.strike[rows] >= strike_min]
+            if strike_max is not None:
+                rows = rows[table.strike[rows] <= strike_max]
+        if exchange:
+            rows = rows[vocab_lookup(table.exchanges, lambda value: value == exchange)[table.exchange_codes[rows]]]
+        if kind is not None:
+            rows = rows[self.kinds[rows] == kind]
+        if mask is not None:
+            rows = rows[mask[rows]]
+        return rows
+
+    def ladder_rows(self, name_code: int, expiry_code: int,
+                    strike_min: Optional[float] = None, strike_max: Optional[float] = None) -> np.ndarray:
+        """
+        Rows of one (underlying, expiry) group in ascending strike order
+
+        Args:
+            name_code: Code of the underlying in table.names
+            expiry_code: Code of the expiry in table.expiries
+            strike_min: Optional lower strike bound (inclusive)
+            strike_max: Optional upper strike bound (inclusive)
+        """
+        start, end = self.expiry_groups.get((name_code, expiry_code), (0, 0))
+        if strike_min is not None or strike_max is not None:
+            strikes = self.chain_strikes[start:end]
+            lo = np.searchsorted(strikes, strike_min, 'left') if strike_min is not None else 0
+            # NaN strikes sort last, so stop before them even without an upper bound
+            hi = np.searchsorted(strikes, strike_max if strike_max is not None else np.inf, 'right')
+            start, end = start + lo, start + hi
+        return self.chain_order[start:end]
+
+    def option_ladder(self, underlying: str, expiry: str, exchange: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Strike ladder of one (underlying, expiry) on an exchange, built once and reused
+
+        Args:
+            underlying: Uppercased underlying name
+            expiry: Expiry string as stored (DD-MMM-YY)
+            exchange: Options exchange code
+
+        Returns:
+            (strikes, ce_rows, pe_rows): ascending strikes and the CE/PE row at
+            each strike, -1 where that side does not exist
+        """
+        key = (underlying, expiry, exchange)
+        ladder = self.option_ladders.get(key)
+        if ladder is None:
+            table_strikes = self.table.strike
+            rows = self.filter_rows(exchange=exchange, underlying=underlying, expiry=expiry)
+            rows = rows[~np.isnan(table_strikes[rows])]
+            strikes = np.sort(table_strikes[rows])
+            if len(strikes):
+                strikes = strikes[np.r_[True, strikes[1:] != strikes[:-1]]]
+            sides = []
+            for kind in (KIND_CE, KIND_PE):
+                # Reversed so that on duplicate strikes the first row in load order wins
+                side_rows = rows[self.kinds[rows] == kind][::-1]
+                side = np.full(len(strikes), -1, dtype=np.int32)
+                side[np.searchsorted(strikes, table_strikes[side_rows])] = side_rows
+                sides.append(side)
+            ladder = (strikes, sides[0], sides[1])
+            self.option_ladders[key] = ladder
+        return ladder
+
+    def rank_keys(self, rows: np.ndarray, primary_term: Optional[str]) -> np.ndarray:
+        """
+        Sort keys for rows: exact underlying match, underlying prefix match,
+        symbol prefix match, then symbol order
+        """
+        tiers = np.zeros(len(rows), dtype=np.int64)
+        if primary_term:
+            name_codes = self.table.name_codes[rows]
+            exact = vocab_lookup(self.names_upper, lambda name: name == primary_term)
+            starts = vocab_lookup(self.names_upper, lambda name: name.startswith(primary_term))
+            tiers += np.where(exact[name_codes], 0, 4)
+            tiers += np.where(starts[name_codes], 0, 2)
+            prefixed = np.zeros(self.size, dtype=bool)
+            prefixed[self.prefix_rows(primary_term)] = True
+            tiers += np.where(prefixed[rows], 0, 1)
+        return tiers * self.size + self.symbol_rank[rows]
+
+    def top(self, rows: np.ndarray, primary_term: Optional[str], limit: int,
+            accept: Optional[Callable[[int], bool]] = None) -> List[int]:
+        """
+        Best ranked rows, optionally verified one by one
+
+        Args:
+            rows: Candidate rows
+            primary_term: First query term, used for ranking
+            limit: Maximum rows to return
+            accept: Exact match check for candidates that may be false positives
+
+        Returns:
+            List[int]: Up to limit rows in rank order
+        """
+        if not len(rows) or limit <= 0:
+            return []
+        keys = self.rank_keys(rows, primary_term)
+        results = []
+        done = 0
+        want = limit
+        while len(results) < limit and done < len(keys):
+            want = min(len(keys), max(want, done * 4))
+            if want < len(keys):
+                best = np.argpartition(keys, want - 1)[:want]
+            else:
+                best = np.arange(len(keys))
+            best = best[np.argsort(keys[best])]
+            # Keys are unique, so the previous pass covered exactly the first `done` of these
+            for row in rows[best[done:]].tolist():
+                if accept is None or accept(row):
+                    results.append(row)
+                    if len(results) >= limit:
+                        break
+            done = want
+        return results
+
+
+def vocab_lookup(vocab: List[Optional[str]], predicate: Callable[[str], bool]) -> np.ndarray:
+    """
+    Boolean lookup table over a column vocabulary
+
+    Indexing it with a code array gives the per-row result of predicate on the
+    non-empty values, without an isin() over the rows.
+    """
+    return np.fromiter((bool(value) and predicate(value) for value in vocab), dtype=bool, count=len(vocab))
+
+
+def _upper(value: str) -> str:
+    """Uppercase a string, reusing the object when it already is uppercase"""
+    upper = value.upper()
+    return value if upper == value else upper
+
+
+def _group_slices(group_keys: np.ndarray, *parts: np.ndarray) -> Dict[Tuple[int, ...], Tuple[int, int]]:
+    """Map each run of equal group_keys to its (start, end) slice, keyed by the part values"""
+    if not len(group_keys):
+        return {}
+    starts = np.flatnonzero(np.r_[True, group_keys[1:] != group_keys[:-1]])
+    ends = np.r_[starts[1:], len(group_keys)]
+    keys = zip(*(part[starts].tolist() for part in parts))
+    return {key: (start, end) for key, start, end in zip(keys, starts.tolist(), ends.tolist())}
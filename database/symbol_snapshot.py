@@ -0,0 +1,387 @@
+"""
+Memory-mapped symbol cache snapshot shared by every process on the host.
+
+The process that downloads the master contract writes the columnar symbol
+table, together with prebuilt open-addressing hash indexes, into a single
+read-only file. Every other Flask worker or helper process maps that file
+instead of rebuilding the cache from the database, so the operating system
+keeps one copy of the symbols in the page cache no matter how many processes
+use them.
+
+A new download writes a fresh file next to the old one and atomically renames
+it into place. Processes that still map the previous file keep a valid view
+until they notice the change and map the new one.
+
+File layout (all integers little-endian):
+    8 bytes   magic
+    4 bytes   header length
+    header    JSON: broker, created_at, source, size, vocabularies, sections
+    sections  8-byte aligned arrays described by the header
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+import zlib
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+import pytz
+
+from database.token_db_enhanced import SymbolTable, _intern_column
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+SNAPSHOT_MAGIC = b'OASYMS01'
+SNAPSHOT_FILENAME = 'symbol_cache.snapshot'
+
+# Low-cardinality columns stored as int32 codes plus a vocabulary in the header
+CODED_COLUMNS = ('name', 'exchange', 'brexchange', 'expiry', 'instrumenttype')
+
+# High-cardinality string columns stored as a UTF-8 blob plus row offsets
+STRING_COLUMNS = ('symbol', 'brsymbol', 'token')
+
+# Hash indexes as (section name, key column, qualified by exchange)
+HASH_INDEXES = (
+    ('symbol_exchange', 'symbol', True),
+    ('token_exchange', 'token', True),
+    ('brsymbol_exchange', 'brsymbol', True),
+    ('token', 'token', False)
+)
+
+EMPTY_SLOT = -1
+
+
+def get_snapshot_path() -> Optional[str]:
+    """
+    Get the snapshot file location
+
+    SYMBOL_CACHE_SNAPSHOT overrides the location and an empty value disables
+    snapshots. By default the file sits next to a SQLite DATABASE_URL, or in
+    the temp directory for other databases.
+
+    Returns:
+        str: Snapshot path, or None if snapshots are disabled
+    """
+    path = os.getenv('SYMBOL_CACHE_SNAPSHOT')
+    if path is not None:
+        return path.strip() or None
+
+    database_url = os.getenv('DATABASE_URL', '')
+    if database_url.startswith('sqlite:///'):
+        db_file = database_url[len('sqlite:///'):]
+        if db_file and db_file != ':memory:':
+            return os.path.join(os.path.dirname(db_file) or '.', SNAPSHOT_FILENAME)
+    return os.path.join(tempfile.gettempdir(), f"openalgo_{get_source_id()}_{SNAPSHOT_FILENAME}")
+
+
+def get_source_id() -> str:
+    """Fingerprint of DATABASE_URL, so a snapshot is never served for another database"""
+    return hashlib.sha256(os.getenv('DATABASE_URL', '').encode('utf-8')).hexdigest()[:16]
+
+
+def get_snapshot_identity(path: str) -> Optional[Tuple[int, int, int]]:
+    """Identity of the file currently at path, which changes whenever it is replaced"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _key_hash(key: bytes, seed: int) -> int:
+    """Stable across processes, unlike hash()"""
+    return zlib.crc32(key, seed)
+
+
+def _build_hash_index(keys: List[bytes], exchange_codes: List[int],
+                      exchange_seeds: List[int], qualified: bool) -> np.ndarray:
+    """
+    Build an open-addressing (linear probing) table of row ids
+
+    Later rows replace earlier rows with the same key, matching SymbolTable.
+    """
+    capacity = 1 << max(4, (len(keys) * 2 - 1).bit_length())
+    mask = capacity - 1
+    slots = [EMPTY_SLOT] * capacity
+
+    for row, key in enumerate(keys):
+        code = exchange_codes[row]
+        slot = _key_hash(key, exchange_seeds[code] if qualified else 0) & mask
+        while True:
+            existing = slots[slot]
+            if existing == EMPTY_SLOT:
+                break
+            if keys[existing] == key and (not qualified or exchange_codes[existing] == code):
+                break
+            slot = (slot + 1) & mask
+        slots[slot] = row
+    return np.array(slots, dtype=np.int32)
+
+
+def _encode_strings(values: List[Optional[str]]) -> Tuple[List[bytes], np.ndarray, np.ndarray, bytes]:
+    """Encode a string column as (encoded values, offsets, null mask, blob)"""
+    encoded = [value.encode('utf-8') if value is not None else b'' for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint32)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    nulls = np.fromiter((value is None for value in values), dtype=np.uint8, count=len(values))
+    return encoded, offsets, nulls, b''.join(encoded)
+
+
+def write_snapshot(table: SymbolTable, broker: str, path: str) -> bool:
+    """
+    Write a table to path and atomically replace any previous snapshot
+
+    Args:
+        table: Table built from the database
+        broker: Broker the master contract belongs to
+        path: Destination file
+
+    Returns:
+        bool: True if the snapshot was written
+    """
+    tmp_path = None
+    try:
+        sections: List[Tuple[str, Any]] = []
+        encoded_columns = {}
+        for column in STRING_COLUMNS:
+            encoded, offsets, nulls, blob = _encode_strings(getattr(table, column))
+            encoded_columns[column] = encoded
+            sections += [(f"{column}_offsets", offsets), (f"{column}_nulls", nulls), (f"{column}_blob", blob)]
+
+        for column in CODED_COLUMNS:
+            sections.append((f"{column}_codes", getattr(table, f"{column}_codes")))
+        sections += [('strike', table.strike), ('tick_size', table.tick_size), ('lotsize', table.lotsize)]
+
+        exchange_codes = table.exchange_codes.tolist()
+        exchange_seeds = [_key_hash((exchange or '').encode('utf-8'), 0) for exchange in table.exchanges]
+        for name, column, qualified in HASH_INDEXES:
+            sections.append((f"index_{name}", _build_hash_index(
+                encoded_columns[column], exchange_codes, exchange_seeds, qualified)))
+
+        # Lay the sections out after the header, each 8-byte aligned
+        layout = {}
+        payloads = []
+        offset = 0
+        for name, data in sections:
+            if isinstance(data, bytes):
+                raw, dtype, count = data, 'bytes', len(data)
+            else:
+                array = np.ascontiguousarray(data)
+                raw, dtype, count = array.tobytes(), array.dtype.str, len(array)
+            layout[name] = [offset, dtype, count]
+            payloads.append((offset, raw))
+            offset = (offset + len(raw) + 7) // 8 * 8
+
+        header = json.dumps({
+            'broker': broker,
+            'created_at': datetime.now(pytz.timezone('Asia/Kolkata')).isoformat(),
+            'source': get_source_id(),
+            'size': table.size,
+            'vocab': {column: getattr(table, _vocab_name(column)) for column in CODED_COLUMNS},
+            'sections': layout
+        }).encode('utf-8')
+        data_start = (len(SNAPSHOT_MAGIC) + 4 + len(header) + 7) // 8 * 8
+
+        directory = os.path.dirname(path) or '.'
+        fd, tmp_path = tempfile.mkstemp(prefix='.symbol_cache.', dir=directory)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(SNAPSHOT_MAGIC)
+            f.write(len(header).to_bytes(4, 'little'))
+            f.write(header)
+            for offset, raw in payloads:
+                f.seek(data_start + offset)
+                f.write(raw)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp_path, path)
+        return True
+
+    except Exception as e:
+        logger.warning(f"Could not write symbol cache snapshot {path}: {e}")
+        if tmp_path and os.path.exists(tmp_path):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+        return False
+
+
+def remove_snapshot(path: Optional[str] = None):
+    """Remove the snapshot so other processes drop it on their next check"""
+    path = path or get_snapshot_path()
+    if not path:
+        return
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        # Windows refuses to delete a file that another process still maps
+        logger.debug(f"Could not remove symbol cache snapshot {path}: {e}")
+
+
+def _vocab_name(column: str) -> str:
+    """SymbolTable attribute holding the vocabulary of a coded column"""
+    return {'name': 'names', 'exchange': 'exchanges', 'brexchange': 'brexchanges',
+            'expiry': 'expiries', 'instrumenttype': 'instrumenttypes'}[column]
+
+
+class StringColumn:
+    """Read-only sequence view of a string column inside the snapshot"""
+
+    def __init__(self, blob: memoryview, offsets: memoryview, nulls: memoryview):
+        self.blob = blob
+        self.offsets = offsets
+        self.nulls = nulls
+
+    def __len__(self) -> int:
+        return len(self.nulls)
+
+    def __getitem__(self, row: int) -> Optional[str]:
+        if self.nulls[row]:
+            return None
+        return str(self.blob[self.offsets[row]:self.offsets[row + 1]], 'utf-8')
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self[row]
+
+    def equals(self, row: int, key: bytes) -> bool:
+        """Compare a row with an encoded key without decoding it"""
+        return not self.nulls[row] and self.blob[self.offsets[row]:self.offsets[row + 1]] == key
+
+
+class MappedSymbolTable(SymbolTable):
+    """
+    SymbolTable backed by a memory-mapped snapshot
+
+    Numeric and code columns are zero-copy NumPy views of the mapping, strings
+    are decoded on access, and lookups probe the prebuilt hash indexes, so
+    opening a snapshot costs almost nothing regardless of its size.
+    """
+
+    def __init__(self, path: str):
+        """
+        Map a snapshot file
+
+        Raises:
+            ValueError: If the file is not a snapshot
+        """
+        with open(path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.mm[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a symbol cache snapshot")
+
+        header_start = len(SNAPSHOT_MAGIC) + 4
+        header_len = int.from_bytes(self.mm[len(SNAPSHOT_MAGIC):header_start], 'little')
+        header = json.loads(self.mm[header_start:header_start + header_len])
+        data_start = (header_start + header_len + 7) // 8 * 8
+
+        self.path = path
+        self.broker: str = header['broker']
+        self.created_at = datetime.fromisoformat(header['created_at'])
+        self.source: str = header['source']
+        self.size: int = header['size']
+        self.file_size = len(self.mm)
+
+        buffer = memoryview(self.mm)
+        sections = {}
+        for name, (offset, dtype, count) in header['sections'].items():
+            start = data_start + offset
+            if dtype == 'bytes':
+                sections[name] = buffer[start:start + count]
+            else:
+                sections[name] = np.frombuffer(self.mm, dtype=np.dtype(dtype), count=count, offset=start)
+
+        for column in STRING_COLUMNS:
+            setattr(self, column, StringColumn(
+                sections[f"{column}_blob"],
+                memoryview(sections[f"{column}_offsets"]),
+                memoryview(sections[f"{column}_nulls"])
+            ))
+        for column in CODED_COLUMNS:
+            setattr(self, f"{column}_codes", sections[f"{column}_codes"])
+            setattr(self, _vocab_name(column), _intern_column(header['vocab'][column]))
+        self.strike = sections['strike']
+        self.tick_size = sections['tick_size']
+        self.lotsize = sections['lotsize']
+
+        # Plain memoryviews index faster than NumPy scalars on the lookup path
+        self._exchange_codes = memoryview(self.exchange_codes)
+        self._exchange_seeds = {
+            exchange: (code, _key_hash((exchange or '').encode('utf-8'), 0))
+            for code, exchange in enumerate(self.exchanges)
+        }
+        self._indexes = {
+            name: (memoryview(sections[f"index_{name}"]), len(sections[f"index_{name}"]) - 1)
+            for name, _, _ in HASH_INDEXES
+        }
+
+    def _probe(self, index: str, column: StringColumn, key: Optional[str],
+               exchange: Optional[str], qualified: bool) -> Optional[int]:
+        """Look a key up in one of the hash indexes"""
+        if key is None:
+            return None
+        if qualified:
+            seed = self._exchange_seeds.get(exchange)
+            if seed is None:
+                return None
+            code, seed = seed
+        else:
+            code, seed = None, 0
+
+        slots, mask = self._indexes[index]
+        encoded = key.encode('utf-8')
+        slot = _key_hash(encoded, seed) & mask
+        while True:
+            row = slots[slot]
+            if row == EMPTY_SLOT:
+                return None
+            if column.equals(row, encoded) and (code is None or self._exchange_codes[row] == code):
+                return row
+            slot = (slot + 1) & mask
+
+    def symbol_row(self, symbol: str, exchange: str) -> Optional[int]:
+        """Row id for symbol and exchange"""
+        return self._probe('symbol_exchange', self.symbol, symbol, exchange, True)
+
+    def token_row(self, token: str, exchange: Optional[str] = None) -> Optional[int]:
+        """Row id for token and exchange, or for the token on any exchange"""
+        if exchange is None:
+            return self._probe('token', self.token, token, None, False)
+        return self._probe('token_exchange', self.token, token, exchange, True)
+
+    def brsymbol_row(self, brsymbol: str, exchange: str) -> Optional[int]:
+        """Row id for broker symbol and exchange"""
+        return self._probe('brsymbol_exchange', self.brsymbol, brsymbol, exchange, True)
+
+    def memory_bytes(self) -> int:
+        """Size of the mapping, shared with every other process that maps it"""
+        return self.file_size
+
+
+def open_snapshot(path: str) -> Optional[MappedSymbolTable]:
+    """
+    Map the snapshot at path if it was built from this process's database
+
+    Returns:
+        MappedSymbolTable, or None if there is no usable snapshot
+    """
+    try:
+        table = MappedSymbolTable(path)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable symbol cache snapshot {path}: {e}")
+        return None
+
+    if table.source != get_source_id():
+        logger.debug(f"Ignoring symbol cache snapshot {path} built from another database")
+        return None
+    return table
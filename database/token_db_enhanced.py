@@ -3,16 +3,32 @@ Enhanced Token DB with Full Memory Caching for 100,000+ symbols
 Optimized for zero-config deployment with configurable session reset time (SESSION_EXPIRY_TIME)
 """
 
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Sequence, Tuple, Any
 from datetime import datetime, timedelta
+import math
+import sys
 import time
 from dataclasses import dataclass, field
 from collections import defaultdict
+import numpy as np
 import pytz
+from database.symbol_search import KIND_CODES, get_search_index, vocab_lookup
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Columns loaded from the symtoken table, in SELECT order
+SYMBOL_COLUMNS = (
+    'symbol', 'brsymbol', 'name', 'exchange', 'brexchange', 'token',
+    'expiry', 'strike', 'lotsize', 'instrumenttype', 'tick_size'
+)
+
+# Stored in the lotsize array for rows without a lot size
+NO_LOTSIZE = -1
+
+# Seconds between checks for a snapshot published by another process
+SNAPSHOT_CHECK_INTERVAL = 1.0
+
 @dataclass
 class CacheStats:
     """Statistics for cache performance monitoring"""
@@ -59,6 +75,168 @@ class SymbolData:
     instrumenttype: Optional[str] = None
     tick_size: Optional[float] = None
 
+class SymbolTable:
+    """
+    Columnar, read-only storage for one broker's master contract
+
+    High-cardinality strings (symbol, brsymbol, token) are kept as lists of
+    interned strings, low-cardinality strings (name, exchange, brexchange,
+    expiry, instrumenttype) as int32 codes into a small vocabulary, and the
+    numeric columns as NumPy arrays. The lookup indexes hold integer row ids
+    and are nested per exchange, so no tuple key or per-row object is kept.
+    """
+
+    def __init__(self, columns: Dict[str, Sequence]):
+        """
+        Build the table and its indexes
+
+        Args:
+            columns: Mapping of every name in SYMBOL_COLUMNS to a sequence of
+                     values, one per row
+        """
+        self.size = len(columns['symbol'])
+
+        self.symbol = _intern_column(columns['symbol'])
+        self.brsymbol = _intern_column(columns['brsymbol'])
+        self.token = _intern_column(columns['token'])
+
+        self.name_codes, self.names = _encode_column(columns['name'])
+        self.exchange_codes, self.exchanges = _encode_column(columns['exchange'])
+        self.brexchange_codes, self.brexchanges = _encode_column(columns['brexchange'])
+        self.expiry_codes, self.expiries = _encode_column(columns['expiry'])
+        self.instrumenttype_codes, self.instrumenttypes = _encode_column(columns['instrumenttype'])
+
+        # Missing values become NaN in the float columns and NO_LOTSIZE in lotsize
+        self.strike = np.array(columns['strike'], dtype=np.float64)
+        self.tick_size = np.array(columns['tick_size'], dtype=np.float64)
+        self.lotsize = np.fromiter(
+            (NO_LOTSIZE if value is None else value for value in columns['lotsize']),
+            dtype=np.int32,
+            count=self.size
+        )
+
+        # Multi-index maps to row ids for O(1) lookups: exchange -> key -> row
+        self.by_symbol_exchange: Dict[str, Dict[str, int]] = {exchange: {} for exchange in self.exchanges}
+        self.by_token_exchange: Dict[str, Dict[str, int]] = {exchange: {} for exchange in self.exchanges}
+        self.by_brsymbol_exchange: Dict[str, Dict[str, int]] = {exchange: {} for exchange in self.exchanges}
+        self.by_token: Dict[str, int] = {}
+        self._build_indexes()
+
+    def _build_indexes(self):
+        """Populate the lookup indexes, later rows winning on duplicate keys"""
+        exchanges = self.exchanges
+        by_symbol = [self.by_symbol_exchange[exchange] for exchange in exchanges]
+        by_token = [self.by_token_exchange[exchange] for exchange in exchanges]
+        by_brsymbol = [self.by_brsymbol_exchange[exchange] for exchange in exchanges]
+        by_token_any = self.by_token
+
+        # The same int object is stored in all four indexes for a row
+        for row, symbol, brsymbol, token, code in zip(
+            range(self.size), self.symbol, self.brsymbol, self.token, self.exchange_codes.tolist()
+        ):
+            by_symbol[code][symbol] = row
+            by_token[code][token] = row
+            by_brsymbol[code][brsymbol] = row
+            by_token_any[token] = row
+
+    def symbol_row(self, symbol: str, exchange: str) -> Optional[int]:
+        """Row id for symbol and exchange"""
+        rows = self.by_symbol_exchange.get(exchange)
+        return rows.get(symbol) if rows is not None else None
+
+    def token_row(self, token: str, exchange: Optional[str] = None) -> Optional[int]:
+        """Row id for token and exchange, or for the token on any exchange"""
+        if exchange is None:
+            return self.by_token.get(token)
+        rows = self.by_token_exchange.get(exchange)
+        return rows.get(token) if rows is not None else None
+
+    def brsymbol_row(self, brsymbol: str, exchange: str) -> Optional[int]:
+        """Row id for broker symbol and exchange"""
+        rows = self.by_brsymbol_exchange.get(exchange)
+        return rows.get(brsymbol) if rows is not None else None
+
+    def row(self, row: int) -> SymbolData:
+        """Materialize one row as a SymbolData object"""
+        strike = float(self.strike[row])
+        tick_size = float(self.tick_size[row])
+        lotsize = int(self.lotsize[row])
+        return SymbolData(
+            symbol=self.symbol[row],
+            brsymbol=self.brsymbol[row],
+            name=self.names[self.name_codes[row]],
+            exchange=self.exchanges[self.exchange_codes[row]],
+            brexchange=self.brexchanges[self.brexchange_codes[row]],
+            token=self.token[row],
+            expiry=self.expiries[self.expiry_codes[row]],
+            strike=None if math.isnan(strike) else strike,
+            lotsize=None if lotsize == NO_LOTSIZE else lotsize,
+            instrumenttype=self.instrumenttypes[self.instrumenttype_codes[row]],
+            tick_size=None if math.isnan(tick_size) else tick_size
+        )
+
+    def filter_mask(
+        self,
+        exchange: Optional[str] = None,
+        underlying: Optional[str] = None,
+        expiry: Optional[str] = None
+    ) -> np.ndarray:
+        """
+        Boolean row mask for the exact-match filters shared by the search functions
+
+        Args:
+            exchange: Exchange code, compared exactly
+            underlying: Underlying name, compared case-insensitively
+            expiry: Expiry string, compared exactly
+
+        Returns:
+            np.ndarray: Boolean mask with one entry per row
+        """
+        mask = np.ones(self.size, dtype=bool)
+        if exchange:
+            mask &= vocab_lookup(self.exchanges, lambda value: value == exchange)[self.exchange_codes]
+        if underlying:
+            mask &= vocab_lookup(self.names, lambda value: value.upper() == underlying)[self.name_codes]
+        if expiry:
+            mask &= vocab_lookup(self.expiries, lambda value: value == expiry)[self.expiry_codes]
+        return mask
+
+    def memory_bytes(self) -> int:
+        """Approximate memory held by the table, including strings and indexes"""
+        size = sys.getsizeof
+        total = sum(array.nbytes for array in (
+            self.strike, self.tick_size, self.lotsize, self.name_codes, self.exchange_codes,
+            self.brexchange_codes, self.expiry_codes, self.instrumenttype_codes
+        ))
+        for column in (self.symbol, self.brsymbol, self.token, self.names, self.exchanges,
+                       self.brexchanges, self.expiries, self.instrumenttypes):
+            total += size(column) + sum(map(size, column))
+        for index in (self.by_symbol_exchange, self.by_token_exchange, self.by_brsymbol_exchange):
+            total += size(index) + sum(map(size, index.values()))
+        total += size(self.by_token)
+        # One int object per row id, shared by all four indexes
+        total += self.size * size(self.size)
+        return total
+
+
+def _intern_column(values: Sequence[Optional[str]]) -> List[Optional[str]]:
+    """Intern every string in a column"""
+    return [sys.intern(value) if value is not None else None for value in values]
+
+
+def _encode_column(values: Sequence[Optional[str]]) -> Tuple[np.ndarray, List[Optional[str]]]:
+    """
+    Dictionary-encode a low-cardinality string column
+
+    Returns:
+        Tuple of (int32 code per row, distinct values indexed by code)
+    """
+    vocab = list(dict.fromkeys(values))
+    codes = {value: code for code, value in enumerate(vocab)}
+    encoded = np.fromiter(map(codes.__getitem__, values), dtype=np.int32, count=len(values))
+    return encoded, _intern_column(vocab)
+
+
 class BrokerSymbolCache:
     """
     High-performance in-memory cache for broker symbols
@@ -70,14 +248,8 @@ class BrokerSymbolCache:
         self.active_broker: Optional[str] = None
         self.cache_loaded: bool = False
         
-        # Primary storage - all symbols in memory
-        self.symbols: Dict[str, SymbolData] = {}
-        
-        # Multi-index maps for O(1) lookups
-        self.by_symbol_exchange: Dict[Tuple[str, str], SymbolData] = {}
-        self.by_token_exchange: Dict[Tuple[str, str], SymbolData] = {}
-        self.by_brsymbol_exchange: Dict[Tuple[str, str], SymbolData] = {}
-        self.by_token: Dict[str, SymbolData] = {}
+        # Primary storage - all symbols in columnar form, replaced as a whole on reload
+        self.table: Optional[SymbolTable] = None
         
         # Cache statistics
         self.stats = CacheStats()
@@ -86,6 +258,10 @@ class BrokerSymbolCache:
         self.session_start: Optional[datetime] = None
         self.next_reset_time: Optional[datetime] = None
         
+        # Shared snapshot tracking (see database/symbol_snapshot.py)
+        self.snapshot_identity: Optional[Tuple[int, int, int]] = None
+        self.snapshot_checked_at: float = float('-inf')
+        
         logger.debug("BrokerSymbolCache initialized")
     
     def load_all_symbols(self, broker: str) -> bool:
@@ -94,58 +270,36 @@ class BrokerSymbolCache:
         This is called once after master contract download
         """
         try:
-            from database.symbol import SymToken
+            from database.symbol import SymToken, engine
             
             start_time = time.time()
             logger.debug(f"Loading all symbols for broker: {broker}")
             
-            # Clear existing cache
-            self.clear_cache()
-            
-            # Query all symbols from database
-            symbols = SymToken.query.all()
+            # Raw bulk SELECT on the DBAPI cursor - no ORM objects or result rows are built
+            raw_conn = engine.raw_connection()
+            try:
+                cursor = raw_conn.cursor()
+                cursor.execute(f"SELECT {', '.join(SYMBOL_COLUMNS)} FROM {SymToken.__tablename__}")
+                rows = cursor.fetchall()
+                cursor.close()
+            finally:
+                raw_conn.close()
             
-            if not symbols:
+            if not rows:
                 logger.warning(f"No symbols found in database for broker: {broker}")
+                self.clear_cache()
                 return False
             
-            # Build in-memory structures
-            for sym in symbols:
-                # Create lightweight data object
-                symbol_data = SymbolData(
-                    symbol=sym.symbol,
-                    brsymbol=sym.brsymbol,
-                    name=sym.name,
-                    exchange=sym.exchange,
-                    brexchange=sym.brexchange,
-                    token=sym.token,
-                    expiry=sym.expiry,
-                    strike=sym.strike,
-                    lotsize=sym.lotsize,
-                    instrumenttype=sym.instrumenttype,
-                    tick_size=sym.tick_size
-                )
-                
-                # Store in primary dict
-                self.symbols[sym.token] = symbol_data
-                
-                # Build indexes
-                self.by_symbol_exchange[(sym.symbol, sym.exchange)] = symbol_data
-                self.by_token_exchange[(sym.token, sym.exchange)] = symbol_data
-                self.by_brsymbol_exchange[(sym.brsymbol, sym.exchange)] = symbol_data
-                self.by_token[sym.token] = symbol_data
+            # Build the new table off to the side so lookups keep using the old one meanwhile
+            table = SymbolTable(dict(zip(SYMBOL_COLUMNS, zip(*rows))))
+            del rows
             
-            # Update cache metadata
-            self.active_broker = broker
-            self.cache_loaded = True
-            self.stats.total_symbols = len(symbols)
-            self.stats.cache_loads += 1
-            self.stats.last_loaded = datetime.now(pytz.timezone('Asia/Kolkata'))
+            # Publish the table for the other processes and serve this one from the mapping too
+            table = self._publish_snapshot(table, broker)
+            self._activate(table, broker)
             
-            # Calculate memory usage (rough estimate)
-            self.stats.memory_usage_mb = (
-                len(self.symbols) * 500  # ~500 bytes per symbol
-            ) / (1024 * 1024)
+            # Build the search index now rather than on the first search
+            get_search_index(table)
             
             load_time = time.time() - start_time
             logger.debug(
@@ -154,19 +308,94 @@ class BrokerSymbolCache:
                 f"Memory usage: {self.stats.memory_usage_mb:.2f} MB"
             )
             
-            # Set session timing
-            self._set_session_timing()
-            
             return True
             
         except Exception as e:
             logger.error(f"Error loading symbols into cache: {e}")
+            self.clear_cache()
             return False
     
-    def _set_session_timing(self):
+    def _activate(self, table: SymbolTable, broker: str, loaded_at: Optional[datetime] = None):
+        """Make table the active symbol table and update the cache metadata"""
+        self.table = table
+        self.active_broker = broker
+        self.cache_loaded = True
+        self.stats.total_symbols = table.size
+        self.stats.cache_loads += 1
+        self.stats.last_loaded = datetime.now(pytz.timezone('Asia/Kolkata'))
+        self.stats.memory_usage_mb = table.memory_bytes() / (1024 * 1024)
+        
+        # Set session timing
+        self._set_session_timing(loaded_at)
+    
+    def _publish_snapshot(self, table: SymbolTable, broker: str) -> SymbolTable:
+        """
+        Write table as the shared snapshot and map it
+        
+        Returns:
+            SymbolTable: The mapped snapshot, or table itself if snapshots are
+                         disabled or could not be written
+        """
+        from database.symbol_snapshot import get_snapshot_identity, get_snapshot_path, open_snapshot, write_snapshot
+        
+        path = get_snapshot_path()
+        if not path or not write_snapshot(table, broker, path):
+            return table
+        
+        mapped = open_snapshot(path)
+        if mapped is None:
+            return table
+        
+        self.snapshot_identity = get_snapshot_identity(path)
+        logger.debug(f"Published symbol cache snapshot: {path} ({mapped.file_size / (1024 * 1024):.2f} MB)")
+        return mapped
+    
+    def sync_snapshot(self):
+        """
+        Follow the snapshot published by whichever process downloaded the master contract
+        
+        Checks the snapshot file at most once every SNAPSHOT_CHECK_INTERVAL
+        seconds. A new or replaced file is mapped; a removed file drops the
+        mapped table so lookups fall back to the database.
+        """
+        now = time.monotonic()
+        if now - self.snapshot_checked_at < SNAPSHOT_CHECK_INTERVAL:
+            return
+        self.snapshot_checked_at = now
+        
+        from database.symbol_snapshot import MappedSymbolTable, get_snapshot_identity, get_snapshot_path, open_snapshot
+        
+        path = get_snapshot_path()
+        if not path:
+            return
+        
+        identity = get_snapshot_identity(path)
+        if identity == self.snapshot_identity:
+            return
+        self.snapshot_identity = identity
+        
+        if identity is None:
+            if isinstance(self.table, MappedSymbolTable):
+                logger.debug("Symbol cache snapshot removed, clearing cache")
+                self.clear_cache()
+            return
+        
+        table = open_snapshot(path)
+        if table is None:
+            return
+        
+        self._activate(table, table.broker, table.created_at)
+        if not self.is_cache_valid():
+            logger.debug(f"Ignoring symbol cache snapshot from an expired session ({table.created_at})")
+            self.clear_cache()
+            return
+        
+        logger.debug(f"Mapped symbol cache snapshot: {table.size} symbols for broker {table.broker}")
+    
+    def _set_session_timing(self, start: Optional[datetime] = None):
         """Set session start and next reset time from SESSION_EXPIRY_TIME env variable"""
         import os
-        now_ist = datetime.now(pytz.timezone('Asia/Kolkata'))
+        now_ist = start or datetime.now(pytz.timezone('Asia/Kolkata'))
         self.session_start = now_ist
         
         # Get session expiry time from environment (default to 3:00 if not set)
@@ -195,77 +424,78 @@ class BrokerSymbolCache:
     
     def get_token(self, symbol: str, exchange: str) -> Optional[str]:
         """Get token for symbol and exchange - O(1) lookup"""
-        self.stats.hits += 1
-        key = (symbol, exchange)
-        if key in self.by_symbol_exchange:
-            return self.by_symbol_exchange[key].token
+        table = self.table
+        row = table.symbol_row(symbol, exchange) if table else None
+        if row is not None:
+            self.stats.hits += 1
+            return table.token[row]
         
-        self.stats.hits -= 1
         self.stats.misses += 1
         return None
     
     def get_symbol(self, token: str, exchange: str) -> Optional[str]:
         """Get symbol for token and exchange - O(1) lookup"""
-        self.stats.hits += 1
-        key = (token, exchange)
-        if key in self.by_token_exchange:
-            return self.by_token_exchange[key].symbol
+        table = self.table
+        row = table.token_row(token, exchange) if table else None
+        if row is not None:
+            self.stats.hits += 1
+            return table.symbol[row]
         
-        self.stats.hits -= 1
         self.stats.misses += 1
         return None
     
     def get_br_symbol(self, symbol: str, exchange: str) -> Optional[str]:
         """Get broker symbol for symbol and exchange - O(1) lookup"""
-        self.stats.hits += 1
-        key = (symbol, exchange)
-        if key in self.by_symbol_exchange:
-            return self.by_symbol_exchange[key].brsymbol
+        table = self.table
+        row = table.symbol_row(symbol, exchange) if table else None
+        if row is not None:
+            self.stats.hits += 1
+            return table.brsymbol[row]
         
-        self.stats.hits -= 1
         self.stats.misses += 1
         return None
     
     def get_oa_symbol(self, brsymbol: str, exchange: str) -> Optional[str]:
         """Get OpenAlgo symbol for broker symbol and exchange - O(1) lookup"""
-        self.stats.hits += 1
-        key = (brsymbol, exchange)
-        if key in self.by_brsymbol_exchange:
-            return self.by_brsymbol_exchange[key].symbol
+        table = self.table
+        row = table.brsymbol_row(brsymbol, exchange) if table else None
+        if row is not None:
+            self.stats.hits += 1
+            return table.symbol[row]
         
-        self.stats.hits -= 1
         self.stats.misses += 1
         return None
     
     def get_brexchange(self, symbol: str, exchange: str) -> Optional[str]:
         """Get broker exchange for symbol and exchange - O(1) lookup"""
-        self.stats.hits += 1
-        key = (symbol, exchange)
-        if key in self.by_symbol_exchange:
-            return self.by_symbol_exchange[key].brexchange
+        table = self.table
+        row = table.symbol_row(symbol, exchange) if table else None
+        if row is not None:
+            self.stats.hits += 1
+            return table.brexchanges[table.brexchange_codes[row]]
 
-        self.stats.hits -= 1
         self.stats.misses += 1
         return None
 
     def get_symbol_info(self, symbol: str, exchange: str) -> Optional[SymbolData]:
         """Get full symbol data for symbol and exchange - O(1) lookup"""
-        self.stats.hits += 1
-        key = (symbol, exchange)
-        if key in self.by_symbol_exchange:
-            return self.by_symbol_exchange[key]
+        table = self.table
+        row = table.symbol_row(symbol, exchange) if table else None
+        if row is not None:
+            self.stats.hits += 1
+            return table.row(row)
 
-        self.stats.hits -= 1
         self.stats.misses += 1
         return None
 
     def get_symbol_data(self, token: str) -> Optional[SymbolData]:
         """Get complete symbol data by token - O(1) lookup"""
-        self.stats.hits += 1
-        if token in self.by_token:
-            return self.by_token[token]
+        table = self.table
+        row = table.token_row(token) if table else None
+        if row is not None:
+            self.stats.hits += 1
+            return table.row(row)
         
-        self.stats.hits -= 1
         self.stats.misses += 1
         return None
     
@@ -276,11 +506,12 @@ class BrokerSymbolCache:
         """
         self.stats.bulk_queries += 1
         results = []
+        table = self.table
         
         for symbol, exchange in symbol_exchange_pairs:
-            key = (symbol, exchange)
-            if key in self.by_symbol_exchange:
-                results.append(self.by_symbol_exchange[key].token)
+            row = table.symbol_row(symbol, exchange) if table else None
+            if row is not None:
+                results.append(table.token[row])
                 self.stats.hits += 1
             else:
                 results.append(None)
@@ -294,11 +525,12 @@ class BrokerSymbolCache:
         """
         self.stats.bulk_queries += 1
         results = []
+        table = self.table
         
         for token, exchange in token_exchange_pairs:
-            key = (token, exchange)
-            if key in self.by_token_exchange:
-                results.append(self.by_token_exchange[key].symbol)
+            row = table.token_row(token, exchange) if table else None
+            if row is not None:
+                results.append(table.symbol[row])
                 self.stats.hits += 1
             else:
                 results.append(None)
@@ -310,15 +542,17 @@ class BrokerSymbolCache:
         """
         Search symbols by partial match with multi-term support.
         All terms must match (AND logic).
-        Returns list of matching SymbolData objects
+        Returns list of matching SymbolData objects, best matches first
         """
+        table = self.table
+        if table is None:
+            return []
+
         # Split query into terms
         terms = [term.strip().upper() for term in query.split() if term.strip()]
         if not terms:
             return []
 
-        matches = []
-
         # Parse numeric terms for strike matching
         num_terms = []
         for term in terms:
@@ -327,39 +561,52 @@ class BrokerSymbolCache:
             except ValueError:
                 pass
 
-        for symbol_data in self.symbols.values():
-            # Skip if exchange filter doesn't match
-            if exchange and symbol_data.exchange != exchange:
+        # Narrow the candidates with the search index: every term must hit
+        index = get_search_index(table)
+        text_mask = None
+        for term in terms:
+            mask = index.text_mask(term)
+            if mask is None:
                 continue
+            try:
+                mask |= index.strike_mask(float(term))
+            except ValueError:
+                pass
+            text_mask = mask if text_mask is None else text_mask & mask
+        candidates = index.filter_rows(exchange=exchange, mask=text_mask)
+
+        names = index.names_upper
+        name_codes = table.name_codes
+        strikes = table.strike
+
+        def matches(row: int) -> bool:
+            symbol = table.symbol[row].upper()
+            brsymbol = table.brsymbol[row].upper()
+            name = names[name_codes[row]]
+            token = table.token[row]
+            strike = float(strikes[row])
 
             # All terms must match
-            all_match = True
             for term in terms:
                 term_match = (
-                    term in symbol_data.symbol.upper() or
-                    term in symbol_data.brsymbol.upper() or
-                    (symbol_data.name and term in symbol_data.name.upper()) or
-                    (symbol_data.token and term in symbol_data.token)
+                    term in symbol or
+                    term in brsymbol or
+                    (name and term in name) or
+                    (token and term in token)
                 )
-                # Also check numeric terms against strike
-                if not term_match and num_terms and symbol_data.strike:
+                # Also check numeric terms against strike (NaN never compares equal)
+                if not term_match and num_terms and strike:
                     try:
-                        if float(term) == symbol_data.strike:
+                        if float(term) == strike:
                             term_match = True
                     except ValueError:
                         pass
 
                 if not term_match:
-                    all_match = False
-                    break
-
-            if all_match:
-                matches.append(symbol_data)
-
-                if len(matches) >= limit:
-                    break
+                    return False
+            return True
 
-        return matches
+        return [table.row(row) for row in index.top(candidates, terms[0], limit, matches)]
 
     def fno_search_symbols(
         self,
@@ -388,7 +635,10 @@ class BrokerSymbolCache:
         Returns:
             List of matching SymbolData objects
         """
-        matches = []
+        table = self.table
+        if table is None:
+            return []
+
         query_upper = query.upper() if query else None
         underlying_upper = underlying.strip().upper() if underlying else None
         expiry_stripped = expiry.strip() if expiry else None
@@ -407,89 +657,114 @@ class BrokerSymbolCache:
                     except ValueError:
                         pass
 
-        for symbol_data in self.symbols.values():
-            # Exchange filter
-            if exchange and symbol_data.exchange != exchange:
-                continue
+        # Query text: all terms must hit, or any numeric term must equal the strike
+        index = get_search_index(table)
+        text_mask = None
+        for term in query_terms:
+            mask = index.text_mask(term)
+            if mask is not None:
+                text_mask = mask if text_mask is None else text_mask & mask
+        if text_mask is not None:
+            for num in query_nums:
+                text_mask |= index.strike_mask(num)
+
+        # Exchange, underlying, expiry, instrument type and strike range filters
+        candidates = index.filter_rows(
+            exchange=exchange,
+            underlying=underlying_upper,
+            expiry=expiry_stripped,
+            strike_min=strike_min,
+            strike_max=strike_max,
+            kind=KIND_CODES.get(inst_type),
+            mask=text_mask
+        )
 
-            # Underlying filter (match name field)
-            if underlying_upper and (not symbol_data.name or symbol_data.name.upper() != underlying_upper):
-                continue
+        names = index.names_upper
+        name_codes = table.name_codes
+        strikes = table.strike
 
-            # Expiry filter
-            if expiry_stripped and symbol_data.expiry != expiry_stripped:
-                continue
+        def matches(row: int) -> bool:
+            symbol = table.symbol[row].upper()
+            brsymbol = table.brsymbol[row].upper()
+            name = names[name_codes[row]]
+            token = table.token[row]
 
-            # Instrument type filter (based on symbol suffix)
-            if inst_type:
-                symbol_upper = symbol_data.symbol.upper()
-                if inst_type == "FUT" and not symbol_upper.endswith("FUT"):
-                    continue
-                elif inst_type == "CE" and not symbol_upper.endswith("CE"):
-                    continue
-                elif inst_type == "PE" and not symbol_upper.endswith("PE"):
-                    continue
-
-            # Strike range filter
-            if strike_min is not None and (symbol_data.strike is None or symbol_data.strike < strike_min):
-                continue
-            if strike_max is not None and (symbol_data.strike is None or symbol_data.strike > strike_max):
-                continue
+            # All terms must match
+            all_match = True
+            for term in query_terms:
+                term_match = (
+                    term in symbol or
+                    term in brsymbol or
+                    (name and term in name) or
+                    (token and term in token)
+                )
+                if not term_match:
+                    all_match = False
+                    break
 
-            # Query text search (if provided)
-            if query_terms:
-                # All terms must match
-                all_match = True
-                for term in query_terms:
-                    term_match = (
-                        term in symbol_data.symbol.upper() or
-                        term in symbol_data.brsymbol.upper() or
-                        (symbol_data.name and term in symbol_data.name.upper()) or
-                        (symbol_data.token and term in symbol_data.token)
-                    )
-                    if not term_match:
-                        all_match = False
+            # Also check numeric terms against strike
+            strike = float(strikes[row])
+            if not all_match and query_nums and strike:
+                for num in query_nums:
+                    if strike == num:
+                        all_match = True
                         break
 
-                # Also check numeric terms against strike
-                if not all_match and query_nums and symbol_data.strike:
-                    for num in query_nums:
-                        if symbol_data.strike == num:
-                            all_match = True
-                            break
-
-                if not all_match:
-                    continue
-
-            matches.append(symbol_data)
+            return all_match
 
-        # Smart sorting: prioritize exact underlying matches, then alphabetical
-        # Extract the primary search term (first term) for relevance scoring
+        # Ranked like before: exact underlying match, underlying prefix, symbol prefix, then symbol
         primary_term = query_terms[0] if query_terms else None
+        rows = index.top(candidates, primary_term, limit, matches if query_terms else None)
+        return [table.row(row) for row in rows]
+    
+    def get_option_ladder(
+        self,
+        underlying: str,
+        expiry: str,
+        exchange: str,
+        strike_min: Optional[float] = None,
+        strike_max: Optional[float] = None
+    ) -> Dict[float, Dict[str, SymbolData]]:
+        """
+        CE and PE contracts of an underlying and expiry, keyed by strike
 
-        def sort_key(s):
-            # Priority 1: Exact match on name/underlying (e.g., "NIFTY" matches name="NIFTY" exactly)
-            name_exact = 0 if (primary_term and s.name and s.name.upper() == primary_term) else 1
-
-            # Priority 2: Name starts with search term (e.g., "NIFTY" before "BANKNIFTY")
-            name_starts = 0 if (primary_term and s.name and s.name.upper().startswith(primary_term)) else 1
-
-            # Priority 3: Symbol starts with search term
-            symbol_starts = 0 if (primary_term and s.symbol.upper().startswith(primary_term)) else 1
+        The ladder for each (underlying, expiry, exchange) is built once per
+        loaded table, so an option chain costs one lookup instead of one per leg.
 
-            # Priority 4: Alphabetical by symbol
-            return (name_exact, name_starts, symbol_starts, s.symbol)
+        Args:
+            underlying: Underlying name (e.g., NIFTY)
+            expiry: Expiry in DD-MMM-YY format
+            exchange: Options exchange (NFO, BFO, etc.)
+            strike_min: Optional lowest strike to return
+            strike_max: Optional highest strike to return
 
-        matches.sort(key=sort_key)
-        return matches[:limit]
+        Returns:
+            Dict of strike -> {'CE': SymbolData, 'PE': SymbolData} in ascending
+            strike order; a side is absent when that contract does not exist
+        """
+        table = self.table
+        if table is None:
+            return {}
+
+        index = get_search_index(table)
+        strikes, ce_rows, pe_rows = index.option_ladder(underlying.upper(), expiry.upper(), exchange)
+        lo = np.searchsorted(strikes, strike_min, 'left') if strike_min is not None else 0
+        hi = np.searchsorted(strikes, strike_max, 'right') if strike_max is not None else len(strikes)
+
+        ladder = {}
+        for strike, ce_row, pe_row in zip(strikes[lo:hi].tolist(), ce_rows[lo:hi].tolist(), pe_rows[lo:hi].tolist()):
+            legs = {}
+            if ce_row >= 0:
+                legs['CE'] = table.row(ce_row)
+            if pe_row >= 0:
+                legs['PE'] = table.row(pe_row)
+            ladder[strike] = legs
+        self.stats.hits += 1
+        return ladder
     
     def clear_cache(self):
         """Clear all cached data"""
-        self.symbols.clear()
-        self.by_symbol_exchange.clear()
-        self.by_token_exchange.clear()
-        self.by_brsymbol_exchange.clear()
-        self.by_token.clear()
+        self.table = None
         self.cache_loaded = False
         self.active_broker = None
         logger.debug("Cache cleared")
@@ -503,6 +778,7 @@ class BrokerSymbolCache:
             'cache_valid': self.is_cache_valid(),
             'session_start': self.session_start.isoformat() if self.session_start else None,
             'next_reset': self.next_reset_time.isoformat() if self.next_reset_time else None,
+            'snapshot': getattr(self.table, 'path', None),
             'stats': self.stats.to_dict()
         }
 
@@ -514,6 +790,7 @@ def get_cache() -> BrokerSymbolCache:
     global _cache_instance
     if _cache_instance is None:
         _cache_instance = BrokerSymbolCache()
+    _cache_instance.sync_snapshot()
     return _cache_instance
 
 # Public API - Drop-in replacement for existing token_db functions
@@ -719,8 +996,11 @@ def load_cache_for_broker(broker: str) -> bool:
 
 def clear_cache():
     """Clear the cache - useful for manual refresh"""
+    from database.symbol_snapshot import remove_snapshot
     cache = get_cache()
     cache.clear_cache()
+    # Other processes drop the shared snapshot on their next check
+    remove_snapshot()
 
 def get_cache_stats() -> dict:
     """Get cache statistics for monitoring"""
@@ -884,6 +1164,33 @@ def fno_search_symbols(
         return []
 
 
+def get_option_ladder(
+    underlying: str,
+    expiry: str,
+    exchange: str,
+    strike_min: Optional[float] = None,
+    strike_max: Optional[float] = None
+) -> Optional[Dict[float, Dict[str, SymbolData]]]:
+    """
+    Get the CE/PE contracts of an underlying and expiry by strike from cache
+
+    Args:
+        underlying: Underlying name (e.g., NIFTY)
+        expiry: Expiry in DD-MMM-YY format
+        exchange: Options exchange (NFO, BFO, etc.)
+        strike_min: Optional lowest strike to return
+        strike_max: Optional highest strike to return
+
+    Returns:
+        Dict of strike -> {'CE': SymbolData, 'PE': SymbolData}, or None if the
+        cache is not available and the caller should query the database
+    """
+    cache = get_cache()
+    if cache.cache_loaded and cache.is_cache_valid():
+        return cache.get_option_ladder(underlying, expiry, exchange, strike_min, strike_max)
+    return None
+
+
 def get_distinct_expiries_cached(exchange: Optional[str] = None, underlying: Optional[str] = None) -> List[str]:
     """
     Get distinct expiry dates from cache - fast in-memory lookup
@@ -891,23 +1198,16 @@ def get_distinct_expiries_cached(exchange: Optional[str] = None, underlying: Opt
     """
     cache = get_cache()
 
-    if cache.cache_loaded and cache.is_cache_valid():
+    table = cache.table
+    if cache.cache_loaded and cache.is_cache_valid() and table is not None:
         from datetime import datetime
-        expiries = set()
         underlying_upper = underlying.strip().upper() if underlying else None
 
-        for symbol_data in cache.symbols.values():
-            # Filter by exchange
-            if exchange and symbol_data.exchange != exchange:
-                continue
-
-            # Filter by underlying
-            if underlying_upper and (not symbol_data.name or symbol_data.name.upper() != underlying_upper):
-                continue
-
-            # Collect non-empty expiries
-            if symbol_data.expiry:
-                expiries.add(symbol_data.expiry)
+        # Filter by exchange and underlying, then collect non-empty expiries
+        mask = table.filter_mask(exchange=exchange, underlying=underlying_upper)
+        expiries = {table.expiries[code] for code in np.unique(table.expiry_codes[mask]).tolist()}
+        expiries.discard(None)
+        expiries.discard('')
 
         # Sort expiries chronologically
         def parse_expiry(exp_str):
@@ -937,17 +1237,13 @@ def get_distinct_underlyings_cached(exchange: Optional[str] = None) -> List[str]
     """
     cache = get_cache()
 
-    if cache.cache_loaded and cache.is_cache_valid():
-        underlyings = set()
-
-        for symbol_data in cache.symbols.values():
-            # Filter by exchange
-            if exchange and symbol_data.exchange != exchange:
-                continue
-
-            # Collect non-empty names
-            if symbol_data.name:
-                underlyings.add(symbol_data.name)
+    table = cache.table
+    if cache.cache_loaded and cache.is_cache_valid() and table is not None:
+        # Filter by exchange, then collect non-empty names
+        mask = table.filter_mask(exchange=exchange)
+        underlyings = {table.names[code] for code in np.unique(table.name_codes[mask]).tolist()}
+        underlyings.discard(None)
+        underlyings.discard('')
 
         return sorted(list(underlyings))
 
@@ -5,9 +5,12 @@ from sqlalchemy.sql import func
 from sqlalchemy.pool import NullPool
 import os
 import logging
-from datetime import datetime, timedelta
+import threading
+import time
+from datetime import datetime, timedelta, timezone
 import json
 from database.settings_db import get_security_settings
+from database.log_writer import log_writer
 
 logger = logging.getLogger(__name__)
 
@@ -61,7 +64,19 @@ class TrafficLog(LogBase):
 
     @staticmethod
     def log_request(client_ip, method, path, status_code, duration_ms, host=None, error=None, user_id=None):
-        """Log a request to the database"""
+        """Log a request to the database (queued for the batched log writer unless it is disabled)"""
+        if log_writer.enabled:
+            return log_writer.submit(logs_engine, TrafficLog.__table__, {
+                'timestamp': datetime.now(timezone.utc),
+                'client_ip': client_ip,
+                'method': method,
+                'path': path,
+                'status_code': status_code,
+                'duration_ms': duration_ms,
+                'host': host,
+                'error': error,
+                'user_id': user_id
+            })
         try:
             log = TrafficLog(
                 client_ip=client_ip,
@@ -113,6 +128,35 @@ class TrafficLog(LogBase):
                 'avg_duration': 0
             }
 
+# Process-local copy of ip_bans for the per-request ban check: ip -> expiry epoch
+# seconds (None for permanent bans). Workers notice each other's ban/unban through
+# the counter in ip_ban_version, read at most every BAN_VERSION_CHECK_INTERVAL seconds.
+BAN_VERSION_CHECK_INTERVAL = 1.0
+_ban_cache = {}
+_ban_cache_version = None
+_ban_version_checked_at = 0.0
+_ban_cache_lock = threading.Lock()
+
+def _expiry_epoch(expires_at):
+    """Epoch seconds of a stored (UTC) expiry"""
+    return expires_at.replace(tzinfo=timezone.utc).timestamp()
+
+class IPBanVersion(LogBase):
+    """Single-row counter bumped on every ban/unban, so other workers reload their ban cache"""
+    __tablename__ = 'ip_ban_version'
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+    @staticmethod
+    def bump():
+        """Increment the version inside the current logs_session transaction"""
+        updated = logs_session.query(IPBanVersion).filter_by(id=1).update(
+            {IPBanVersion.version: IPBanVersion.version + 1}, synchronize_session=False
+        )
+        if not updated:
+            logs_session.add(IPBanVersion(id=1, version=1))
+
 class IPBan(LogBase):
     """Model for banned IPs"""
     __tablename__ = 'ip_bans'
@@ -127,32 +171,71 @@ class IPBan(LogBase):
     created_by = Column(String(50), default='system')  # 'system' or 'manual'
 
     @staticmethod
-    def is_ip_banned(ip_address):
-        """Check if an IP is currently banned"""
+    def load_ban_cache():
+        """Reload the process-local ban cache from the database"""
+        global _ban_cache, _ban_cache_version, _ban_version_checked_at
         try:
-            ban = IPBan.query.filter_by(ip_address=ip_address).first()
-            if not ban:
-                return False
+            with _ban_cache_lock:
+                with logs_engine.connect() as conn:
+                    version = conn.execute(
+                        IPBanVersion.__table__.select().with_only_columns(IPBanVersion.version).where(IPBanVersion.id == 1)
+                    ).scalar() or 0
+                    rows = conn.execute(
+                        IPBan.__table__.select().with_only_columns(IPBan.ip_address, IPBan.is_permanent, IPBan.expires_at)
+                    ).all()
+
+                bans = {}
+                for ip_address, is_permanent, expires_at in rows:
+                    if is_permanent:
+                        bans[ip_address] = None
+                    elif expires_at:
+                        bans[ip_address] = _expiry_epoch(expires_at)
+
+                _ban_cache = bans
+                _ban_cache_version = version
+                _ban_version_checked_at = time.monotonic()
+            logger.debug(f"Loaded {len(bans)} IP bans (version {version})")
+        except Exception as e:
+            logger.error(f"Error loading IP ban cache: {e}")
 
-            # Check permanent ban
-            if ban.is_permanent:
-                return True
+    @staticmethod
+    def _sync_ban_cache():
+        """Reload the ban cache if another worker changed the bans since the last check"""
+        global _ban_version_checked_at
+        now = time.monotonic()
+        if now - _ban_version_checked_at < BAN_VERSION_CHECK_INTERVAL:
+            return
+        _ban_version_checked_at = now
+        try:
+            with logs_engine.connect() as conn:
+                version = conn.execute(
+                    IPBanVersion.__table__.select().with_only_columns(IPBanVersion.version).where(IPBanVersion.id == 1)
+                ).scalar() or 0
+        except Exception as e:
+            logger.error(f"Error checking IP ban version: {e}")
+            return
+        if version != _ban_cache_version:
+            IPBan.load_ban_cache()
 
-            # Check temporary ban expiry
-            if ban.expires_at:
-                if datetime.utcnow() < ban.expires_at.replace(tzinfo=None):
-                    return True
-                else:
-                    # Ban expired, remove it
-                    logs_session.delete(ban)
-                    logs_session.commit()
-                    return False
+    @staticmethod
+    def is_ip_banned(ip_address):
+        """Check if an IP is currently banned (answered from the process-local ban cache)"""
+        IPBan._sync_ban_cache()
 
+        bans = _ban_cache
+        if ip_address not in bans:
             return False
-        except Exception as e:
-            logger.error(f"Error checking IP ban status: {e}")
-            logs_session.rollback()
-            return False
+
+        # Permanent ban
+        expires = bans[ip_address]
+        if expires is None:
+            return True
+
+        # Temporary ban: expired rows are removed from the database by get_all_bans()
+        if time.time() < expires:
+            return True
+        bans.pop(ip_address, None)
+        return False
 
     @staticmethod
     def ban_ip(ip_address, reason, duration_hours=24, permanent=False, created_by='system'):
@@ -193,8 +276,12 @@ class IPBan(LogBase):
                     created_by=created_by
                 )
                 logs_session.add(ban)
+                existing_ban = ban
 
+            expiry = None if existing_ban.is_permanent else _expiry_epoch(existing_ban.expires_at)
+            IPBanVersion.bump()
             logs_session.commit()
+            _ban_cache[ip_address] = expiry
             logger.info(f"IP {ip_address} banned: {reason}")
             return True
         except Exception as e:
@@ -209,7 +296,9 @@ class IPBan(LogBase):
             ban = IPBan.query.filter_by(ip_address=ip_address).first()
             if ban:
                 logs_session.delete(ban)
+                IPBanVersion.bump()
                 logs_session.commit()
+                _ban_cache.pop(ip_address, None)
                 logger.info(f"IP {ip_address} unbanned")
                 return True
             return False
@@ -465,3 +554,6 @@ def init_logs_db():
 
     from database.db_init_helper import init_db_with_logging
     init_db_with_logging(LogBase, logs_engine, "Traffic Logs DB", logger)
+
+    # Serve the per-request ban check from memory from the first request on
+    IPBan.load_ban_cache()
@@ -113,6 +113,19 @@ class OptionGreeksSchema(Schema):
     underlying_exchange = fields.Str(required=False)  # Optional: Specify underlying exchange (NSE_INDEX, NFO, etc.)
     expiry_time = fields.Str(required=False)  # Optional: Custom expiry time in HH:MM format (e.g., "15:30", "19:00"). If not provided, uses exchange defaults
 
+class OptionGreeksSymbol(Schema):
+    symbol = fields.Str(required=True)      # Option symbol (e.g., NIFTY28NOV2424000CE)
+    exchange = fields.Str(required=True, validate=validate.OneOf(["NFO", "BFO", "CDS", "MCX"]))  # Exchange (NFO, BFO, CDS, MCX)
+
+class MultiOptionGreeksSchema(Schema):
+    apikey = fields.Str(required=True)      # API Key for authentication
+    symbols = fields.List(fields.Nested(OptionGreeksSymbol), required=True, validate=validate.Length(min=1, max=500))  # Options to calculate (e.g., a whole chain)
+    interest_rate = fields.Float(required=False, validate=validate.Range(min=0, max=100))  # Risk-free interest rate (annualized %). Optional, defaults per exchange
+    forward_price = fields.Float(required=False, validate=validate.Range(min=0))  # Optional: Custom forward price for all symbols. If provided, skips underlying price fetch
+    underlying_symbol = fields.Str(required=False)   # Optional: Underlying symbol for all symbols (e.g., NIFTY or NIFTY28NOV24FUT)
+    underlying_exchange = fields.Str(required=False)  # Optional: Underlying exchange for all symbols (NSE_INDEX, NFO, etc.)
+    expiry_time = fields.Str(required=False)  # Optional: Custom expiry time in HH:MM format (e.g., "15:30", "19:00")
+
 class InstrumentsSchema(Schema):
     apikey = fields.Str(required=True)      # API Key for authentication
     exchange = fields.Str(required=False, validate=validate.OneOf([
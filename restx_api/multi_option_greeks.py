@@ -0,0 +1,135 @@
+from flask_restx import Namespace, Resource
+from flask import request, jsonify, make_response
+from marshmallow import ValidationError
+from limiter import limiter
+import os
+
+from .data_schemas import MultiOptionGreeksSchema
+from services.option_greeks_service import get_multi_option_greeks
+from database.auth_db import verify_api_key
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Rate limit for option greeks API
+GREEKS_RATE_LIMIT = os.getenv("GREEKS_RATE_LIMIT", "30 per minute")
+
+api = Namespace('multioptiongreeks', description='Option Greeks API for multiple symbols')
+
+# Initialize schema
+multi_option_greeks_schema = MultiOptionGreeksSchema()
+
+
+@api.route('', strict_slashes=False)
+class MultiOptionGreeks(Resource):
+    @limiter.limit(GREEKS_RATE_LIMIT)
+    def post(self):
+        """
+        Calculate Option Greeks and Implied Volatility for many options in one call
+
+        All prices are fetched with a single multiquote request and IV/Greeks are
+        solved for every option together (Black-76), so a whole option chain
+        costs one API call instead of one per symbol.
+
+        Required fields:
+        - apikey: API key for authentication
+        - symbols: List of {"symbol": ..., "exchange": ...} (max 500)
+
+        Optional fields (applied to every symbol):
+        - interest_rate: Risk-free interest rate (annualized %). Defaults to 0%
+        - forward_price: Custom forward/synthetic futures price. If provided, skips underlying price fetch.
+        - underlying_symbol: Underlying symbol (e.g., NIFTY or NIFTY28NOV24FUT)
+        - underlying_exchange: Underlying exchange (NSE_INDEX, NFO, etc.)
+        - expiry_time: Custom expiry time in HH:MM format (e.g., "15:30")
+
+        Example Request:
+        {
+            "apikey": "your_api_key",
+            "symbols": [
+                {"symbol": "NIFTY02DEC2524000CE", "exchange": "NFO"},
+                {"symbol": "NIFTY02DEC2524000PE", "exchange": "NFO"}
+            ],
+            "interest_rate": 7.0
+        }
+
+        Example Response:
+        {
+            "status": "success",
+            "data": [
+                {
+                    "status": "success",
+                    "symbol": "NIFTY02DEC2524000CE",
+                    "exchange": "NFO",
+                    "underlying": "NIFTY",
+                    "strike": 24000,
+                    "option_type": "CE",
+                    "expiry_date": "02-Dec-2025",
+                    "days_to_expiry": 30.5,
+                    "spot_price": 24550.75,
+                    "option_price": 296.05,
+                    "interest_rate": 7.0,
+                    "implied_volatility": 15.25,
+                    "greeks": {"delta": 0.5234, "gamma": 0.000125, "theta": -4.9678, "vega": 30.7654, "rho": 0.001234}
+                },
+                ...
+            ],
+            "summary": {"total": 2, "success": 2, "failed": 0}
+        }
+
+        "status" is "partial" when some symbols failed; each failed entry has
+        "status": "error" and a "message".
+        """
+        try:
+            # Get request data
+            data = request.json
+
+            if data is None:
+                return make_response(jsonify({
+                    'status': 'error',
+                    'message': 'Request body is missing or invalid JSON'
+                }), 400)
+
+            # Validate request data
+            try:
+                validated_data = multi_option_greeks_schema.load(data)
+            except ValidationError as err:
+                logger.warning(f"Validation error in multi option greeks request: {err.messages}")
+                return make_response(jsonify({
+                    'status': 'error',
+                    'message': 'Validation failed',
+                    'errors': err.messages
+                }), 400)
+
+            api_key = validated_data.get('apikey')
+            symbols = validated_data.get('symbols')
+
+            # Verify API key
+            if not verify_api_key(api_key):
+                logger.warning(f"Invalid API key used for multi option greeks: {api_key[:10]}...")
+                return make_response(jsonify({
+                    'status': 'error',
+                    'message': 'Invalid openalgo apikey'
+                }), 401)
+
+            logger.info(f"Calculating Greeks for {len(symbols)} symbols")
+            success, response, status_code = get_multi_option_greeks(
+                symbols=symbols,
+                interest_rate=validated_data.get('interest_rate'),
+                forward_price=validated_data.get('forward_price'),
+                underlying_symbol=validated_data.get('underlying_symbol'),
+                underlying_exchange=validated_data.get('underlying_exchange'),
+                expiry_time=validated_data.get('expiry_time'),
+                api_key=api_key
+            )
+
+            if not success:
+                logger.error(f"Failed to calculate Greeks: {response.get('message')}")
+
+            return make_response(jsonify(response), status_code)
+
+        except Exception as e:
+            logger.exception(f"Unexpected error in multi option greeks endpoint: {e}")
+            return make_response(jsonify({
+                'status': 'error',
+                'message': 'Internal server error while calculating option Greeks'
+            }), 500)
@@ -5,6 +5,8 @@ from database.auth_db import get_auth_token_broker
 from limiter import limiter
 import os
 import importlib
+import tempfile
+import numpy as np
 import pandas as pd
 from datetime import datetime, timezone, timedelta
 import pytz
@@ -21,6 +23,16 @@ logger = get_logger(__name__)
 # Initialize schema
 ticker_schema = TickerSchema()
 
+# Formats answered as plain text (errors included)
+TEXT_FORMATS = ('txt', 'csv')
+
+# txt/csv exports with more rows than this are streamed in chunks of EXPORT_CHUNK_ROWS
+STREAM_THRESHOLD_ROWS = 50000
+EXPORT_CHUNK_ROWS = 20000
+
+# IST is a fixed UTC+05:30 offset
+IST_OFFSET_SECONDS = 19800
+
 def import_broker_module(broker_name):
     try:
         module_path = f'broker.{broker_name}.api.data'
@@ -56,6 +68,60 @@ def convert_timestamp(timestamp, interval):
     # For intraday: return date and time separately
     return dt_ist.strftime('%Y-%m-%d'), dt_ist.strftime('%H:%M:%S')
 
+def export_frame(df, symbol_with_exchange, interval):
+    """
+    Bars in the txt/csv column layout, with timestamps rendered column-wise
+
+    Returns a DataFrame with Ticker, Date, Time (intraday only), Open, High,
+    Low, Close and Volume columns: dates and times in IST and volume truncated
+    to an integer, the same values convert_timestamp() and the per-row
+    formatting produce. Prices keep the type the per-row loop printed: the
+    frame's common dtype (what iterrows() yields), so integer prices stay
+    integers unless another column is float.
+    """
+    columns = ['Ticker', 'Date'] + (['Time'] if interval.upper() != 'D' else []) + ['Open', 'High', 'Low', 'Close', 'Volume']
+    if df.empty:
+        return pd.DataFrame(columns=columns)
+
+    # Epoch seconds -> IST wall clock, formatted by NumPy as YYYY-MM-DDTHH:MM:SS
+    seconds = np.floor(np.round(df['timestamp'].to_numpy(dtype='float64'), 6)).astype('int64')
+    stamps = np.datetime_as_string((seconds + IST_OFFSET_SECONDS).astype('datetime64[s]'))
+
+    # With an object column iterrows() yields each value as stored, otherwise
+    # every value is cast to the common dtype
+    row_dtype = df.values.dtype
+    values = {'Ticker': symbol_with_exchange, 'Date': stamps.astype('<U10')}
+    if 'Time' in columns:
+        values['Time'] = pd.Series(stamps).str.slice(11).to_numpy()
+    for column in ('open', 'high', 'low', 'close'):
+        prices = df[column].to_numpy()
+        values[column.capitalize()] = prices if row_dtype == object else prices.astype(row_dtype)
+    values['Volume'] = df['volume'].to_numpy(dtype='float64').astype('int64')
+    return pd.DataFrame(values, columns=columns)
+
+def render_export(frame, header=False):
+    """Comma separated lines of an export_frame() slice, one per bar, each ending in a newline"""
+    return frame.to_csv(header=header, index=False, lineterminator='\n')
+
+def stream_export(frame, header=False, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Yield render_export() output chunk by chunk, without the final newline (same text as the unstreamed body)"""
+    total = len(frame)
+    for start in range(0, max(total, 1), chunk_rows):
+        chunk = render_export(frame.iloc[start:start + chunk_rows], header=header and start == 0)
+        yield chunk[:-1] if start + chunk_rows >= total else chunk
+
+def export_parquet(df):
+    """Bars as Parquet file bytes (written with DuckDB)"""
+    import duckdb
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'bars.parquet')
+        with duckdb.connect() as conn:
+            conn.register('bars', df)
+            conn.execute(f"COPY bars TO '{path}' (FORMAT PARQUET)")
+        with open(path, 'rb') as f:
+            return f.read()
+
 def validate_and_adjust_date_range(start_date, end_date, interval):
     """
     Validate and adjust date range based on interval to prevent large queries
@@ -112,7 +178,7 @@ def validate_and_adjust_date_range(start_date, end_date, interval):
     'adjusted': 'Adjust for splits (true/false)',
     'sort': 'Sort order (asc/desc)',
     'apikey': 'API Key for authentication',
-    'format': 'Response format (json/txt). Default: json',
+    'format': 'Response format (json/txt/csv/parquet). Default: json',
 })
 class Ticker(Resource):
     @limiter.limit(API_RATE_LIMIT)
@@ -165,7 +231,7 @@ class Ticker(Resource):
             api_key = history_data['apikey']
             AUTH_TOKEN, broker = get_auth_token_broker(api_key)
             if AUTH_TOKEN is None:
-                if response_format == 'txt':
+                if response_format in TEXT_FORMATS:
                     response = TextResponse('Invalid openalgo apikey\n')
                     response.content_type = 'text/plain'
                     response.json = {'request_id': f"ticker_{symbol}_{history_data['interval']}"}
@@ -177,7 +243,7 @@ class Ticker(Resource):
 
             broker_module = import_broker_module(broker)
             if broker_module is None:
-                if response_format == 'txt':
+                if response_format in TEXT_FORMATS:
                     response = TextResponse('Broker-specific module not found\n')
                     response.content_type = 'text/plain'
                     response.json = {'request_id': f"ticker_{symbol}_{history_data['interval']}"}
@@ -204,29 +270,28 @@ class Ticker(Resource):
                     raise ValueError("Invalid data format returned from broker")
 
                 # Format the response based on the format parameter
-                if response_format == 'txt':
-                    # Convert timestamps to datetime format
-                    text_output = []
-                    interval = history_data['interval']
-                    symbol_with_exchange = f"{history_data['exchange']}:{history_data['symbol']}"
-                    
-                    for _, row in df.iterrows():
-                        # Convert timestamp based on interval
-                        timestamp = convert_timestamp(row['timestamp'], interval)
-                        # Convert volume to integer by removing decimal point
-                        volume = int(row['volume'])
-                        if interval.upper() == 'D':
-                            # Daily format: Ticker,Date_YMD,Open,High,Low,Close,Volume
-                            text_output.append(f"{symbol_with_exchange},{timestamp},{row['open']},{row['high']},{row['low']},{row['close']},{volume}")
-                        else:
-                            # Intraday format: Ticker,Date_YMD,Time,Open,High,Low,Close,Volume
-                            date, time = timestamp
-                            text_output.append(f"{symbol_with_exchange},{date},{time},{row['open']},{row['high']},{row['low']},{row['close']},{volume}")
-                    
-                    # Create plain text response
-                    response = TextResponse('\n'.join(text_output))
-                    response.content_type = 'text/plain'
-                    response.json = {'request_id': f"ticker_{symbol}_{history_data['interval']}"}
+                request_id = f"ticker_{symbol}_{history_data['interval']}"
+                if response_format in TEXT_FORMATS:
+                    # txt: Ticker,Date_YMD[,Time],Open,High,Low,Close,Volume (Time for intraday only)
+                    # csv: the same columns with a header row
+                    frame = export_frame(df, f"{history_data['exchange']}:{history_data['symbol']}", history_data['interval'])
+                    header = response_format == 'csv'
+                    if len(frame) > STREAM_THRESHOLD_ROWS:
+                        response = TextResponse(stream_export(frame, header=header))
+                    else:
+                        response = TextResponse(render_export(frame, header=header)[:-1])
+                    if header:
+                        response.content_type = 'text/csv'
+                        response.headers['Content-Disposition'] = f"attachment; filename={history_data['exchange']}_{history_data['symbol']}_{history_data['interval']}.csv"
+                    else:
+                        response.content_type = 'text/plain'
+                    response.json = {'request_id': request_id}
+                    return response
+                elif response_format == 'parquet':
+                    response = TextResponse(export_parquet(df))
+                    response.content_type = 'application/vnd.apache.parquet'
+                    response.headers['Content-Disposition'] = f"attachment; filename={history_data['exchange']}_{history_data['symbol']}_{history_data['interval']}.parquet"
+                    response.json = {'request_id': request_id}
                     return response
                 else:
                     # Return JSON format
@@ -237,7 +302,7 @@ class Ticker(Resource):
 
             except Exception as e:
                 logger.exception(f"Error in broker_module.get_history: {e}")
-                if response_format == 'txt':
+                if response_format in TEXT_FORMATS:
                     response = TextResponse(str(e))
                     response.content_type = 'text/plain'
                     response.json = {'request_id': f"ticker_{symbol}_{history_data['interval']}"}
@@ -248,7 +313,7 @@ class Ticker(Resource):
                 }), 500)
 
         except ValidationError as err:
-            if response_format == 'txt':
+            if response_format in TEXT_FORMATS:
                 response = TextResponse(str(err.messages))
                 response.content_type = 'text/plain'
                 response.json = {'request_id': 'ticker_validation_error'}
@@ -259,7 +324,7 @@ class Ticker(Resource):
             }), 400)
         except Exception as e:
             logger.exception(f"Unexpected error in ticker endpoint: {e}")
-            if response_format == 'txt':
+            if response_format in TEXT_FORMATS:
                 response = TextResponse('An unexpected error occurred')
                 response.content_type = 'text/plain'
                 response.json = {'request_id': 'ticker_unknown_error'}
@@ -0,0 +1,61 @@
+# sandbox/clock.py
+"""
+Sandbox Clock - Wall clock in normal operation, simulated time during a replay
+
+Sandbox modules read the current time through now() instead of
+datetime.now(), so a replay (sandbox/replay.py) can move time forward tick by
+tick: order and trade timestamps, the MIS square-off block and the session
+filters of the order book and trade book all follow the replayed day.
+
+While a replay is running the simulated clock also holds the last replayed
+quote of every symbol, and the sandbox quote lookups answer from it instead
+of calling the broker.
+"""
+
+from datetime import datetime
+
+# SimulatedClock of the running replay (None when the sandbox follows the wall clock)
+_simulated = None
+
+
+class SimulatedClock:
+    """Replay time (epoch seconds) and the latest replayed quote per symbol"""
+
+    def __init__(self, epoch=0.0):
+        self.epoch = epoch
+        self.quotes = {}    # (symbol, exchange) -> quote dict
+
+    def now(self, tz=None):
+        return datetime.fromtimestamp(self.epoch, tz)
+
+
+def now(tz=None):
+    """Current sandbox time, same signature as datetime.now()"""
+    clock = _simulated
+    if clock is None:
+        return datetime.now(tz)
+    return clock.now(tz)
+
+
+def use_simulated_clock(clock):
+    """Run the sandbox on `clock` until reset_clock() is called"""
+    global _simulated
+    _simulated = clock
+
+
+def reset_clock():
+    """Return the sandbox to the wall clock"""
+    global _simulated
+    _simulated = None
+
+
+def is_simulated():
+    return _simulated is not None
+
+
+def get_simulated_quote(symbol, exchange):
+    """Last replayed quote for a symbol, or None if it has not ticked yet"""
+    clock = _simulated
+    if clock is None:
+        return None
+    return clock.quotes.get((symbol, exchange))
@@ -0,0 +1,231 @@
+# sandbox/event_engine.py
+"""
+Event-Driven Execution Engine - Fills pending sandbox orders on live ticks
+
+Instead of loading every open order and fetching REST quotes on a fixed
+interval, this engine:
+- Keeps open LIMIT/SL/SL-M orders in a PendingOrderBook indexed by trigger price
+- Listens to the MarketDataService feed (WebSocket proxy ticks)
+- On each tick, evaluates only the orders whose price the LTP has crossed
+- Falls back to REST quotes (multiquotes) only for symbols that have not
+  ticked within order_check_interval seconds
+
+Order placement, modification and cancellation call track_order() so the book
+sees changes immediately; a periodic resync against the database catches
+anything changed outside this process.
+"""
+
+import threading
+import time
+
+from database.sandbox_db import SandboxOrders, db_session
+from sandbox.execution_engine import ExecutionEngine
+from sandbox.order_book import PendingOrderBook
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Engine instance owned by the running execution thread (None in poll mode)
+_active_engine = None
+
+
+class EventExecutionEngine(ExecutionEngine):
+    """Executes pending orders as market data ticks arrive"""
+
+    def __init__(self, check_interval=5):
+        super().__init__()
+        self.check_interval = check_interval
+        self.book = PendingOrderBook()
+
+        # Latest tick per symbol waiting to be matched, and when each symbol last ticked
+        self.tick_lock = threading.Lock()
+        self.pending_ticks = {}
+        self.last_tick = {}
+        self.tick_event = threading.Event()
+
+        # Feed state
+        self.subscriber_id = None
+        self.feed_username = None
+        self.feed_symbols = set()
+
+    def start(self):
+        """Load open orders and attach to the market data feed"""
+        global _active_engine
+        from services.market_data_service import subscribe_to_market_updates
+
+        self.sync_book()
+        self.subscriber_id = subscribe_to_market_updates('all', self.on_tick)
+        _active_engine = self
+        self.subscribe_feed_symbols()
+
+    def stop(self):
+        """Detach from the market data feed"""
+        global _active_engine
+        from services.market_data_service import unsubscribe_from_market_updates
+
+        if _active_engine is self:
+            _active_engine = None
+        if self.subscriber_id is not None:
+            unsubscribe_from_market_updates(self.subscriber_id)
+            self.subscriber_id = None
+
+    def on_tick(self, data):
+        """
+        MarketDataService callback - runs on the WebSocket client thread, so it
+        only records the latest quote and wakes the engine thread.
+        """
+        symbol = data.get('symbol')
+        exchange = data.get('exchange')
+        if not self.book.has_symbol(symbol, exchange):
+            return
+
+        quote = data.get('data') or {}
+        if not quote.get('ltp'):
+            return
+
+        key = (symbol, exchange)
+        with self.tick_lock:
+            self.pending_ticks[key] = quote
+            self.last_tick[key] = time.monotonic()
+        self.tick_event.set()
+
+    def wait_for_ticks(self, timeout):
+        """Block until a tick arrives or timeout elapses"""
+        if self.tick_event.wait(timeout):
+            self.tick_event.clear()
+
+    def process_ticks(self):
+        """Match all ticks received since the last call against the book"""
+        with self.tick_lock:
+            ticks = self.pending_ticks
+            self.pending_ticks = {}
+
+        if ticks:
+            self._execute_quotes(ticks)
+
+    def sweep(self):
+        """
+        Periodic maintenance: resync the book with the database, subscribe any
+        new symbols, and poll REST quotes for symbols the feed has not covered.
+        """
+        self.sync_book()
+        self.subscribe_feed_symbols()
+
+        now = time.monotonic()
+        with self.tick_lock:
+            stale = [key for key in self.book.symbols()
+                     if now - self.last_tick.get(key, 0) > self.check_interval]
+        if not stale:
+            return
+
+        logger.debug(f"Polling quotes for {len(stale)} symbols without recent ticks")
+        self._execute_quotes(self._fetch_quotes(stale))
+
+    def sync_book(self):
+        """Rebuild the book from open orders in the database"""
+        try:
+            open_orders = SandboxOrders.query.filter_by(order_status='open').all()
+            self.book.replace(open_orders)
+        except Exception as e:
+            logger.error(f"Error loading pending orders into order book: {e}")
+        finally:
+            db_session.remove()
+
+    def subscribe_feed_symbols(self):
+        """Subscribe the WebSocket feed to book symbols that are not yet subscribed"""
+        new_symbols = [key for key in self.book.symbols() if key not in self.feed_symbols]
+        if not new_symbols:
+            return
+
+        try:
+            from database.auth_db import ApiKeys
+            from services.market_data_service import get_market_data_service
+            from services.websocket_service import get_websocket_connection
+
+            if self.feed_username is None:
+                # Same account the REST fallback uses for quotes
+                api_key_obj = ApiKeys.query.first()
+                if not api_key_obj:
+                    logger.debug("No API keys found for market data feed")
+                    return
+                if not get_market_data_service().register_user_callback(api_key_obj.user_id):
+                    logger.debug("Market data feed unavailable, using quote polling")
+                    return
+                self.feed_username = api_key_obj.user_id
+
+            success, client, error = get_websocket_connection(self.feed_username)
+            if not success:
+                logger.debug(f"Market data feed unavailable, using quote polling: {error}")
+                return
+
+            result = client.subscribe(
+                [{'symbol': symbol, 'exchange': exchange} for symbol, exchange in new_symbols],
+                'Quote'
+            )
+            if result.get('status') == 'success':
+                self.feed_symbols.update(new_symbols)
+                logger.debug(f"Subscribed market data feed to {len(new_symbols)} symbols")
+            else:
+                logger.debug(f"Feed subscription failed: {result.get('message')}")
+
+        except Exception as e:
+            logger.debug(f"Could not subscribe market data feed: {e}")
+
+    def _execute_quotes(self, quotes):
+        """
+        Execute the orders crossed by a set of quotes in one transaction.
+
+        Args:
+            quotes: dict mapping (symbol, exchange) to quote data
+
+        Returns:
+            int: Number of orders executed
+        """
+        crossed = {}
+        for (symbol, exchange), quote in quotes.items():
+            ltp = quote.get('ltp')
+            if ltp:
+                for orderid in self.book.crossed(symbol, exchange, ltp):
+                    crossed[orderid] = quote
+        if not crossed:
+            return 0
+
+        executed = 0
+
+        try:
+            orders = {
+                order.orderid: order
+                for order in SandboxOrders.query.filter(SandboxOrders.orderid.in_(list(crossed))).all()
+                if order.order_status == 'open'
+            }
+            executed = self.execute_orders([(order, crossed[orderid]) for orderid, order in orders.items()])
+
+            # Orders no longer open (filled here, cancelled elsewhere) leave the book
+            for orderid in crossed:
+                if orderid not in orders or orders[orderid].order_status != 'open':
+                    self.book.remove(orderid)
+
+        except Exception as e:
+            logger.error(f"Error executing orders for {len(quotes)} symbols: {e}")
+        finally:
+            db_session.remove()
+
+        return executed
+
+
+def track_order(order):
+    """
+    Tell the running event engine about a placed, modified or cancelled order.
+    No-op when the execution engine runs in poll mode or is stopped.
+    """
+    engine = _active_engine
+    if engine is None:
+        return
+
+    try:
+        if order.order_status == 'open':
+            engine.book.add(order)
+        else:
+            engine.book.remove(order.orderid)
+    except Exception as e:
+        logger.debug(f"Could not update pending order book for {order.orderid}: {e}")
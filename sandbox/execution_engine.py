@@ -7,14 +7,13 @@ Features:
 - Real-time quote fetching from broker
 - Order execution based on price type (MARKET, LIMIT, SL, SL-M)
 - Trade creation and position updates
-- Rate limit compliance (10 orders/second, 50 API calls/second)
-- Batch processing for efficiency
+- Rate limit compliance (50 API calls/second)
+- Price-indexed matching (PendingOrderBook) and one DB transaction per user per batch of fills
 """
 
 import os
 import sys
 from decimal import Decimal
-from datetime import datetime
 import pytz
 import time
 import uuid
@@ -26,14 +25,16 @@ from database.sandbox_db import (
     SandboxOrders, SandboxTrades, SandboxPositions,
     db_session
 )
+from sandbox import clock
 from sandbox.fund_manager import FundManager, validate_margin_consistency, reconcile_margin
+from sandbox.order_book import PendingOrderBook
+from sandbox.unit_of_work import RowState, SandboxUnitOfWork
 from services.quotes_service import get_quotes, get_multiquotes
 from database.auth_db import get_auth_token_broker
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
 
-
 class ExecutionEngine:
     """Executes pending orders based on market data"""
 
@@ -46,7 +47,7 @@ class ExecutionEngine:
     def check_and_execute_pending_orders(self):
         """
         Main execution loop - checks all pending orders and executes if conditions met
-        Respects rate limits through batch processing
+        Quotes are fetched per symbol; matched orders are executed in one transaction
         """
         try:
             # Get all pending orders
@@ -58,62 +59,64 @@ class ExecutionEngine:
 
             logger.info(f"Processing {len(pending_orders)} pending orders")
 
-            # Group orders by user and symbol for efficient quote fetching
-            orders_by_symbol = {}
-            for order in pending_orders:
-                key = (order.symbol, order.exchange)
-                if key not in orders_by_symbol:
-                    orders_by_symbol[key] = []
-                orders_by_symbol[key].append(order)
-
-            # Fetch quotes using multiquotes (more efficient - single API call)
-            # Falls back to individual quotes if multiquotes fails
-            quote_cache = {}
-            symbols_list = list(orders_by_symbol.keys())
-
-            # Try batch fetch using multiquotes
-            quote_cache = self._fetch_quotes_batch(symbols_list)
-
-            # Fallback: For any symbols that failed in batch, try individual fetch
-            failed_symbols = [s for s in symbols_list if s not in quote_cache or quote_cache[s] is None]
-            if failed_symbols:
-                logger.debug(f"Fetching {len(failed_symbols)} symbols individually (multiquotes fallback)")
-                for i in range(0, len(failed_symbols), self.api_rate_limit):
-                    batch = failed_symbols[i:i + self.api_rate_limit]
-                    for symbol, exchange in batch:
-                        quote = self._fetch_quote(symbol, exchange)
-                        if quote:
-                            quote_cache[(symbol, exchange)] = quote
-                    # Wait 1 second before next batch if more symbols remain
-                    if i + self.api_rate_limit < len(failed_symbols):
-                        time.sleep(self.batch_delay)
-
-            # Process orders in batches (respecting order rate limit of 10/second)
-            orders_processed = 0
-            for i in range(0, len(pending_orders), self.order_rate_limit):
-                batch = pending_orders[i:i + self.order_rate_limit]
-
-                for order in batch:
-                    quote = quote_cache.get((order.symbol, order.exchange))
-                    if quote:
-                        self._process_order(order, quote)
-                        orders_processed += 1
+            # Index orders by trigger price so each quote only touches the orders it crosses
+            book = PendingOrderBook()
+            book.replace(pending_orders)
+            orders_by_id = {order.orderid: order for order in pending_orders}
+
+            # Fetch quotes using multiquotes, falling back to individual quotes
+            quote_cache = self._fetch_quotes(book.symbols())
+
+            candidates = []
+            for (symbol, exchange), quote in quote_cache.items():
+                ltp = quote.get('ltp')
+                if ltp:
+                    candidates.extend(
+                        (orders_by_id[orderid], quote)
+                        for orderid in book.crossed(symbol, exchange, ltp)
+                    )
 
-                # Wait 1 second before next batch if more orders remain
-                if i + self.order_rate_limit < len(pending_orders):
-                    time.sleep(self.batch_delay)
+            orders_processed = self.execute_orders(candidates)
 
-            logger.info(f"Processed {orders_processed} orders")
+            logger.info(f"Executed {orders_processed} of {len(pending_orders)} pending orders")
 
         except Exception as e:
             logger.error(f"Error in execution engine: {e}")
 
+    def _fetch_quotes(self, symbols_list):
+        """
+        Fetch quotes for (symbol, exchange) pairs.
+        Tries a single multiquotes call first, then fetches any symbols it missed
+        individually in batches of api_rate_limit per second.
+        Returns dict mapping (symbol, exchange) to quote data.
+        """
+        quote_cache = self._fetch_quotes_batch(symbols_list)
+
+        # Fallback: For any symbols that failed in batch, try individual fetch
+        failed_symbols = [s for s in symbols_list if s not in quote_cache or quote_cache[s] is None]
+        if failed_symbols:
+            logger.debug(f"Fetching {len(failed_symbols)} symbols individually (multiquotes fallback)")
+            for i in range(0, len(failed_symbols), self.api_rate_limit):
+                batch = failed_symbols[i:i + self.api_rate_limit]
+                for symbol, exchange in batch:
+                    quote = self._fetch_quote(symbol, exchange)
+                    if quote:
+                        quote_cache[(symbol, exchange)] = quote
+                # Wait 1 second before next batch if more symbols remain
+                if i + self.api_rate_limit < len(failed_symbols):
+                    time.sleep(self.batch_delay)
+
+        return quote_cache
+
     def _fetch_quote(self, symbol, exchange):
         """
         Fetch real-time quote for a symbol using API key
         Returns dict with ltp, high, low, open, close, etc.
         Returns None if quote cannot be fetched (permission error, API error, etc.)
         """
+        if clock.is_simulated():
+            return clock.get_simulated_quote(symbol, exchange)
+
         try:
             # Get any user's API key for fetching quotes
             from database.auth_db import ApiKeys, decrypt_token
@@ -158,6 +161,13 @@ class ExecutionEngine:
         if not symbols_list:
             return quote_cache
 
+        if clock.is_simulated():
+            for symbol, exchange in symbols_list:
+                quote = clock.get_simulated_quote(symbol, exchange)
+                if quote:
+                    quote_cache[(symbol, exchange)] = quote
+            return quote_cache
+
         try:
             # Get any user's API key for fetching quotes
             from database.auth_db import ApiKeys, decrypt_token
@@ -226,74 +236,202 @@ class ExecutionEngine:
                     order.average_price = existing_trade.price
                     order.filled_quantity = order.quantity
                     order.pending_quantity = 0
-                    order.update_timestamp = datetime.now(pytz.timezone('Asia/Kolkata'))
+                    order.update_timestamp = clock.now(pytz.timezone('Asia/Kolkata'))
                     db_session.commit()
                     logger.info(f"Updated order {order.orderid} status to complete (was in race condition)")
                 return
 
-            ltp = Decimal(str(quote.get('ltp', 0)))
-            bid = Decimal(str(quote.get('bid', 0)))
-            ask = Decimal(str(quote.get('ask', 0)))
+            execution_price = self._execution_price(order, quote)
 
-            if ltp <= 0:
-                logger.warning(f"Invalid LTP for order {order.orderid}: {ltp}")
-                return
+            # Execute the order if conditions are met
+            if execution_price is not None:
+                self._execute_order(order, execution_price)
+
+        except Exception as e:
+            logger.error(f"Error processing order {order.orderid}: {e}")
+
+    def _execution_price(self, order, quote):
+        """
+        Apply the MARKET/LIMIT/SL/SL-M execution rules to a quote.
+        Returns the execution price, or None if the order should stay open.
+        """
+        ltp = Decimal(str(quote.get('ltp', 0)))
+        bid = Decimal(str(quote.get('bid', 0)))
+        ask = Decimal(str(quote.get('ask', 0)))
 
-            # Determine if order should be executed based on price type
-            should_execute = False
-            execution_price = None
+        if ltp <= 0:
+            logger.warning(f"Invalid LTP for order {order.orderid}: {ltp}")
+            return None
 
-            if order.price_type == 'MARKET':
-                # Market orders execute immediately at bid/ask (more realistic)
-                # BUY: Execute at ask price (pay seller's asking price)
-                # SELL: Execute at bid price (receive buyer's bid price)
-                # If bid/ask is 0, fall back to LTP
+        # Determine if order should be executed based on price type
+        should_execute = False
+        execution_price = None
+
+        if order.price_type == 'MARKET':
+            # Market orders execute immediately at bid/ask (more realistic)
+            # BUY: Execute at ask price (pay seller's asking price)
+            # SELL: Execute at bid price (receive buyer's bid price)
+            # If bid/ask is 0, fall back to LTP
+            should_execute = True
+            if order.action == 'BUY':
+                execution_price = ask if ask > 0 else ltp
+            else:  # SELL
+                execution_price = bid if bid > 0 else ltp
+
+        elif order.price_type == 'LIMIT':
+            # Limit BUY: Execute if LTP <= Limit Price (you get filled at LTP or better)
+            # Limit SELL: Execute if LTP >= Limit Price (you get filled at LTP or better)
+            if order.action == 'BUY' and ltp <= order.price:
                 should_execute = True
-                if order.action == 'BUY':
-                    execution_price = ask if ask > 0 else ltp
-                else:  # SELL
-                    execution_price = bid if bid > 0 else ltp
-
-            elif order.price_type == 'LIMIT':
-                # Limit BUY: Execute if LTP <= Limit Price (you get filled at LTP or better)
-                # Limit SELL: Execute if LTP >= Limit Price (you get filled at LTP or better)
-                if order.action == 'BUY' and ltp <= order.price:
-                    should_execute = True
-                    execution_price = ltp  # Execute at current market price (LTP), which is better than limit
-                elif order.action == 'SELL' and ltp >= order.price:
-                    should_execute = True
-                    execution_price = ltp  # Execute at current market price (LTP), which is better than limit
-
-            elif order.price_type == 'SL':
-                # Stop Loss Limit order
-                # SL BUY: When LTP >= trigger price, order activates. Execute at LTP if LTP <= limit price
-                # SL SELL: When LTP <= trigger price, order activates. Execute at LTP if LTP >= limit price
-                if order.action == 'BUY' and ltp >= order.trigger_price:
-                    if ltp <= order.price:
-                        should_execute = True
-                        execution_price = ltp  # Execute at current market price (LTP)
-                elif order.action == 'SELL' and ltp <= order.trigger_price:
-                    if ltp >= order.price:
-                        should_execute = True
-                        execution_price = ltp  # Execute at current market price (LTP)
-
-            elif order.price_type == 'SL-M':
-                # Stop Loss Market order
-                # BUY: Execute at market when LTP >= trigger price
-                # SELL: Execute at market when LTP <= trigger price
-                if order.action == 'BUY' and ltp >= order.trigger_price:
+                execution_price = ltp  # Execute at current market price (LTP), which is better than limit
+            elif order.action == 'SELL' and ltp >= order.price:
+                should_execute = True
+                execution_price = ltp  # Execute at current market price (LTP), which is better than limit
+
+        elif order.price_type == 'SL':
+            # Stop Loss Limit order
+            # SL BUY: When LTP >= trigger price, order activates. Execute at LTP if LTP <= limit price
+            # SL SELL: When LTP <= trigger price, order activates. Execute at LTP if LTP >= limit price
+            if order.action == 'BUY' and ltp >= order.trigger_price:
+                if ltp <= order.price:
                     should_execute = True
-                    execution_price = ltp
-                elif order.action == 'SELL' and ltp <= order.trigger_price:
+                    execution_price = ltp  # Execute at current market price (LTP)
+            elif order.action == 'SELL' and ltp <= order.trigger_price:
+                if ltp >= order.price:
                     should_execute = True
-                    execution_price = ltp
+                    execution_price = ltp  # Execute at current market price (LTP)
 
-            # Execute the order if conditions are met
-            if should_execute:
-                self._execute_order(order, execution_price)
+        elif order.price_type == 'SL-M':
+            # Stop Loss Market order
+            # BUY: Execute at market when LTP >= trigger price
+            # SELL: Execute at market when LTP <= trigger price
+            if order.action == 'BUY' and ltp >= order.trigger_price:
+                should_execute = True
+                execution_price = ltp
+            elif order.action == 'SELL' and ltp <= order.trigger_price:
+                should_execute = True
+                execution_price = ltp
+
+        return execution_price if should_execute else None
+
+    def execute_orders(self, candidates):
+        """
+        Execute matched orders with one transaction per user.
+
+        Existing trades are checked with one query for all candidates. Each user's
+        fills are then netted in a SandboxUnitOfWork (positions loaded with one
+        query) and written with bulk INSERT/UPDATE statements in one commit. If a
+        user's batch fails, that user's orders are retried one at a time so one
+        bad order does not block the rest.
+
+        Args:
+            candidates: list of (order, quote) pairs for open orders
+
+        Returns:
+            int: Number of orders executed
+        """
+        if not candidates:
+            return 0
+
+        # Fill in placement order, as the per-order loop did
+        candidates = sorted(candidates, key=lambda candidate: candidate[0].id or 0)
+        now = clock.now(pytz.timezone('Asia/Kolkata'))
+
+        # Orders that already have a trade (MARKET order race) are only marked complete
+        existing_trades = {
+            orderid: (tradeid, price)
+            for orderid, tradeid, price in db_session.query(
+                SandboxTrades.orderid, SandboxTrades.tradeid, SandboxTrades.price
+            ).filter(SandboxTrades.orderid.in_([order.orderid for order, _ in candidates]))
+        }
+
+        # Work on plain copies and detach the ORM orders: otherwise every per-user
+        # commit expires all candidates and they reload one row at a time
+        by_user = {}
+        for order, quote in candidates:
+            by_user.setdefault(order.user_id, []).append((RowState.from_instance(order), order, quote))
+            db_session.expunge(order)
+
+        executed = 0
+        for user_id, user_candidates in by_user.items():
+            executed += self._execute_user_orders(user_id, user_candidates, existing_trades, now)
+        return executed
+
+    def _execute_user_orders(self, user_id, candidates, existing_trades, now):
+        """
+        Execute one user's matched orders through a SandboxUnitOfWork.
+        candidates are (RowState copy, ORM order, quote) triples.
+        """
+        uow = SandboxUnitOfWork(user_id)
+        fills = 0
+
+        try:
+            uow.load_positions(order.symbol for order, _, _ in candidates)
+
+            for order, instance, quote in candidates:
+                existing_trade = existing_trades.get(order.orderid)
+                if existing_trade:
+                    tradeid, trade_price = existing_trade
+                    logger.debug(f"Order {order.orderid} already has trade {tradeid}, skipping execution")
+                    if order.order_status == 'open':
+                        uow.complete_order(order, trade_price, now, instance)
+                        logger.info(f"Updated order {order.orderid} status to complete (was in race condition)")
+                    continue
+
+                execution_price = self._execution_price(order, quote)
+                if execution_price is None:
+                    continue
+
+                logger.info(f"Executing order {order.orderid}: {order.symbol} {order.action} {order.quantity} @ {execution_price}")
+                uow.add_trade(
+                    tradeid=self._generate_trade_id(),
+                    orderid=order.orderid,
+                    user_id=order.user_id,
+                    symbol=order.symbol,
+                    exchange=order.exchange,
+                    action=order.action,
+                    quantity=order.quantity,
+                    price=execution_price,
+                    product=order.product,
+                    strategy=order.strategy,
+                    trade_timestamp=now
+                )
+                uow.complete_order(order, execution_price, now, instance)
+
+                position = uow.get_position(order.symbol, order.exchange, order.product)
+                position, release = self._net_position(position, order, execution_price)
+                uow.set_position(position)
+                if release:
+                    uow.release_margin(*release)
+                fills += 1
+
+            if not uow.orders:
+                return 0
+            uow.flush()
 
         except Exception as e:
-            logger.error(f"Error processing order {order.orderid}: {e}")
+            db_session.rollback()
+            logger.error(f"Batch execution failed for user {user_id}, executing {len(candidates)} orders individually: {e}")
+            executed = 0
+            for _, instance, quote in candidates:
+                db_session.add(instance)
+                self._process_order(instance, quote)
+                if instance.order_status == 'complete':
+                    executed += 1
+            return executed
+
+        if fills:
+            # Validate margin consistency once after the batch
+            is_consistent, discrepancy = validate_margin_consistency(user_id)
+            if not is_consistent:
+                logger.warning(
+                    f"Margin inconsistency detected after batch execution for user {user_id}: "
+                    f"discrepancy={discrepancy}. Auto-reconciling..."
+                )
+                reconcile_margin(user_id, auto_fix=True)
+            logger.info(f"Executed {fills} orders for user {user_id} in one transaction")
+
+        return fills
 
     def _execute_order(self, order, execution_price):
         """
@@ -317,7 +455,7 @@ class ExecutionEngine:
                 price=execution_price,
                 product=order.product,
                 strategy=order.strategy,
-                trade_timestamp=datetime.now(pytz.timezone('Asia/Kolkata'))
+                trade_timestamp=clock.now(pytz.timezone('Asia/Kolkata'))
             )
 
             db_session.add(trade)
@@ -327,7 +465,7 @@ class ExecutionEngine:
             order.average_price = execution_price
             order.filled_quantity = order.quantity
             order.pending_quantity = 0
-            order.update_timestamp = datetime.now(pytz.timezone('Asia/Kolkata'))
+            order.update_timestamp = clock.now(pytz.timezone('Asia/Kolkata'))
 
             db_session.commit()
 
@@ -344,7 +482,7 @@ class ExecutionEngine:
             try:
                 order.order_status = 'rejected'
                 order.rejection_reason = f"Execution error: {str(e)}"
-                order.update_timestamp = datetime.now(pytz.timezone('Asia/Kolkata'))
+                order.update_timestamp = clock.now(pytz.timezone('Asia/Kolkata'))
                 db_session.commit()
             except:
                 db_session.rollback()
@@ -359,8 +497,6 @@ class ExecutionEngine:
         positions are closed/reduced.
         """
         try:
-            fund_manager = FundManager(order.user_id)
-
             # Check if position exists
             position = SandboxPositions.query.filter_by(
                 user_id=order.user_id,
@@ -369,157 +505,13 @@ class ExecutionEngine:
                 product=order.product
             ).first()
 
-            if not position:
-                # Create new position
-                # Store the exact margin that was blocked at order placement time
-                order_margin = order.margin_blocked if hasattr(order, 'margin_blocked') and order.margin_blocked else Decimal('0.00')
-                position = SandboxPositions(
-                    user_id=order.user_id,
-                    symbol=order.symbol,
-                    exchange=order.exchange,
-                    product=order.product,
-                    quantity=order.quantity if order.action == 'BUY' else -order.quantity,
-                    average_price=execution_price,
-                    ltp=execution_price,
-                    pnl=Decimal('0.00'),
-                    pnl_percent=Decimal('0.00'),
-                    accumulated_realized_pnl=Decimal('0.00'),
-                    margin_blocked=order_margin,  # Store exact margin from order
-                    created_at=datetime.now(pytz.timezone('Asia/Kolkata'))
-                )
+            is_new = position is None
+            position, release = self._net_position(position, order, execution_price)
+            if is_new:
                 db_session.add(position)
-                logger.info(f"Created new position: {order.symbol} {order.action} {order.quantity} (margin blocked: ₹{order_margin})")
 
-            else:
-                # Update existing position (netting logic)
-                old_quantity = position.quantity
-                new_quantity = order.quantity if order.action == 'BUY' else -order.quantity
-                final_quantity = old_quantity + new_quantity
-
-                # Special case: Reopening a closed position (old_quantity = 0)
-                if old_quantity == 0:
-                    # Keep accumulated realized P&L from previous trades, start fresh unrealized P&L
-                    position.quantity = new_quantity
-                    position.average_price = execution_price
-                    position.ltp = execution_price
-                    position.pnl = Decimal('0.00')  # Reset current P&L (will be updated by MTM)
-                    position.pnl_percent = Decimal('0.00')
-                    # accumulated_realized_pnl stays as is from previous closed trades
-                    # Store the exact margin that was blocked at order placement time
-                    order_margin = order.margin_blocked if hasattr(order, 'margin_blocked') and order.margin_blocked else Decimal('0.00')
-                    position.margin_blocked = order_margin
-                    logger.info(f"Reopened position: {order.symbol} {order.action} {order.quantity} (accumulated realized P&L: ₹{position.accumulated_realized_pnl}) (margin blocked: ₹{order_margin})")
-
-                elif final_quantity == 0:
-                    # Position closed completely
-                    # Calculate realized P&L
-                    realized_pnl = self._calculate_realized_pnl(
-                        old_quantity, position.average_price,
-                        abs(new_quantity), execution_price
-                    )
-
-                    # Release the EXACT margin that was stored in the position
-                    # This prevents over-release when execution price differs from order placement price
-                    margin_to_release = position.margin_blocked if hasattr(position, 'margin_blocked') and position.margin_blocked else Decimal('0.00')
-
-                    if margin_to_release > 0:
-                        fund_manager.release_margin(
-                            margin_to_release,
-                            realized_pnl,
-                            f"Position closed: {order.symbol}"
-                        )
-                        logger.info(f"Released exact margin ₹{margin_to_release} for closed position (from position.margin_blocked)")
-
-                    # Keep position with 0 quantity to show it was closed
-                    # Add realized P&L to accumulated realized P&L (for day's trading)
-                    position.accumulated_realized_pnl += realized_pnl
-
-                    position.quantity = 0
-                    position.margin_blocked = Decimal('0.00')  # Reset margin to 0 when position fully closed
-                    position.ltp = execution_price
-                    position.pnl = position.accumulated_realized_pnl  # Display total accumulated P&L
-                    position.pnl_percent = Decimal('0.00')
-                    logger.info(f"Position closed: {order.symbol}, Realized P&L: ₹{realized_pnl}, Total Accumulated P&L: ₹{position.accumulated_realized_pnl}")
-
-                elif (old_quantity > 0 and final_quantity > old_quantity) or (old_quantity < 0 and final_quantity < old_quantity):
-                    # Adding to existing position (same direction, position size increasing)
-                    # Calculate new average price
-                    total_value = (abs(old_quantity) * position.average_price) + (abs(new_quantity) * execution_price)
-                    total_quantity = abs(old_quantity) + abs(new_quantity)
-                    new_average_price = total_value / total_quantity
-
-                    position.quantity = final_quantity
-                    position.average_price = new_average_price
-                    position.ltp = execution_price
-
-                    # Accumulate margin - add the margin blocked for this order to existing position margin
-                    order_margin = order.margin_blocked if hasattr(order, 'margin_blocked') and order.margin_blocked else Decimal('0.00')
-                    position.margin_blocked = (position.margin_blocked if hasattr(position, 'margin_blocked') and position.margin_blocked else Decimal('0.00')) + order_margin
-                    logger.info(f"Added to position: {order.symbol}, New qty: {final_quantity}, Avg: {new_average_price} (total margin blocked: ₹{position.margin_blocked})")
-
-                else:
-                    # Reducing position (opposite direction) or position reversal
-                    reduced_quantity = min(abs(old_quantity), abs(new_quantity))
-
-                    # Calculate realized P&L for reduced portion
-                    realized_pnl = self._calculate_realized_pnl(
-                        old_quantity, position.average_price,
-                        reduced_quantity, execution_price
-                    )
-
-                    # Add realized P&L to accumulated realized P&L
-                    # This tracks all partial closes throughout the day
-                    position.accumulated_realized_pnl = (position.accumulated_realized_pnl or Decimal('0.00')) + realized_pnl
-
-                    # Release margin PROPORTIONALLY for reduced quantity
-                    # Use exact margin stored in position, release proportionally
-                    current_margin = position.margin_blocked if hasattr(position, 'margin_blocked') and position.margin_blocked else Decimal('0.00')
-
-                    if abs(old_quantity) > 0:
-                        # Calculate proportion of position being reduced
-                        reduction_proportion = Decimal(str(reduced_quantity)) / Decimal(str(abs(old_quantity)))
-                        margin_to_release = current_margin * reduction_proportion
-                    else:
-                        margin_to_release = Decimal('0.00')
-
-                    if margin_to_release > 0:
-                        fund_manager.release_margin(
-                            margin_to_release,
-                            realized_pnl,
-                            f"Position reduced: {order.symbol}"
-                        )
-                        logger.info(f"Released proportional margin ₹{margin_to_release} for reduced position ({reduction_proportion*100:.1f}% of ₹{current_margin})")
-
-                    # Update remaining margin after proportional release
-                    remaining_margin = current_margin - margin_to_release
-
-                    # If position reversed, set margin for new reversed position
-                    if abs(new_quantity) > abs(old_quantity):
-                        # Position reversed - remaining quantity creates opposite position
-                        remaining_quantity = abs(new_quantity) - abs(old_quantity)
-                        position.quantity = remaining_quantity if order.action == 'BUY' else -remaining_quantity
-                        position.average_price = execution_price
-
-                        # For reversed position, the new margin comes from the excess quantity in the order
-                        # The old position's margin was fully released, new position gets fresh margin
-                        # Note: order.margin_blocked contains margin for the FULL order quantity
-                        # We need to calculate what portion corresponds to the excess quantity
-                        if abs(new_quantity) > 0:
-                            excess_proportion = Decimal(str(remaining_quantity)) / Decimal(str(abs(new_quantity)))
-                            order_margin = order.margin_blocked if hasattr(order, 'margin_blocked') and order.margin_blocked else Decimal('0.00')
-                            new_position_margin = order_margin * excess_proportion
-                            position.margin_blocked = new_position_margin
-                            logger.info(f"Position reversed: {order.symbol}, New qty: {position.quantity} (new margin: ₹{new_position_margin})")
-                        else:
-                            position.margin_blocked = Decimal('0.00')
-                    else:
-                        # Position reduced but not reversed - keep remaining margin
-                        position.quantity = final_quantity
-                        position.margin_blocked = remaining_margin
-                        logger.info(f"Position reduced: {order.symbol}, New qty: {final_quantity}, Remaining margin: ₹{remaining_margin}")
-
-                    position.ltp = execution_price
-                    logger.info(f"Partial close: {order.symbol}, New qty: {final_quantity}, Realized P&L: ₹{realized_pnl}")
+            if release:
+                FundManager(order.user_id).release_margin(*release)
 
             db_session.commit()
 
@@ -538,6 +530,163 @@ class ExecutionEngine:
             logger.error(f"Error updating position for order {order.orderid}: {e}")
             raise
 
+    def _net_position(self, position, order, execution_price):
+        """
+        Apply a fill to a position (creating it if needed) with netting for
+        opposite positions. Does not add new positions to the session, commit,
+        or touch funds.
+
+        Returns:
+            tuple: (position, release) where release is (margin, realized_pnl, description)
+            for FundManager.release_margin, or None when no margin is freed
+        """
+        release = None
+
+        if not position:
+            # Create new position
+            # Store the exact margin that was blocked at order placement time
+            order_margin = order.margin_blocked if hasattr(order, 'margin_blocked') and order.margin_blocked else Decimal('0.00')
+            position = SandboxPositions(
+                user_id=order.user_id,
+                symbol=order.symbol,
+                exchange=order.exchange,
+                product=order.product,
+                quantity=order.quantity if order.action == 'BUY' else -order.quantity,
+                average_price=execution_price,
+                ltp=execution_price,
+                pnl=Decimal('0.00'),
+                pnl_percent=Decimal('0.00'),
+                accumulated_realized_pnl=Decimal('0.00'),
+                margin_blocked=order_margin,  # Store exact margin from order
+                created_at=clock.now(pytz.timezone('Asia/Kolkata'))
+            )
+            logger.info(f"Created new position: {order.symbol} {order.action} {order.quantity} (margin blocked: ₹{order_margin})")
+
+        else:
+            # Update existing position (netting logic)
+            old_quantity = position.quantity
+            new_quantity = order.quantity if order.action == 'BUY' else -order.quantity
+            final_quantity = old_quantity + new_quantity
+
+            # Special case: Reopening a closed position (old_quantity = 0)
+            if old_quantity == 0:
+                # Keep accumulated realized P&L from previous trades, start fresh unrealized P&L
+                position.quantity = new_quantity
+                position.average_price = execution_price
+                position.ltp = execution_price
+                position.pnl = Decimal('0.00')  # Reset current P&L (will be updated by MTM)
+                position.pnl_percent = Decimal('0.00')
+                # accumulated_realized_pnl stays as is from previous closed trades
+                # Store the exact margin that was blocked at order placement time
+                order_margin = order.margin_blocked if hasattr(order, 'margin_blocked') and order.margin_blocked else Decimal('0.00')
+                position.margin_blocked = order_margin
+                logger.info(f"Reopened position: {order.symbol} {order.action} {order.quantity} (accumulated realized P&L: ₹{position.accumulated_realized_pnl}) (margin blocked: ₹{order_margin})")
+
+            elif final_quantity == 0:
+                # Position closed completely
+                # Calculate realized P&L
+                realized_pnl = self._calculate_realized_pnl(
+                    old_quantity, position.average_price,
+                    abs(new_quantity), execution_price
+                )
+
+                # Release the EXACT margin that was stored in the position
+                # This prevents over-release when execution price differs from order placement price
+                margin_to_release = position.margin_blocked if hasattr(position, 'margin_blocked') and position.margin_blocked else Decimal('0.00')
+
+                if margin_to_release > 0:
+                    release = (margin_to_release, realized_pnl, f"Position closed: {order.symbol}")
+                    logger.info(f"Released exact margin ₹{margin_to_release} for closed position (from position.margin_blocked)")
+
+                # Keep position with 0 quantity to show it was closed
+                # Add realized P&L to accumulated realized P&L (for day's trading)
+                position.accumulated_realized_pnl += realized_pnl
+
+                position.quantity = 0
+                position.margin_blocked = Decimal('0.00')  # Reset margin to 0 when position fully closed
+                position.ltp = execution_price
+                position.pnl = position.accumulated_realized_pnl  # Display total accumulated P&L
+                position.pnl_percent = Decimal('0.00')
+                logger.info(f"Position closed: {order.symbol}, Realized P&L: ₹{realized_pnl}, Total Accumulated P&L: ₹{position.accumulated_realized_pnl}")
+
+            elif (old_quantity > 0 and final_quantity > old_quantity) or (old_quantity < 0 and final_quantity < old_quantity):
+                # Adding to existing position (same direction, position size increasing)
+                # Calculate new average price
+                total_value = (abs(old_quantity) * position.average_price) + (abs(new_quantity) * execution_price)
+                total_quantity = abs(old_quantity) + abs(new_quantity)
+                new_average_price = total_value / total_quantity
+
+                position.quantity = final_quantity
+                position.average_price = new_average_price
+                position.ltp = execution_price
+
+                # Accumulate margin - add the margin blocked for this order to existing position margin
+                order_margin = order.margin_blocked if hasattr(order, 'margin_blocked') and order.margin_blocked else Decimal('0.00')
+                position.margin_blocked = (position.margin_blocked if hasattr(position, 'margin_blocked') and position.margin_blocked else Decimal('0.00')) + order_margin
+                logger.info(f"Added to position: {order.symbol}, New qty: {final_quantity}, Avg: {new_average_price} (total margin blocked: ₹{position.margin_blocked})")
+
+            else:
+                # Reducing position (opposite direction) or position reversal
+                reduced_quantity = min(abs(old_quantity), abs(new_quantity))
+
+                # Calculate realized P&L for reduced portion
+                realized_pnl = self._calculate_realized_pnl(
+                    old_quantity, position.average_price,
+                    reduced_quantity, execution_price
+                )
+
+                # Add realized P&L to accumulated realized P&L
+                # This tracks all partial closes throughout the day
+                position.accumulated_realized_pnl = (position.accumulated_realized_pnl or Decimal('0.00')) + realized_pnl
+
+                # Release margin PROPORTIONALLY for reduced quantity
+                # Use exact margin stored in position, release proportionally
+                current_margin = position.margin_blocked if hasattr(position, 'margin_blocked') and position.margin_blocked else Decimal('0.00')
+
+                if abs(old_quantity) > 0:
+                    # Calculate proportion of position being reduced
+                    reduction_proportion = Decimal(str(reduced_quantity)) / Decimal(str(abs(old_quantity)))
+                    margin_to_release = current_margin * reduction_proportion
+                else:
+                    margin_to_release = Decimal('0.00')
+
+                if margin_to_release > 0:
+                    release = (margin_to_release, realized_pnl, f"Position reduced: {order.symbol}")
+                    logger.info(f"Released proportional margin ₹{margin_to_release} for reduced position ({reduction_proportion*100:.1f}% of ₹{current_margin})")
+
+                # Update remaining margin after proportional release
+                remaining_margin = current_margin - margin_to_release
+
+                # If position reversed, set margin for new reversed position
+                if abs(new_quantity) > abs(old_quantity):
+                    # Position reversed - remaining quantity creates opposite position
+                    remaining_quantity = abs(new_quantity) - abs(old_quantity)
+                    position.quantity = remaining_quantity if order.action == 'BUY' else -remaining_quantity
+                    position.average_price = execution_price
+
+                    # For reversed position, the new margin comes from the excess quantity in the order
+                    # The old position's margin was fully released, new position gets fresh margin
+                    # Note: order.margin_blocked contains margin for the FULL order quantity
+                    # We need to calculate what portion corresponds to the excess quantity
+                    if abs(new_quantity) > 0:
+                        excess_proportion = Decimal(str(remaining_quantity)) / Decimal(str(abs(new_quantity)))
+                        order_margin = order.margin_blocked if hasattr(order, 'margin_blocked') and order.margin_blocked else Decimal('0.00')
+                        new_position_margin = order_margin * excess_proportion
+                        position.margin_blocked = new_position_margin
+                        logger.info(f"Position reversed: {order.symbol}, New qty: {position.quantity} (new margin: ₹{new_position_margin})")
+                    else:
+                        position.margin_blocked = Decimal('0.00')
+                else:
+                    # Position reduced but not reversed - keep remaining margin
+                    position.quantity = final_quantity
+                    position.margin_blocked = remaining_margin
+                    logger.info(f"Position reduced: {order.symbol}, New qty: {final_quantity}, Remaining margin: ₹{remaining_margin}")
+
+                position.ltp = execution_price
+                logger.info(f"Partial close: {order.symbol}, New qty: {final_quantity}, Realized P&L: ₹{realized_pnl}")
+
+        return position, release
+
     def _calculate_realized_pnl(self, old_quantity, avg_price, close_quantity, close_price):
         """Calculate realized P&L for closed positions"""
         try:
@@ -560,7 +709,7 @@ class ExecutionEngine:
 
     def _generate_trade_id(self):
         """Generate unique trade ID"""
-        now = datetime.now(pytz.timezone('Asia/Kolkata'))
+        now = clock.now(pytz.timezone('Asia/Kolkata'))
         timestamp = now.strftime('%Y%m%d-%H%M%S')
         unique_id = str(uuid.uuid4())[:8]
         return f"TRADE-{timestamp}-{unique_id}"
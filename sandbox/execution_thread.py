@@ -6,8 +6,14 @@ Manages the execution engine as a daemon thread that:
 - Starts automatically when analyzer mode is enabled
 - Stops gracefully when analyzer mode is disabled
 - Runs continuously in the background monitoring and executing orders
+
+Two modes, selected with SANDBOX_EXECUTION_MODE:
+- event (default): fills orders on live ticks from the market data feed and
+  polls REST quotes only for symbols without recent ticks
+- poll: checks every open order against REST quotes each order_check_interval
 """
 
+import os
 import threading
 import time
 from utils.logging import get_logger
@@ -28,12 +34,22 @@ class ExecutionEngineThread(threading.Thread):
         super().__init__(daemon=True, name="SandboxExecutionEngine")
         self.stop_event = threading.Event()
         self.check_interval = int(get_config('order_check_interval', '5'))
+        self.mode = get_execution_mode()
 
     def run(self):
         """Main thread loop"""
+        if self.mode == 'event':
+            self.run_event_loop()
+        else:
+            self.run_poll_loop()
+
+        logger.info("Sandbox Execution Engine thread stopped")
+
+    def run_poll_loop(self):
+        """Check all pending orders against REST quotes every check_interval"""
         from sandbox.execution_engine import ExecutionEngine
 
-        logger.debug("Sandbox Execution Engine thread started")
+        logger.debug("Sandbox Execution Engine thread started (poll mode)")
         engine = ExecutionEngine()
 
         while not self.stop_event.is_set():
@@ -48,13 +64,47 @@ class ExecutionEngineThread(threading.Thread):
                     break
                 time.sleep(1)
 
-        logger.info("Sandbox Execution Engine thread stopped")
+    def run_event_loop(self):
+        """Execute pending orders on ticks, sweeping with REST quotes every check_interval"""
+        from sandbox.event_engine import EventExecutionEngine
+
+        logger.debug("Sandbox Execution Engine thread started (event mode)")
+        engine = EventExecutionEngine(self.check_interval)
+        next_sweep = 0
+
+        try:
+            engine.start()
+            while not self.stop_event.is_set():
+                try:
+                    # Short waits keep shutdown quick when no ticks arrive
+                    engine.wait_for_ticks(timeout=0.5)
+                    engine.process_ticks()
+
+                    if time.monotonic() >= next_sweep:
+                        engine.sweep()
+                        next_sweep = time.monotonic() + self.check_interval
+                    elif engine.feed_username:
+                        # Feed is up - subscribe newly placed orders' symbols right away
+                        engine.subscribe_feed_symbols()
+                except Exception as e:
+                    logger.error(f"Error in execution engine thread: {e}")
+        finally:
+            engine.stop()
 
     def stop(self):
         """Signal the thread to stop"""
         self.stop_event.set()
 
 
+def get_execution_mode():
+    """Execution engine mode from SANDBOX_EXECUTION_MODE ('event' or 'poll')"""
+    mode = os.getenv('SANDBOX_EXECUTION_MODE', 'event').strip().lower()
+    if mode not in ('event', 'poll'):
+        logger.warning(f"Invalid SANDBOX_EXECUTION_MODE '{mode}', using 'event'")
+        mode = 'event'
+    return mode
+
+
 def start_execution_engine():
     """
     Start the execution engine daemon thread
@@ -118,5 +168,6 @@ def get_execution_engine_status():
     return {
         'running': is_execution_engine_running(),
         'thread_name': _execution_thread.name if _execution_thread else None,
+        'mode': _execution_thread.mode if _execution_thread else get_execution_mode(),
         'check_interval': int(get_config('order_check_interval', '5'))
     }
@@ -0,0 +1,188 @@
+# sandbox/order_book.py
+"""
+Pending Order Book - In-memory index of open sandbox orders by trigger price
+
+Each (symbol, exchange) keeps two sorted price ladders:
+- falling: orders that become executable when LTP <= level
+  (LIMIT BUY at price, SL/SL-M SELL at trigger price)
+- rising: orders that become executable when LTP >= level
+  (LIMIT SELL at price, SL/SL-M BUY at trigger price)
+
+SL orders also carry a limit price: an SL BUY only executes while LTP <= limit
+and an SL SELL while LTP >= limit, so crossed() leaves out stops the market
+has gapped through. MARKET orders that are still open (no quote was available
+at placement) are kept in a separate set and are candidates on every tick.
+
+Given a new LTP the book returns the candidate order IDs with two bisects, so
+matching costs O(log n + k) for k executable orders, however many orders are
+resting away from the market. The execution price itself is still decided by
+ExecutionEngine._execution_price.
+"""
+
+import threading
+from bisect import bisect_left, bisect_right
+
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class PriceLadder:
+    """Order IDs sorted by price level (parallel lists kept in step)"""
+
+    def __init__(self):
+        self.levels = []
+        self.orderids = []
+
+    def add(self, level, orderid):
+        i = bisect_right(self.levels, level)
+        self.levels.insert(i, level)
+        self.orderids.insert(i, orderid)
+
+    def remove(self, level, orderid):
+        i = bisect_left(self.levels, level)
+        while i < len(self.levels) and self.levels[i] == level:
+            if self.orderids[i] == orderid:
+                del self.levels[i]
+                del self.orderids[i]
+                return True
+            i += 1
+        return False
+
+    def at_or_above(self, price):
+        """Order IDs with level >= price"""
+        return self.orderids[bisect_left(self.levels, price):]
+
+    def at_or_below(self, price):
+        """Order IDs with level <= price"""
+        return self.orderids[:bisect_right(self.levels, price)]
+
+    def __len__(self):
+        return len(self.orderids)
+
+
+class SymbolBook:
+    """Pending orders for one (symbol, exchange)"""
+
+    def __init__(self):
+        self.falling = PriceLadder()
+        self.rising = PriceLadder()
+        self.market = set()
+        self.limits = {}  # orderid -> limit price for SL orders
+
+    def crossed(self, ltp):
+        """Order IDs that are executable at this LTP"""
+        falling = self.falling.at_or_above(ltp)
+        rising = self.rising.at_or_below(ltp)
+        if self.limits:
+            limits = self.limits
+            falling = [oid for oid in falling if oid not in limits or ltp >= limits[oid]]
+            rising = [oid for oid in rising if oid not in limits or ltp <= limits[oid]]
+        return falling + rising + list(self.market)
+
+    def __len__(self):
+        return len(self.falling) + len(self.rising) + len(self.market)
+
+
+def order_level(order):
+    """
+    Return (side, level, limit) for an open order, where side is 'falling',
+    'rising' or 'market' and limit is the SL limit price (None otherwise).
+    Orders without a usable price are evaluated on every tick.
+    """
+    limit = None
+    if order.price_type == 'LIMIT':
+        level = order.price
+        side = 'falling' if order.action == 'BUY' else 'rising'
+    elif order.price_type in ('SL', 'SL-M'):
+        level = order.trigger_price
+        side = 'rising' if order.action == 'BUY' else 'falling'
+        if order.price_type == 'SL':
+            if not order.price or order.price <= 0:
+                return 'market', None, None
+            limit = float(order.price)
+    else:
+        return 'market', None, None
+
+    if not level or level <= 0:
+        return 'market', None, None
+    return side, float(level), limit
+
+
+class PendingOrderBook:
+    """Thread-safe book of open sandbox orders keyed by (symbol, exchange)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.books = {}     # (symbol, exchange) -> SymbolBook
+        self.entries = {}   # orderid -> ((symbol, exchange), side, level)
+
+    def add(self, order):
+        """Add or re-index an open order (call again after modify)"""
+        with self.lock:
+            self._discard(order.orderid)
+            self._insert(self.books, self.entries, order)
+
+    def remove(self, orderid):
+        """Drop an order that is no longer open"""
+        with self.lock:
+            return self._discard(orderid)
+
+    def replace(self, orders):
+        """Rebuild the book from the full list of open orders"""
+        books = {}
+        entries = {}
+        for order in orders:
+            self._insert(books, entries, order)
+        with self.lock:
+            self.books = books
+            self.entries = entries
+
+    def crossed(self, symbol, exchange, ltp):
+        """Order IDs on (symbol, exchange) that are executable at this LTP"""
+        with self.lock:
+            book = self.books.get((symbol, exchange))
+            if book is None:
+                return []
+            return book.crossed(float(ltp))
+
+    def has_symbol(self, symbol, exchange):
+        return (symbol, exchange) in self.books
+
+    def symbols(self):
+        """(symbol, exchange) pairs with at least one pending order"""
+        with self.lock:
+            return list(self.books)
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def _insert(books, entries, order):
+        key = (order.symbol, order.exchange)
+        side, level, limit = order_level(order)
+        book = books.get(key)
+        if book is None:
+            book = books[key] = SymbolBook()
+        if side == 'market':
+            book.market.add(order.orderid)
+        else:
+            getattr(book, side).add(level, order.orderid)
+            if limit is not None:
+                book.limits[order.orderid] = limit
+        entries[order.orderid] = (key, side, level)
+
+    def _discard(self, orderid):
+        entry = self.entries.pop(orderid, None)
+        if entry is None:
+            return False
+        key, side, level = entry
+        book = self.books[key]
+        if side == 'market':
+            book.market.discard(orderid)
+        else:
+            getattr(book, side).remove(level, orderid)
+            book.limits.pop(orderid, None)
+        if not len(book):
+            del self.books[key]
+        return True
@@ -14,7 +14,6 @@ import os
 import sys
 import time
 from decimal import Decimal
-from datetime import datetime
 import pytz
 import uuid
 
@@ -24,7 +23,9 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from database.sandbox_db import (
     SandboxOrders, SandboxTrades, SandboxPositions, db_session
 )
+from sandbox import clock
 from sandbox.fund_manager import FundManager
+from sandbox.event_engine import track_order
 from database.symbol import SymToken
 from database.token_db import get_symbol_info
 from utils.logging import get_logger
@@ -123,7 +124,7 @@ class OrderManager:
 
                 if square_off_time:
                     ist = pytz.timezone('Asia/Kolkata')
-                    now = datetime.now(ist)
+                    now = clock.now(ist)
                     current_time = now.time()
 
                     # Market opens at 9:00 AM IST
@@ -239,6 +240,10 @@ class OrderManager:
                     except Exception as e:
                         logger.debug(f"Quote fetch attempt {attempt + 1} failed: {e}")
 
+                    # Replayed quotes do not change while we wait
+                    if clock.is_simulated():
+                        break
+
                     # Wait before retry (0.3s, 0.6s, 0.9s)
                     if attempt < 2:
                         time.sleep(0.3 * (attempt + 1))
@@ -401,7 +406,7 @@ class OrderManager:
                     pending_quantity=0,
                     rejection_reason=cnc_sell_rejection_reason,
                     margin_blocked=Decimal('0'),  # No margin blocked for rejected orders
-                    order_timestamp=datetime.now(pytz.timezone('Asia/Kolkata'))
+                    order_timestamp=clock.now(pytz.timezone('Asia/Kolkata'))
                 )
 
                 db_session.add(order)
@@ -438,7 +443,7 @@ class OrderManager:
                 pending_quantity=quantity,
                 rejection_reason=None,
                 margin_blocked=actual_margin_to_block,  # Store exact margin blocked
-                order_timestamp=datetime.now(pytz.timezone('Asia/Kolkata'))
+                order_timestamp=clock.now(pytz.timezone('Asia/Kolkata'))
             )
 
             db_session.add(order)
@@ -463,6 +468,9 @@ class OrderManager:
                     logger.error(f"Error executing market order immediately: {e}")
                     # Order remains in 'open' status if execution fails
 
+            # Hand resting orders to the tick-driven execution engine
+            track_order(order)
+
             return True, {
                 'status': 'success',
                 'orderid': orderid,
@@ -532,9 +540,10 @@ class OrderManager:
             if 'trigger_price' in new_data and new_data['trigger_price']:
                 order.trigger_price = Decimal(str(new_data['trigger_price']))
 
-            order.update_timestamp = datetime.now(pytz.timezone('Asia/Kolkata'))
+            order.update_timestamp = clock.now(pytz.timezone('Asia/Kolkata'))
 
             db_session.commit()
+            track_order(order)
 
             logger.info(f"Order modified: {orderid}")
 
@@ -587,7 +596,7 @@ class OrderManager:
 
             # Update order status
             order.order_status = 'cancelled'
-            order.update_timestamp = datetime.now(pytz.timezone('Asia/Kolkata'))
+            order.update_timestamp = clock.now(pytz.timezone('Asia/Kolkata'))
 
             # Release blocked margin using the exact amount that was blocked
             if hasattr(order, 'margin_blocked') and order.margin_blocked and order.margin_blocked > 0:
@@ -649,6 +658,7 @@ class OrderManager:
                         logger.info(f"No margin to release for cancelled order {orderid} ({order.action} {order.product})")
 
             db_session.commit()
+            track_order(order)
 
             logger.info(f"Order cancelled: {orderid}")
 
@@ -679,7 +689,7 @@ class OrderManager:
             expiry_hour, expiry_minute = map(int, session_expiry_str.split(':'))
 
             # Get current time
-            now = datetime.now()
+            now = clock.now()
             today = now.date()
 
             # Calculate session start time
@@ -870,12 +880,13 @@ class OrderManager:
         """
         import random
 
-        now = datetime.now(pytz.timezone('Asia/Kolkata'))
+        now = clock.now(pytz.timezone('Asia/Kolkata'))
         date_prefix = now.strftime('%y%m%d')  # YYMMDD format
 
         # Use microseconds (0-999999) + random (0-99) for 8-digit unique sequence
         # This avoids race conditions when parallel orders query count simultaneously
-        micro = now.microsecond
+        # Microseconds come from the wall clock: replayed ticks can share a timestamp
+        micro = time.time_ns() // 1000 % 1000000
         rand_suffix = random.randint(0, 99)
 
         # Combine: first 6 digits from microseconds, last 2 from random
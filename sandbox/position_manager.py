@@ -23,6 +23,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from database.sandbox_db import (
     SandboxPositions, SandboxTrades, db_session, get_config
 )
+from sandbox import clock
 from sandbox.fund_manager import FundManager
 from sandbox.holdings_manager import HoldingsManager
 from services.quotes_service import get_quotes, get_multiquotes
@@ -312,7 +313,7 @@ class PositionManager:
             expiry_hour, expiry_minute = map(int, session_expiry_str.split(':'))
 
             # Get current time
-            now = datetime.now()
+            now = clock.now()
             today = now.date()
 
             # Calculate if we're in a new session
@@ -574,6 +575,9 @@ class PositionManager:
 
     def _fetch_quote(self, symbol, exchange):
         """Fetch real-time quote for a symbol using API key"""
+        if clock.is_simulated():
+            return clock.get_simulated_quote(symbol, exchange)
+
         try:
             # Get any user's API key for fetching quotes
             from database.auth_db import ApiKeys, decrypt_token
@@ -614,6 +618,13 @@ class PositionManager:
         if not symbols_list:
             return quote_cache
 
+        if clock.is_simulated():
+            for symbol, exchange in symbols_list:
+                quote = clock.get_simulated_quote(symbol, exchange)
+                if quote:
+                    quote_cache[(symbol, exchange)] = quote
+            return quote_cache
+
         try:
             # Get any user's API key for fetching quotes
             from database.auth_db import ApiKeys, decrypt_token
@@ -734,7 +745,7 @@ class PositionManager:
             expiry_hour, expiry_minute = map(int, session_expiry_str.split(':'))
 
             # Get current time
-            now = datetime.now()
+            now = clock.now()
             today = now.date()
 
             # Calculate session start time
@@ -0,0 +1,397 @@
+# sandbox/replay.py
+"""
+Sandbox Replay - Drive the sandbox from recorded ticks or historical candles
+
+A replay feeds a stream of ticks through the same order book and execution
+path the live event engine uses, on a simulated clock:
+- the sandbox clock (sandbox/clock.py) follows the tick timestamps, so orders,
+  trades and the MIS square-off block see the replayed time
+- quote lookups (MARKET order placement, SL/LIMIT matching, position MTM)
+  answer from the last replayed tick instead of the broker
+- orders placed while the replay runs (OrderManager / sandbox_service, i.e.
+  the normal OpenAlgo order APIs) are matched against the following ticks
+
+Ticks come from a recorded CSV file (timestamp,symbol,exchange,ltp[,volume])
+or from services.history_service.get_history candles, each candle expanded
+into open, low/high, high/low and close ticks. The replay runs as fast as
+possible (speed=0) or paced at N times real time.
+
+Strategies can run in-process as tick listeners: a listener is called
+synchronously for every tick with the same payload MarketDataService
+subscribers receive, so a full trading day replays in seconds and every
+order the strategy places is filled on the very next qualifying tick.
+
+The scheduled square-off and T+1 settlement jobs keep running on the wall
+clock; a replay only moves the sandbox's own notion of time.
+
+A replay writes orders, trades, positions and funds with replayed timestamps,
+so it never runs against the app's sandbox database (SANDBOX_DATABASE_URL):
+the running app's execution engine would fill its resting orders at live
+prices. The command line replays into --sandbox-db, a fresh temporary SQLite
+file by default, and SandboxReplay.run refuses the live database.
+
+Usage:
+    python -m sandbox.replay --file ticks.csv --speed 0 --strategy mystrategy:on_tick
+    python -m sandbox.replay --history SBIN:NSE,INFY:NSE --interval 1m \\
+        --start 2025-01-10 --end 2025-01-10 --api-key <key> --speed 60 \\
+        --sandbox-db db/replay_jan10.db
+"""
+
+import argparse
+import csv
+import heapq
+import importlib
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pytz
+from dotenv import dotenv_values
+
+# Add parent directory to path
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+DEFAULT_SANDBOX_DATABASE_URL = 'sqlite:///db/sandbox.db'
+
+# The app's sandbox database as configured in .env (or its default)
+LIVE_SANDBOX_DATABASE_URLS = {
+    url for url in (
+        dotenv_values(os.path.join(ROOT_DIR, '.env')).get('SANDBOX_DATABASE_URL'),
+        DEFAULT_SANDBOX_DATABASE_URL
+    ) if url
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Replay recorded ticks or history through the sandbox")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--file", help="CSV tick file (timestamp,symbol,exchange,ltp[,volume])")
+    source.add_argument("--history", help="Comma separated SYMBOL:EXCHANGE list to replay from history")
+    parser.add_argument("--interval", default="1m", help="History interval (default 1m)")
+    parser.add_argument("--start", help="History start date (YYYY-MM-DD)")
+    parser.add_argument("--end", help="History end date (YYYY-MM-DD)")
+    parser.add_argument("--api-key", help="OpenAlgo API key for history")
+    parser.add_argument("--speed", type=float, default=0, help="Multiple of real time, 0 = as fast as possible")
+    parser.add_argument("--strategy", action="append", default=[], help="Tick listener as module:function")
+    parser.add_argument("--sandbox-db", help="SQLite file or database URL to replay into "
+                                             "(default: a new temporary file, never the app's sandbox database)")
+    return parser
+
+
+def normalize_database_url(url):
+    """Absolute file path for a SQLite URL (relative paths from the app directory), else the URL"""
+    if url.startswith('sqlite:///'):
+        path = url[len('sqlite:///'):]
+        return os.path.normpath(path if os.path.isabs(path) else os.path.join(ROOT_DIR, path))
+    return url
+
+
+def is_live_sandbox_database(url, *also_live):
+    live_urls = LIVE_SANDBOX_DATABASE_URLS.union(live for live in also_live if live)
+    return normalize_database_url(url) in {normalize_database_url(live) for live in live_urls}
+
+
+def use_replay_database(sandbox_db=None):
+    """
+    Point SANDBOX_DATABASE_URL at the replay database. Must run before
+    database.sandbox_db is imported, which binds its engine on import.
+
+    Args:
+        sandbox_db: SQLite file path or database URL, None for a new temporary file
+
+    Returns:
+        str: The replay database URL
+    """
+    if not sandbox_db:
+        handle, path = tempfile.mkstemp(prefix='sandbox_replay_', suffix='.db')
+        os.close(handle)
+        sandbox_db = path
+    url = sandbox_db if '://' in sandbox_db else f"sqlite:///{os.path.abspath(sandbox_db)}"
+    # SANDBOX_DATABASE_URL from the shell is the app's database too
+    if is_live_sandbox_database(url, os.getenv('SANDBOX_DATABASE_URL')):
+        raise SystemExit(f"Refusing to replay into the app's sandbox database {sandbox_db}; pass another --sandbox-db")
+    os.environ['SANDBOX_DATABASE_URL'] = url
+    return url
+
+
+if __name__ == "__main__":
+    # Select the database before the sandbox modules below import database.sandbox_db
+    use_replay_database(build_parser().parse_args().sandbox_db)
+
+from sandbox import clock, event_engine
+from sandbox.event_engine import EventExecutionEngine
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+IST = pytz.timezone('Asia/Kolkata')
+
+# Seconds per unit of a history interval such as 1m, 5m, 1h or D
+INTERVAL_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 7 * 86400}
+
+
+def parse_timestamp(value):
+    """
+    Epoch seconds from a tick file timestamp: epoch seconds, epoch
+    milliseconds or an ISO 8601 string (naive times are taken as IST)
+    """
+    try:
+        epoch = float(value)
+    except ValueError:
+        dt = datetime.fromisoformat(value.strip())
+        if dt.tzinfo is None:
+            dt = IST.localize(dt)
+        return dt.timestamp()
+    return epoch / 1000 if epoch > 1e11 else epoch
+
+
+def load_tick_file(path):
+    """
+    Stream ticks from a recorded CSV file with a header row containing
+    timestamp, symbol, exchange, ltp and optionally volume. Rows must already
+    be in time order (as recorded).
+
+    Yields:
+        tuple: (epoch seconds, symbol, exchange, ltp, volume)
+    """
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        header = [column.strip().lower() for column in next(reader)]
+        ts_col = header.index('timestamp')
+        symbol_col = header.index('symbol')
+        exchange_col = header.index('exchange')
+        ltp_col = header.index('ltp')
+        volume_col = header.index('volume') if 'volume' in header else None
+
+        for row in reader:
+            if not row:
+                continue
+            yield (
+                parse_timestamp(row[ts_col]),
+                row[symbol_col],
+                row[exchange_col],
+                float(row[ltp_col]),
+                int(float(row[volume_col] or 0)) if volume_col is not None else 0
+            )
+
+
+def interval_seconds(interval):
+    """Length of a history interval ('1m', '5m', '1h', 'D', ...) in seconds"""
+    unit = interval[-1].lower()
+    count = interval[:-1]
+    if unit not in INTERVAL_UNITS:
+        raise ValueError(f"Unsupported interval '{interval}'")
+    return (int(count) if count else 1) * INTERVAL_UNITS[unit]
+
+
+def candle_ticks(symbol, exchange, candles, interval):
+    """
+    Expand OHLC candles into four ticks each, spread across the candle:
+    open, low, high, close for a rising candle and open, high, low, close for
+    a falling one (the path that touches the nearer extreme first).
+
+    Yields:
+        tuple: (epoch seconds, symbol, exchange, ltp, volume)
+    """
+    step = interval_seconds(interval) / 4
+    for candle in candles:
+        ts = float(candle['timestamp'])
+        o, h, l, c = (float(candle[k]) for k in ('open', 'high', 'low', 'close'))
+        first, second = (l, h) if c >= o else (h, l)
+        yield ts, symbol, exchange, o, 0
+        yield ts + step, symbol, exchange, first, 0
+        yield ts + 2 * step, symbol, exchange, second, 0
+        yield ts + 3 * step, symbol, exchange, c, int(candle.get('volume') or 0)
+
+
+def history_ticks(symbols, interval, start_date, end_date, api_key):
+    """
+    Fetch candles with services.history_service.get_history and merge them
+    into one time-ordered tick stream.
+
+    Args:
+        symbols: list of (symbol, exchange) pairs
+        interval: history interval (e.g. 1m, 5m, 1h, D)
+        start_date: Start date in YYYY-MM-DD format
+        end_date: End date in YYYY-MM-DD format
+        api_key: OpenAlgo API key used to fetch the history
+
+    Returns:
+        iterator of (epoch seconds, symbol, exchange, ltp, volume) tuples
+    """
+    from services.history_service import get_history
+
+    streams = []
+    for symbol, exchange in symbols:
+        success, response, status_code = get_history(
+            symbol=symbol, exchange=exchange, interval=interval,
+            start_date=start_date, end_date=end_date, api_key=api_key
+        )
+        if not success:
+            raise ValueError(f"Could not fetch history for {symbol}: {response.get('message', 'Unknown error')}")
+        candles = sorted(response.get('data') or [], key=lambda candle: candle['timestamp'])
+        logger.info(f"Loaded {len(candles)} {interval} candles for {exchange}:{symbol}")
+        streams.append(candle_ticks(symbol, exchange, candles, interval))
+
+    return heapq.merge(*streams, key=lambda tick: tick[0])
+
+
+class SandboxReplay(EventExecutionEngine):
+    """Replays a tick stream through the sandbox on a simulated clock"""
+
+    def __init__(self, speed=0, publish=False):
+        """
+        Args:
+            speed: 0 to replay as fast as possible, otherwise the multiple of
+                real time to pace ticks at (60 = one market minute per second)
+            publish: also push each tick into MarketDataService, so anything
+                subscribed there (UI, strategies) sees the replayed market
+        """
+        super().__init__()
+        self.speed = speed
+        self.publish = publish
+        self.clock = clock.SimulatedClock()
+        self.listeners = []
+        self.ticks = 0
+        self.fills = 0
+
+    def add_listener(self, callback):
+        """
+        Call `callback(data)` for every replayed tick, after the orders it
+        crosses have been filled. `data` has the MarketDataService shape:
+        {'symbol', 'exchange', 'mode', 'data': {'ltp', 'volume', 'timestamp'}}
+        """
+        self.listeners.append(callback)
+
+    def start(self):
+        """
+        Switch the sandbox to the simulated clock and route order tracking here.
+        Starts with an empty book: orders placed before the replay are left to
+        the live engine.
+        """
+        clock.use_simulated_clock(self.clock)
+        event_engine._active_engine = self
+
+    def stop(self):
+        if event_engine._active_engine is self:
+            event_engine._active_engine = None
+        clock.reset_clock()
+
+    def run(self, ticks):
+        """
+        Replay a tick stream (any iterable of (epoch, symbol, exchange, ltp,
+        volume) tuples in time order) and return a summary dict.
+        """
+        from database.sandbox_db import SANDBOX_DATABASE_URL
+        from sandbox.execution_thread import (
+            is_execution_engine_running, start_execution_engine, stop_execution_engine
+        )
+
+        if is_live_sandbox_database(SANDBOX_DATABASE_URL):
+            raise RuntimeError(
+                "Sandbox replay refused: SANDBOX_DATABASE_URL is the app's sandbox database. "
+                "Replay into a separate database (see use_replay_database)."
+            )
+
+        # The live engine would match the same orders against broker quotes
+        resume_live = is_execution_engine_running()
+        if resume_live:
+            stop_execution_engine()
+
+        self.start()
+        started = time.perf_counter()
+        try:
+            self._replay(ticks)
+        finally:
+            self.stop()
+            if resume_live:
+                start_execution_engine()
+
+        elapsed = time.perf_counter() - started
+        summary = {
+            'ticks': self.ticks,
+            'fills': self.fills,
+            'open_orders': len(self.book),
+            'seconds': round(elapsed, 3),
+            'ticks_per_second': round(self.ticks / elapsed) if elapsed else 0
+        }
+        logger.info(
+            f"Replayed {self.ticks} ticks in {elapsed:.2f}s "
+            f"({summary['ticks_per_second']} ticks/s), {self.fills} fills, {summary['open_orders']} orders still open"
+        )
+        return summary
+
+    def _replay(self, ticks):
+        sim = self.clock
+        quotes = sim.quotes
+        book = self.book
+        listeners = self.listeners
+        publish = None
+        if self.publish:
+            from services.market_data_service import get_market_data_service
+            publish = get_market_data_service().process_market_data
+
+        pace_start = None
+        count = 0
+        for epoch, symbol, exchange, ltp, volume in ticks:
+            sim.epoch = epoch
+            key = (symbol, exchange)
+            quote = quotes[key] = {'ltp': ltp, 'volume': volume, 'timestamp': epoch}
+
+            if self.speed:
+                if pace_start is None:
+                    pace_start = (epoch, time.monotonic())
+                delay = pace_start[1] + (epoch - pace_start[0]) / self.speed - time.monotonic()
+                if delay > 0.001:
+                    time.sleep(delay)
+
+            if key in book.books:
+                self.fills += self._execute_quotes({key: quote})
+
+            if listeners or publish:
+                data = {'symbol': symbol, 'exchange': exchange, 'mode': 1, 'data': quote}
+                if publish:
+                    publish(data)
+                for listener in listeners:
+                    try:
+                        listener(data)
+                    except Exception as e:
+                        logger.error(f"Replay listener failed on {exchange}:{symbol}: {e}")
+            count += 1
+
+        self.ticks += count
+
+
+def load_strategy(path):
+    """Import a 'module:function' tick listener"""
+    module_name, _, function_name = path.partition(':')
+    return getattr(importlib.import_module(module_name), function_name or 'on_tick')
+
+
+def main():
+    parser = build_parser()
+    args = parser.parse_args()
+
+    from database.sandbox_db import SANDBOX_DATABASE_URL, init_db
+    init_db()
+
+    if args.file:
+        ticks = load_tick_file(args.file)
+    else:
+        if not (args.start and args.end and args.api_key):
+            parser.error("--history needs --start, --end and --api-key")
+        symbols = [tuple(item.split(':', 1)) for item in args.history.split(',')]
+        ticks = history_ticks(symbols, args.interval, args.start, args.end, args.api_key)
+
+    replay = SandboxReplay(speed=args.speed)
+    for strategy in args.strategy:
+        replay.add_listener(load_strategy(strategy))
+    print(replay.run(ticks))
+    print(f"Replay database: {SANDBOX_DATABASE_URL}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+# sandbox/unit_of_work.py
+"""
+Sandbox Unit of Work - Batched trade, position and fund writes for one user
+
+Executing an order one at a time costs a trade INSERT, an order UPDATE, a
+position SELECT/UPDATE and a fund SELECT/UPDATE, each followed by its own
+commit. When hundreds of paper orders fill together (market open), those
+commits serialize on the SQLite write lock and stall the UI.
+
+SandboxUnitOfWork collects a cycle's changes for one user in memory:
+- trades to insert
+- order status updates
+- positions (loaded once, netted in memory, then inserted or updated)
+- margin releases and realized P&L, applied as one delta on sandbox_funds
+
+flush() writes everything with executemany INSERT/UPDATE statements in a
+single transaction, so a user's fills cost a handful of statements however
+many orders executed.
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm.attributes import set_committed_value
+
+from database.sandbox_db import (
+    SandboxOrders, SandboxTrades, SandboxPositions, SandboxFunds,
+    db_session
+)
+from sandbox.fund_manager import FundManager
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+POSITION_FIELDS = (
+    'quantity', 'average_price', 'ltp', 'pnl', 'pnl_percent',
+    'accumulated_realized_pnl', 'margin_blocked'
+)
+
+positions_table = SandboxPositions.__table__
+orders_table = SandboxOrders.__table__
+funds_table = SandboxFunds.__table__
+
+
+def to_cents(value):
+    """
+    Round a money value the way a DECIMAL(10, 2) column round-trips through
+    SQLite (stored as REAL, read back at two decimals), so netting in memory
+    gives the same result as committing every fill.
+    """
+    return Decimal('%.2f' % float(value))
+
+
+class RowState:
+    """
+    Detached copy of a sandbox row. Unlike ORM instances these are not expired
+    by the per-user commits, so a batch never reloads rows one at a time.
+    """
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+    @classmethod
+    def from_instance(cls, instance):
+        return cls(**{column.key: getattr(instance, column.key) for column in instance.__table__.columns})
+
+
+class SandboxUnitOfWork:
+    """Accumulates one user's sandbox writes and flushes them in one transaction"""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.trades = []
+        self.orders = {}        # orderid -> (order id, ORM order or None, field values)
+        self.positions = {}     # (symbol, exchange, product) -> RowState / new SandboxPositions
+        self.new_positions = set()
+        self.dirty_positions = set()
+        self.funds = defaultdict(Decimal)   # used_margin / available_balance / realized_pnl deltas
+        self.fund_changes = 0
+
+    def load_positions(self, symbols):
+        """Load the user's positions for these symbols with one SELECT"""
+        rows = db_session.execute(
+            select(positions_table).where(
+                positions_table.c.user_id == self.user_id,
+                positions_table.c.symbol.in_(set(symbols))
+            )
+        ).mappings().all()
+        for row in rows:
+            self.positions[(row['symbol'], row['exchange'], row['product'])] = RowState(**row)
+
+    def get_position(self, symbol, exchange, product):
+        """Position for netting, or None if the user has no position yet"""
+        return self.positions.get((symbol, exchange, product))
+
+    def set_position(self, position):
+        """Record a position after netting (new SandboxPositions or a loaded RowState)"""
+        key = (position.symbol, position.exchange, position.product)
+        for field in ('average_price', 'ltp', 'pnl', 'accumulated_realized_pnl', 'margin_blocked'):
+            value = getattr(position, field)
+            if value is not None:
+                setattr(position, field, to_cents(value))
+        if isinstance(position, SandboxPositions):
+            self.new_positions.add(key)
+        self.positions[key] = position
+        self.dirty_positions.add(key)
+
+    def add_trade(self, **fields):
+        self.trades.append(fields)
+
+    def complete_order(self, order, average_price, timestamp, instance=None):
+        """
+        Mark an order complete at average_price. `order` may be a RowState; pass the
+        ORM `instance` to have it updated in the session after flush.
+        """
+        self.orders[order.orderid] = (order.id, instance, {
+            'order_status': 'complete',
+            'average_price': average_price,
+            'filled_quantity': order.quantity,
+            'pending_quantity': 0,
+            'update_timestamp': timestamp
+        })
+
+    def release_margin(self, amount, realized_pnl=0, description=""):
+        """Same effect on funds as FundManager.release_margin, applied at flush"""
+        amount = to_cents(amount)
+        realized_pnl = to_cents(realized_pnl)
+        self.funds['used_margin'] -= amount
+        self.funds['available_balance'] += amount + realized_pnl
+        self.funds['realized_pnl'] += realized_pnl
+        self.fund_changes += 1
+        logger.info(f"Released ₹{amount} margin for user {self.user_id}. Realized P&L: ₹{realized_pnl}. {description}")
+
+    def flush(self):
+        """Write all accumulated changes in one transaction"""
+        try:
+            if self.trades:
+                db_session.execute(SandboxTrades.__table__.insert(), self.trades)
+
+            if self.orders:
+                db_session.execute(
+                    update(orders_table).where(orders_table.c.id == bindparam('_id')),
+                    [dict(values, _id=order_id) for order_id, _, values in self.orders.values()]
+                )
+
+            new_rows = []
+            changed_rows = []
+            for key in self.dirty_positions:
+                position = self.positions[key]
+                values = {field: getattr(position, field) for field in POSITION_FIELDS}
+                if key in self.new_positions:
+                    values.update(
+                        user_id=self.user_id, symbol=position.symbol, exchange=position.exchange,
+                        product=position.product, created_at=position.created_at
+                    )
+                    new_rows.append(values)
+                else:
+                    values['_id'] = position.id
+                    changed_rows.append(values)
+            if new_rows:
+                db_session.execute(positions_table.insert(), new_rows)
+            if changed_rows:
+                db_session.execute(
+                    update(positions_table).where(positions_table.c.id == bindparam('_id')),
+                    changed_rows
+                )
+
+            with FundManager._lock:
+                if self.fund_changes:
+                    realized = self.funds['realized_pnl']
+                    result = db_session.execute(
+                        update(funds_table)
+                        .where(funds_table.c.user_id == self.user_id)
+                        .values(
+                            used_margin=funds_table.c.used_margin + self.funds['used_margin'],
+                            available_balance=funds_table.c.available_balance + self.funds['available_balance'],
+                            realized_pnl=funds_table.c.realized_pnl + realized,
+                            total_pnl=funds_table.c.realized_pnl + realized + funds_table.c.unrealized_pnl
+                        )
+                    )
+                    if not result.rowcount:
+                        logger.error(f"Error releasing margin for user {self.user_id}: Funds not initialized")
+                db_session.commit()
+
+        except Exception:
+            db_session.rollback()
+            raise
+
+        # The statements bypassed the ORM; sync loaded orders without marking them dirty
+        for _, instance, values in self.orders.values():
+            if instance is not None:
+                for field, value in values.items():
+                    set_committed_value(instance, field, value)
+
+        return len(self.trades)
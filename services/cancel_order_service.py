@@ -9,6 +9,7 @@ from database.settings_db import get_analyze_mode
 from database.analyzer_db import async_log_analyzer
 from extensions import socketio
 from utils.logging import get_logger
+from utils.order_dispatch import get_order_bucket
 from services.telegram_alert_service import telegram_alert_service
 
 # Initialize logger
@@ -123,6 +124,8 @@ def cancel_order_with_auth(
         return False, error_response, 404
 
     try:
+        # Wait for the broker's order rate limit, shared with all order paths
+        get_order_bucket(broker).acquire()
         # Use the dynamically imported module's function to cancel the order
         response_message, status_code = broker_module.cancel_order(orderid, auth_token)
     except Exception as e:
@@ -11,6 +11,7 @@ from extensions import socketio
 from utils.api_analyzer import analyze_request
 from utils.logging import get_logger
 from services.telegram_alert_service import telegram_alert_service
+from services.position_state_service import invalidate_position_state
 
 # Initialize logger
 logger = get_logger(__name__)
@@ -151,6 +152,9 @@ def close_position_with_auth(
         executor.submit(async_log_order, 'closeposition', original_data, error_response)
         return False, error_response, 500
 
+    # Positions changed outside of smart orders
+    invalidate_position_state(auth_token, broker)
+
     if status_code == 200:
         response_data = {
             'status': 'success',
@@ -45,9 +45,12 @@ Strike Labels (different for CE and PE):
     - Strike ABOVE ATM: CE is OTM, PE is ITM
 """
 
+import os
 from typing import Tuple, Dict, Any, List, Optional
+from cachetools import TTLCache
 from database.auth_db import get_auth_token_broker
 from database.symbol import SymToken, db_session
+from database.token_db_enhanced import get_option_ladder, get_symbol_info
 from services.quotes_service import get_quotes, get_multiquotes
 from services.option_symbol_service import (
     parse_underlying_symbol,
@@ -60,6 +63,12 @@ from utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Short-lived cache of complete chain responses; dashboards poll the same chain
+# every second, so repeated requests within the TTL reuse one multiquote call.
+# OPTION_CHAIN_CACHE_TTL=0 disables it.
+OPTION_CHAIN_CACHE_TTL = float(os.getenv('OPTION_CHAIN_CACHE_TTL', '1'))
+_chain_response_cache = TTLCache(maxsize=256, ttl=OPTION_CHAIN_CACHE_TTL) if OPTION_CHAIN_CACHE_TTL > 0 else None
+
 
 def get_strikes_with_labels(
     available_strikes: List[float],
@@ -126,7 +135,7 @@ def get_option_symbols_for_chain(
     exchange: str
 ) -> List[Dict[str, Any]]:
     """
-    Get CE and PE symbols for each strike from database.
+    Get CE and PE symbols for each strike from the symbol cache (database if not loaded).
 
     Args:
         base_symbol: Base symbol (e.g., NIFTY)
@@ -142,6 +151,14 @@ def get_option_symbols_for_chain(
     # Convert expiry format for database lookup (DDMMMYY -> DD-MMM-YY)
     expiry_formatted = f"{expiry_date[:2]}-{expiry_date[2:5]}-{expiry_date[5:]}".upper()
 
+    # One lookup for the whole strike range instead of two queries per strike
+    ladder = None
+    if strikes_with_labels:
+        ladder = get_option_ladder(
+            base_symbol, expiry_formatted, exchange,
+            strikes_with_labels[0]['strike'], strikes_with_labels[-1]['strike']
+        )
+
     for strike_info in strikes_with_labels:
         strike = strike_info['strike']
         ce_label = strike_info['ce_label']
@@ -151,16 +168,21 @@ def get_option_symbols_for_chain(
         ce_symbol = construct_option_symbol(base_symbol, expiry_date, strike, "CE")
         pe_symbol = construct_option_symbol(base_symbol, expiry_date, strike, "PE")
 
-        # Query database for both CE and PE
-        ce_record = db_session.query(SymToken).filter(
-            SymToken.symbol == ce_symbol,
-            SymToken.exchange == exchange
-        ).first()
+        if ladder is not None:
+            legs = ladder.get(strike, {})
+            ce_record = _ladder_leg(legs, 'CE', ce_symbol, exchange)
+            pe_record = _ladder_leg(legs, 'PE', pe_symbol, exchange)
+        else:
+            # Query database for both CE and PE
+            ce_record = db_session.query(SymToken).filter(
+                SymToken.symbol == ce_symbol,
+                SymToken.exchange == exchange
+            ).first()
 
-        pe_record = db_session.query(SymToken).filter(
-            SymToken.symbol == pe_symbol,
-            SymToken.exchange == exchange
-        ).first()
+            pe_record = db_session.query(SymToken).filter(
+                SymToken.symbol == pe_symbol,
+                SymToken.exchange == exchange
+            ).first()
 
         chain_symbols.append({
             'strike': strike,
@@ -183,6 +205,20 @@ def get_option_symbols_for_chain(
     return chain_symbols
 
 
+def _ladder_leg(legs: Dict[str, Any], option_type: str, symbol: str, exchange: str):
+    """
+    Pick the contract for a constructed option symbol from a strike ladder entry.
+
+    The ladder is keyed by underlying name; if its contract has a different
+    symbol (or none exists), resolve the symbol itself so the result matches
+    an exact symbol/exchange lookup.
+    """
+    record = legs.get(option_type)
+    if record is not None and record.symbol == symbol:
+        return record
+    return get_symbol_info(symbol, exchange)
+
+
 def get_option_chain(
     underlying: str,
     exchange: str,
@@ -193,6 +229,9 @@ def get_option_chain(
     """
     Main function to get option chain data.
 
+    Successful responses are reused for OPTION_CHAIN_CACHE_TTL seconds for the
+    same API key and parameters.
+
     Args:
         underlying: Underlying symbol (e.g., NIFTY, BANKNIFTY, RELIANCE)
         exchange: Exchange (NSE_INDEX, NSE, NFO, BSE_INDEX, BSE, BFO, MCX, CDS)
@@ -203,6 +242,12 @@ def get_option_chain(
     Returns:
         Tuple of (success, response_data, status_code)
     """
+    cache_key = (api_key, underlying, exchange, expiry_date, strike_count)
+    if _chain_response_cache is not None:
+        cached = _chain_response_cache.get(cache_key)
+        if cached is not None:
+            return True, cached, 200
+
     try:
         # Step 1: Parse underlying symbol
         base_symbol, embedded_expiry = parse_underlying_symbol(underlying)
@@ -372,7 +417,7 @@ def get_option_chain(
 
             chain.append(strike_data)
 
-        return True, {
+        response = {
             'status': 'success',
             'underlying': base_symbol,
             'underlying_ltp': underlying_ltp,
@@ -380,7 +425,10 @@ def get_option_chain(
             'expiry_date': final_expiry,
             'atm_strike': atm_strike,
             'chain': chain
-        }, 200
+        }
+        if _chain_response_cache is not None:
+            _chain_response_cache[cache_key] = response
+        return True, response, 200
 
     except Exception as e:
         logger.exception(f"Error in get_option_chain: {e}")
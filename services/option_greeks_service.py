@@ -5,11 +5,17 @@ for options across all supported exchanges (NFO, BFO, CDS, MCX)
 
 Uses Black-76 model (py_vollib) - appropriate for options on futures/forwards
 which is the correct model for Indian F&O markets (NFO, BFO, MCX, CDS)
+
+Whole chains are handled by get_multi_option_greeks, which fetches all prices
+with one multiquote call and solves IV and Greeks for every option at once
+with the vectorized Black-76 functions below (same formulas and units as
+py_vollib).
 """
 
 import re
 from datetime import datetime
-from typing import Dict, Any, Tuple, Optional
+from typing import Dict, Any, List, Tuple, Optional
+import numpy as np
 from utils.logging import get_logger
 
 # Import py_vollib for Black-76 calculations
@@ -20,6 +26,8 @@ try:
     from py_vollib.black.greeks.analytical import theta as black_theta
     from py_vollib.black.greeks.analytical import vega as black_vega
     from py_vollib.black.greeks.analytical import rho as black_rho
+    # py_vollib depends on scipy; the batch functions use its normal CDF directly
+    from scipy.special import ndtr
     PYVOLLIB_AVAILABLE = True
 except ImportError:
     PYVOLLIB_AVAILABLE = False
@@ -46,6 +54,12 @@ COMMODITY_SYMBOLS = {
     "ALUMINIUM", "NICKEL", "COTTONCANDY", "MENTHAOIL"
 }
 
+# Implied volatility search range (decimal) and tolerance for the batch solver
+IV_MIN = 1e-6
+IV_MAX = 20.0
+IV_TOLERANCE = 1e-10
+IV_MAX_ITERATIONS = 100
+
 # Default interest rates by exchange (annualized %)
 # Set to 0 - users should explicitly define interest rate if needed
 DEFAULT_INTEREST_RATES = {
@@ -539,3 +553,372 @@ def get_option_greeks(
             'status': 'error',
             'message': f'Failed to get option Greeks: {str(e)}'
         }, 500
+
+
+# ============================================================================
+# BATCH GREEKS - Vectorized Black-76 for whole option chains
+# ============================================================================
+
+def _black76_d1_d2(F: np.ndarray, K: np.ndarray, t: np.ndarray, sigma: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Black-76 d1 and d2 for arrays of inputs"""
+    sigma_sqrt_t = sigma * np.sqrt(t)
+    d1 = (np.log(F / K) + 0.5 * sigma * sigma * t) / sigma_sqrt_t
+    return d1, d1 - sigma_sqrt_t
+
+
+def _norm_pdf(x: np.ndarray) -> np.ndarray:
+    """Standard normal density"""
+    return np.exp(-0.5 * x * x) / np.sqrt(2.0 * np.pi)
+
+
+def black76_price(F: np.ndarray, K: np.ndarray, t: np.ndarray, r: np.ndarray,
+                  sigma: np.ndarray, is_call: np.ndarray) -> np.ndarray:
+    """
+    Discounted Black-76 option prices
+
+    Args:
+        F: Futures/forward prices
+        K: Strikes
+        t: Time to expiry in years
+        r: Interest rates (decimal)
+        sigma: Volatilities (decimal)
+        is_call: True for calls, False for puts
+
+    Returns:
+        np.ndarray: Option prices
+    """
+    d1, d2 = _black76_d1_d2(F, K, t, sigma)
+    discount = np.exp(-r * t)
+    call = discount * (F * ndtr(d1) - K * ndtr(d2))
+    put = discount * (K * ndtr(-d2) - F * ndtr(-d1))
+    return np.where(is_call, call, put)
+
+
+def black76_implied_volatility(prices: np.ndarray, F: np.ndarray, K: np.ndarray, t: np.ndarray,
+                               r: np.ndarray, is_call: np.ndarray) -> np.ndarray:
+    """
+    Implied volatility of discounted Black-76 prices, solved for all options at once
+
+    Newton steps on every unconverged option, falling back to bisection of the
+    bracketing interval whenever a step would leave it, so each option
+    converges even where vega is tiny (deep ITM/OTM, near expiry).
+
+    Args:
+        prices: Option prices
+        F, K, t, r, is_call: As for black76_price
+
+    Returns:
+        np.ndarray: IV as decimal, NaN where the price has no Black-76 volatility
+        (at/below intrinsic value, at/above the maximum price, or above IV_MAX)
+    """
+    discount = np.exp(-r * t)
+    intrinsic = discount * np.where(is_call, np.maximum(F - K, 0.0), np.maximum(K - F, 0.0))
+    maximum = discount * np.where(is_call, F, K)
+    solvable = (prices > intrinsic) & (prices < maximum)
+
+    low = np.full(prices.shape, IV_MIN)
+    high = np.full(prices.shape, IV_MAX)
+    solvable &= black76_price(F, K, t, r, high, is_call) >= prices
+
+    # Brenner-Subrahmanyam starting point, kept inside the bracket
+    sigma = np.clip(np.sqrt(2.0 * np.pi / t) * prices / (discount * F), 0.05, 2.0)
+    active = solvable.copy()
+    sqrt_t = np.sqrt(t)
+
+    for _ in range(IV_MAX_ITERATIONS):
+        if not active.any():
+            break
+        idx = np.flatnonzero(active)
+        s, f, k, tt, rr, c = sigma[idx], F[idx], K[idx], t[idx], r[idx], is_call[idx]
+        diff = black76_price(f, k, tt, rr, s, c) - prices[idx]
+
+        lo = np.where(diff < 0, s, low[idx])
+        hi = np.where(diff > 0, s, high[idx])
+        low[idx], high[idx] = lo, hi
+
+        d1, _ = _black76_d1_d2(f, k, tt, s)
+        vega = discount[idx] * f * _norm_pdf(d1) * sqrt_t[idx]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = s - diff / vega
+        step = np.where((vega > 0) & (newton > lo) & (newton < hi), newton, 0.5 * (lo + hi))
+
+        done = (np.abs(diff) <= IV_TOLERANCE * prices[idx]) | (hi - lo <= IV_TOLERANCE * s)
+        sigma[idx] = np.where(done, s, step)
+        active[idx[done]] = False
+
+    return np.where(solvable & ~active, sigma, np.nan)
+
+
+def black76_greeks(F: np.ndarray, K: np.ndarray, t: np.ndarray, r: np.ndarray,
+                   sigma: np.ndarray, is_call: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Black-76 Greeks in py_vollib units (theta per day, vega and rho per 1%)
+
+    Returns:
+        Dict of delta, gamma, theta, vega, rho arrays
+    """
+    d1, d2 = _black76_d1_d2(F, K, t, sigma)
+    discount = np.exp(-r * t)
+    sqrt_t = np.sqrt(t)
+    pdf_d1 = _norm_pdf(d1)
+
+    delta = np.where(is_call, discount * ndtr(d1), -discount * ndtr(-d1))
+    gamma = pdf_d1 * discount / (F * sigma * sqrt_t)
+
+    first_term = F * discount * pdf_d1 * sigma / (2 * sqrt_t)
+    call_theta = -(first_term - r * F * discount * ndtr(d1) + r * K * discount * ndtr(d2)) / 365.0
+    put_theta = (-first_term - r * F * discount * ndtr(-d1) + r * K * discount * ndtr(-d2)) / 365.0
+    theta = np.where(is_call, call_theta, put_theta)
+
+    vega = F * discount * pdf_d1 * sqrt_t * 0.01
+    rho = -t * black76_price(F, K, t, r, sigma, is_call) * 0.01
+
+    return {'delta': delta, 'gamma': gamma, 'theta': theta, 'vega': vega, 'rho': rho}
+
+
+def calculate_greeks_batch(
+    options: List[Dict[str, Any]],
+    interest_rate: Optional[float] = None,
+    expiry_time: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Calculate IV and Greeks for many options in one vectorized pass
+
+    Each result has the same fields as a calculate_greeks response, including
+    the theoretical deep ITM Greeks, or 'status': 'error' with a message.
+
+    Args:
+        options: Dicts with symbol, exchange, spot_price and option_price
+        interest_rate: Risk-free interest rate (annualized %), default per exchange
+        expiry_time: Optional custom expiry time in "HH:MM" format
+
+    Returns:
+        List of per-option result dicts in input order
+    """
+    available, error_response, _ = check_pyvollib_availability()
+    if not available:
+        return [dict(error_response, symbol=o['symbol'], exchange=o['exchange']) for o in options]
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(options)
+    expiry_years: Dict[datetime, Tuple[float, float]] = {}
+    rows = []
+
+    def fail(i: int, message: str):
+        results[i] = {
+            'status': 'error',
+            'symbol': options[i]['symbol'],
+            'exchange': options[i]['exchange'],
+            'message': message
+        }
+
+    for i, option in enumerate(options):
+        symbol, exchange = option['symbol'], option['exchange']
+        try:
+            base_symbol, expiry, strike, opt_type = parse_option_symbol(symbol, exchange, expiry_time)
+        except ValueError as e:
+            fail(i, str(e))
+            continue
+
+        if expiry not in expiry_years:
+            expiry_years[expiry] = calculate_time_to_expiry(expiry)
+        years, days = expiry_years[expiry]
+
+        spot_price = option.get('spot_price') or 0
+        option_price = option.get('option_price') or 0
+        rate = interest_rate if interest_rate is not None else DEFAULT_INTEREST_RATES.get(exchange, 0)
+
+        if years <= 0:
+            fail(i, f'Option has expired on {expiry.strftime("%d-%b-%Y")}')
+        elif spot_price <= 0 or option_price <= 0:
+            fail(i, 'Spot price and option price must be positive')
+        elif strike <= 0:
+            fail(i, 'Strike price must be positive')
+        else:
+            intrinsic_value = max(spot_price - strike, 0) if opt_type == 'CE' else max(strike - spot_price, 0)
+            results[i] = {
+                'status': 'success',
+                'symbol': symbol,
+                'exchange': exchange,
+                'underlying': base_symbol,
+                'strike': round(strike, 2),
+                'option_type': opt_type,
+                'expiry_date': expiry.strftime('%d-%b-%Y'),
+                'days_to_expiry': round(days, 4),
+                'spot_price': round(spot_price, 2),
+                'option_price': round(option_price, 2),
+                'interest_rate': round(rate, 2)
+            }
+            rows.append((i, spot_price, strike, years, rate / 100.0, option_price, opt_type == 'CE', intrinsic_value))
+
+    if rows:
+        index, F, K, t, r, prices, is_call, intrinsic = (np.array(column) for column in zip(*rows))
+        time_value = prices - intrinsic
+        # Same rule as calculate_greeks: no (or negligible) time value means deep ITM
+        deep_itm = (time_value <= 0) | ((intrinsic > 0) & (time_value < 0.01))
+
+        sigma = black76_implied_volatility(prices, F, K, t, r, is_call)
+        solved = ~deep_itm & ~np.isnan(sigma)
+        above_maximum = prices >= np.exp(-r * t) * np.where(is_call, F, K)
+        greeks = black76_greeks(F, K, t, r, np.where(solved, sigma, 0.2), is_call)
+
+        for j, i in enumerate(index.tolist()):
+            result = results[i]
+            if solved[j]:
+                result['implied_volatility'] = round(float(sigma[j]) * 100.0, 2)
+                result['greeks'] = {
+                    'delta': round(float(greeks['delta'][j]), 4),
+                    'gamma': round(float(greeks['gamma'][j]), 6),
+                    'theta': round(float(greeks['theta'][j]), 4),
+                    'vega': round(float(greeks['vega'][j]), 4),
+                    'rho': round(float(greeks['rho'][j]), 6)
+                }
+            elif deep_itm[j] or not above_maximum[j]:
+                # Deep ITM, or no volatility reproduces the price: theoretical Greeks
+                result['intrinsic_value'] = round(float(intrinsic[j]), 2)
+                result['time_value'] = round(max(float(time_value[j]), 0), 2)
+                result['implied_volatility'] = 0
+                result['greeks'] = {
+                    'delta': 1.0 if is_call[j] else -1.0,
+                    'gamma': 0,
+                    'theta': 0,
+                    'vega': 0,
+                    'rho': 0
+                }
+                if deep_itm[j]:
+                    result['note'] = 'Deep ITM option with no time value - theoretical Greeks returned'
+                else:
+                    result['note'] = 'IV calculation not possible - theoretical deep ITM Greeks returned'
+            else:
+                fail(i, 'Failed to calculate Implied Volatility: option price is above the maximum Black-76 value')
+
+    return results
+
+
+def get_multi_option_greeks(
+    symbols: List[Dict[str, str]],
+    interest_rate: Optional[float] = None,
+    forward_price: Optional[float] = None,
+    underlying_symbol: Optional[str] = None,
+    underlying_exchange: Optional[str] = None,
+    expiry_time: Optional[str] = None,
+    api_key: Optional[str] = None
+) -> Tuple[bool, Dict[str, Any], int]:
+    """
+    Get option Greeks for many options (e.g. a whole chain) with one multiquote fetch
+
+    Underlying and option prices are fetched together in a single multiquote
+    call, then IV and Greeks are solved for all options with calculate_greeks_batch.
+
+    Args:
+        symbols: List of dicts with 'symbol' and 'exchange' keys
+        interest_rate: Optional interest rate (default from exchange mapping)
+        forward_price: Optional custom forward price used for every option; skips the underlying fetch
+        underlying_symbol: Optional underlying symbol used for every option
+        underlying_exchange: Optional underlying exchange used for every option
+        expiry_time: Optional custom expiry time in "HH:MM" format
+        api_key: API key for authentication
+
+    Returns:
+        Tuple of (success, response_dict, status_code). response_dict has a
+        'data' list with one result per input symbol and a 'summary'.
+    """
+    try:
+        # Import here to avoid circular dependency
+        from services.quotes_service import get_multiquotes
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(symbols)
+
+        def fail(i: int, message: str):
+            results[i] = {
+                'status': 'error',
+                'symbol': symbols[i]['symbol'],
+                'exchange': symbols[i]['exchange'],
+                'message': message
+            }
+
+        # Work out the underlying of each option (same rules as get_option_greeks)
+        spot_keys: Dict[int, Optional[Tuple[str, str]]] = {}
+        for i, item in enumerate(symbols):
+            try:
+                base_symbol = parse_option_symbol(item['symbol'], item['exchange'], expiry_time)[0]
+            except ValueError as e:
+                fail(i, str(e))
+                continue
+            if forward_price:
+                spot_keys[i] = None
+            else:
+                spot_keys[i] = (
+                    underlying_symbol or base_symbol,
+                    underlying_exchange or get_underlying_exchange(base_symbol, item['exchange'])
+                )
+
+        # One multiquote call for all distinct underlyings and options
+        quote_keys = list(dict.fromkeys(
+            [key for key in spot_keys.values() if key] +
+            [(symbols[i]['symbol'], symbols[i]['exchange']) for i in spot_keys]
+        ))
+        ltp_map = {}
+        if quote_keys:
+            logger.info(f"Fetching {len(quote_keys)} quotes for {len(symbols)} option Greeks")
+            success, quotes_response, status_code = get_multiquotes(
+                symbols=[{'symbol': symbol, 'exchange': exchange} for symbol, exchange in quote_keys],
+                api_key=api_key
+            )
+            if not success:
+                return False, {
+                    'status': 'error',
+                    'message': f'Failed to fetch quotes: {quotes_response.get("message", "Unknown error")}'
+                }, status_code
+
+            for result in quotes_response.get('results', []):
+                # Handle both formats: direct data or nested data
+                if 'data' in result:
+                    ltp_map[(result.get('symbol'), result.get('exchange'))] = result['data'].get('ltp')
+                elif 'error' not in result:
+                    ltp_map[(result.get('symbol'), result.get('exchange'))] = result.get('ltp')
+
+        options = []
+        positions = []
+        for i, spot_key in spot_keys.items():
+            item = symbols[i]
+            spot_price = forward_price if forward_price else ltp_map.get(spot_key)
+            option_price = ltp_map.get((item['symbol'], item['exchange']))
+            if not spot_price:
+                fail(i, 'Underlying LTP not available')
+            elif not option_price:
+                fail(i, 'Option LTP not available')
+            else:
+                options.append({
+                    'symbol': item['symbol'],
+                    'exchange': item['exchange'],
+                    'spot_price': spot_price,
+                    'option_price': option_price
+                })
+                positions.append(i)
+
+        for i, result in zip(positions, calculate_greeks_batch(options, interest_rate, expiry_time)):
+            results[i] = result
+
+        succeeded = sum(1 for result in results if result['status'] == 'success')
+        summary = {'total': len(results), 'success': succeeded, 'failed': len(results) - succeeded}
+        if not succeeded:
+            return False, {
+                'status': 'error',
+                'message': 'Failed to calculate Greeks for all symbols',
+                'data': results,
+                'summary': summary
+            }, 400
+
+        logger.info(f"Greeks calculated for {succeeded}/{len(results)} options using Black-76 model")
+        return True, {
+            'status': 'success' if succeeded == len(results) else 'partial',
+            'data': results,
+            'summary': summary
+        }, 200
+
+    except Exception as e:
+        logger.exception(f"Error in get_multi_option_greeks: {e}")
+        return False, {
+            'status': 'error',
+            'message': f'Failed to get option Greeks: {str(e)}'
+        }, 500
@@ -201,7 +201,7 @@ def construct_option_symbol(base_symbol: str, expiry_date: str, strike: float, o
         strike_str = str(strike)
 
     option_symbol = f"{base_symbol}{expiry_date}{strike_str}{option_type.upper()}"
-    logger.info(f"Constructed option symbol: {option_symbol}")
+    logger.debug(f"Constructed option symbol: {option_symbol}")
     return option_symbol
 
 
@@ -7,10 +7,7 @@ Supports split orders per leg if splitsize is specified.
 """
 
 import copy
-import time
-import os
 from typing import Tuple, Dict, Any, Optional, List
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from database.auth_db import get_auth_token_broker
 from database.apilog_db import async_log_order, executor as log_executor
 from database.settings_db import get_analyze_mode
@@ -21,23 +18,13 @@ from services.place_order_service import place_order
 from services.quotes_service import get_quotes
 from services.telegram_alert_service import telegram_alert_service
 from utils.logging import get_logger
+from utils.order_dispatch import dispatch_bulk
 
 logger = get_logger(__name__)
 
 # Maximum number of split orders per leg
 MAX_SPLIT_ORDERS_PER_LEG = 100
 
-# Get rate limit from environment (default: 10 per second)
-def get_order_rate_limit():
-    """Parse ORDER_RATE_LIMIT and return delay in seconds between orders"""
-    rate_limit_str = os.getenv('ORDER_RATE_LIMIT', '10 per second')
-    try:
-        rate = int(rate_limit_str.split()[0])
-        return 1.0 / rate if rate > 0 else 0.1
-    except (ValueError, IndexError):
-        return 0.1  # Default 100ms delay
-
-
 def get_underlying_ltp(underlying: str, exchange: str, api_key: str) -> Tuple[bool, Optional[float], str]:
     """
     Fetch the LTP of the underlying symbol once.
@@ -123,27 +110,23 @@ def emit_analyzer_error(request_data: Dict[str, Any], error_message: str) -> Dic
     return error_response
 
 
-def place_single_split_order_for_leg(
+def place_leg_order(
     order_data: Dict[str, Any],
     api_key: str,
-    order_num: int,
-    total_orders: int,
     auth_token: Optional[str] = None,
     broker: Optional[str] = None
-) -> Dict[str, Any]:
+) -> Tuple[bool, Dict[str, Any]]:
     """
-    Place a single split order for a leg and return result.
+    Place one order of a leg (the whole leg, or one of its split orders).
 
     Args:
         order_data: Order data with symbol, exchange, action, quantity, etc.
         api_key: OpenAlgo API key
-        order_num: Order number in the split sequence
-        total_orders: Total number of split orders
         auth_token: Direct broker auth token (optional)
         broker: Broker name (optional)
 
     Returns:
-        Result dictionary with order status
+        Tuple of (success, order response)
     """
     try:
         # Pass emit_event=False to suppress per-order socket events
@@ -155,57 +138,33 @@ def place_single_split_order_for_leg(
             broker=broker,
             emit_event=False
         )
-
-        if success:
-            return {
-                'order_num': order_num,
-                'quantity': int(order_data['quantity']),
-                'status': 'success',
-                'orderid': order_response.get('orderid')
-            }
-        else:
-            return {
-                'order_num': order_num,
-                'quantity': int(order_data['quantity']),
-                'status': 'error',
-                'message': order_response.get('message', 'Failed to place order')
-            }
+        return success, order_response
     except Exception as e:
-        logger.error(f"Error placing split order {order_num} for leg: {e}")
-        return {
-            'order_num': order_num,
-            'quantity': int(order_data['quantity']),
-            'status': 'error',
-            'message': 'Failed to place order due to internal error'
-        }
+        logger.error(f"Error placing {order_data.get('symbol')} order for leg: {e}")
+        return False, {'message': 'Failed to place order due to internal error'}
 
 
-def resolve_and_place_leg(
+def resolve_leg(
     leg_data: Dict[str, Any],
     common_data: Dict[str, Any],
     api_key: str,
     leg_index: int,
-    total_legs: int,
-    auth_token: Optional[str] = None,
-    broker: Optional[str] = None,
     underlying_ltp: Optional[float] = None
-) -> Dict[str, Any]:
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
     """
-    Resolve option symbol and place order for a single leg.
-    Supports split orders if splitsize is specified in leg_data.
+    Resolve the option symbol of a single leg and build the orders to place for it.
+    Builds one order per split if splitsize is specified in leg_data.
 
     Args:
         leg_data: Leg-specific data (offset, option_type, action, quantity, splitsize, etc.)
         common_data: Common data (underlying, exchange, expiry_date, strike_int, strategy)
         api_key: OpenAlgo API key
         leg_index: Index of this leg
-        total_legs: Total number of legs
-        auth_token: Direct broker auth token (optional)
-        broker: Broker name (optional)
         underlying_ltp: Pre-fetched underlying LTP to avoid redundant quote requests
 
     Returns:
-        Result dictionary with leg details and order status
+        Tuple of (result dictionary with leg details, order data per order to place).
+        If the leg cannot be placed the result has status 'error' and there are no orders.
     """
     try:
         # Step 1: Resolve option symbol
@@ -231,110 +190,22 @@ def resolve_and_place_leg(
                 'action': leg_data.get('action', '').upper(),
                 'status': 'error',
                 'message': symbol_response.get('message', 'Failed to resolve option symbol')
-            }
+            }, []
 
         resolved_symbol = symbol_response.get('symbol')
         resolved_exchange = symbol_response.get('exchange')
         underlying_ltp = symbol_response.get('underlying_ltp')
 
-        # Check if split order is requested for this leg
-        splitsize = leg_data.get('splitsize', 0) or 0
-        total_quantity = int(leg_data.get('quantity', 0))
-
-        # Step 2: Handle split orders if splitsize > 0
-        if splitsize > 0:
-            # Validate split parameters
-            num_full_orders = total_quantity // splitsize
-            remaining_qty = total_quantity % splitsize
-            total_split_orders = num_full_orders + (1 if remaining_qty > 0 else 0)
-
-            if total_split_orders > MAX_SPLIT_ORDERS_PER_LEG:
-                return {
-                    'leg': leg_index + 1,
-                    'symbol': resolved_symbol,
-                    'exchange': resolved_exchange,
-                    'offset': leg_data.get('offset'),
-                    'option_type': leg_data.get('option_type', '').upper(),
-                    'action': leg_data.get('action', '').upper(),
-                    'status': 'error',
-                    'message': f'Split orders would exceed maximum limit of {MAX_SPLIT_ORDERS_PER_LEG} per leg'
-                }
-
-            logger.info(
-                f"Split order for leg {leg_index + 1}: total_qty={total_quantity}, "
-                f"splitsize={splitsize}, orders={total_split_orders}"
-            )
-
-            # Base order data template - include underlying_ltp for execution reference
-            base_order_data = {
-                'apikey': api_key,
-                'strategy': common_data.get('strategy'),
-                'exchange': resolved_exchange,
-                'symbol': resolved_symbol,
-                'action': leg_data.get('action'),
-                'pricetype': leg_data.get('pricetype', 'MARKET'),
-                'product': leg_data.get('product', 'MIS'),
-                'price': leg_data.get('price', 0.0),
-                'trigger_price': leg_data.get('trigger_price', 0.0),
-                'disclosed_quantity': leg_data.get('disclosed_quantity', 0),
-                'underlying_ltp': underlying_ltp  # Pass LTP for execution reference
-            }
-
-            # Process split orders sequentially with rate limiting
-            split_results = []
-            order_delay = get_order_rate_limit()
-
-            # Place full-size orders
-            for i in range(num_full_orders):
-                if i > 0:
-                    time.sleep(order_delay)  # Rate limit delay between orders
-                order_data = copy.deepcopy(base_order_data)
-                order_data['quantity'] = splitsize
-                result = place_single_split_order_for_leg(
-                    order_data,
-                    api_key,
-                    i + 1,
-                    total_split_orders,
-                    auth_token,
-                    broker
-                )
-                split_results.append(result)
-
-            # Place remaining quantity order if any
-            if remaining_qty > 0:
-                if num_full_orders > 0:
-                    time.sleep(order_delay)  # Rate limit delay
-                order_data = copy.deepcopy(base_order_data)
-                order_data['quantity'] = remaining_qty
-                result = place_single_split_order_for_leg(
-                    order_data,
-                    api_key,
-                    total_split_orders,
-                    total_split_orders,
-                    auth_token,
-                    broker
-                )
-                split_results.append(result)
-
-            # Determine overall status
-            successful_orders = sum(1 for r in split_results if r.get('status') == 'success')
-            overall_status = 'success' if successful_orders > 0 else 'error'
-
-            return {
-                'leg': leg_index + 1,
-                'symbol': resolved_symbol,
-                'exchange': resolved_exchange,
-                'offset': leg_data.get('offset'),
-                'option_type': leg_data.get('option_type', '').upper(),
-                'action': leg_data.get('action', '').upper(),
-                'status': overall_status,
-                'total_quantity': total_quantity,
-                'split_size': splitsize,
-                'split_results': split_results,
-                'mode': 'analyze' if get_analyze_mode() else 'live'
-            }
+        leg_result = {
+            'leg': leg_index + 1,
+            'symbol': resolved_symbol,
+            'exchange': resolved_exchange,
+            'offset': leg_data.get('offset'),
+            'option_type': leg_data.get('option_type', '').upper(),
+            'action': leg_data.get('action', '').upper()
+        }
 
-        # Step 2 (non-split): Construct regular order data - include underlying_ltp for execution reference
+        # Step 2: Construct order data - include underlying_ltp for execution reference
         order_data = {
             'apikey': api_key,
             'strategy': common_data.get('strategy'),
@@ -350,45 +221,37 @@ def resolve_and_place_leg(
             'underlying_ltp': underlying_ltp  # Pass LTP for execution reference
         }
 
-        # Step 3: Place the order
-        # Pass emit_event=False to suppress per-leg socket events
-        # A summary event is emitted at the end of all legs
-        success, order_response, status_code = place_order(
-            order_data=order_data,
-            api_key=api_key,
-            auth_token=auth_token,
-            broker=broker,
-            emit_event=False
-        )
+        # Check if split order is requested for this leg
+        splitsize = leg_data.get('splitsize', 0) or 0
+        if splitsize <= 0:
+            return leg_result, [order_data]
 
-        if success:
-            result = {
-                'leg': leg_index + 1,
-                'symbol': resolved_symbol,
-                'exchange': resolved_exchange,
-                'offset': leg_data.get('offset'),
-                'option_type': leg_data.get('option_type', '').upper(),
-                'action': leg_data.get('action', '').upper(),
-                'status': 'success',
-                'orderid': order_response.get('orderid'),
-                'mode': order_response.get('mode', 'live')
-            }
+        # Step 3: Split the quantity into full-size orders, then the remaining quantity if any
+        total_quantity = int(leg_data.get('quantity', 0))
+        num_full_orders = total_quantity // splitsize
+        remaining_qty = total_quantity % splitsize
+        total_split_orders = num_full_orders + (1 if remaining_qty > 0 else 0)
+
+        if total_split_orders > MAX_SPLIT_ORDERS_PER_LEG:
+            leg_result['status'] = 'error'
+            leg_result['message'] = f'Split orders would exceed maximum limit of {MAX_SPLIT_ORDERS_PER_LEG} per leg'
+            return leg_result, []
+
+        logger.info(
+            f"Split order for leg {leg_index + 1}: total_qty={total_quantity}, "
+            f"splitsize={splitsize}, orders={total_split_orders}"
+        )
 
-            # Note: Toast notification is emitted once at the end of multiorder processing
-            # to avoid multiple toast messages for each leg
+        quantities = [splitsize] * num_full_orders
+        if remaining_qty > 0:
+            quantities.append(remaining_qty)
 
-            return result
-        else:
-            return {
-                'leg': leg_index + 1,
-                'symbol': resolved_symbol,
-                'exchange': resolved_exchange,
-                'offset': leg_data.get('offset'),
-                'option_type': leg_data.get('option_type', '').upper(),
-                'action': leg_data.get('action', '').upper(),
-                'status': 'error',
-                'message': order_response.get('message', 'Order placement failed')
-            }
+        split_orders = []
+        for quantity in quantities:
+            split_order = copy.deepcopy(order_data)
+            split_order['quantity'] = quantity
+            split_orders.append(split_order)
+        return leg_result, split_orders
 
     except Exception as e:
         logger.error(f"Error processing leg {leg_index + 1}: {e}")
@@ -399,7 +262,70 @@ def resolve_and_place_leg(
             'action': leg_data.get('action', '').upper(),
             'status': 'error',
             'message': f'Internal error: {str(e)}'
-        }
+        }, []
+
+
+def complete_leg_result(
+    leg_result: Dict[str, Any],
+    leg_data: Dict[str, Any],
+    placed: List[Tuple[Dict[str, Any], bool, Dict[str, Any]]]
+) -> Dict[str, Any]:
+    """
+    Add the outcome of a leg's orders to the result from resolve_leg.
+
+    Args:
+        leg_result: Result dictionary with leg details from resolve_leg
+        leg_data: Leg-specific data (quantity, splitsize, etc.)
+        placed: (order data, success, order response) per order of the leg, in split order
+
+    Returns:
+        Result dictionary with leg details and order status
+    """
+    if 'status' in leg_result:
+        # Symbol resolution or split validation failed, nothing was placed
+        return leg_result
+
+    splitsize = leg_data.get('splitsize', 0) or 0
+    if splitsize > 0:
+        split_results = []
+        for order_num, (order_data, success, order_response) in enumerate(placed, start=1):
+            split_result = {
+                'order_num': order_num,
+                'quantity': int(order_data['quantity']),
+                'status': 'success' if success else 'error'
+            }
+            if success:
+                split_result['orderid'] = order_response.get('orderid')
+            else:
+                split_result['message'] = order_response.get('message', 'Failed to place order')
+            split_results.append(split_result)
+
+        # Determine overall status
+        successful_orders = sum(1 for r in split_results if r.get('status') == 'success')
+        leg_result.update({
+            'status': 'success' if successful_orders > 0 else 'error',
+            'total_quantity': int(leg_data.get('quantity', 0)),
+            'split_size': splitsize,
+            'split_results': split_results,
+            'mode': 'analyze' if get_analyze_mode() else 'live'
+        })
+        return leg_result
+
+    order_data, success, order_response = placed[0]
+    if success:
+        # Note: Toast notification is emitted once at the end of multiorder processing
+        # to avoid multiple toast messages for each leg
+        leg_result.update({
+            'status': 'success',
+            'orderid': order_response.get('orderid'),
+            'mode': order_response.get('mode', 'live')
+        })
+    else:
+        leg_result.update({
+            'status': 'error',
+            'message': order_response.get('message', 'Order placement failed')
+        })
+    return leg_result
 
 
 def process_multiorder_with_auth(
@@ -423,7 +349,6 @@ def process_multiorder_with_auth(
     }
 
     legs = multiorder_data.get('legs', [])
-    total_legs = len(legs)
 
     # Separate BUY and SELL legs
     buy_legs = [(i, leg) for i, leg in enumerate(legs) if leg.get('action', '').upper() == 'BUY']
@@ -443,95 +368,26 @@ def process_multiorder_with_auth(
         else:
             logger.warning(f"Failed to fetch underlying LTP: {error_msg}. Will retry per leg.")
 
-    # Check if any leg has splitsize > 0 (requires sequential processing to avoid broker rate limits)
-    has_split_orders = any(leg.get('splitsize', 0) > 0 for _, leg in buy_legs + sell_legs)
-
-    if has_split_orders:
-        # Process legs sequentially when splits are involved to avoid broker rate limits
-        order_delay = get_order_rate_limit()
-
-        # Process BUY legs first (sequentially)
-        for i, (orig_idx, leg) in enumerate(buy_legs):
-            if i > 0:
-                time.sleep(order_delay)
-            result = resolve_and_place_leg(
-                leg,
-                common_data,
-                api_key,
-                orig_idx,
-                total_legs,
-                auth_token,
-                broker,
-                underlying_ltp
-            )
-            if result:
-                results.append(result)
-
-        # Then process SELL legs (sequentially)
-        for i, (orig_idx, leg) in enumerate(sell_legs):
-            if i > 0 or buy_legs:  # Delay after BUY legs or between SELL legs
-                time.sleep(order_delay)
-            result = resolve_and_place_leg(
-                leg,
-                common_data,
-                api_key,
-                orig_idx,
-                total_legs,
-                auth_token,
-                broker,
-                underlying_ltp
-            )
-            if result:
-                results.append(result)
-    else:
-        # No splits - process legs in parallel for speed
-        # Process BUY legs first (in parallel)
-        if buy_legs:
-            with ThreadPoolExecutor(max_workers=10) as executor:
-                buy_futures = []
-                for orig_idx, leg in buy_legs:
-                    buy_futures.append(
-                        executor.submit(
-                            resolve_and_place_leg,
-                            leg,
-                            common_data,
-                            api_key,
-                            orig_idx,
-                            total_legs,
-                            auth_token,
-                            broker,
-                            underlying_ltp
-                        )
-                    )
-
-                for future in as_completed(buy_futures):
-                    result = future.result()
-                    if result:
-                        results.append(result)
-
-        # Then process SELL legs (in parallel)
-        if sell_legs:
-            with ThreadPoolExecutor(max_workers=10) as executor:
-                sell_futures = []
-                for orig_idx, leg in sell_legs:
-                    sell_futures.append(
-                        executor.submit(
-                            resolve_and_place_leg,
-                            leg,
-                            common_data,
-                            api_key,
-                            orig_idx,
-                            total_legs,
-                            auth_token,
-                            broker,
-                            underlying_ltp
-                        )
-                    )
-
-                for future in as_completed(sell_futures):
-                    result = future.result()
-                    if result:
-                        results.append(result)
+    def resolve(indexed_leg):
+        orig_idx, leg = indexed_leg
+        return resolve_leg(leg, common_data, api_key, orig_idx, underlying_ltp)
+
+    def place(leg_order):
+        _, order_data = leg_order
+        return place_leg_order(order_data, api_key, auth_token, broker)
+
+    # BUY legs first, then SELL legs. Each group resolves its symbols, then
+    # places all of its orders (split orders included) from one pool, taking
+    # turns for the broker's order rate limit as one batch.
+    for group in (buy_legs, sell_legs):
+        resolved = [result for result, _ in dispatch_bulk(resolve, group, broker, paced=False)]
+        leg_orders = [(leg_num, order_data) for leg_num, (_, orders) in enumerate(resolved) for order_data in orders]
+        placed = [[] for _ in resolved]
+        for (leg_num, order_data), (response, _) in zip(leg_orders, dispatch_bulk(place, leg_orders, broker, paced=False)):
+            success, order_response = response
+            placed[leg_num].append((order_data, success, order_response))
+        for (_, leg), (leg_result, _), leg_placed in zip(group, resolved, placed):
+            results.append(complete_leg_result(leg_result, leg, leg_placed))
 
     # Sort results by leg number
     results.sort(key=lambda x: x.get('leg', 0))
@@ -10,10 +10,9 @@ Supports both live trading and sandbox (analyze) mode, just like place_order_ser
 """
 
 import copy
-import time
-import os
 from typing import Tuple, Dict, Any, Optional, List
 from utils.logging import get_logger
+from utils.order_dispatch import dispatch_bulk
 from services.option_symbol_service import get_option_symbol
 from services.place_order_service import place_order
 from database.auth_db import get_auth_token_broker
@@ -29,17 +28,6 @@ logger = get_logger(__name__)
 # Maximum number of split orders allowed
 MAX_SPLIT_ORDERS = 100
 
-# Get rate limit from environment (default: 10 per second)
-def get_order_rate_limit():
-    """Parse ORDER_RATE_LIMIT and return delay in seconds between orders"""
-    rate_limit_str = os.getenv('ORDER_RATE_LIMIT', '10 per second')
-    try:
-        rate = int(rate_limit_str.split()[0])
-        return 1.0 / rate if rate > 0 else 0.1
-    except (ValueError, IndexError):
-        return 0.1  # Default 100ms delay
-
-
 def place_single_split_order(
     order_data: Dict[str, Any],
     api_key: str,
@@ -248,41 +236,25 @@ def place_options_order(
                 'underlying_ltp': underlying_ltp  # Pass LTP for execution reference
             }
 
-            # Process split orders sequentially with rate limiting
-            results = []
-            order_delay = get_order_rate_limit()
+            # Full-size orders, then the remaining quantity if any
+            quantities = [splitsize] * num_full_orders
+            if remaining_qty > 0:
+                quantities.append(remaining_qty)
 
-            # Place full-size orders
-            for i in range(num_full_orders):
-                if i > 0:
-                    time.sleep(order_delay)  # Rate limit delay between orders
+            def place_split(order_num):
                 order_data = copy.deepcopy(base_order_data)
-                order_data['quantity'] = splitsize
-                result = place_single_split_order(
+                order_data['quantity'] = quantities[order_num - 1]
+                return place_single_split_order(
                     order_data,
                     api_key,
-                    i + 1,
+                    order_num,
                     total_orders,
                     auth_token,
                     broker
                 )
-                results.append(result)
 
-            # Place remaining quantity order if any
-            if remaining_qty > 0:
-                if num_full_orders > 0:
-                    time.sleep(order_delay)  # Rate limit delay
-                order_data = copy.deepcopy(base_order_data)
-                order_data['quantity'] = remaining_qty
-                result = place_single_split_order(
-                    order_data,
-                    api_key,
-                    total_orders,
-                    total_orders,
-                    auth_token,
-                    broker
-                )
-                results.append(result)
+            # Placed concurrently; place_order takes each order's token from the broker's rate limit
+            results = [result for result, _ in dispatch_bulk(place_split, range(1, total_orders + 1), broker, paced=False)]
 
             # Build split order response
             response_data = {
@@ -18,6 +18,8 @@ from utils.constants import (
 from restx_api.schemas import OrderSchema
 from utils.logging import get_logger
 from services.telegram_alert_service import telegram_alert_service
+from services.position_state_service import invalidate_position_state
+from utils.order_dispatch import get_order_bucket
 
 # Initialize logger
 logger = get_logger(__name__)
@@ -179,6 +181,8 @@ def place_order_with_auth(
         return False, error_response, 404
 
     try:
+        # Wait for the broker's order rate limit, shared with all order paths
+        get_order_bucket(broker).acquire()
         # Call the broker's place_order_api function
         res, response_data, order_id = broker_module.place_order_api(order_data, auth_token)
     except Exception as e:
@@ -191,6 +195,9 @@ def place_order_with_auth(
         executor.submit(async_log_order, 'placeorder', original_data, error_response)
         return False, error_response, 500
 
+    # Positions changed outside of smart orders
+    invalidate_position_state(auth_token, broker)
+
     if res.status == 200:
         # Emit SocketIO event asynchronously (non-blocking)
         # Skip event emission for batch orders (they emit a summary event at the end)
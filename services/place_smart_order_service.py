@@ -18,7 +18,9 @@ from utils.constants import (
     REQUIRED_SMART_ORDER_FIELDS
 )
 from utils.logging import get_logger
+from utils.order_dispatch import get_order_bucket
 from services.telegram_alert_service import telegram_alert_service
+from services.position_state_service import place_smartorder_from_state
 
 # Initialize logger
 logger = get_logger(__name__)
@@ -134,7 +136,9 @@ def place_smart_order_with_auth(
         auth_token: Authentication token for the broker API
         broker: Name of the broker
         original_data: Original request data for logging
-        smart_order_delay: Delay in seconds between order placement and response
+        smart_order_delay: Delay in seconds between order placement and response,
+            only used when the position state is unavailable (orders on the
+            same position are serialized by position_state_service instead)
         
     Returns:
         Tuple containing:
@@ -202,7 +206,15 @@ def place_smart_order_with_auth(
         return False, error_response, 404
 
     try:
-        res, response_data, order_id = broker_module.place_smartorder_api(order_data, auth_token)
+        # Current position from the in-memory position state, falling back to
+        # the broker's positionbook lookup (and the delay) when it is unavailable
+        result = place_smartorder_from_state(broker_module, order_data, auth_token, broker)
+        used_position_state = result is not None
+        if used_position_state:
+            res, response_data, order_id = result
+        else:
+            get_order_bucket(broker).acquire()
+            res, response_data, order_id = broker_module.place_smartorder_api(order_data, auth_token)
         
         # Handle case where position size matches current position
         if res is None and response_data.get('status') == 'success' and 'No action needed' in response_data.get('message', ''):
@@ -258,11 +270,12 @@ def place_smart_order_with_auth(
         return False, error_response, 500
 
     # Add delay if needed
-    try:
-        time.sleep(float(smart_order_delay))
-    except Exception as e:
-        logger.error(f"Invalid SMART_ORDER_DELAY value: {smart_order_delay}")
-        traceback.print_exc()
+    if not used_position_state:
+        try:
+            time.sleep(float(smart_order_delay))
+        except Exception as e:
+            logger.error(f"Invalid SMART_ORDER_DELAY value: {smart_order_delay}")
+            traceback.print_exc()
 
     if res and res.status == 200:
         return True, order_response_data, 200
@@ -0,0 +1,329 @@
+"""
+Live position state for smart orders
+
+place_smartorder_api in every broker fetched the full positionbook from the
+broker for each smart order, and place_smart_order_service then slept for
+SMART_ORDER_DELAY so the next order could see the new position. TradingView
+strategies fire many smart orders at bar close, so each one paid a positionbook
+round-trip plus the sleep.
+
+This service keeps the net positions of each broker session in memory:
+- seeded from the positionbook (OpenAlgo format, via positionbook_service)
+  and refreshed when the snapshot is older than SMART_ORDER_POSITION_TTL
+  seconds, so a burst of smart orders shares one positionbook request
+- updated from the acknowledgement of every MARKET smart order it places, so
+  the next smart order on the same symbol sees the expected position before
+  the broker's positionbook does
+- reconciled on every refresh: an expected position is dropped once the
+  positionbook agrees, once the orderbook shows one of its orders rejected
+  or cancelled, or after ORDER_SETTLE_SECONDS
+
+Brokers acknowledge orders that their RMS rejects afterwards, so an expected
+position the positionbook has not confirmed only sizes orders that add to it.
+A smart order that would reduce, reverse or leave it as it is checks the
+orderbook and refreshes from the positionbook first, and falls back to the
+broker's place_smartorder_api if the position is still unconfirmed.
+
+Smart orders on the same symbol/exchange/product are serialized by a lock
+instead of the fixed sleep. Other order services call
+invalidate_position_state() so the next smart order refreshes first.
+
+SMART_ORDER_POSITION_TTL = '0' (the default) disables the state, keeping the
+broker's place_smartorder_api with the SMART_ORDER_DELAY sleep.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional, Tuple
+
+from cachetools import TTLCache
+
+from utils.logging import get_logger
+from utils.order_dispatch import get_order_bucket
+
+logger = get_logger(__name__)
+
+# Seconds a positionbook snapshot is reused for smart orders (0 = disabled)
+SMART_ORDER_POSITION_TTL = os.getenv('SMART_ORDER_POSITION_TTL', '0')
+
+# Seconds the expected position after a smart order overrides the positionbook
+ORDER_SETTLE_SECONDS = 5.0
+
+# Orderbook statuses (OpenAlgo format) of orders that never change the position
+FAILED_ORDER_STATUSES = ('rejected', 'cancelled')
+
+# Position state per broker session, dropped when idle for a day
+_states = TTLCache(maxsize=64, ttl=24 * 3600)
+_states_lock = threading.Lock()
+
+
+def get_position_ttl() -> float:
+    """SMART_ORDER_POSITION_TTL in seconds, 0 if disabled or invalid"""
+    try:
+        return max(0.0, float(SMART_ORDER_POSITION_TTL))
+    except (TypeError, ValueError):
+        logger.error(f"Invalid SMART_ORDER_POSITION_TTL value: {SMART_ORDER_POSITION_TTL}")
+        return 0.0
+
+
+def position_key(symbol: str, exchange: str, product: str) -> Tuple[str, str, str]:
+    """Key of a position in OpenAlgo format"""
+    return (symbol, exchange, product)
+
+
+class PositionState:
+    """Net positions of one broker session"""
+
+    def __init__(self, broker: str):
+        self.broker = broker
+        self.positions = {}      # position_key -> net quantity from the positionbook
+        self.expected = {}       # position_key -> (net quantity, monotonic time of the order, order ids)
+        self.refreshed_at = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._key_locks = defaultdict(threading.Lock)
+
+    def key_lock(self, key) -> threading.Lock:
+        """Lock that serializes smart orders for one position"""
+        with self._lock:
+            return self._key_locks[key]
+
+    def invalidate(self):
+        """Refresh from the positionbook before the next smart order"""
+        with self._lock:
+            self.refreshed_at = None
+
+    def is_fresh(self, ttl: float) -> bool:
+        with self._lock:
+            return self.refreshed_at is not None and time.monotonic() - self.refreshed_at < ttl
+
+    def refresh(self, auth_token: str) -> bool:
+        """
+        Reload the positions from the broker's positionbook
+
+        Returns:
+            bool: True if the positionbook was loaded
+        """
+        from services.positionbook_service import get_positionbook_with_auth
+
+        success, response, _ = get_positionbook_with_auth(auth_token, self.broker)
+        if not success:
+            logger.warning(f"Could not refresh position state from positionbook: {response.get('message')}")
+            return False
+
+        positions = {}
+        for position in response.get('data') or []:
+            try:
+                quantity = int(float(position.get('quantity') or 0))
+            except (TypeError, ValueError):
+                continue
+            key = position_key(position.get('symbol'), position.get('exchange'), position.get('product'))
+            positions[key] = positions.get(key, 0) + quantity
+
+        now = time.monotonic()
+        with self._lock:
+            self.positions = positions
+            # Reconcile: keep expected positions the positionbook has not caught up with yet
+            self.expected = {
+                key: (quantity, placed_at, orderids)
+                for key, (quantity, placed_at, orderids) in self.expected.items()
+                if positions.get(key, 0) != quantity and now - placed_at < ORDER_SETTLE_SECONDS
+            }
+            self.refreshed_at = now
+        logger.debug(f"Position state refreshed with {len(positions)} positions")
+        return True
+
+    def get_position(self, key, auth_token: str, ttl: float) -> Optional[int]:
+        """
+        Net quantity of a position, refreshing the snapshot if it is older than ttl
+
+        Returns:
+            int: Net quantity, or None if the positionbook could not be loaded
+        """
+        if not self.is_fresh(ttl):
+            # One refresh at a time, so concurrent smart orders share one positionbook request
+            with self._refresh_lock:
+                if not self.is_fresh(ttl) and not self.refresh(auth_token):
+                    return None
+
+        with self._lock:
+            expected = self.expected.get(key)
+            if expected and time.monotonic() - expected[1] < ORDER_SETTLE_SECONDS:
+                return expected[0]
+            return self.positions.get(key, 0)
+
+    def is_pending(self, key) -> bool:
+        """True if the position of key is an expectation the positionbook has not confirmed"""
+        with self._lock:
+            expected = self.expected.get(key)
+            return expected is not None and time.monotonic() - expected[1] < ORDER_SETTLE_SECONDS
+
+    def record_order(self, key, quantity: int, orderid: Any):
+        """Record the position expected once an acknowledged MARKET order fills"""
+        with self._lock:
+            expected = self.expected.get(key)
+            # Orders on top of an unconfirmed expectation all have to go through
+            orderids = expected[2] if expected else ()
+            self.expected[key] = (quantity, time.monotonic(), orderids + (str(orderid),))
+
+    def confirm(self, key, auth_token: str) -> bool:
+        """
+        Drop the expected position of key if the orderbook shows one of its
+        orders rejected or cancelled, then refresh from the positionbook
+
+        Returns:
+            bool: True if the position of key now comes from the positionbook
+        """
+        from services.orderbook_service import get_orderbook_with_auth
+
+        with self._lock:
+            expected = self.expected.get(key)
+        if expected:
+            success, response, _ = get_orderbook_with_auth(auth_token, self.broker)
+            if success:
+                statuses = {
+                    str(order.get('orderid')): str(order.get('order_status', '')).lower()
+                    for order in (response.get('data') or {}).get('orders') or []
+                }
+                if any(statuses.get(orderid) in FAILED_ORDER_STATUSES for orderid in expected[2]):
+                    logger.info(f"Smart order for {key[0]} was not filled, dropping the expected position")
+                    with self._lock:
+                        self.expected.pop(key, None)
+            else:
+                logger.warning(f"Could not check smart orders in orderbook: {response.get('message')}")
+
+        with self._refresh_lock:
+            if not self.refresh(auth_token):
+                return False
+        return not self.is_pending(key)
+
+    def forget(self, key):
+        """Drop the expected position of a key and refresh before the next smart order"""
+        with self._lock:
+            self.expected.pop(key, None)
+            self.refreshed_at = None
+
+
+def _state_id(auth_token: str, broker: str) -> Tuple[str, str]:
+    # Never keep the broker token itself as a key
+    return (broker, hashlib.sha256(auth_token.encode()).hexdigest())
+
+
+def get_position_state(auth_token: str, broker: str) -> PositionState:
+    """Position state of a broker session (created on first use)"""
+    state_id = _state_id(auth_token, broker)
+    with _states_lock:
+        state = _states.get(state_id)
+        if state is None:
+            state = _states[state_id] = PositionState(broker)
+        return state
+
+
+def invalidate_position_state(auth_token: str, broker: str):
+    """
+    Make the next smart order of a broker session refresh from the positionbook.
+    Called after orders placed outside of smart orders change positions.
+    """
+    if not auth_token:
+        return
+    with _states_lock:
+        state = _states.get(_state_id(auth_token, broker))
+    if state is not None:
+        state.invalidate()
+
+
+def compute_smart_order(position_size: int, current_position: int, quantity: int) -> Tuple[Optional[str], int, str]:
+    """
+    Order needed to move current_position to position_size, following the
+    brokers' place_smartorder_api. With no position and position_size 0 the
+    brokers differ (most place `quantity` as a regular order, zerodha places
+    nothing), so place_smartorder_from_state leaves that case to the broker.
+
+    Returns:
+        Tuple of (action or None, quantity, message when no order is needed)
+    """
+    if position_size == current_position:
+        if quantity == 0:
+            return None, 0, 'No OpenPosition Found. Not placing Exit order.'
+        return None, 0, 'No action needed. Position size matches current position'
+    if position_size > current_position:
+        return 'BUY', position_size - current_position, ''
+    return 'SELL', current_position - position_size, ''
+
+
+def adds_to_position(current_position: int, action: Optional[str]) -> bool:
+    """True if an order on `action` grows an open position on its own side"""
+    return (current_position > 0 and action == 'BUY') or (current_position < 0 and action == 'SELL')
+
+
+def place_smartorder_from_state(broker_module: Any, data: Dict[str, Any], auth_token: str, broker: str) -> Optional[Tuple[Any, Dict[str, Any], Any]]:
+    """
+    Place a smart order with the current position taken from the position state.
+    Same contract as the broker's place_smartorder_api.
+
+    Args:
+        broker_module: The broker's order_api module
+        data: Smart order data in OpenAlgo format
+        auth_token: Authentication token for the broker API
+        broker: Name of the broker
+
+    Returns:
+        (response object, response data, order id) like place_smartorder_api,
+        or None if the state is disabled, the positionbook is unavailable or
+        the position is still unconfirmed, and the broker's
+        place_smartorder_api should be used instead
+    """
+    ttl = get_position_ttl()
+    if ttl <= 0:
+        return None
+
+    state = get_position_state(auth_token, broker)
+    key = position_key(data.get('symbol'), data.get('exchange'), data.get('product'))
+    position_size = int(data.get('position_size', '0'))
+    quantity = int(data.get('quantity', 0))
+
+    with state.key_lock(key):
+        current_position = state.get_position(key, auth_token, ttl)
+        if current_position is None:
+            return None
+
+        action, order_quantity, message = compute_smart_order(position_size, current_position, quantity)
+        if state.is_pending(key) and not adds_to_position(current_position, action):
+            # Only the positionbook (or a failed order) settles an expected
+            # position before it sizes an exit, a reversal or no order at all
+            if not state.confirm(key, auth_token):
+                return None
+            current_position = state.get_position(key, auth_token, ttl)
+            if current_position is None:
+                return None
+            action, order_quantity, message = compute_smart_order(position_size, current_position, quantity)
+
+        if position_size == 0 and current_position == 0 and quantity != 0:
+            # Brokers differ here, see compute_smart_order
+            return None
+
+        logger.info(f"position_size: {position_size}")
+        logger.info(f"Open Position: {current_position}")
+        if action is None:
+            return None, {'status': 'success', 'message': message}, None
+
+        order_data = data.copy()
+        order_data['action'] = action
+        order_data['quantity'] = str(order_quantity)
+        try:
+            get_order_bucket(broker).acquire()
+            res, response, orderid = broker_module.place_order_api(order_data, auth_token)
+        except Exception:
+            state.forget(key)
+            raise
+
+        if res is not None and getattr(res, 'status', None) == 200 and order_data.get('pricetype') == 'MARKET':
+            signed_quantity = order_quantity if action == 'BUY' else -order_quantity
+            state.record_order(key, current_position + signed_quantity, orderid)
+        else:
+            # Limit/stop orders fill later and failed orders leave an unknown state
+            state.forget(key)
+        return res, response, orderid
@@ -1,8 +1,6 @@
 import importlib
 import traceback
 import copy
-import time
-import os
 from typing import Tuple, Dict, Any, Optional, List
 
 from database.auth_db import get_auth_token_broker
@@ -19,7 +17,9 @@ from utils.constants import (
     REQUIRED_ORDER_FIELDS
 )
 from utils.logging import get_logger
+from utils.order_dispatch import dispatch_bulk
 from services.telegram_alert_service import telegram_alert_service
+from services.position_state_service import invalidate_position_state
 
 # Initialize logger
 logger = get_logger(__name__)
@@ -27,16 +27,6 @@ logger = get_logger(__name__)
 # Maximum number of orders allowed
 MAX_ORDERS = 100
 
-# Get rate limit from environment (default: 10 per second)
-def get_order_rate_limit():
-    """Parse ORDER_RATE_LIMIT and return delay in seconds between orders"""
-    rate_limit_str = os.getenv('ORDER_RATE_LIMIT', '10 per second')
-    try:
-        rate = int(rate_limit_str.split()[0])
-        return 1.0 / rate if rate > 0 else 0.1
-    except (ValueError, IndexError):
-        return 0.1  # Default 100ms delay
-
 def emit_analyzer_error(request_data: Dict[str, Any], error_message: str) -> Dict[str, Any]:
     """
     Helper function to emit analyzer error events
@@ -306,39 +296,27 @@ def split_order_with_auth(
         log_executor.submit(async_log_order, 'splitorder', original_data, error_response)
         return False, error_response, 404
 
-    # Process orders sequentially with rate limiting
-    results = []
-    order_delay = get_order_rate_limit()
+    # Full-size orders, then the remaining quantity order if any
+    quantities = [split_size] * num_full_orders
+    if remaining_qty > 0:
+        quantities.append(remaining_qty)
 
-    # Place full-size orders
-    for i in range(num_full_orders):
-        if i > 0:
-            time.sleep(order_delay)  # Rate limit delay between orders
+    def place_split(order_num):
         order_data = copy.deepcopy(split_data)
-        order_data['quantity'] = str(split_size)
-        result = place_single_order(
+        order_data['quantity'] = str(quantities[order_num - 1])
+        return place_single_order(
             order_data,
             broker_module,
             auth_token,
-            i + 1,
+            order_num,
             total_orders
         )
-        results.append(result)
 
-    # Place remaining quantity order if any
-    if remaining_qty > 0:
-        if num_full_orders > 0:
-            time.sleep(order_delay)  # Rate limit delay
-        order_data = copy.deepcopy(split_data)
-        order_data['quantity'] = str(remaining_qty)
-        result = place_single_order(
-            order_data,
-            broker_module,
-            auth_token,
-            total_orders,
-            total_orders
-        )
-        results.append(result)
+    # Place the orders concurrently under the broker rate limit, results in order_num order
+    results = [result for result, _ in dispatch_bulk(place_split, range(1, len(quantities) + 1), broker)]
+
+    # Positions changed outside of smart orders
+    invalidate_position_state(auth_token, broker)
 
     # Log the split order results
     response_data = {
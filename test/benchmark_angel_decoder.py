@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Angel SmartWebSocketV2 Binary Decoder Benchmark
+Measures packets/sec decoded by SmartWebSocketV2._parse_binary_data for each
+subscription mode (LTP, Quote, SnapQuote, Depth 20), with the depth ladders
+decoded into lists of dicts (default) and into NumPy structured arrays
+(depth_as_numpy=True).
+
+Packets are synthetic and no connection is opened.
+
+Usage:
+    python test/benchmark_angel_decoder.py
+    python test/benchmark_angel_decoder.py --packets 200000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add parent directory to path to import broker modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from broker.angel.streaming.smartWebSocketV2 import SmartWebSocketV2
+
+# Packet sizes per subscription mode
+MODES = {"LTP": (1, 51), "QUOTE": (2, 123), "SNAP_QUOTE": (3, 379), "DEPTH": (4, 443)}
+
+
+def synthetic_packets(mode, size, count, seed=16):
+    rng = random.Random(seed)
+    packets = []
+    for _ in range(count):
+        packet = bytearray(rng.randbytes(size))
+        packet[0] = mode
+        token = str(rng.randrange(1000, 99999)).encode()
+        packet[2:27] = token + b"\x00" * (25 - len(token))
+        packets.append(bytes(packet))
+    return packets
+
+
+def run(decoder, packets):
+    decode = decoder._parse_binary_data
+    start = time.perf_counter()
+    for packet in packets:
+        decode(packet)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Angel binary packet decoding")
+    parser.add_argument("--packets", type=int, default=100000, help="Packets per mode")
+    args = parser.parse_args()
+
+    decoders = {}
+    for label, as_numpy in (("dicts", False), ("numpy", True)):
+        decoder = SmartWebSocketV2.__new__(SmartWebSocketV2)
+        decoder.depth_as_numpy = as_numpy
+        decoders[label] = decoder
+
+    print(f"{'mode':>10} {'ladders':>8} {'seconds':>9} {'packets/s':>11}")
+    for name, (mode, size) in MODES.items():
+        packets = synthetic_packets(mode, size, args.packets)
+        for label, decoder in decoders.items():
+            if label == "numpy" and mode < SmartWebSocketV2.SNAP_QUOTE:
+                continue
+            elapsed = run(decoder, packets)
+            print(f"{name:>10} {label:>8} {elapsed:>9.3f} {args.packets / elapsed:>11,.0f}")
+
+
+if __name__ == "__main__":
+    main()
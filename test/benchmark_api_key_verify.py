@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+API Key Verification Benchmark
+Measures a cold (uncached) database.auth_db.verify_api_key with 1, 100 and
+1000 users:
+
+- legacy:      Argon2 verify against every stored hash until one matches
+               (worst case: the key belongs to the last row, or is invalid)
+- backfill:    first verification after upgrading, which fingerprints the
+               existing keys from their encrypted copies
+- fingerprint: one indexed lookup by HMAC fingerprint plus one Argon2 verify
+
+Users are written to a temporary SQLite database without fingerprints, as
+they would be before the upgrade. Hashing the users takes a while for 1000
+users (one Argon2 hash each).
+
+Usage:
+    python test/benchmark_api_key_verify.py
+    python test/benchmark_api_key_verify.py --users 1,100,1000
+"""
+
+import argparse
+import logging
+import os
+import secrets
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add parent directory to path to import database modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Point the database at a scratch file before database.auth_db is imported
+_db_dir = tempfile.mkdtemp(prefix="api_key_verify_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'openalgo.db')}"
+os.environ.setdefault("API_KEY_PEPPER", secrets.token_hex(32))
+os.environ["LOGS_DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'logs.db')}"
+
+from argon2.exceptions import VerifyMismatchError
+
+from database import auth_db
+from database.auth_db import ApiKeys, PEPPER, db_session, encrypt_token, ph, verify_api_key
+
+
+def create_users(count):
+    """Pre-upgrade api_keys rows (no fingerprint), returns the plaintext keys in row order"""
+    keys = [secrets.token_hex(32) for _ in range(count)]
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        hashes = list(executor.map(lambda key: ph.hash(key + PEPPER), keys))
+
+    db_session.query(ApiKeys).delete()
+    db_session.add_all([
+        ApiKeys(user_id=f"user{i}", api_key_hash=hashes[i], api_key_encrypted=encrypt_token(key))
+        for i, key in enumerate(keys)
+    ])
+    db_session.commit()
+    db_session.remove()
+    auth_db._fingerprints_backfilled = False
+    return keys
+
+
+def legacy_verify(provided_api_key):
+    """The pre-fingerprint cache-miss path: Argon2 against every stored hash"""
+    peppered_key = provided_api_key + PEPPER
+    for api_key_obj in ApiKeys.query.all():
+        try:
+            ph.verify(api_key_obj.api_key_hash, peppered_key)
+            return api_key_obj.user_id
+        except VerifyMismatchError:
+            continue
+    return None
+
+
+def cold(function, key):
+    """Time one verification with empty caches"""
+    auth_db.verified_api_key_cache.clear()
+    auth_db.invalid_api_key_cache.clear()
+    start = time.perf_counter()
+    result = function(key)
+    elapsed = (time.perf_counter() - start) * 1000
+    db_session.remove()
+    return elapsed, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cold API key verification")
+    parser.add_argument("--users", default="1,100,1000", help="Comma separated user counts")
+    args = parser.parse_args()
+
+    # Invalid key tracking and per-miss logs are not what is being measured
+    logging.disable(logging.WARNING)
+    auth_db.init_db()
+    from database.settings_db import init_db as init_settings_db
+    from database.traffic_db import init_logs_db
+    init_settings_db()
+    init_logs_db()
+
+    print(f"Database: {_db_dir}")
+    print(f"{'users':>6} {'legacy ms':>10} {'legacy bad':>11} {'backfill ms':>12} {'fingerprint ms':>15} {'bad key ms':>11}")
+    for count in (int(c) for c in args.users.split(",")):
+        keys = create_users(count)
+        last_key = keys[-1]
+        bad_key = secrets.token_hex(32)
+
+        legacy_ms, user = cold(legacy_verify, last_key)
+        assert user == f"user{count - 1}"
+        legacy_bad_ms, _ = cold(legacy_verify, bad_key)
+
+        backfill_ms, user = cold(verify_api_key, keys[0])
+        assert user == "user0"
+        fingerprint_ms, user = cold(verify_api_key, last_key)
+        assert user == f"user{count - 1}"
+        bad_ms, user = cold(verify_api_key, bad_key)
+        assert user is None
+
+        print(f"{count:>6} {legacy_ms:>10.1f} {legacy_bad_ms:>11.1f} {backfill_ms:>12.1f} {fingerprint_ms:>15.1f} {bad_ms:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Bulk Cancel/Close Benchmark
+Times Zerodha cancel_all_orders_api and close_all_positions against a local
+mock of the Kite API for growing order counts, with the broker calls made one
+at a time (MAX_BULK_WORKERS=1, the old loop) and concurrently through
+utils/order_dispatch.dispatch_bulk.
+
+The mock answers every request after --latency-ms, fails every
+--fail-every'th cancellation (to exercise partial-failure reporting) and
+records request start times, so the benchmark also reports the highest
+order-request rate the broker saw in any one-second window against
+ORDER_RATE_LIMIT. The symbol master is a temporary SQLite file.
+
+Usage:
+    python test/benchmark_bulk_dispatch.py
+    python test/benchmark_bulk_dispatch.py --orders 10,30,60 --latency-ms 150 --rate 10
+"""
+
+import argparse
+import logging
+import os
+import time
+
+from mock_broker import MockBrokerHandler, peak_rate, populate_symbols, start_mock_broker, use_scratch_databases
+
+# Point the databases at scratch files before the database modules are imported
+use_scratch_databases("bulk_dispatch_bench_")
+
+from utils import order_dispatch, rate_limiter
+
+
+class MockKiteHandler(MockBrokerHandler):
+    """Order book, positions, cancellations and squareoff orders with a fixed delay"""
+
+    latency = 0.15
+    fail_every = 0
+    open_orders = 0
+    open_positions = 0
+    request_times = []
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        if self.path.startswith("/orders"):
+            orders = [{"order_id": str(100000 + i), "status": "OPEN"} for i in range(self.open_orders)]
+            self.reply({"status": "success", "data": orders})
+        else:
+            net = [{"tradingsymbol": f"SYM{i}", "exchange": "NSE", "product": "MIS", "quantity": 5}
+                   for i in range(self.open_positions)]
+            self.reply({"status": "success", "data": {"net": net, "day": net}})
+
+    def do_DELETE(self):
+        self.record_request()
+        time.sleep(self.latency)
+        orderid = self.path.rsplit("/", 1)[-1]
+        if self.fail_every and int(orderid) % self.fail_every == 0:
+            self.reply({"status": "error", "message": "Order already completed"}, status=400)
+        else:
+            self.reply({"status": "success", "data": {"order_id": orderid}})
+
+    def do_POST(self):
+        self.record_request()
+        self.read_body()
+        time.sleep(self.latency)
+        self.reply({"status": "success", "data": {"order_id": "250101000000001"}})
+
+
+def timed(function, workers):
+    MockKiteHandler.request_times = []
+    order_dispatch.MAX_BULK_WORKERS = workers
+    # A fresh (full) budget per run
+    rate_limiter.reset_rate_limiters()
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result, peak_rate(sorted(MockKiteHandler.request_times))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent cancel-all/close-all against a mock broker")
+    parser.add_argument("--orders", default="10,30,60", help="Comma separated open order/position counts")
+    parser.add_argument("--latency-ms", type=int, default=150, help="Mock broker response time per request")
+    parser.add_argument("--rate", type=int, default=10, help="ORDER_RATE_LIMIT per second")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent broker calls")
+    parser.add_argument("--fail-every", type=int, default=10, help="Fail every n-th cancellation (0 = never)")
+    args = parser.parse_args()
+
+    # The failed cancellations are logged as errors by the broker module
+    logging.disable(logging.ERROR)
+    os.environ["ORDER_RATE_LIMIT"] = f"{args.rate} per second"
+    counts = [int(c) for c in args.orders.split(",")]
+    populate_symbols([(f"SYM{i}", str(1000 + i)) for i in range(max(counts))])
+
+    MockKiteHandler.latency = args.latency_ms / 1000
+    MockKiteHandler.fail_every = args.fail_every
+    server = start_mock_broker(MockKiteHandler)
+
+    from broker.zerodha.api import order_api
+
+    print(f"Mock Kite API on port {server.server_address[1]}, {args.latency_ms} ms per request, "
+          f"ORDER_RATE_LIMIT {args.rate}/s, {args.workers} workers")
+    print(f"{'operation':>10} {'orders':>7} {'sequential s':>13} {'concurrent s':>13} {'speedup':>8} {'peak req/s':>11} {'canceled/failed':>16}")
+    for count in counts:
+        MockKiteHandler.open_orders = count
+        MockKiteHandler.open_positions = count
+
+        cancel_all = lambda: order_api.cancel_all_orders_api({}, "api_key:access_token")
+        seq, seq_result, _ = timed(cancel_all, 1)
+        conc, conc_result, peak = timed(cancel_all, args.workers)
+        assert seq_result == conc_result
+        print(f"{'cancel':>10} {count:>7} {seq:>13.2f} {conc:>13.2f} {seq / conc:>7.1f}x {peak:>11} "
+              f"{len(conc_result[0]):>8}/{len(conc_result[1])}")
+
+        close_all = lambda: order_api.close_all_positions("", "api_key:access_token")
+        seq, _, _ = timed(close_all, 1)
+        conc, _, peak = timed(close_all, args.workers)
+        print(f"{'close':>10} {count:>7} {seq:>13.2f} {conc:>13.2f} {seq / conc:>7.1f}x {peak:>11}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
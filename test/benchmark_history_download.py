@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Chunked History Download Benchmark
+Times Zerodha BrokerData.get_history over a long 1-minute range against a
+local mock of the Kite historical candle API, with the chunks fetched one at
+a time (max_workers=1, the old sequential loop) and concurrently through
+utils/history_chunks.fetch_chunks.
+
+The mock server answers every chunk after --latency-ms with one candle per
+trading minute and records request start times, so the benchmark also
+reports the highest request rate the broker saw in any one-second window
+(Zerodha allows 3/s). The shared httpx client is pointed at the mock with a
+transport that rewrites https://api.kite.trade to the local server; the
+symbol master is a temporary SQLite file.
+
+Usage:
+    python test/benchmark_history_download.py
+    python test/benchmark_history_download.py --days 730 --latency-ms 800 --workers 4
+"""
+
+import argparse
+import logging
+import time
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs, urlparse
+
+from mock_broker import MockBrokerHandler, peak_rate, populate_symbols, start_mock_broker, use_scratch_databases
+
+# Point the symbol database at a scratch file before the database modules are imported
+use_scratch_databases("history_download_bench_")
+
+from utils import history_chunks
+
+# Candles per mocked trading day (a few bars per hour keeps the payloads small)
+CANDLES_PER_DAY = 25
+
+
+class MockKiteHandler(MockBrokerHandler):
+    """/instruments/historical/<token>/<interval>?from=..&to=.. with a fixed delay"""
+
+    latency = 0.6
+    request_times = []
+
+    def do_GET(self):
+        self.record_request()
+        time.sleep(self.latency)
+
+        query = parse_qs(urlparse(self.path).query)
+        day = datetime.strptime(query["from"][0][:10], "%Y-%m-%d")
+        last = datetime.strptime(query["to"][0][:10], "%Y-%m-%d")
+        candles = []
+        while day <= last:
+            if day.weekday() < 5:
+                for i in range(CANDLES_PER_DAY):
+                    ts = day + timedelta(hours=9, minutes=15 + 15 * i)
+                    candles.append([ts.strftime("%Y-%m-%dT%H:%M:%S+0530"), 100.0, 101.0, 99.0, 100.5, 1000 + i, 0])
+            day += timedelta(days=1)
+        self.reply({"status": "success", "data": {"candles": candles}})
+
+
+def run(data, days, workers):
+    MockKiteHandler.request_times = []
+    history_chunks.MAX_CONCURRENT_CHUNKS = workers
+    end = datetime(2025, 12, 31)
+    start = end - timedelta(days=days - 1)
+
+    started = time.perf_counter()
+    df = data.get_history("SBIN", "NSE", "1m", start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d"))
+    elapsed = time.perf_counter() - started
+    return elapsed, len(df), len(MockKiteHandler.request_times), peak_rate(sorted(MockKiteHandler.request_times))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent chunked history downloads against a mock broker")
+    parser.add_argument("--days", type=int, default=730, help="Days of 1-minute history to download")
+    parser.add_argument("--latency-ms", type=int, default=600, help="Mock broker response time per chunk")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent chunk requests")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    populate_symbols([("SBIN", "779521::::3045")])
+
+    MockKiteHandler.latency = args.latency_ms / 1000
+    server = start_mock_broker(MockKiteHandler)
+
+    from broker.zerodha.api.data import BrokerData
+    data = BrokerData("api_key:access_token")
+
+    print(f"Mock Kite API on port {server.server_address[1]}, {args.days} days of 1m bars, {args.latency_ms} ms per chunk")
+    print(f"{'mode':>12} {'seconds':>8} {'bars':>8} {'chunks':>7} {'peak req/s':>11}")
+    results = {}
+    for label, workers in (("sequential", 1), ("concurrent", args.workers)):
+        elapsed, bars, chunks, peak = run(data, args.days, workers)
+        results[label] = (elapsed, bars)
+        print(f"{label:>12} {elapsed:>8.2f} {bars:>8,} {chunks:>7} {peak:>11}")
+
+    assert results["sequential"][1] == results["concurrent"][1]
+    print(f"Speedup: {results['sequential'][0] / results['concurrent'][0]:.1f}x")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
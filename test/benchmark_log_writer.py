@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Order Endpoint Log Overhead Benchmark
+Measures request latency (p50/p95/p99) of a stub order endpoint wrapped the
+way /api/v1/placeorder is: TrafficLoggerMiddleware around the app,
+track_latency('PLACE') around the view, and an API order log submitted to the
+apilog executor. The view does no broker work, so the timings are the logging
+overhead.
+
+Runs once with synchronous per-row commits (log_writer disabled) and once
+with the batched background writer (database/log_writer.py). Traffic, latency
+and API log databases are temporary SQLite files.
+
+Usage:
+    python test/benchmark_log_writer.py
+    python test/benchmark_log_writer.py --requests 5000 --threads 8
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Add parent directory to path to import database modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Point the log databases at scratch files before the database modules are imported
+_db_dir = tempfile.mkdtemp(prefix="log_writer_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'openalgo.db')}"
+os.environ["LOGS_DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'logs.db')}"
+os.environ["LATENCY_DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'latency.db')}"
+
+import numpy as np
+from flask import Flask, jsonify, request
+
+from database import apilog_db, latency_db, traffic_db
+from database.apilog_db import async_log_order, executor as log_executor
+from database.log_writer import log_writer
+from utils.latency_monitor import track_latency
+from utils.traffic_logger import TrafficLoggerMiddleware
+
+ORDER = {"strategy": "bench", "symbol": "SBIN", "exchange": "NSE", "action": "BUY",
+         "quantity": "1", "pricetype": "MARKET", "product": "MIS"}
+
+
+def create_app():
+    app = Flask(__name__)
+
+    @app.route("/api/v1/placeorder", methods=["POST"])
+    @track_latency("PLACE")
+    def place_order():
+        data = request.get_json()
+        response = {"status": "success", "orderid": "250101000000001"}
+        log_executor.submit(async_log_order, "placeorder", data, response)
+        return jsonify(response)
+
+    app.wsgi_app = TrafficLoggerMiddleware(app.wsgi_app)
+    return app
+
+
+def wait_for_logs(expected):
+    """Wait until every request's three log rows are in the databases"""
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        log_writer.flush()
+        counts = (
+            traffic_db.TrafficLog.query.count(),
+            latency_db.OrderLatency.query.count(),
+            apilog_db.OrderLog.query.count()
+        )
+        traffic_db.logs_session.remove()
+        latency_db.latency_session.remove()
+        apilog_db.db_session.remove()
+        if min(counts) >= expected:
+            return counts
+        time.sleep(0.05)
+    return counts
+
+
+def run(app, batched, requests, threads):
+    for table, session in ((traffic_db.TrafficLog, traffic_db.logs_session),
+                           (latency_db.OrderLatency, latency_db.latency_session),
+                           (apilog_db.OrderLog, apilog_db.db_session)):
+        session.execute(table.__table__.delete())
+        session.commit()
+        session.remove()
+    log_writer.enabled = batched
+
+    timings = []
+    per_thread = requests // threads
+
+    def client_loop():
+        client = app.test_client()
+        local = []
+        for _ in range(per_thread):
+            start = time.perf_counter()
+            response = client.post("/api/v1/placeorder", json=ORDER)
+            local.append((time.perf_counter() - start) * 1000)
+            assert response.status_code == 200
+        timings.extend(local)
+
+    workers = [threading.Thread(target=client_loop) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    counts = wait_for_logs(per_thread * threads)
+    return np.array(timings), elapsed, counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark order endpoint latency with and without the batched log writer")
+    parser.add_argument("--requests", type=int, default=4000, help="Total requests per run")
+    parser.add_argument("--threads", type=int, default=8, help="Concurrent clients")
+    args = parser.parse_args()
+
+    # Per-request logs would dominate the timings
+    logging.disable(logging.WARNING)
+    traffic_db.init_logs_db()
+    latency_db.init_latency_db()
+    apilog_db.init_db()
+    app = create_app()
+
+    print(f"Databases: {_db_dir} ({args.requests:,} requests, {args.threads} clients)")
+    print(f"{'logging':>10} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'rows written':>20}")
+    for label, batched in (("sync", False), ("batched", True)):
+        timings, elapsed, counts = run(app, batched, args.requests, args.threads)
+        p50, p95, p99 = np.percentile(timings, [50, 95, 99])
+        print(f"{label:>10} {len(timings) / elapsed:>8,.0f} {p50:>8.2f} {p95:>8.2f} {p99:>8.2f} {str(counts):>20}")
+
+    print(f"Log writer: {log_writer.stats()}")
+
+
+if __name__ == "__main__":
+    main()
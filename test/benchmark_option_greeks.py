@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Option Greeks Chain Benchmark
+Compares computing IV and Greeks for a whole option chain the per-symbol way
+(get_option_greeks once per option: two quote calls and scalar py_vollib math
+each) with get_multi_option_greeks (one multiquote call and vectorized
+Black-76 for all options).
+
+Broker quote calls are replaced by in-process fakes with a configurable
+latency, so no broker login is needed. The fake prices come from Black-76 with
+a volatility smile, and the two paths are checked to return the same results.
+
+Usage:
+    python test/benchmark_option_greeks.py
+    python test/benchmark_option_greeks.py --strikes 40 --quote-latency-ms 50
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+import warnings
+from datetime import datetime, timedelta
+
+# Add parent directory to path to import services
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables from parent directory (database modules need them)
+from dotenv import load_dotenv
+env_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env')
+load_dotenv(env_path)
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+import numpy as np
+import services.quotes_service as quotes_service
+import services.option_greeks_service as greeks_service
+
+SPOT = 24250.5
+STRIKE_STEP = 50
+INTEREST_RATE = 6.5
+
+
+def build_chain(strikes, days):
+    """Option symbols of a synthetic NIFTY chain and their Black-76 prices"""
+    expiry = (datetime.now() + timedelta(days=days)).strftime('%d%b%y').upper()
+    atm = round(SPOT / STRIKE_STEP) * STRIKE_STEP
+    t = days / 365.0
+    prices = {("NIFTY", "NSE_INDEX"): SPOT}
+    symbols = []
+    for k in range(atm - strikes * STRIKE_STEP, atm + (strikes + 1) * STRIKE_STEP, STRIKE_STEP):
+        sigma = 0.12 + 5 * np.log(k / SPOT) ** 2  # Simple smile
+        for opt_type in ("CE", "PE"):
+            price = greeks_service.black76_price(
+                np.array([SPOT]), np.array([float(k)]), np.array([t]), np.array([INTEREST_RATE / 100]),
+                np.array([sigma]), np.array([opt_type == "CE"])
+            )[0]
+            symbol = f"NIFTY{expiry}{k}{opt_type}"
+            prices[(symbol, "NFO")] = max(round(float(price) / 0.05) * 0.05, 0.05)
+            symbols.append({"symbol": symbol, "exchange": "NFO"})
+    return symbols, prices
+
+
+def install_fake_quotes(prices, latency):
+    """Replace broker quote calls with fakes that sleep `latency` seconds per call"""
+    calls = {"quotes": 0, "multiquotes": 0}
+
+    def get_quotes(symbol, exchange, api_key=None):
+        calls["quotes"] += 1
+        time.sleep(latency)
+        return True, {"status": "success", "data": {"ltp": prices[(symbol, exchange)]}}, 200
+
+    def get_multiquotes(symbols, api_key=None):
+        calls["multiquotes"] += 1
+        time.sleep(latency)
+        return True, {"status": "success", "results": [
+            {"symbol": s["symbol"], "exchange": s["exchange"], "data": {"ltp": prices[(s["symbol"], s["exchange"])]}}
+            for s in symbols
+        ]}, 200
+
+    quotes_service.get_quotes = get_quotes
+    quotes_service.get_multiquotes = get_multiquotes
+    return calls
+
+
+def per_symbol(symbols):
+    """One get_option_greeks call per option"""
+    return [
+        greeks_service.get_option_greeks(item["symbol"], item["exchange"], interest_rate=INTEREST_RATE)[1]
+        for item in symbols
+    ]
+
+
+def batch(symbols):
+    """One get_multi_option_greeks call for the chain"""
+    return greeks_service.get_multi_option_greeks(symbols, interest_rate=INTEREST_RATE)[1]["data"]
+
+
+def _timed(run, symbols):
+    start = time.perf_counter()
+    run(symbols)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-symbol vs batch option Greeks")
+    parser.add_argument("--strikes", type=int, default=40, help="Strikes on each side of ATM (2 options per strike)")
+    parser.add_argument("--days", type=float, default=7, help="Days to expiry")
+    parser.add_argument("--quote-latency-ms", type=float, default=30, help="Simulated broker quote call latency")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per path (best is reported)")
+    args = parser.parse_args()
+
+    # Per-symbol logging would dominate the timings
+    logging.disable(logging.INFO)
+
+    symbols, prices = build_chain(args.strikes, args.days)
+    print(f"Chain: {len(symbols)} options, quote latency {args.quote_latency_ms:.0f} ms")
+
+    # Compare results with no quote latency; freeze the clock so both paths see the same time to expiry
+    frozen_now = datetime.now()
+
+    class FrozenDateTime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return frozen_now
+
+    greeks_service.datetime = FrozenDateTime
+    install_fake_quotes(prices, 0)
+    for scalar, vector in zip(per_symbol(symbols), batch(symbols)):
+        assert scalar["status"] == vector["status"], (scalar, vector)
+        if scalar["status"] == "success":
+            assert abs(scalar["implied_volatility"] - vector["implied_volatility"]) <= 0.011, (scalar, vector)
+            for name, value in scalar["greeks"].items():
+                assert abs(value - vector["greeks"][name]) <= 2e-4 * max(1.0, abs(value)), (name, scalar, vector)
+    greeks_service.datetime = datetime
+
+    print(f"{'path':>12} {'quote calls':>12} {'compute ms':>11} {'total ms':>9} {'options/s':>10}")
+    for name, run in (("per-symbol", per_symbol), ("batch", batch)):
+        # Math alone (no quote latency)
+        install_fake_quotes(prices, 0)
+        compute = min(_timed(run, symbols) for _ in range(args.repeat))
+
+        calls = install_fake_quotes(prices, args.quote_latency_ms / 1000.0)
+        total = _timed(run, symbols)
+        quote_calls = calls["quotes"] + calls["multiquotes"]
+        print(f"{name:>12} {quote_calls:>12} {compute * 1000:>11.1f} {total * 1000:>9.1f} {len(symbols) / total:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Sandbox Fill Throughput Benchmark
+Measures how many paper-order fills per second the sandbox execution engine
+writes at 100, 1000 and 10000 simultaneous fills, comparing the per-order path
+(ExecutionEngine._process_order: trade, position and fund commits per order)
+with ExecutionEngine.execute_orders (SandboxUnitOfWork: one bulk transaction
+per user).
+
+Orders, positions and funds are written to a temporary SQLite sandbox
+database, and every order is given a quote that crosses its limit, so no
+broker login or market data is needed.
+
+Usage:
+    python test/benchmark_sandbox_fills.py
+    python test/benchmark_sandbox_fills.py --fills 100,1000,10000 --users 20 --legacy-max 10000
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from decimal import Decimal
+
+# Add parent directory to path to import sandbox modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Point the sandbox database at a scratch file before database.sandbox_db is imported
+_db_dir = tempfile.mkdtemp(prefix="sandbox_fills_bench_")
+os.environ["SANDBOX_DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'sandbox.db')}"
+
+from database.sandbox_db import (
+    SandboxOrders, SandboxTrades, SandboxPositions, SandboxFunds,
+    db_session, init_db
+)
+from sandbox.execution_engine import ExecutionEngine
+
+SYMBOLS = [f"STOCK{i}" for i in range(50)]
+STARTING_CAPITAL = Decimal("10000000.00")
+MARGIN_PER_UNIT = Decimal("20.00")
+
+
+def populate(fills, users, seed=42):
+    """Write `fills` crossing LIMIT orders plus some existing positions; return the quotes"""
+    rng = random.Random(seed)
+    user_ids = [f"user{i}" for i in range(users)]
+    for table in (SandboxTrades, SandboxOrders, SandboxPositions, SandboxFunds):
+        db_session.execute(table.__table__.delete())
+
+    now = datetime.now()
+    used_margin = dict.fromkeys(user_ids, Decimal("0.00"))
+    positions = []
+    for user_id in user_ids:
+        for symbol in rng.sample(SYMBOLS, 10):
+            quantity = rng.choice([-30, -20, -10, 10, 20, 30])
+            margin = abs(quantity) * MARGIN_PER_UNIT
+            used_margin[user_id] += margin
+            positions.append({
+                "user_id": user_id, "symbol": symbol, "exchange": "NSE", "product": "MIS",
+                "quantity": quantity, "average_price": Decimal("100.00"), "ltp": Decimal("100.00"),
+                "pnl": Decimal("0.00"), "pnl_percent": Decimal("0.00"),
+                "accumulated_realized_pnl": Decimal("0.00"), "margin_blocked": margin, "created_at": now
+            })
+
+    orders = []
+    for i in range(fills):
+        user_id = rng.choice(user_ids)
+        quantity = rng.choice([10, 20, 30])
+        margin = quantity * MARGIN_PER_UNIT
+        used_margin[user_id] += margin
+        orders.append({
+            "orderid": f"BENCH{i:06d}", "user_id": user_id, "strategy": "benchmark",
+            "symbol": rng.choice(SYMBOLS), "exchange": "NSE", "action": rng.choice(["BUY", "SELL"]),
+            "quantity": quantity, "price": None, "trigger_price": None, "price_type": "LIMIT",
+            "product": "MIS", "order_status": "open", "filled_quantity": 0, "pending_quantity": quantity,
+            "margin_blocked": margin, "order_timestamp": now, "update_timestamp": now
+        })
+    # Limit prices that the quote below always crosses: BUY above it, SELL below it
+    quotes = {symbol: {"ltp": rng.randrange(9500, 10500) / 100, "bid": 0, "ask": 0} for symbol in SYMBOLS}
+    for order in orders:
+        ltp = Decimal(str(quotes[order["symbol"]]["ltp"]))
+        order["price"] = ltp + Decimal("1.00") if order["action"] == "BUY" else ltp - Decimal("1.00")
+
+    funds = [{
+        "user_id": user_id, "total_capital": STARTING_CAPITAL,
+        "available_balance": STARTING_CAPITAL - used_margin[user_id], "used_margin": used_margin[user_id],
+        "realized_pnl": Decimal("0.00"), "unrealized_pnl": Decimal("0.00"), "total_pnl": Decimal("0.00"),
+        "last_reset_date": now, "reset_count": 0
+    } for user_id in user_ids]
+
+    db_session.execute(SandboxPositions.__table__.insert(), positions)
+    db_session.execute(SandboxOrders.__table__.insert(), orders)
+    db_session.execute(SandboxFunds.__table__.insert(), funds)
+    db_session.commit()
+    db_session.remove()
+    return quotes
+
+
+def per_order(engine, candidates):
+    """The per-order path the execution engine used before batching"""
+    for order, quote in candidates:
+        engine._process_order(order, quote)
+
+
+def batched(engine, candidates):
+    engine.execute_orders(candidates)
+
+
+def snapshot():
+    """Positions and funds after a run, used to check both paths agree"""
+    db_session.remove()
+    positions = sorted(
+        (p.user_id, p.symbol, p.quantity, p.average_price, p.margin_blocked, p.accumulated_realized_pnl)
+        for p in SandboxPositions.query.all()
+    )
+    funds = sorted((f.user_id, f.available_balance, f.used_margin, f.realized_pnl) for f in SandboxFunds.query.all())
+    trades = SandboxTrades.query.count()
+    db_session.remove()
+    return positions, funds, trades
+
+
+def run(path, fills, users):
+    """Populate, execute every order through `path` and return (seconds, snapshot)"""
+    quotes = populate(fills, users)
+    engine = ExecutionEngine()
+    orders = SandboxOrders.query.filter_by(order_status="open").order_by(SandboxOrders.id).all()
+    candidates = [(order, quotes[order.symbol]) for order in orders]
+
+    start = time.perf_counter()
+    path(engine, candidates)
+    elapsed = time.perf_counter() - start
+
+    result = snapshot()
+    assert result[2] == fills, f"expected {fills} trades, got {result[2]}"
+    return elapsed, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sandbox fill throughput")
+    parser.add_argument("--fills", default="100,1000,10000", help="Comma separated fill counts")
+    parser.add_argument("--users", type=int, default=20, help="Users the orders are spread across")
+    parser.add_argument("--legacy-max", type=int, default=1000,
+                        help="Largest fill count to run through the slow per-order path")
+    args = parser.parse_args()
+
+    # Per-fill logs (and the margin reconciliation warnings) would dominate the timings
+    logging.disable(logging.WARNING)
+    init_db()
+
+    print(f"Sandbox database: {os.environ['SANDBOX_DATABASE_URL']} ({args.users} users)")
+    print(f"{'fills':>7} {'path':>10} {'seconds':>9} {'fills/s':>10}")
+    for fills in [int(f) for f in args.fills.split(",")]:
+        batched_time, batched_result = run(batched, fills, args.users)
+        if fills <= args.legacy_max:
+            legacy_time, legacy_result = run(per_order, fills, args.users)
+            assert legacy_result == batched_result, "per-order and batched results differ"
+            print(f"{fills:>7} {'per-order':>10} {legacy_time:>9.3f} {fills / legacy_time:>10,.0f}")
+        else:
+            print(f"{fills:>7} {'per-order':>10} {'skipped (raise --legacy-max)':>20}")
+        print(f"{fills:>7} {'batched':>10} {batched_time:>9.3f} {fills / batched_time:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Sandbox Replay Throughput Benchmark
+Replays a synthetic trading day (a random walk per symbol from 09:15 to 15:30
+IST) through sandbox.replay.SandboxReplay as fast as possible and reports
+ticks per second, with an in-process strategy placing LIMIT and MARKET orders
+through the sandbox OrderManager so the ticks also drive real fills.
+
+The symbol master and the sandbox database are temporary SQLite files, so no
+broker login or market data is needed. Target: 1M ticks in under a minute on
+one core.
+
+Usage:
+    python test/benchmark_sandbox_replay.py
+    python test/benchmark_sandbox_replay.py --ticks 1000000 --symbols 20 --order-every 2000
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Add parent directory to path to import sandbox modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Point the symbol and sandbox databases at scratch files before the database modules are imported
+_db_dir = tempfile.mkdtemp(prefix="sandbox_replay_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'symbols.db')}"
+os.environ["SANDBOX_DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'sandbox.db')}"
+
+import pytz
+
+from database import symbol as symbol_db
+from database.sandbox_db import SandboxOrders, SandboxPositions, SandboxTrades, SandboxFunds, db_session, init_db
+from sandbox.fund_manager import initialize_user_funds
+from sandbox.order_manager import OrderManager
+from sandbox.replay import SandboxReplay
+
+USER_ID = "replay_bench"
+SESSION_START = pytz.timezone("Asia/Kolkata").localize(datetime(2026, 1, 12, 9, 15)).timestamp()
+SESSION_SECONDS = 6 * 3600 + 15 * 60
+
+
+def populate_symbols(count):
+    symbol_db.init_db()
+    names = [f"STOCK{i}" for i in range(count)]
+    with symbol_db.engine.begin() as conn:
+        conn.execute(symbol_db.SymToken.__table__.delete())
+        conn.execute(symbol_db.SymToken.__table__.insert(), [{
+            "symbol": name, "brsymbol": f"{name}-EQ", "name": name, "exchange": "NSE",
+            "brexchange": "NSE", "token": str(1000 + i), "expiry": "", "strike": -1.0,
+            "lotsize": 1, "instrumenttype": "EQ", "tick_size": 0.05
+        } for i, name in enumerate(names)])
+    return names
+
+
+def synthetic_day(symbols, ticks, seed=7):
+    """Random-walk ticks spread evenly over the session, round-robin across symbols"""
+    rng = random.Random(seed)
+    prices = {symbol: 100.0 + 10 * i for i, symbol in enumerate(symbols)}
+    step = SESSION_SECONDS / ticks
+    count = len(symbols)
+    for i in range(ticks):
+        symbol = symbols[i % count]
+        price = prices[symbol] = round(max(1.0, prices[symbol] + rng.choice((-0.05, 0.0, 0.05))), 2)
+        yield SESSION_START + i * step, symbol, "NSE", price, 1
+
+
+def make_strategy(order_every):
+    """Every `order_every` ticks, place a LIMIT just below the market or a MARKET order"""
+    manager = OrderManager(USER_ID)
+    state = {"ticks": 0, "orders": 0}
+
+    def on_tick(data):
+        state["ticks"] += 1
+        if state["ticks"] % order_every:
+            return
+        ltp = data["data"]["ltp"]
+        action = "BUY" if state["orders"] % 4 < 2 else "SELL"
+        order = {
+            "symbol": data["symbol"], "exchange": data["exchange"], "action": action,
+            "quantity": 1, "product": "MIS", "strategy": "replay_bench"
+        }
+        if state["orders"] % 2:
+            order.update(price_type="MARKET", price=0)
+        else:
+            offset = -0.1 if action == "BUY" else 0.1
+            order.update(price_type="LIMIT", price=round(ltp + offset, 2))
+        success, response, _ = manager.place_order(order)
+        if success:
+            state["orders"] += 1
+
+    return on_tick, state
+
+
+def run(symbols, ticks, order_every):
+    for table in (SandboxTrades, SandboxOrders, SandboxPositions, SandboxFunds):
+        db_session.execute(table.__table__.delete())
+    db_session.commit()
+    db_session.remove()
+    initialize_user_funds(USER_ID)
+
+    replay = SandboxReplay()
+    state = {"orders": 0}
+    if order_every:
+        strategy, state = make_strategy(order_every)
+        replay.add_listener(strategy)
+
+    start = time.perf_counter()
+    summary = replay.run(synthetic_day(symbols, ticks))
+    elapsed = time.perf_counter() - start
+
+    trades = SandboxTrades.query.count()
+    db_session.remove()
+    return elapsed, summary, state["orders"], trades
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sandbox replay throughput")
+    parser.add_argument("--ticks", type=int, default=1_000_000, help="Ticks in the replayed day")
+    parser.add_argument("--symbols", type=int, default=20, help="Symbols in the replayed day")
+    parser.add_argument("--order-every", type=int, default=2000,
+                        help="Ticks between strategy orders (0 = replay without a strategy)")
+    args = parser.parse_args()
+
+    # Per-order and per-fill logs would dominate the timings
+    logging.disable(logging.WARNING)
+    init_db()
+    symbols = populate_symbols(args.symbols)
+
+    print(f"Databases: {_db_dir} ({args.ticks:,} ticks, {args.symbols} symbols)")
+    print(f"{'run':>10} {'seconds':>9} {'ticks/s':>10} {'orders':>7} {'fills':>6}")
+    for label, order_every in (("feed only", 0), ("strategy", args.order_every)):
+        if label == "strategy" and not order_every:
+            continue
+        elapsed, summary, orders, trades = run(symbols, args.ticks, order_every)
+        assert summary["ticks"] == args.ticks
+        print(f"{label:>10} {elapsed:>9.2f} {args.ticks / elapsed:>10,.0f} {orders:>7} {trades:>6}")
+
+    print(f"Target: {args.ticks:,} ticks in under 60s -> {'met' if elapsed < 60 else 'missed'}")
+
+
+if __name__ == "__main__":
+    main()
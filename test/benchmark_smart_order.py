@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Smart Order Burst Benchmark
+Times a burst of smart orders, as fired by a TradingView strategy at bar
+close, through Zerodha's order_api against a local mock of the Kite API:
+
+- legacy:   broker place_smartorder_api (one positionbook request per smart
+            order) followed by the SMART_ORDER_DELAY sleep, one order at a time
+            as place_smart_order_service did
+- state:    services/position_state_service.place_smartorder_from_state,
+            concurrently (one positionbook request per snapshot, deltas
+            computed locally, no sleep)
+
+The mock answers every request after --latency-ms and keeps its own net
+positions, so the benchmark also checks that both modes end at the target
+positions. The symbol master is a temporary SQLite file.
+
+Usage:
+    python test/benchmark_smart_order.py
+    python test/benchmark_smart_order.py --orders 20 --latency-ms 150 --delay 0.5
+"""
+
+import argparse
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+from mock_broker import MockBrokerHandler, populate_symbols, start_mock_broker, use_scratch_databases
+
+# Point the databases at scratch files before the database modules are imported
+use_scratch_databases("smart_order_bench_")
+os.environ.setdefault("SMART_ORDER_POSITION_TTL", "2")
+
+
+class MockKiteHandler(MockBrokerHandler):
+    """/portfolio/positions and /orders/regular with a fixed delay; orders fill at once"""
+
+    latency = 0.1
+    positions = {}
+    positionbook_requests = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        with self.lock:
+            MockKiteHandler.positionbook_requests += 1
+            net = [{"tradingsymbol": symbol, "exchange": "NSE", "product": "MIS", "quantity": quantity,
+                    "average_price": 100.0, "last_price": 100.0, "pnl": 0.0}
+                   for symbol, quantity in self.positions.items()]
+        self.reply({"status": "success", "data": {"net": net, "day": net}})
+
+    def do_POST(self):
+        form = parse_qs(self.read_body().decode())
+        time.sleep(self.latency)
+        quantity = int(form["quantity"][0]) * (1 if form["transaction_type"][0] == "BUY" else -1)
+        with self.lock:
+            symbol = form["tradingsymbol"][0]
+            self.positions[symbol] = self.positions.get(symbol, 0) + quantity
+        self.reply({"status": "success", "data": {"order_id": "250101000000001"}})
+
+
+def smart_orders(symbols, target):
+    return [{"strategy": "bench", "symbol": symbol, "exchange": "NSE", "action": "BUY", "product": "MIS",
+             "pricetype": "MARKET", "quantity": "1", "position_size": str(target), "price": "0",
+             "trigger_price": "0", "disclosed_quantity": "0"} for symbol in symbols]
+
+
+def run_legacy(order_api, orders, delay):
+    for order in orders:
+        order_api.place_smartorder_api(dict(order), "api_key:access_token")
+        time.sleep(delay)
+
+
+def run_state(order_api, orders, workers):
+    from services.position_state_service import place_smartorder_from_state
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda order: place_smartorder_from_state(order_api, dict(order), "api_key:access_token", "zerodha"), orders))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark a burst of smart orders with and without the position state")
+    parser.add_argument("--orders", type=int, default=20, help="Smart orders in the burst (one symbol each)")
+    parser.add_argument("--latency-ms", type=int, default=150, help="Mock broker response time per request")
+    parser.add_argument("--delay", type=float, default=0.5, help="SMART_ORDER_DELAY of the legacy path")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent smart orders in state mode")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    symbols = [f"SYM{i}" for i in range(args.orders)]
+    populate_symbols([(symbol, str(1000 + i)) for i, symbol in enumerate(symbols)])
+    from database.settings_db import init_db as init_settings_db
+    init_settings_db()
+
+    MockKiteHandler.latency = args.latency_ms / 1000
+    server = start_mock_broker(MockKiteHandler)
+
+    from broker.zerodha.api import order_api
+
+    print(f"Mock Kite API on port {server.server_address[1]}, {args.orders} smart orders, {args.latency_ms} ms per request")
+    print(f"{'mode':>8} {'seconds':>8} {'ms/order':>9} {'positionbook':>13} {'positions ok':>13}")
+    for label, target in (("legacy", 10), ("state", 10)):
+        MockKiteHandler.positions = {symbol: 5 for symbol in symbols}
+        MockKiteHandler.positionbook_requests = 0
+        orders = smart_orders(symbols, target)
+
+        start = time.perf_counter()
+        if label == "legacy":
+            run_legacy(order_api, orders, args.delay)
+        else:
+            run_state(order_api, orders, args.workers)
+        elapsed = time.perf_counter() - start
+
+        ok = all(quantity == target for quantity in MockKiteHandler.positions.values())
+        print(f"{label:>8} {elapsed:>8.2f} {elapsed * 1000 / args.orders:>9.1f} "
+              f"{MockKiteHandler.positionbook_requests:>13} {str(ok):>13}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Streaming Adapter Tick Throughput Benchmark
+Measures how many ticks/sec each broker streaming adapter turns into ZeroMQ
+publishes (subscription lookup, normalization, publish) with 10, 1000 and
+5000 subscribed symbols. With the token index the rate should not depend on
+the number of subscriptions.
+
+Angel ticks are synthetic binary Quote packets decoded by SmartWebSocketV2;
+the JSON brokers (5paisa, Firstock, DefinEdge, INDmoney) get synthetic
+decoded messages in their wire format. Symbols are written to a temporary
+SQLite master contract, so no broker login is needed; publishes go to the
+adapter's real ZeroMQ PUB socket (no subscriber attached).
+
+Usage:
+    python test/benchmark_streaming_adapters.py
+    python test/benchmark_streaming_adapters.py --subscriptions 10,1000,5000 --ticks 50000 --brokers angel,firstock
+"""
+
+import argparse
+import logging
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+
+# Add parent directory to path to import broker modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables from parent directory (database modules need them)
+from dotenv import load_dotenv
+env_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env')
+load_dotenv(env_path)
+
+# Point the symbol database at a scratch file before database.symbol is imported
+_db_dir = tempfile.mkdtemp(prefix="streaming_adapter_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'symbols.db')}"
+
+from database.symbol import SymToken, engine, init_db
+from websocket_proxy import create_broker_adapter
+
+BROKERS = ["angel", "fivepaisa", "firstock", "definedge", "indmoney"]
+
+# Angel Quote packet: mode, exchange type, 25 byte token, then little-endian fields up to byte 123
+ANGEL_QUOTE = struct.Struct("<BB25sqqqqqqdd4q")
+
+
+def populate_symbols(count):
+    init_db()
+    with engine.begin() as conn:
+        conn.execute(SymToken.__table__.delete())
+        conn.execute(SymToken.__table__.insert(), [{
+            "symbol": f"STOCK{i}", "brsymbol": f"STOCK{i}-EQ", "name": f"STOCK{i}", "exchange": "NSE",
+            "brexchange": "NSE", "token": str(10000 + i), "expiry": "", "strike": -1.0,
+            "lotsize": 1, "instrumenttype": "EQ", "tick_size": 0.05
+        } for i in range(count)])
+
+
+def make_adapter(broker):
+    adapter = create_broker_adapter(broker)
+    assert adapter is not None, f"No streaming adapter registered for {broker}"
+    return adapter
+
+
+def synthetic_ticks(broker, subscriptions, ticks, seed=11):
+    """Wire-format messages for random subscribed symbols, plus the decoder to apply first"""
+    rng = random.Random(seed)
+    subs = list(subscriptions.values())
+    messages = []
+    for i in range(ticks):
+        sub = rng.choice(subs)
+        token = sub["token"]
+        paise = rng.randrange(10000, 500000)
+        if broker == "angel":
+            messages.append(ANGEL_QUOTE.pack(
+                2, sub["exchange_type"], token.encode(), i, 1760000000000 + i, paise,
+                75, paise, 1000 + i, 125000.0, 98000.0, paise - 500, paise + 900, paise - 900, paise - 100
+            ))
+        elif broker == "fivepaisa":
+            messages.append({
+                "Token": int(token), "Exch": "N", "ExchType": "C", "LastRate": paise / 100,
+                "LastQty": 75, "TotalQty": 1000 + i, "OpenRate": paise / 100 - 5, "High": paise / 100 + 9,
+                "Low": paise / 100 - 9, "PClose": paise / 100 - 1, "AvgRate": paise / 100,
+                "BidRate": paise / 100 - 0.05, "OffRate": paise / 100 + 0.05, "TickDt": "/Date(1760000000000)/"
+            })
+        elif broker == "firstock":
+            messages.append({
+                "c_symbol": token, "c_exch_seg": sub["brexchange"], "i_last_traded_price": paise,
+                "i_last_traded_quantity": 75, "i_volume": 1000 + i, "i_open_price": paise - 500,
+                "i_high_price": paise + 900, "i_low_price": paise - 900, "i_close_price": paise - 100,
+                "i_average_price": paise, "i_last_trade_time": 1760000000 + i
+            })
+        elif broker == "definedge":
+            messages.append({
+                "t": "tf", "e": sub["definedge_exchange"], "tk": token, "lp": str(paise / 100),
+                "v": str(1000 + i), "o": str(paise / 100 - 5), "h": str(paise / 100 + 9),
+                "l": str(paise / 100 - 9), "c": str(paise / 100 - 1), "ap": str(paise / 100)
+            })
+        else:
+            messages.append({
+                "mode": "quote", "instrument": token, "timestamp": 1760000000000 + i,
+                "data": {"ltp": paise / 100, "volume": 1000 + i, "open": paise / 100 - 5,
+                         "high": paise / 100 + 9, "low": paise / 100 - 9, "close": paise / 100 - 1}
+            })
+
+    decode = None
+    if broker == "angel":
+        from broker.angel.streaming.smartWebSocketV2 import SmartWebSocketV2
+        decode = SmartWebSocketV2.__new__(SmartWebSocketV2)._parse_binary_data
+    return messages, decode
+
+
+def run(broker, symbols, ticks):
+    adapter = make_adapter(broker)
+    try:
+        for i in range(symbols):
+            result = adapter.subscribe(f"STOCK{i}", "NSE", 2)
+            assert result["status"] == "success", result
+        messages, decode = synthetic_ticks(broker, adapter.subscriptions, ticks)
+
+        published = 0
+        publish = adapter.publish_market_data
+
+        def counting_publish(topic, data):
+            nonlocal published
+            published += 1
+            publish(topic, data)
+
+        adapter.publish_market_data = counting_publish
+        on_data = adapter._on_data
+
+        start = time.perf_counter()
+        if decode:
+            for message in messages:
+                on_data(None, decode(message))
+        else:
+            for message in messages:
+                on_data(None, message)
+        elapsed = time.perf_counter() - start
+        assert published >= ticks, f"{broker}: {published} publishes for {ticks} ticks"
+        return elapsed
+    finally:
+        adapter.cleanup_zmq()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streaming adapter tick throughput")
+    parser.add_argument("--subscriptions", default="10,1000,5000", help="Comma separated subscription counts")
+    parser.add_argument("--ticks", type=int, default=50000, help="Ticks per run")
+    parser.add_argument("--brokers", default=",".join(BROKERS), help="Comma separated adapters to run")
+    args = parser.parse_args()
+
+    # Hot-path debug logs stay off, as in production
+    logging.disable(logging.WARNING)
+    counts = [int(c) for c in args.subscriptions.split(",")]
+    populate_symbols(max(counts))
+
+    print(f"Symbol database: {os.environ['DATABASE_URL']} ({args.ticks:,} ticks per run)")
+    print(f"{'broker':>10} {'subs':>6} {'seconds':>9} {'ticks/s':>10}")
+    for broker in args.brokers.split(","):
+        for count in counts:
+            elapsed = run(broker, count, args.ticks)
+            print(f"{broker:>10} {count:>6} {elapsed:>9.3f} {args.ticks / elapsed:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Symbol Cache Memory / Load-Time Benchmark
+Compares the previous BrokerSymbolCache layout (ORM query.all(), one SymbolData
+object per row, four tuple-keyed dict indexes) with the columnar SymbolTable
+(bulk SELECT, interned strings, NumPy numeric columns, row-id indexes), and
+with the memory-mapped snapshot: "publish" is the downloading process building
+and writing it, "attach" is any other process mapping it.
+
+A synthetic F&O master contract is written to a temporary SQLite database, so
+no broker login or master contract download is needed.
+
+Usage:
+    python test/benchmark_symbol_cache.py
+    python test/benchmark_symbol_cache.py --rows 150000 --lookups 200000
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Add parent directory to path to import database modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Point the symbol database at a scratch file before database.symbol is imported
+_db_dir = tempfile.mkdtemp(prefix="symbol_cache_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'symbols.db')}"
+SNAPSHOT_PATH = os.path.join(_db_dir, "symbol_cache.snapshot")
+
+from database.symbol import SymToken, engine, db_session, init_db
+from database.token_db_enhanced import BrokerSymbolCache, SymbolData
+
+UNDERLYINGS = ["NIFTY", "BANKNIFTY", "FINNIFTY", "MIDCPNIFTY", "SENSEX"] + [f"STOCK{i}" for i in range(200)]
+EXPIRIES = ["30-OCT-26", "06-NOV-26", "13-NOV-26", "20-NOV-26", "27-NOV-26", "24-DEC-26", "28-JAN-27"]
+
+
+def populate(rows):
+    """Write a synthetic master contract with `rows` option/future contracts"""
+    init_db()
+    rng = random.Random(42)
+    records = []
+    token = 100000
+    while len(records) < rows:
+        name = rng.choice(UNDERLYINGS)
+        expiry = rng.choice(EXPIRIES)
+        exchange = "BFO" if name == "SENSEX" else "NFO"
+        compact_expiry = expiry.replace("-", "")
+        strike = float(rng.randrange(100, 60000, 50))
+        for suffix, instrumenttype in (("CE", "CE"), ("PE", "PE")):
+            token += 1
+            records.append({
+                "symbol": f"{name}{compact_expiry}{int(strike)}{suffix}",
+                "brsymbol": f"{name}{compact_expiry}{int(strike)}{suffix}",
+                "name": name,
+                "exchange": exchange,
+                "brexchange": exchange,
+                "token": str(token),
+                "expiry": expiry,
+                "strike": strike,
+                "lotsize": rng.choice([15, 25, 50, 75, 500, 1000]),
+                "instrumenttype": instrumenttype,
+                "tick_size": 0.05
+            })
+    with engine.begin() as conn:
+        conn.execute(SymToken.__table__.delete())
+        conn.execute(SymToken.__table__.insert(), records[:rows])
+    return records[:rows]
+
+
+def legacy_load():
+    """The pre-columnar load_all_symbols body, kept here for comparison"""
+    symbols = {}
+    by_symbol_exchange = {}
+    by_token_exchange = {}
+    by_brsymbol_exchange = {}
+    by_token = {}
+    for sym in SymToken.query.all():
+        symbol_data = SymbolData(
+            symbol=sym.symbol, brsymbol=sym.brsymbol, name=sym.name, exchange=sym.exchange,
+            brexchange=sym.brexchange, token=sym.token, expiry=sym.expiry, strike=sym.strike,
+            lotsize=sym.lotsize, instrumenttype=sym.instrumenttype, tick_size=sym.tick_size
+        )
+        symbols[sym.token] = symbol_data
+        by_symbol_exchange[(sym.symbol, sym.exchange)] = symbol_data
+        by_token_exchange[(sym.token, sym.exchange)] = symbol_data
+        by_brsymbol_exchange[(sym.brsymbol, sym.exchange)] = symbol_data
+        by_token[sym.token] = symbol_data
+    db_session.remove()
+    return symbols, by_symbol_exchange, by_token_exchange, by_brsymbol_exchange, by_token
+
+
+def legacy_get_token(by_symbol_exchange, symbol, exchange):
+    """The pre-columnar BrokerSymbolCache.get_token lookup"""
+    key = (symbol, exchange)
+    if key in by_symbol_exchange:
+        return by_symbol_exchange[key].token
+    return None
+
+
+def columnar_load():
+    """Build the in-process columnar table from the database, without a snapshot"""
+    os.environ["SYMBOL_CACHE_SNAPSHOT"] = ""
+    cache = BrokerSymbolCache()
+    assert cache.load_all_symbols("benchmark")
+    return cache
+
+
+def snapshot_publish():
+    """Build the table, write the shared snapshot and map it (the downloading process)"""
+    os.environ["SYMBOL_CACHE_SNAPSHOT"] = SNAPSHOT_PATH
+    cache = BrokerSymbolCache()
+    assert cache.load_all_symbols("benchmark")
+    return cache
+
+
+def snapshot_attach():
+    """Map an existing snapshot (every other process)"""
+    os.environ["SYMBOL_CACHE_SNAPSHOT"] = SNAPSHOT_PATH
+    cache = BrokerSymbolCache()
+    cache.sync_snapshot()
+    assert cache.cache_loaded
+    return cache
+
+
+SEARCHES = [
+    ("search_symbols('NIFTY')", lambda cache: cache.search_symbols("NIFTY", limit=50)),
+    ("search_symbols('BANKNIFTY 25000 CE')", lambda cache: cache.search_symbols("BANKNIFTY 25000 CE", limit=50)),
+    ("search_symbols('100123')", lambda cache: cache.search_symbols("100123", limit=50)),
+    ("fno_search_symbols(query='ST')", lambda cache: cache.fno_search_symbols(query="ST")),
+    ("fno_search_symbols(underlying, expiry, CE)",
+     lambda cache: cache.fno_search_symbols(underlying="NIFTY", expiry="06-NOV-26", instrumenttype="CE")),
+    ("fno_search_symbols(exchange, expiry, strike_min)",
+     lambda cache: cache.fno_search_symbols(exchange="NFO", expiry="13-NOV-26", strike_min=1000)),
+]
+
+
+def measure(loader):
+    """Return (seconds, retained MB, peak MB, result) for one load"""
+    gc.collect()
+    start = time.perf_counter()
+    loader()
+    elapsed = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    result = loader()
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, retained / (1024 * 1024), peak / (1024 * 1024), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark symbol cache memory and load time")
+    parser.add_argument("--rows", type=int, default=150000, help="Contracts in the synthetic master contract")
+    parser.add_argument("--lookups", type=int, default=200000, help="get_token lookups to time")
+    args = parser.parse_args()
+
+    print(f"Writing {args.rows:,} synthetic contracts to {os.environ['DATABASE_URL']}")
+    records = populate(args.rows)
+
+    legacy_time, legacy_mb, legacy_peak, legacy = measure(legacy_load)
+    results = [("legacy", legacy_time, legacy_mb, legacy_peak, None)]
+    for name, loader in (("columnar", columnar_load), ("publish", snapshot_publish), ("attach", snapshot_attach)):
+        results.append((name,) + measure(loader))
+
+    # Every layout must answer lookups exactly like the legacy one
+    by_symbol_exchange = legacy[1]
+    for _, _, _, _, cache in results[1:]:
+        for record in records[::97]:
+            key = (record["symbol"], record["exchange"])
+            assert cache.get_token(*key) == by_symbol_exchange[key].token
+            assert cache.get_symbol_info(*key) == by_symbol_exchange[key]
+
+    keys = [(r["symbol"], r["exchange"]) for r in random.Random(7).choices(records, k=args.lookups)]
+    print(f"{'layout':>10} {'load s':>8} {'retained MB':>12} {'peak MB':>9} {'get_token ns':>13}")
+    for name, elapsed, retained, peak, cache in results:
+        start = time.perf_counter()
+        if cache is None:
+            for symbol, exchange in keys:
+                legacy_get_token(by_symbol_exchange, symbol, exchange)
+        else:
+            for symbol, exchange in keys:
+                cache.get_token(symbol, exchange)
+        lookup = time.perf_counter() - start
+        print(f"{name:>10} {elapsed:>8.3f} {retained:>12.1f} {peak:>9.1f} {lookup / args.lookups * 1e9:>13.0f}")
+
+    print(f"Snapshot file: {os.path.getsize(SNAPSHOT_PATH) / (1024 * 1024):.1f} MB, mapped by every process "
+          f"(retained MB above counts only heap allocations)")
+
+    cache = results[1][4]
+    print(f"\n{'search':<60} {'results':>8} {'ms':>8}")
+    for label, search in SEARCHES:
+        start = time.perf_counter()
+        for _ in range(10):
+            found = search(cache)
+        print(f"{label:<60} {len(found):>8} {(time.perf_counter() - start) / 10 * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
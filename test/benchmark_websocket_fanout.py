@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+WebSocket Proxy Fan-out Benchmark
+Measures how many market data ticks/sec WebSocketProxy can fan out to 1, 100
+and 1000 connected clients, comparing the legacy per-client path
+(dict copy + json.dumps + awaited send per client) with
+WebSocketProxy.broadcast_market_data (encode once + per-client send queues).
+
+Everything runs on localhost: real WebSocket connections are opened against an
+in-process server, but no broker, ZeroMQ publisher or database is involved.
+
+Usage:
+    python test/benchmark_websocket_fanout.py
+    python test/benchmark_websocket_fanout.py --clients 1,100,1000 --deliveries 200000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+# Add parent directory to path to import websocket_proxy
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables from parent directory (database modules need them)
+from dotenv import load_dotenv
+env_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env')
+load_dotenv(env_path)
+
+import websockets
+from websocket_proxy.server import WebSocketProxy
+
+HOST = "127.0.0.1"
+PORT = int(os.getenv('BENCHMARK_WS_PORT', '8799'))
+SYMBOL, EXCHANGE, MODE = "NIFTY28OCT2625000CE", "NFO", 2
+BROKER = "angel"
+
+# A representative Quote-mode payload as published by the adapters
+SAMPLE_QUOTE = {
+    "symbol": SYMBOL, "exchange": EXCHANGE, "mode": MODE, "ltp": 152.35,
+    "ltt": 1760000000000, "volume": 18234525, "open": 140.1, "high": 171.45,
+    "low": 133.0, "close": 145.2, "last_quantity": 75, "average_price": 151.87,
+    "total_buy_quantity": 1254300, "total_sell_quantity": 984525,
+    "timestamp": 1760000000123
+}
+
+
+def make_proxy():
+    """Create a WebSocketProxy without binding ports or connecting to ZeroMQ"""
+    proxy = WebSocketProxy.__new__(WebSocketProxy)
+    proxy.clients = {}
+    proxy.subscriptions = {}
+    proxy.user_mapping = {}
+    proxy.user_broker_mapping = {1: BROKER}
+    proxy.client_encodings = {}
+    proxy.send_queues = {}
+    proxy.client_queue_size = 1000
+    return proxy
+
+
+async def legacy_fanout(proxy, payload, client_ids):
+    """The pre-broadcast zmq_listener fan-out, kept here for comparison"""
+    market_data = json.loads(payload.decode('utf-8'))
+    base_message = {
+        "type": "market_data",
+        "symbol": SYMBOL,
+        "exchange": EXCHANGE,
+        "mode": MODE,
+        "data": market_data
+    }
+    send_tasks = []
+    for client_id in client_ids:
+        if client_id not in proxy.clients:
+            continue
+        user_id = proxy.user_mapping.get(client_id)
+        if not user_id:
+            continue
+        message = base_message.copy()
+        message["broker"] = BROKER
+        send_tasks.append(proxy.send_message(client_id, message))
+    if send_tasks:
+        await asyncio.gather(*send_tasks, return_exceptions=True)
+
+
+async def run_case(proxy, num_clients, ticks, path):
+    """Connect num_clients, publish ticks through the given path and time it"""
+    received = [0]
+    done = asyncio.Event()
+    expected = num_clients * ticks
+    # Use a distinct symbol per tick so the queued path delivers every tick instead of conflating
+    symbols = [f"{SYMBOL}{i}" for i in range(ticks)]
+
+    async def reader(ws):
+        async for _ in ws:
+            received[0] += 1
+            if received[0] >= expected:
+                done.set()
+
+    client_connections = [await websockets.connect(f"ws://{HOST}:{PORT}", max_queue=None)
+                          for _ in range(num_clients)]
+    while len(proxy.clients) < num_clients:
+        await asyncio.sleep(0.01)
+
+    reader_tasks = [asyncio.create_task(reader(ws)) for ws in client_connections]
+    client_ids = set(proxy.clients)
+    payload = json.dumps(SAMPLE_QUOTE).encode('utf-8')
+
+    fanout_time = 0.0
+    start = time.perf_counter()
+    for symbol in symbols:
+        t0 = time.perf_counter()
+        if path == "legacy":
+            await legacy_fanout(proxy, payload, client_ids)
+        else:
+            proxy.broadcast_market_data(BROKER, symbol, EXCHANGE, MODE, payload, client_ids)
+        fanout_time += time.perf_counter() - t0
+        # Give the event loop a turn so transports can flush, as zmq_listener does between receives
+        await asyncio.sleep(0)
+    await asyncio.wait_for(done.wait(), timeout=300)
+    elapsed = time.perf_counter() - start
+
+    for ws in client_connections:
+        await ws.close()
+    for task in reader_tasks:
+        task.cancel()
+    while proxy.clients:
+        await asyncio.sleep(0.01)
+
+    return {
+        "fanout_ticks_per_sec": ticks / fanout_time if fanout_time else float("inf"),
+        "end_to_end_ticks_per_sec": ticks / elapsed,
+        "deliveries_per_sec": expected / elapsed
+    }
+
+
+async def main(client_counts, deliveries):
+    proxy = make_proxy()
+
+    async def handler(websocket):
+        client_id = id(websocket)
+        proxy.clients[client_id] = websocket
+        proxy.user_mapping[client_id] = 1
+        proxy.create_send_queue(client_id, websocket)
+        try:
+            await websocket.wait_closed()
+        finally:
+            proxy.clients.pop(client_id, None)
+            proxy.user_mapping.pop(client_id, None)
+            proxy.send_queues.pop(client_id).close()
+
+    async with websockets.serve(handler, HOST, PORT):
+        print(f"{'clients':>8} {'path':>10} {'fan-out ticks/s':>16} {'e2e ticks/s':>12} {'deliveries/s':>13}")
+        for num_clients in client_counts:
+            ticks = max(50, deliveries // num_clients)
+            for path in ("legacy", "queued"):
+                result = await run_case(proxy, num_clients, ticks, path)
+                print(f"{num_clients:>8} {path:>10} {result['fanout_ticks_per_sec']:>16,.0f} "
+                      f"{result['end_to_end_ticks_per_sec']:>12,.0f} {result['deliveries_per_sec']:>13,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark WebSocket proxy market data fan-out")
+    parser.add_argument("--clients", default="1,100,1000", help="Comma separated client counts")
+    parser.add_argument("--deliveries", type=int, default=200000,
+                        help="Approximate messages delivered per case (ticks = deliveries / clients)")
+    args = parser.parse_args()
+
+    # Each client needs two sockets in this process (client and server side)
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    except (ImportError, ValueError):
+        pass  # Windows, or not permitted to raise the limit
+
+    asyncio.run(main([int(c) for c in args.clients.split(",")], args.deliveries))
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+ZeroMQ Listener Latency Benchmark
+Measures end-to-end latency from adapter publish (ZeroMQ PUB) to WebSocket
+client receive under bursty load (~20k ticks/sec by default), comparing the
+legacy `wait_for(recv_multipart(), 0.3)` loop with the event-driven drain loop
+in WebSocketProxy.zmq_listener.
+
+The publisher and the WebSocket clients run in separate processes; the proxy
+runs in this process. Latency is measured with time.time_ns() stamped into the
+payload by the publisher. Coalesced ticks are measured on the newest payload
+that reaches the client.
+
+Usage:
+    python test/benchmark_zmq_listener_latency.py
+    python test/benchmark_zmq_listener_latency.py --rate 20000 --duration 5 --symbols 200 --clients 1
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing as mp
+import os
+import sys
+import time
+
+# Add parent directory to path to import websocket_proxy
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables from parent directory (database modules need them)
+from dotenv import load_dotenv
+env_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env')
+load_dotenv(env_path)
+
+HOST = "127.0.0.1"
+BROKER = "angel"
+EXCHANGE = "NSE"
+
+
+def run_publisher(zmq_port, rate, duration, symbols, ready):
+    """Publish Quote ticks in 10ms bursts, like an adapter feed thread"""
+    import zmq
+    context = zmq.Context()
+    socket = context.socket(zmq.PUB)
+    socket.setsockopt(zmq.SNDHWM, 100000)
+    socket.bind(f"tcp://{HOST}:{zmq_port}")
+    ready.wait()
+    time.sleep(1.0)  # Let the proxy's SUB socket finish connecting
+
+    topics = [f"{BROKER}_{EXCHANGE}_SYM{i}_QUOTE".encode('utf-8') for i in range(symbols)]
+    burst = max(1, rate // 100)
+    sent = 0
+    start = time.perf_counter()
+    next_burst = start
+    while time.perf_counter() - start < duration:
+        for _ in range(burst):
+            i = sent % symbols
+            payload = {"symbol": f"SYM{i}", "exchange": EXCHANGE, "mode": 2,
+                       "ltp": 100.0 + sent % 50, "volume": sent, "ts": time.time_ns()}
+            socket.send_multipart([topics[i], json.dumps(payload).encode('utf-8')])
+            sent += 1
+        next_burst += 0.01
+        delay = next_burst - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    socket.close(linger=1000)
+    context.term()
+
+
+def run_clients(ws_port, num_clients, duration, connected, results):
+    """Connect WebSocket clients and record publish-to-receive latency"""
+    import websockets
+
+    async def client(latencies):
+        async with websockets.connect(f"ws://{HOST}:{ws_port}", max_queue=None) as ws:
+            counters[0] += 1
+            if counters[0] == num_clients:
+                connected.set()
+            try:
+                while True:
+                    message = await asyncio.wait_for(ws.recv(), timeout=3.0)
+                    latencies.append(time.time_ns() - json.loads(message)["data"]["ts"])
+            except (asyncio.TimeoutError, websockets.exceptions.ConnectionClosed):
+                pass
+
+    async def main():
+        latencies = []
+        await asyncio.gather(*(client(latencies) for _ in range(num_clients)))
+        results.put(latencies)
+
+    counters = [0]
+    asyncio.run(main())
+
+
+async def run_case(proxy_class, ws_port, zmq_port, args):
+    """Run one publisher/proxy/clients session and return latencies in ms"""
+    os.environ["ZMQ_PORT"] = str(zmq_port)
+    import websockets
+    proxy = proxy_class(host=HOST, port=ws_port)
+    proxy.running = True
+    proxy.user_broker_mapping[1] = BROKER
+    sub_keys = [(f"SYM{i}", EXCHANGE, 2) for i in range(args.symbols)]
+
+    async def handler(websocket):
+        client_id = id(websocket)
+        proxy.clients[client_id] = websocket
+        proxy.user_mapping[client_id] = 1
+        for sub_key in sub_keys:
+            proxy.subscription_index[sub_key].add(client_id)
+        proxy.create_send_queue(client_id, websocket)
+        try:
+            await websocket.wait_closed()
+        finally:
+            proxy.clients.pop(client_id, None)
+            proxy.user_mapping.pop(client_id, None)
+            proxy.send_queues.pop(client_id).close()
+
+    ctx = mp.get_context("spawn")
+    connected = ctx.Event()
+    results = ctx.Queue()
+    async with websockets.serve(handler, HOST, ws_port):
+        listener = asyncio.create_task(proxy.zmq_listener())
+        clients = ctx.Process(target=run_clients, args=(ws_port, args.clients, args.duration, connected, results))
+        publisher = ctx.Process(target=run_publisher, args=(zmq_port, args.rate, args.duration, args.symbols, connected))
+        clients.start()
+        publisher.start()
+        latencies = await asyncio.get_running_loop().run_in_executor(None, results.get)
+        proxy.running = False
+        await listener
+        clients.join()
+        publisher.join()
+
+    proxy.socket.close(linger=0)
+    proxy.context.term()
+    return sorted(latency / 1e6 for latency in latencies)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return float("nan")
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ZeroMQ -> WebSocket latency in the proxy")
+    parser.add_argument("--rate", type=int, default=20000, help="Published ticks per second")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds to publish for")
+    parser.add_argument("--symbols", type=int, default=200, help="Distinct symbols in the feed")
+    parser.add_argument("--clients", type=int, default=1, help="WebSocket clients subscribed to every symbol")
+    parser.add_argument("--ws-port", type=int, default=8798)
+    parser.add_argument("--zmq-port", type=int, default=5598)
+    args = parser.parse_args()
+
+    from websocket_proxy.server import WebSocketProxy
+
+    class LegacyListenerProxy(WebSocketProxy):
+        """Proxy using the previous 0.3s wait_for receive loop, one message per turn"""
+
+        async def zmq_listener(self):
+            while self.running:
+                try:
+                    topic, data = await asyncio.wait_for(self.socket.recv_multipart(), timeout=0.3)
+                except asyncio.TimeoutError:
+                    continue
+                self.route_market_data(topic, data)
+
+    print(f"rate={args.rate}/s duration={args.duration}s symbols={args.symbols} clients={args.clients}")
+    print(f"{'listener':>12} {'received':>10} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'p99.9 ms':>9} {'max ms':>8}")
+    for name, proxy_class, offset in (("legacy", LegacyListenerProxy, 0), ("event-drain", WebSocketProxy, 1)):
+        latencies = asyncio.run(run_case(proxy_class, args.ws_port + offset, args.zmq_port + offset, args))
+        print(f"{name:>12} {len(latencies):>10,} {percentile(latencies, 50):>8.2f} {percentile(latencies, 90):>8.2f} "
+              f"{percentile(latencies, 99):>8.2f} {percentile(latencies, 99.9):>9.2f} "
+              f"{(latencies[-1] if latencies else float('nan')):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Mock broker scaffolding shared by the benchmarks
+
+The benchmarks run a broker module against a local HTTP server that answers
+like the broker's REST API after a fixed latency:
+
+- use_scratch_databases() points DATABASE_URL at a temporary SQLite file; call
+  it before any database module is imported
+- MockBrokerHandler is the base request handler (JSON replies, request start
+  times for peak_rate(), no request logging)
+- start_mock_broker() serves a handler class and points the pooled
+  utils/httpx_client at it, so every broker request lands on the mock
+- populate_symbols() fills the symbol master with the symbols the benchmark uses
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add parent directory to path to import the app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def use_scratch_databases(prefix):
+    """
+    Point DATABASE_URL at a new temporary SQLite file
+
+    Returns:
+        str: the temporary directory, for other scratch databases
+    """
+    db_dir = tempfile.mkdtemp(prefix=prefix)
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(db_dir, 'openalgo.db')}"
+    os.environ.setdefault("API_KEY_PEPPER", "0" * 64)
+    return db_dir
+
+
+class MockBrokerHandler(BaseHTTPRequestHandler):
+    """Base handler: subclasses implement do_GET/do_POST/... and sleep `latency` per request"""
+
+    protocol_version = "HTTP/1.1"
+    latency = 0.1
+    request_times = []
+
+    def record_request(self):
+        """Note the start of a request counted by peak_rate()"""
+        type(self).request_times.append(time.monotonic())
+
+    def read_body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def reply(self, payload, status=200):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_mock_broker(handler_class):
+    """
+    Serve handler_class on a local port and send every httpx_client request there
+
+    Returns:
+        ThreadingHTTPServer: call shutdown() when done
+    """
+    import httpx
+    from utils import httpx_client
+
+    class RedirectTransport(httpx.HTTPTransport):
+        """Sends every request to the mock server instead of the broker"""
+
+        def handle_request(self, request):
+            request.url = request.url.copy_with(scheme="http", host="127.0.0.1", port=server.server_address[1])
+            return super().handle_request(request)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler_class)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    httpx_client._httpx_client = httpx.Client(transport=RedirectTransport(), timeout=30)
+    return server
+
+
+def populate_symbols(symbols):
+    """
+    Replace the symbol master with NSE equities
+
+    Args:
+        symbols: list of (symbol, token) tuples
+    """
+    from database.symbol import SymToken, engine, init_db
+
+    init_db()
+    with engine.begin() as conn:
+        conn.execute(SymToken.__table__.delete())
+        conn.execute(SymToken.__table__.insert(), [{
+            "symbol": symbol, "brsymbol": symbol, "name": symbol, "exchange": "NSE", "brexchange": "NSE",
+            "token": token, "expiry": "", "strike": -1.0, "lotsize": 1,
+            "instrumenttype": "EQ", "tick_size": 0.05
+        } for symbol, token in symbols])
+
+
+def peak_rate(times):
+    """Most requests started within any one-second window (times sorted)"""
+    peak = 0
+    start = 0
+    for end in range(len(times)):
+        while times[end] - times[start] >= 1.0:
+            start += 1
+        peak = max(peak, end - start + 1)
+    return peak
@@ -0,0 +1,204 @@
+"""
+Unit tests for the smart order position state (services/position_state_service.py)
+
+Checks the generic smart order sizing against zerodha's place_smartorder_api
+and the expected-position transitions, with the broker's positionbook,
+orderbook and order API stubbed.
+
+Run with: python -m pytest test/test_position_state.py -v
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Add parent directory to path to import services
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Point the databases at scratch files before the database modules are imported
+_db_dir = tempfile.mkdtemp(prefix="position_state_test_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_db_dir, 'openalgo.db')}")
+os.environ.setdefault("API_KEY_PEPPER", "0" * 64)
+
+from broker.zerodha.api import order_api as zerodha_order_api
+from services import orderbook_service, position_state_service, positionbook_service
+from services.position_state_service import (
+    compute_smart_order,
+    get_position_state,
+    place_smartorder_from_state,
+    position_key,
+)
+
+SYMBOL = "SBIN"
+KEY = position_key(SYMBOL, "NSE", "MIS")
+
+
+class Response:
+    status = 200
+
+
+class FakeBroker:
+    """Order API, positionbook and orderbook of one symbol, in OpenAlgo format"""
+
+    def __init__(self, position=0):
+        self.position = position
+        self.fill_orders = True
+        self.order_status = "complete"
+        self.placed = []
+        self.positionbook_requests = 0
+
+    def place_order_api(self, data, auth_token):
+        self.placed.append((data["action"], data["quantity"]))
+        if self.fill_orders:
+            quantity = int(data["quantity"])
+            self.position += quantity if data["action"] == "BUY" else -quantity
+        return Response(), {"status": "success"}, str(len(self.placed))
+
+    def get_positionbook_with_auth(self, auth_token, broker, original_data=None):
+        self.positionbook_requests += 1
+        return True, {"status": "success", "data": [
+            {"symbol": SYMBOL, "exchange": "NSE", "product": "MIS", "quantity": self.position}
+        ]}, 200
+
+    def get_orderbook_with_auth(self, auth_token, broker, original_data=None):
+        orders = [{"orderid": str(i + 1), "order_status": self.order_status} for i in range(len(self.placed))]
+        return True, {"status": "success", "data": {"orders": orders}}, 200
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    fake = FakeBroker()
+    monkeypatch.setattr(positionbook_service, "get_positionbook_with_auth", fake.get_positionbook_with_auth)
+    monkeypatch.setattr(orderbook_service, "get_orderbook_with_auth", fake.get_orderbook_with_auth)
+    monkeypatch.setattr(position_state_service, "SMART_ORDER_POSITION_TTL", "2")
+    position_state_service._states.clear()
+    return fake
+
+
+def smart_order(position_size, quantity=1, action="BUY", pricetype="MARKET"):
+    return {"symbol": SYMBOL, "exchange": "NSE", "product": "MIS", "action": action, "pricetype": pricetype,
+            "quantity": str(quantity), "position_size": str(position_size), "price": "0",
+            "trigger_price": "0", "disclosed_quantity": "0", "strategy": "test"}
+
+
+def place(broker, position_size, **kwargs):
+    return place_smartorder_from_state(broker, smart_order(position_size, **kwargs), "token", "zerodha")
+
+
+class TestComputeSmartOrder:
+    """compute_smart_order places the same order as zerodha's place_smartorder_api"""
+
+    @pytest.mark.parametrize("position_size,current_position,quantity", [
+        (10, 0, 1),      # entry long from flat
+        (-10, 0, 1),     # entry short from flat
+        (15, 10, 1),     # add to long
+        (5, 10, 1),      # reduce long
+        (-15, -10, 1),   # add to short
+        (0, 10, 1),      # exit long
+        (0, -10, 0),     # exit short
+        (-10, 10, 1),    # flip long to short
+        (10, -10, 1),    # flip short to long
+        (10, 10, 5),     # position matches, with quantity
+        (10, 10, 0),     # position matches, quantity 0
+        (0, 0, 0),       # flat exit with quantity 0
+    ])
+    def test_matches_zerodha(self, monkeypatch, position_size, current_position, quantity):
+        placed = []
+        monkeypatch.setattr(zerodha_order_api, "get_open_position", lambda *args: str(current_position))
+        monkeypatch.setattr(zerodha_order_api, "place_order_api",
+                            lambda data, auth: placed.append((data["action"], int(data["quantity"]))) or (Response(), {}, "1"))
+        zerodha_order_api.place_smartorder_api(smart_order(position_size, quantity), "token")
+
+        action, order_quantity, message = compute_smart_order(position_size, current_position, quantity)
+        assert placed == ([(action, order_quantity)] if action else [])
+        if action is None:
+            assert message
+
+    def test_flat_with_quantity_is_left_to_the_broker(self, broker):
+        """position_size 0 on a flat position: the broker's place_smartorder_api decides"""
+        assert place(broker, 0, quantity=5) is None
+        assert broker.placed == []
+
+
+class TestPositionState:
+    """Expected positions, reconciliation and rejected orders"""
+
+    def test_burst_shares_one_positionbook_request(self, broker):
+        place(broker, 10)
+        place(broker, 20)
+        assert broker.placed == [("BUY", "10"), ("BUY", "10")]
+        assert broker.positionbook_requests == 1
+        quantity, _, orderids = get_position_state("token", "zerodha").expected[KEY]
+        assert (quantity, orderids) == (20, ("1", "2"))
+
+    def test_refresh_drops_confirmed_expectation(self, broker):
+        place(broker, 10)
+        state = get_position_state("token", "zerodha")
+        assert state.is_pending(KEY)
+        state.refresh("token")
+        assert not state.is_pending(KEY)
+        assert state.get_position(KEY, "token", 2) == 10
+
+    def test_refresh_keeps_unconfirmed_expectation(self, broker):
+        broker.fill_orders = False
+        place(broker, 10)
+        state = get_position_state("token", "zerodha")
+        state.refresh("token")
+        assert state.is_pending(KEY)
+        assert state.get_position(KEY, "token", 2) == 10
+
+    def test_expectation_expires(self, broker, monkeypatch):
+        broker.fill_orders = False
+        place(broker, 10)
+        monkeypatch.setattr(position_state_service, "ORDER_SETTLE_SECONDS", 0)
+        state = get_position_state("token", "zerodha")
+        assert not state.is_pending(KEY)
+        assert state.get_position(KEY, "token", 2) == 0
+
+    def test_limit_order_is_not_expected(self, broker):
+        place(broker, 10, pricetype="LIMIT")
+        state = get_position_state("token", "zerodha")
+        assert not state.is_pending(KEY)
+        assert not state.is_fresh(2)
+
+    def test_exit_after_confirmed_entry(self, broker):
+        place(broker, 10)
+        place(broker, 0)
+        assert broker.placed == [("BUY", "10"), ("SELL", "10")]
+        assert broker.position == 0
+
+    def test_rejected_entry_does_not_open_a_short(self, broker):
+        """Broker acknowledges the BUY and rejects it later: the exit must not sell"""
+        broker.fill_orders = False
+        broker.order_status = "rejected"
+        place(broker, 10)
+        res, response, orderid = place(broker, 0, quantity=0)
+        assert res is None and orderid is None
+        assert broker.placed == [("BUY", "10")]
+        assert not get_position_state("token", "zerodha").is_pending(KEY)
+
+    def test_rejected_entry_exit_with_quantity_falls_back(self, broker):
+        broker.fill_orders = False
+        broker.order_status = "rejected"
+        place(broker, 10)
+        assert place(broker, 0, quantity=10) is None
+        assert broker.placed == [("BUY", "10")]
+
+    def test_unconfirmed_entry_falls_back_before_reducing(self, broker):
+        """Order acknowledged but not in the positionbook yet: no SELL from the expectation"""
+        broker.fill_orders = False
+        broker.order_status = "open"
+        place(broker, 10)
+        assert place(broker, 0) is None
+        assert place(broker, -10) is None
+        assert place(broker, 10) is None
+        assert broker.placed == [("BUY", "10")]
+
+    def test_unconfirmed_entry_can_be_added_to(self, broker):
+        broker.fill_orders = False
+        place(broker, 10)
+        place(broker, 15)
+        assert broker.placed == [("BUY", "10"), ("BUY", "5")]
+        assert broker.positionbook_requests == 1
@@ -0,0 +1,196 @@
+"""
+Unit tests for the per-broker rate limiter (utils/rate_limiter.py)
+
+Runs the limiter on a fake clock, so the window limit and the round-robin
+order between clients are checked without depending on real timing.
+
+Run with: python -m pytest test/test_rate_limiter.py -v
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# Add parent directory to path to import utils
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import order_dispatch, rate_limiter
+from utils.rate_limiter import RateLimiter, rate_limit_client
+
+
+class FakeClock:
+    """Monotonic clock that only moves when the test advances it"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.limiter = None
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+        # Wake waiting calls, which otherwise sleep in real time
+        with self.limiter._cond:
+            self.limiter._cond.notify_all()
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out waiting for the limiter")
+        time.sleep(0.001)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_limiter(clock, rate, period=1.0):
+    limiter = RateLimiter(rate, period, clock=clock)
+    clock.limiter = limiter
+    return limiter
+
+
+def queue_acquire(limiter, client, served, label):
+    """Start a blocked acquire() and return once it is queued"""
+    depth = limiter.stats()["queue_depth"]
+    thread = threading.Thread(target=lambda: served.append((label, limiter.acquire(client))), daemon=True)
+    thread.start()
+    wait_until(lambda: limiter.stats()["queue_depth"] == depth + 1)
+    return thread
+
+
+class TestWindowLimit:
+    """No window of `period` seconds sees more than `rate` calls"""
+
+    def test_burst_up_to_capacity(self, clock):
+        limiter = make_limiter(clock, 3)
+        assert [limiter.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert limiter.stats()["delayed"] == 0
+
+    def test_call_over_capacity_waits_for_the_oldest_slot(self, clock):
+        limiter = make_limiter(clock, 3)
+        for _ in range(3):
+            limiter.acquire()
+            clock.advance(0.2)
+
+        served = []
+        thread = queue_acquire(limiter, None, served, "late")
+        clock.advance(0.3)
+        time.sleep(0.05)
+        assert served == []
+
+        # The first slot returns one period after it was used
+        clock.advance(0.1)
+        thread.join(2)
+        assert served == [("late", pytest.approx(0.4))]
+
+    def test_slots_return_one_by_one(self, clock):
+        limiter = make_limiter(clock, 2)
+        limiter.acquire()
+        clock.advance(0.5)
+        limiter.acquire()
+        clock.advance(0.5)
+        assert limiter.acquire() == 0.0
+
+        served = []
+        thread = queue_acquire(limiter, None, served, "late")
+        clock.advance(0.4)
+        time.sleep(0.05)
+        assert served == []
+        clock.advance(0.1)
+        thread.join(2)
+        assert served == [("late", pytest.approx(0.5))]
+
+    def test_rate_below_one_per_second(self, clock):
+        limiter = RateLimiter(0.5, clock=clock)
+        assert limiter.capacity == 1
+        assert limiter.period == pytest.approx(rate_limiter.RATE_WINDOW_SECONDS * 2)
+
+
+class TestFairness:
+    """Waiting calls are served round-robin by client"""
+
+    def test_clients_take_turns(self, clock):
+        limiter = make_limiter(clock, 1)
+        limiter.acquire()
+
+        served = []
+        basket, single = object(), object()
+        threads = [queue_acquire(limiter, basket, served, "basket") for _ in range(3)]
+        threads += [queue_acquire(limiter, single, served, "single") for _ in range(2)]
+
+        for count in range(1, 6):
+            clock.advance(1.0)
+            wait_until(lambda: len(served) == count)
+
+        for thread in threads:
+            thread.join(2)
+        assert [label for label, _ in served] == ["basket", "single", "basket", "single", "basket"]
+
+    def test_context_client_is_used_without_explicit_client(self, clock):
+        limiter = make_limiter(clock, 1)
+        limiter.acquire()
+        client = object()
+
+        def acquire_as_client():
+            with rate_limit_client(client):
+                limiter.acquire()
+
+        threads = [threading.Thread(target=acquire_as_client, daemon=True) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        wait_until(lambda: limiter.stats()["queue_depth"] == 2)
+        assert list(limiter._waiting) == [client]
+
+        for count in (2, 3):
+            clock.advance(1.0)
+            wait_until(lambda: limiter.stats()["acquired"] == count)
+        for thread in threads:
+            thread.join(2)
+
+    def test_dispatch_bulk_calls_share_one_client(self):
+        def current_client(item):
+            return rate_limiter._current_client.get()
+
+        first = [client for client, _ in order_dispatch.dispatch_bulk(current_client, list(range(5)), "test", paced=False)]
+        second = [client for client, _ in order_dispatch.dispatch_bulk(current_client, list(range(5)), "test", paced=False)]
+        assert first[0] is not None
+        assert all(client is first[0] for client in first)
+        assert all(client is second[0] for client in second)
+        assert first[0] is not second[0]
+        assert rate_limiter._current_client.get() is None
+
+
+class TestMetrics:
+    """stats() reports queue depth and waits"""
+
+    def test_stats(self, clock):
+        limiter = make_limiter(clock, 1)
+        limiter.acquire()
+
+        served = []
+        threads = [queue_acquire(limiter, object(), served, i) for i in range(2)]
+        assert limiter.stats()["queue_depth"] == 2
+
+        clock.advance(1.0)
+        wait_until(lambda: len(served) == 1)
+        clock.advance(1.0)
+        wait_until(lambda: len(served) == 2)
+        for thread in threads:
+            thread.join(2)
+
+        stats = limiter.stats()
+        assert stats["capacity"] == 1
+        assert stats["queue_depth"] == 0
+        assert stats["max_queue_depth"] == 2
+        assert stats["acquired"] == 3
+        assert stats["delayed"] == 2
+        assert stats["max_wait_ms"] == 2000.0
+        assert stats["avg_wait_ms"] == 1000.0
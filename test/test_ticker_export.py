@@ -0,0 +1,84 @@
+"""
+Unit tests for the /api/v1/ticker txt/csv export (restx_api/ticker.py)
+
+Checks that the column-wise export renders exactly the text of the per-row
+iterrows() loop it replaced, for float, integer, mixed and empty frames.
+
+Run with: python -m pytest test/test_ticker_export.py -v
+"""
+
+import os
+import sys
+import tempfile
+
+import pandas as pd
+import pytest
+
+# Add parent directory to path to import restx_api
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Point the databases at scratch files before the database modules are imported
+_db_dir = tempfile.mkdtemp(prefix="ticker_export_test_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_db_dir, 'openalgo.db')}")
+os.environ.setdefault("API_KEY_PEPPER", "0" * 64)
+
+from restx_api.ticker import convert_timestamp, export_frame, render_export, stream_export
+
+SYMBOL = "NSE:SBIN"
+# 2025-01-01 09:15:00 IST and the following minutes
+TIMESTAMPS = [1735703100, 1735703160, 1735703220]
+
+
+def per_row_export(df, interval):
+    """The txt body as the iterrows() loop built it before export_frame()"""
+    text_output = []
+    for _, row in df.iterrows():
+        timestamp = convert_timestamp(row['timestamp'], interval)
+        volume = int(row['volume'])
+        if interval.upper() == 'D':
+            text_output.append(f"{SYMBOL},{timestamp},{row['open']},{row['high']},{row['low']},{row['close']},{volume}")
+        else:
+            date, time = timestamp
+            text_output.append(f"{SYMBOL},{date},{time},{row['open']},{row['high']},{row['low']},{row['close']},{volume}")
+    return '\n'.join(text_output)
+
+
+def bars(open_, high, low, close, volume):
+    return pd.DataFrame({'timestamp': TIMESTAMPS, 'open': open_, 'high': high, 'low': low,
+                         'close': close, 'volume': volume})
+
+
+FRAMES = {
+    'float': bars([100.5, 101.25, 99.0], [102.0, 103.5, 100.1], [99.95, 100.0, 98.7], [101.0, 102.3, 99.4],
+                  [1500.0, 2300.7, 0.0]),
+    'int': bars([100, 101, 99], [102, 103, 100], [99, 100, 98], [101, 102, 99], [1500, 2300, 0]),
+    'int prices, float volume': bars([100, 101, 99], [102, 103, 100], [99, 100, 98], [101, 102, 99],
+                                     [1500.0, 2300.5, 0.0]),
+    'float timestamps': bars([100, 101, 99], [102, 103, 100], [99, 100, 98], [101, 102, 99],
+                             [1500, 2300, 0]).astype({'timestamp': 'float64'}),
+    'empty': pd.DataFrame(),
+    'empty with columns': pd.DataFrame(columns=['timestamp', 'open', 'high', 'low', 'close', 'volume']),
+}
+
+
+class TestExportText:
+    """render_export(export_frame(...)) matches the per-row loop"""
+
+    @pytest.mark.parametrize("interval", ["1m", "D"])
+    @pytest.mark.parametrize("name", list(FRAMES))
+    def test_matches_per_row_loop(self, name, interval):
+        df = FRAMES[name]
+        frame = export_frame(df, SYMBOL, interval)
+        # The route drops the final newline of the unstreamed body
+        assert render_export(frame)[:-1] == per_row_export(df, interval)
+        assert ''.join(stream_export(frame, chunk_rows=2)) == per_row_export(df, interval)
+
+    def test_int_prices_stay_integers(self):
+        line = render_export(export_frame(FRAMES['int'], SYMBOL, "1m")).splitlines()[0]
+        assert line == "NSE:SBIN,2025-01-01,09:15:00,100,102,99,101,1500"
+
+    def test_csv_header(self):
+        text = render_export(export_frame(FRAMES['float'], SYMBOL, "D"), header=True)
+        assert text.splitlines()[0] == "Ticker,Date,Open,High,Low,Close,Volume"
+        assert render_export(export_frame(FRAMES['empty'], SYMBOL, "1m"), header=True) == \
+            "Ticker,Date,Time,Open,High,Low,Close,Volume\n"
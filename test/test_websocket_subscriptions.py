@@ -0,0 +1,210 @@
+"""
+Unit tests for the WebSocket proxy's subscription bookkeeping (websocket_proxy/server.py)
+
+Feeds the proxy the subscribe/unsubscribe messages services/websocket_client
+sends and checks what reaches the broker adapter, directly and through the
+sharded AdapterHost (websocket_proxy/sharding.py).
+
+Run with: python -m pytest test/test_websocket_subscriptions.py -v
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+
+import pytest
+
+# Add parent directory to path to import the proxy
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Point the databases at scratch files before the database modules are imported
+_db_dir = tempfile.mkdtemp(prefix="websocket_subscriptions_test_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_db_dir, 'openalgo.db')}")
+os.environ.setdefault("API_KEY_PEPPER", "0" * 64)
+os.environ.setdefault("ZMQ_PORT", "5555")
+
+from services.websocket_client import WebSocketClient
+from websocket_proxy.server import WebSocketProxy
+from websocket_proxy.sharding import AdapterHost, RemoteBrokerAdapter
+
+SBIN = [{"symbol": "SBIN", "exchange": "NSE"}]
+
+
+class FakeAdapter:
+    """Broker adapter recording the subscribe/unsubscribe calls it receives"""
+
+    def __init__(self):
+        self.calls = []
+
+    def initialize(self, broker_name, user_id, auth_data=None):
+        return {"success": True}
+
+    def connect(self):
+        return {"success": True}
+
+    def subscribe(self, symbol, exchange, mode=2, depth_level=5):
+        self.calls.append(("subscribe", symbol, exchange, mode))
+        return {"status": "success"}
+
+    def unsubscribe(self, symbol, exchange, mode=2):
+        self.calls.append(("unsubscribe", symbol, exchange, mode))
+        return {"status": "success"}
+
+    def disconnect(self):
+        pass
+
+
+class RecordingWebSocket:
+    """Stands in for the client's connection, keeping the messages it sends"""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, message):
+        self.sent.append(json.loads(message))
+
+
+@pytest.fixture
+def client():
+    """services/websocket_client.WebSocketClient whose messages are recorded, not sent"""
+    ws_client = WebSocketClient("test")
+    ws_client.loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=ws_client.loop.run_forever, daemon=True)
+    thread.start()
+    ws_client.ws = RecordingWebSocket()
+    ws_client.connected = ws_client.authenticated = True
+    yield ws_client
+    ws_client.loop.call_soon_threadsafe(ws_client.loop.stop)
+    thread.join(2)
+
+
+@pytest.fixture
+def proxy():
+    ws_proxy = WebSocketProxy(port=0, check_port=False)
+    ws_proxy.replies = []
+
+    async def send_message(client_id, message):
+        ws_proxy.replies.append(message)
+
+    async def send_error(client_id, code, message):
+        ws_proxy.replies.append({"status": "error", "code": code, "message": message})
+
+    ws_proxy.send_message = send_message
+    ws_proxy.send_error = send_error
+    yield ws_proxy
+    ws_proxy.socket.close()
+
+
+def add_client(proxy, client_id, adapter, user_id="user"):
+    proxy.broker_adapters[user_id] = adapter
+    proxy.user_mapping[client_id] = user_id
+    proxy.subscriptions[client_id] = set()
+
+
+def deliver(proxy, client_id, message):
+    """Handle one client message the way the proxy's message loop dispatches it"""
+    if message["action"] == "subscribe":
+        asyncio.run(proxy.subscribe_client(client_id, message))
+    else:
+        asyncio.run(proxy.unsubscribe_client(client_id, message))
+    return proxy.replies[-1]
+
+
+class TestSubscriptionModes:
+    """Unsubscribe resolves the mode the same way subscribe does"""
+
+    @pytest.mark.parametrize("mode,numeric_mode", [("LTP", 1), ("Quote", 2), ("Depth", 3)])
+    def test_websocket_client_unsubscribe_releases_subscription(self, proxy, client, mode, numeric_mode):
+        adapter = FakeAdapter()
+        add_client(proxy, 1, adapter)
+
+        client.subscribe(SBIN, mode=mode)
+        client.unsubscribe(SBIN, mode=mode)
+        subscribe, unsubscribe = client.ws.sent
+        assert "mode" not in unsubscribe["symbols"][0]
+
+        deliver(proxy, 1, subscribe)
+        reply = deliver(proxy, 1, unsubscribe)
+
+        assert reply["status"] == "success"
+        assert "message" not in reply["successful"][0]
+        assert adapter.calls == [("subscribe", "SBIN", "NSE", numeric_mode), ("unsubscribe", "SBIN", "NSE", numeric_mode)]
+        assert proxy.subscriptions[1] == set()
+        assert ("SBIN", "NSE", numeric_mode) not in proxy.subscription_index
+
+    def test_per_symbol_mode_overrides_request_mode(self, proxy):
+        adapter = FakeAdapter()
+        add_client(proxy, 1, adapter)
+
+        deliver(proxy, 1, {"action": "subscribe", "symbols": [dict(SBIN[0], mode="Depth")], "mode": "LTP"})
+        deliver(proxy, 1, {"action": "unsubscribe", "symbols": [dict(SBIN[0], mode="Depth")]})
+
+        assert adapter.calls == [("subscribe", "SBIN", "NSE", 3), ("unsubscribe", "SBIN", "NSE", 3)]
+
+    def test_other_mode_is_not_released(self, proxy, client):
+        adapter = FakeAdapter()
+        add_client(proxy, 1, adapter)
+
+        client.subscribe(SBIN, mode="LTP")
+        client.unsubscribe(SBIN, mode="Quote")
+        subscribe, unsubscribe = client.ws.sent
+
+        deliver(proxy, 1, subscribe)
+        reply = deliver(proxy, 1, unsubscribe)
+
+        assert reply["successful"][0]["message"] == "Not subscribed"
+        assert adapter.calls == [("subscribe", "SBIN", "NSE", 1)]
+        assert proxy.subscription_index[("SBIN", "NSE", 1)] == {1}
+
+
+class TestSubscriptionReferences:
+    """Each client subscription holds exactly one reference in the AdapterHost"""
+
+    @pytest.fixture
+    def host(self):
+        adapter = FakeAdapter()
+        adapter_host = AdapterHost(adapter_factory=lambda broker_name: adapter).start()
+        adapter_host.adapter = adapter
+        yield adapter_host
+        adapter_host.stop()
+
+    def remote_adapter(self, host):
+        remote = RemoteBrokerAdapter(host.endpoint, worker_id=1, broker_name="test")
+        remote.initialize("test", "user")
+        return remote
+
+    def test_repeated_subscribe_is_released_on_disconnect(self, proxy, client, host):
+        remote = self.remote_adapter(host)
+        add_client(proxy, 1, remote)
+        add_client(proxy, 2, remote)
+
+        client.subscribe(SBIN, mode="LTP")
+        subscribe = client.ws.sent[0]
+        deliver(proxy, 1, subscribe)
+        assert deliver(proxy, 1, subscribe)["subscriptions"][0]["message"] == "Already subscribed"
+        deliver(proxy, 2, subscribe)
+
+        asyncio.run(proxy.cleanup_client(1))
+        assert host.adapter.calls == [("subscribe", "SBIN", "NSE", 1)]
+        asyncio.run(proxy.cleanup_client(2))
+
+        assert host.adapter.calls == [("subscribe", "SBIN", "NSE", 1), ("unsubscribe", "SBIN", "NSE", 1)]
+        assert dict(host.subscribers) == {}
+        assert dict(proxy.subscription_index) == {}
+
+    def test_unsubscribe_of_other_clients_symbol_keeps_it(self, proxy, client, host):
+        remote = self.remote_adapter(host)
+        add_client(proxy, 1, remote)
+        add_client(proxy, 2, remote)
+
+        client.subscribe(SBIN, mode="LTP")
+        client.unsubscribe(SBIN, mode="LTP")
+        subscribe, unsubscribe = client.ws.sent
+        deliver(proxy, 1, subscribe)
+        deliver(proxy, 2, unsubscribe)
+
+        assert host.adapter.calls == [("subscribe", "SBIN", "NSE", 1)]
+        assert proxy.subscription_index[("SBIN", "NSE", 1)] == {1}
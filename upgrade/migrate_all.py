@@ -45,6 +45,7 @@ MIGRATIONS = [
     ('migrate_security_columns.py', 'Security Columns'),
     ('migrate_sandbox.py', 'Sandbox Mode'),
     ('migrate_order_mode.py', 'Order Mode & Action Center'),
+    ('migrate_api_key_fingerprint.py', 'API Key Fingerprints'),
 
     # Performance migrations
     ('migrate_indexes.py', 'Database Performance Indexes'),
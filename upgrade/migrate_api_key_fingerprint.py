@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Migration script for API key fingerprints.
+
+This script:
+1. Adds 'api_key_fingerprint' column to api_keys table
+2. Creates the idx_api_keys_fingerprint index on it
+
+Existing keys are fingerprinted lazily by the application on the first API
+key verification after the upgrade (from the encrypted copy of the key), so
+no pepper or key material is needed here.
+
+Usage:
+    python migrate_api_key_fingerprint.py
+"""
+
+import os
+import sys
+from sqlalchemy import create_engine, inspect, text
+
+# Set UTF-8 encoding for output to handle Unicode characters on Windows
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+def get_database_url():
+    """Get database URL from environment"""
+    from dotenv import load_dotenv
+
+    # Get the project root directory (parent of upgrade folder)
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    # Load .env from project root
+    load_dotenv(os.path.join(project_root, '.env'))
+
+    database_url = os.getenv('DATABASE_URL')
+
+    # Convert relative SQLite paths to absolute paths
+    if database_url and database_url.startswith('sqlite:///'):
+        relative_path = database_url.replace('sqlite:///', '', 1)
+        if not os.path.isabs(relative_path):
+            absolute_path = os.path.join(project_root, relative_path)
+            database_url = f'sqlite:///{absolute_path}'
+
+    return database_url
+
+def check_column_exists(engine, table_name, column_name):
+    """Check if a column exists in a table"""
+    inspector = inspect(engine)
+    columns = [col['name'] for col in inspector.get_columns(table_name)]
+    return column_name in columns
+
+def check_table_exists(engine, table_name):
+    """Check if a table exists"""
+    inspector = inspect(engine)
+    return table_name in inspector.get_table_names()
+
+def add_fingerprint_column(engine):
+    """Add api_key_fingerprint column and its index to api_keys table"""
+    try:
+        if check_column_exists(engine, 'api_keys', 'api_key_fingerprint'):
+            logger.info("✓ api_key_fingerprint column already exists in api_keys table")
+        else:
+            logger.info("Adding api_key_fingerprint column to api_keys table...")
+            with engine.connect() as conn:
+                conn.execute(text("""
+                    ALTER TABLE api_keys
+                    ADD COLUMN api_key_fingerprint VARCHAR(64)
+                """))
+                conn.commit()
+            logger.info("✓ api_key_fingerprint column added successfully")
+
+        with engine.connect() as conn:
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS idx_api_keys_fingerprint ON api_keys(api_key_fingerprint)
+            """))
+            conn.commit()
+        logger.info("✓ idx_api_keys_fingerprint index exists")
+        return True
+
+    except Exception as e:
+        logger.error(f"✗ Error adding api_key_fingerprint column: {e}")
+        return False
+
+def main():
+    """Main migration function"""
+    print("="*60)
+    print("API Key Fingerprint Migration")
+    print("="*60)
+    print()
+
+    database_url = get_database_url()
+    if not database_url:
+        logger.error("DATABASE_URL not found in environment")
+        return False
+
+    logger.info(f"Database URL: {database_url}")
+
+    try:
+        engine = create_engine(database_url)
+        logger.info("✓ Database connection established")
+    except Exception as e:
+        logger.error(f"✗ Failed to connect to database: {e}")
+        return False
+
+    # Fresh installs get the column from the model when the app creates api_keys
+    if not check_table_exists(engine, 'api_keys'):
+        logger.info("✓ api_keys table not created yet - nothing to migrate")
+        return True
+
+    success = add_fingerprint_column(engine)
+
+    print()
+    if success:
+        print("="*60)
+        print("✓ Migration completed successfully!")
+        print("="*60)
+        print()
+        print("Existing API keys are fingerprinted automatically on the first")
+        print("API request after restarting OpenAlgo.")
+        print()
+    else:
+        print("="*60)
+        print("✗ Migration completed with errors")
+        print("="*60)
+        print("Please check the logs above for details")
+        print()
+
+    return success
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
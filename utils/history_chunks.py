@@ -0,0 +1,83 @@
+"""
+Chunked historical data downloads shared by the broker data modules
+
+Broker history APIs cap the date range of one request, so long ranges are
+split into chunks. plan_chunks() computes the chunk boundaries and
+fetch_chunks() requests them concurrently (the broker modules use the pooled
+utils/httpx_client), pacing request starts with the broker's history
+RateLimiter (utils/rate_limiter) shared by every download in the process, and
+returns the results in chunk order so they can be concatenated as before.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from utils.logging import get_logger
+from utils.rate_limiter import get_rate_limiter
+
+logger = get_logger(__name__)
+
+# Chunk requests in flight at once for one history download
+MAX_CONCURRENT_CHUNKS = 4
+
+
+def plan_chunks(start, end, chunk_days):
+    """
+    Split [start, end] into consecutive ranges of at most chunk_days days
+
+    Args:
+        start: first datetime/Timestamp of the range
+        end: last datetime/Timestamp of the range
+        chunk_days: days per chunk (inclusive of both ends)
+
+    Returns:
+        list: (chunk_start, chunk_end) tuples in date order; each chunk starts
+        the day after the previous one ended
+    """
+    chunks = []
+    current_start = start
+    while current_start <= end:
+        current_end = min(current_start + timedelta(days=chunk_days - 1), end)
+        chunks.append((current_start, current_end))
+        current_start = current_end + timedelta(days=1)
+    return chunks
+
+
+def fetch_chunks(fetch, chunks, broker, rate, max_workers=None):
+    """
+    Call fetch(chunk_start, chunk_end) for every chunk, concurrently
+
+    Args:
+        fetch: function issuing the request for one chunk
+        chunks: list of (chunk_start, chunk_end) tuples from plan_chunks()
+        broker: broker name, selects the shared rate limiter
+        rate: the broker's history requests per second
+        max_workers: chunk requests in flight at once (default MAX_CONCURRENT_CHUNKS)
+
+    Returns:
+        list: fetch() results in chunk order
+
+    Raises:
+        The first exception raised by fetch(), in chunk order; chunks not yet
+        started are cancelled
+    """
+    limiter = get_rate_limiter('history', broker, rate)
+    if max_workers is None:
+        max_workers = MAX_CONCURRENT_CHUNKS
+
+    def fetch_paced(chunk):
+        limiter.acquire()
+        return fetch(*chunk)
+
+    if len(chunks) <= 1 or max_workers <= 1:
+        return [fetch_paced(chunk) for chunk in chunks]
+
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(chunks)), thread_name_prefix=f"{broker}_history")
+    try:
+        futures = [executor.submit(fetch_paced, chunk) for chunk in chunks]
+        results = [future.result() for future in futures]
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    logger.debug(f"Fetched {len(chunks)} {broker} history chunks")
+    return results
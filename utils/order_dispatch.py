@@ -0,0 +1,105 @@
+"""
+Order dispatch: the per-broker order rate limit and bulk order calls
+
+Every order path takes a slot from the broker's order RateLimiter
+(utils/rate_limiter) before calling the broker: single, smart, modify and
+cancel orders through get_order_bucket(broker).acquire(), and cancel-all,
+close-all, basket, split and multi-leg option orders through dispatch_bulk().
+The limiters are shared by the whole process and sized from ORDER_RATE_LIMIT,
+replacing the fixed
+1 / ORDER_RATE_LIMIT sleeps between orders: calls go out as soon as the
+broker's budget allows, and concurrent requests share one budget.
+
+dispatch_bulk() runs the calls concurrently over the pooled utils/httpx_client.
+Results come back in input order, one per call, with the exception of a failed
+call recorded next to it instead of aborting the rest.
+
+get_dispatch_metrics() reports queue depth and wait times per broker.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from utils.logging import get_logger
+from utils.rate_limiter import RateLimiter, get_rate_limiter, get_rate_limiter_metrics, rate_limit_client
+
+logger = get_logger(__name__)
+
+# Broker calls in flight at once for one bulk operation
+MAX_BULK_WORKERS = 8
+
+# Seconds per ORDER_RATE_LIMIT period
+RATE_PERIODS = {'second': 1, 'minute': 60, 'hour': 3600}
+
+
+def get_order_rate() -> float:
+    """ORDER_RATE_LIMIT (e.g. '10 per second') as orders per second, default 10"""
+    rate_limit_str = os.getenv('ORDER_RATE_LIMIT', '10 per second')
+    try:
+        parts = rate_limit_str.split()
+        count = float(parts[0])
+        period = RATE_PERIODS.get(parts[-1].rstrip('s').lower(), 1) if len(parts) > 1 else 1
+        return count / period if count > 0 else 10.0
+    except (ValueError, IndexError):
+        return 10.0
+
+
+def get_order_bucket(broker: str, rate: Optional[float] = None) -> RateLimiter:
+    """Process-wide RateLimiter for a broker's order API (created on first use)"""
+    return get_rate_limiter('orders', broker, rate or get_order_rate())
+
+
+def get_dispatch_metrics() -> Dict[str, Dict[str, Any]]:
+    """Queue depth and wait-time metrics of every broker's order RateLimiter (see RateLimiter.stats)"""
+    return get_rate_limiter_metrics('orders')
+
+
+def dispatch_bulk(
+    call: Callable[[Any], Any],
+    items: Sequence[Any],
+    broker: str,
+    max_workers: Optional[int] = None,
+    paced: bool = True
+) -> List[Tuple[Any, Optional[Exception]]]:
+    """
+    Call call(item) for every item concurrently under the broker's rate limit
+
+    Args:
+        call: function issuing the broker request for one item
+        items: orders, positions or order ids to process
+        broker: broker name, selects the shared order RateLimiter (may be None if not paced)
+        max_workers: calls in flight at once (default MAX_BULK_WORKERS)
+        paced: take a slot per call; False when call goes through a service
+            that takes its own (e.g. place_order_service.place_order). Either
+            way the calls take turns with other operations' as one client.
+
+    Returns:
+        list: (result, None) or (None, exception) per item, in item order
+    """
+    bucket = get_order_bucket(broker) if paced else None
+    if max_workers is None:
+        max_workers = MAX_BULK_WORKERS
+    # The calls of this operation take turns with other operations' calls
+    client = object()
+
+    def call_paced(item):
+        # Pool threads do not inherit the caller's context
+        with rate_limit_client(client):
+            if paced:
+                bucket.acquire()
+            try:
+                return call(item), None
+            except Exception as e:
+                logger.exception(f"{broker} bulk order call failed: {e}")
+                return None, e
+
+    if len(items) <= 1 or max_workers <= 1:
+        return [call_paced(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items)), thread_name_prefix=f"{broker}_orders") as executor:
+        results = list(executor.map(call_paced, items))
+
+    failed = sum(1 for _, error in results if error is not None)
+    logger.debug(f"Dispatched {len(items)} {broker} order calls, {failed} raised")
+    return results
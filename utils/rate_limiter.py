@@ -0,0 +1,197 @@
+"""
+Process-wide rate limiters for broker APIs
+
+One RateLimiter per broker API (e.g. ('orders', 'zerodha') or
+('history', 'angel')), shared by every thread in the process. Order paths use
+it through utils/order_dispatch and chunked history downloads through
+utils/history_chunks.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Seconds before a used slot returns: a little over a second, so jitter on the
+# way to the broker cannot land rate + 1 requests inside one of its one-second windows
+RATE_WINDOW_SECONDS = 1.1
+
+# Recent waits kept per limiter for the p95 wait metric
+METRICS_SAMPLE_SIZE = 1000
+
+# (api, broker) -> RateLimiter
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+# Client that acquire() calls without an explicit client belong to (see rate_limit_client)
+_current_client = ContextVar('rate_limit_client', default=None)
+
+
+@contextmanager
+def rate_limit_client(client: Any):
+    """
+    Make acquire() calls in this context take turns as `client`, so calls made
+    deep inside services (e.g. place_order for each leg of a basket) are
+    scheduled as one batch
+    """
+    token = _current_client.set(client)
+    try:
+        yield client
+    finally:
+        _current_client.reset(token)
+
+
+class RateLimiter:
+    """
+    Request budget shared across threads: `rate` slots, each one returning
+    RATE_WINDOW_SECONDS after it was used. The first `rate` calls go through
+    at once (a burst up to the limit), and no window ever sees more than
+    `rate` calls, which a continuously refilled token bucket would allow on
+    top of its burst.
+
+    Waiting calls are served round-robin by client (e.g. one bulk order
+    operation), in arrival order within a client, so a large batch cannot
+    hold back a concurrent one until it is done.
+    """
+
+    def __init__(self, rate: float, period: Optional[float] = None, clock=time.monotonic):
+        """
+        Args:
+            rate: requests allowed per second
+            period: seconds until a used slot returns (default RATE_WINDOW_SECONDS,
+                longer for rates below one per second)
+            clock: monotonic time source
+        """
+        rate = max(float(rate), 0.001)
+        self.capacity = max(1, int(rate))
+        self.period = period if period is not None else RATE_WINDOW_SECONDS * self.capacity / rate
+        self._clock = clock
+        self._taken = deque(maxlen=self.capacity)
+        self._cond = threading.Condition()
+        # client -> waiting tickets, and the clients in serving order
+        self._waiting = {}
+        self._turns = deque()
+        self._queue_depth = 0
+        # Metrics
+        self._acquired = 0
+        self._delayed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._max_queue_depth = 0
+        self._recent_waits = deque(maxlen=METRICS_SAMPLE_SIZE)
+
+    def acquire(self, client: Any = None) -> float:
+        """
+        Block until a slot is available
+
+        Args:
+            client: the batch this call belongs to; calls of one client take
+                turns with other clients' calls (default: the rate_limit_client
+                of this context, else a client of its own)
+
+        Returns:
+            float: seconds waited
+        """
+        if client is None:
+            client = _current_client.get() or object()
+        ticket = object()
+        start = self._clock()
+        with self._cond:
+            tickets = self._waiting.get(client)
+            if tickets is None:
+                tickets = self._waiting[client] = deque()
+                self._turns.append(client)
+            tickets.append(ticket)
+            self._queue_depth += 1
+            self._max_queue_depth = max(self._max_queue_depth, self._queue_depth)
+
+            while True:
+                if self._turns[0] is client and tickets[0] is ticket:
+                    now = self._clock()
+                    ready = now
+                    if len(self._taken) == self.capacity:
+                        ready = self._taken[0] + self.period
+                    if ready <= now:
+                        break
+                    self._cond.wait(ready - now)
+                else:
+                    self._cond.wait()
+
+            self._taken.append(now)
+            tickets.popleft()
+            self._turns.popleft()
+            if tickets:
+                self._turns.append(client)
+            else:
+                del self._waiting[client]
+            self._queue_depth -= 1
+
+            wait = now - start
+            self._acquired += 1
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+            self._recent_waits.append(wait)
+            if wait > 0.001:
+                self._delayed += 1
+            self._cond.notify_all()
+        return wait
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Queue and wait-time metrics since the limiter was created
+
+        Returns:
+            dict: capacity, queue depth (current and peak), calls acquired,
+            how many had to wait, and average/p95/max wait in milliseconds
+        """
+        with self._cond:
+            waits = sorted(self._recent_waits)
+            return {
+                'capacity': self.capacity,
+                'window_seconds': round(self.period, 3),
+                'queue_depth': self._queue_depth,
+                'max_queue_depth': self._max_queue_depth,
+                'acquired': self._acquired,
+                'delayed': self._delayed,
+                'avg_wait_ms': round(self._total_wait * 1000 / self._acquired, 2) if self._acquired else 0.0,
+                'p95_wait_ms': round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 2) if waits else 0.0,
+                'max_wait_ms': round(self._max_wait * 1000, 2)
+            }
+
+
+def get_rate_limiter(api: str, broker: str, rate: float) -> RateLimiter:
+    """
+    Process-wide RateLimiter for one broker API (created on first use)
+
+    Args:
+        api: which API of the broker, e.g. 'orders' or 'history'
+        broker: broker name
+        rate: requests per second, used when the limiter is created
+    """
+    key = (api, broker)
+    limiter = _limiters.get(key)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(key)
+            if limiter is None:
+                limiter = _limiters[key] = RateLimiter(rate)
+    return limiter
+
+
+def get_rate_limiter_metrics(api: str) -> Dict[str, Dict[str, Any]]:
+    """RateLimiter.stats() of every broker's limiter for one API"""
+    with _limiters_lock:
+        limiters = {broker: limiter for (name, broker), limiter in _limiters.items() if name == api}
+    return {broker: limiter.stats() for broker, limiter in limiters.items()}
+
+
+def reset_rate_limiters():
+    """Drop every limiter (benchmarks and tests start from a full budget)"""
+    with _limiters_lock:
+        _limiters.clear()
@@ -7,6 +7,7 @@ import signal
 import atexit
 
 from .server import main as websocket_main
+from .sharding import get_websocket_worker_count, ShardedWebSocketProxy
 from utils.logging import get_logger, highlight_url
 
 # Set the correct event loop policy for Windows to avoid ZeroMQ warnings
@@ -18,6 +19,7 @@ if platform.system() == 'Windows':
 _websocket_server_started = False
 _websocket_proxy_instance = None
 _websocket_thread = None
+_sharded_proxy = None
 
 logger = get_logger(__name__)
 
@@ -44,11 +46,19 @@ def should_start_websocket():
 
 def cleanup_websocket_server():
     """Clean up WebSocket server resources - cross-platform compatible"""
-    global _websocket_proxy_instance, _websocket_thread
+    global _websocket_proxy_instance, _websocket_thread, _sharded_proxy
     
     try:
         logger.info("Cleaning up WebSocket server...")
         
+        if _sharded_proxy:
+            try:
+                _sharded_proxy.stop()
+            except Exception as e:
+                logger.error(f"Error stopping WebSocket proxy workers: {e}")
+            finally:
+                _sharded_proxy = None
+        
         if _websocket_proxy_instance:
             # For Windows compatibility, set a shutdown flag instead of trying to 
             # manipulate the event loop from a different thread
@@ -96,6 +106,7 @@ def cleanup_websocket_server():
         # Last resort: force cleanup
         _websocket_proxy_instance = None
         _websocket_thread = None
+        _sharded_proxy = None
 
 def signal_handler(signum, frame):
     """Handle SIGINT (Ctrl+C) and SIGTERM signals"""
@@ -111,11 +122,13 @@ def start_websocket_server():
     """
     global _websocket_proxy_instance, _websocket_thread
     
+    workers = get_websocket_worker_count()
+    
     logger.debug("Starting WebSocket proxy server in a separate thread")
     
     def run_websocket_server():
         """Run the WebSocket server in an event loop"""
-        global _websocket_proxy_instance
+        global _websocket_proxy_instance, _sharded_proxy
         try:
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
@@ -129,6 +142,11 @@ def start_websocket_server():
             ws_host = os.getenv('WEBSOCKET_HOST', '127.0.0.1')
             ws_port = int(os.getenv('WEBSOCKET_PORT', '8765'))
             
+            if workers > 1:
+                # Sharded mode: adapters stay in this process, workers share the port
+                _sharded_proxy = ShardedWebSocketProxy(ws_host, ws_port, workers).start()
+                return
+            
             # Create and store the proxy instance
             _websocket_proxy_instance = WebSocketProxy(host=ws_host, port=ws_port)
             
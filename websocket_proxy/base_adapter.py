@@ -1,4 +1,3 @@
-import json
 import threading
 import zmq
 import random
@@ -6,6 +5,7 @@ import socket
 import os
 from abc import ABC, abstractmethod
 from utils.logging import get_logger
+from .codec import encode_bus_payload, get_bus_encoding
 
 # Initialize logger
 logger = get_logger(__name__)
@@ -93,7 +93,9 @@ class BaseBrokerWebSocketAdapter(ABC):
             
             # Initialize instance variables
             self.subscriptions = {}
+            self.token_index = {}  # broker token key -> correlation IDs, see _index_subscription
             self.connected = False
+            self.bus_encoding = get_bus_encoding()  # JSON unless ZMQ_MESSAGE_ENCODING=msgpack
             
             self.logger.info(f"BaseBrokerWebSocketAdapter initialized on port {self.zmq_port}")
             
@@ -257,11 +259,35 @@ class BaseBrokerWebSocketAdapter(ABC):
         try:
             self.socket.send_multipart([
                 topic.encode('utf-8'),
-                json.dumps(data).encode('utf-8')
+                encode_bus_payload(data, self.bus_encoding)
             ])
         except Exception as e:
             self.logger.exception(f"Error publishing market data: {e}")
     
+    def _index_subscription(self, key, correlation_id):
+        """
+        Register a subscription under the key the broker identifies ticks by
+        (e.g. token or (exchange type, token)), so the tick handler finds its
+        subscriptions with one dict lookup instead of scanning all of them.
+        Call while holding the adapter lock, next to the self.subscriptions update.
+        """
+        correlation_ids = self.token_index.setdefault(key, [])
+        if correlation_id not in correlation_ids:
+            correlation_ids.append(correlation_id)
+
+    def _unindex_subscription(self, key, correlation_id):
+        """Remove a subscription registered with _index_subscription"""
+        correlation_ids = self.token_index.get(key)
+        if correlation_ids and correlation_id in correlation_ids:
+            correlation_ids.remove(correlation_id)
+            if not correlation_ids:
+                del self.token_index[key]
+
+    def _subscriptions_for_token(self, key):
+        """Subscriptions registered under a broker token key, in subscription order"""
+        subscriptions = self.subscriptions
+        return [subscriptions[cid] for cid in self.token_index.get(key, ()) if cid in subscriptions]
+
     def _create_success_response(self, message, **kwargs):
         """
         Create a standard success response
@@ -0,0 +1,161 @@
+"""
+Wire encodings for market data on the ZeroMQ bus and towards WebSocket clients.
+
+JSON is the default on every hop. MessagePack is an opt-in compact encoding:
+- Broker adapters publish MessagePack on the ZeroMQ bus when
+  ZMQ_MESSAGE_ENCODING=msgpack is set
+- WebSocket clients request it by sending "encoding": "msgpack" in their
+  authenticate message; market data then arrives as binary frames while
+  control messages (auth, subscribe, errors) stay JSON text frames
+
+The proxy detects the bus encoding per message, so adapters and the proxy do
+not have to agree on it up front. MessagePack requires the optional `msgpack`
+package.
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Union
+from utils.logging import get_logger
+
+# orjson is listed in requirements.txt; keep the stdlib encoder as a fallback
+try:
+    import orjson
+
+    def dumps_json(obj) -> str:
+        return orjson.dumps(obj).decode('utf-8')
+
+    loads_json = orjson.loads
+except ImportError:
+    def dumps_json(obj) -> str:
+        return json.dumps(obj, separators=(',', ':'))
+
+    loads_json = json.loads
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+ENCODING_JSON = "json"
+ENCODING_MSGPACK = "msgpack"
+
+# MessagePack encoding of the "data" key, appended after the envelope fields
+_MSGPACK_DATA_KEY = b'\xa4data'
+
+
+def get_supported_encodings() -> List[str]:
+    """Encodings that clients may request at authentication time"""
+    if MSGPACK_AVAILABLE:
+        return [ENCODING_JSON, ENCODING_MSGPACK]
+    return [ENCODING_JSON]
+
+
+def get_bus_encoding() -> str:
+    """
+    Get the encoding adapters should use when publishing on the ZeroMQ bus
+
+    Returns:
+        str: ENCODING_MSGPACK if configured and available, otherwise ENCODING_JSON
+    """
+    encoding = os.getenv('ZMQ_MESSAGE_ENCODING', ENCODING_JSON).strip().lower()
+    if encoding == ENCODING_MSGPACK:
+        if MSGPACK_AVAILABLE:
+            return ENCODING_MSGPACK
+        logger.warning("ZMQ_MESSAGE_ENCODING=msgpack but msgpack is not installed, publishing JSON")
+    elif encoding != ENCODING_JSON:
+        logger.warning(f"Unknown ZMQ_MESSAGE_ENCODING '{encoding}', publishing JSON")
+    return ENCODING_JSON
+
+
+def encode_bus_payload(data: Dict[str, Any], encoding: str = ENCODING_JSON) -> bytes:
+    """
+    Encode an adapter market data dict for the ZeroMQ bus
+
+    Args:
+        data: Market data dictionary
+        encoding: ENCODING_JSON or ENCODING_MSGPACK
+
+    Returns:
+        bytes: Encoded payload
+    """
+    if encoding == ENCODING_MSGPACK:
+        return msgpack.packb(data)
+    return json.dumps(data).encode('utf-8')
+
+
+def is_json_payload(payload: bytes) -> bool:
+    """
+    Check whether a bus payload is JSON
+
+    Market data payloads are always objects, so a JSON payload starts with '{'.
+    That byte is a positive fixint in MessagePack and can never start a map.
+    """
+    return payload[:1] == b'{'
+
+
+def decode_bus_payload(payload: bytes) -> Dict[str, Any]:
+    """Decode a bus payload in either encoding into a dict"""
+    if is_json_payload(payload):
+        return loads_json(payload)
+    return msgpack.unpackb(payload)
+
+
+def convert_bus_payload(payload: bytes, encoding: str) -> Union[str, bytes]:
+    """
+    Convert a bus payload into the form encode_market_data expects for a client encoding
+
+    Payloads that already match the client encoding are passed through without
+    being decoded.
+
+    Args:
+        payload: Raw payload received from the ZeroMQ bus
+        encoding: Client encoding
+
+    Returns:
+        str for ENCODING_JSON, bytes for ENCODING_MSGPACK
+    """
+    if is_json_payload(payload):
+        if encoding == ENCODING_MSGPACK:
+            return msgpack.packb(loads_json(payload))
+        return payload.decode('utf-8')
+    if encoding == ENCODING_MSGPACK:
+        return payload
+    return dumps_json(msgpack.unpackb(payload))
+
+
+def encode_market_data(symbol: str, exchange: str, mode: int, broker: str,
+                       data: Union[str, bytes], encoding: str = ENCODING_JSON) -> Union[str, bytes]:
+    """
+    Build a client market_data message around an already-encoded payload
+
+    The payload is spliced into the envelope verbatim instead of being decoded
+    and re-encoded for every tick.
+
+    Args:
+        symbol: Trading symbol
+        exchange: Exchange code
+        mode: Numeric subscription mode
+        broker: Broker name reported to the client
+        data: Payload from convert_bus_payload for the same encoding
+        encoding: ENCODING_JSON or ENCODING_MSGPACK
+
+    Returns:
+        str (text frame) for JSON, bytes (binary frame) for MessagePack
+    """
+    envelope = {
+        "type": "market_data",
+        "symbol": symbol,
+        "exchange": exchange,
+        "mode": mode,
+        "broker": broker
+    }
+    if encoding == ENCODING_MSGPACK:
+        # The envelope packs as a 5 entry fixmap (0x85); widen it to 6 entries
+        # and append the "data" key followed by the packed payload
+        return b'\x86' + msgpack.packb(envelope)[1:] + _MSGPACK_DATA_KEY + data
+    envelope_json = dumps_json(envelope)
+    return f'{envelope_json[:-1]},"data":{data}}}'
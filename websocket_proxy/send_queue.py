@@ -0,0 +1,111 @@
+"""
+Per-client outbound queue for the WebSocket proxy.
+
+Market data for each client is buffered in a bounded queue that conflates by
+(symbol, exchange, mode): while a message for a key is still waiting to be
+written, a newer message for the same key replaces it in place. A client that
+cannot keep up therefore receives the newest quote per instrument instead of a
+growing backlog, and a slow connection never delays delivery to other clients.
+"""
+
+import asyncio
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Union
+
+import websockets
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class ClientSendQueue:
+    """
+    Bounded, conflating send queue drained by one writer task per client
+    """
+
+    def __init__(self, websocket, max_pending: int = 1000):
+        """
+        Initialize the queue
+
+        Args:
+            websocket: The client's WebSocket connection
+            max_pending: Maximum number of distinct keys waiting to be sent.
+                         When full, the oldest pending message is dropped.
+        """
+        self.websocket = websocket
+        self.max_pending = max(1, max_pending)
+        self.pending: "OrderedDict[Hashable, Union[str, bytes]]" = OrderedDict()
+        self.ready = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+        # Counters exposed through WebSocketProxy.get_client_stats
+        self.enqueued = 0
+        self.sent = 0
+        self.conflated = 0
+        self.dropped = 0
+
+    def start(self):
+        """Start the writer task on the running event loop"""
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self.run())
+        return self
+
+    def close(self):
+        """Stop the writer task and discard anything still pending"""
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        self.pending.clear()
+
+    def put(self, key: Hashable, message: Union[str, bytes]):
+        """
+        Queue a message without waiting for the client
+
+        Args:
+            key: Conflation key, normally (symbol, exchange, mode)
+            message: Encoded message (str for text frames, bytes for binary)
+        """
+        self.enqueued += 1
+        pending = self.pending
+        if key in pending:
+            # Replace in place so the instrument keeps its position in the queue
+            pending[key] = message
+            self.conflated += 1
+            return
+
+        if len(pending) >= self.max_pending:
+            pending.popitem(last=False)
+            self.dropped += 1
+
+        pending[key] = message
+        self.ready.set()
+
+    async def run(self):
+        """Write pending messages to the client one at a time, oldest key first"""
+        send = self.websocket.send
+        pending = self.pending
+        try:
+            while True:
+                await self.ready.wait()
+                self.ready.clear()
+                while pending:
+                    _, message = pending.popitem(last=False)
+                    await send(message)
+                    self.sent += 1
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error in client send queue: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the queue counters"""
+        return {
+            "pending": len(self.pending),
+            "max_pending": self.max_pending,
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "conflated": self.conflated,
+            "dropped": self.dropped
+        }
@@ -20,6 +20,11 @@ from database.auth_db import verify_api_key
 from .broker_factory import create_broker_adapter
 from .base_adapter import BaseBrokerWebSocketAdapter
 
+from .send_queue import ClientSendQueue
+from .codec import (
+    ENCODING_JSON, convert_bus_payload, encode_market_data, get_supported_encodings
+)
+
 # Initialize logger
 logger = get_logger("websocket_proxy")
 
@@ -30,19 +35,25 @@ class WebSocketProxy:
     Supports dynamic broker selection based on user configuration.
     """
     
-    def __init__(self, host: str = "127.0.0.1", port: int = 8765):
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, adapter_factory=None, check_port: bool = True):
         """
         Initialize the WebSocket Proxy
         
         Args:
             host: Hostname to bind the WebSocket server to
             port: Port number to bind the WebSocket server to
+            adapter_factory: Callable taking a broker name and returning a broker adapter.
+                             Defaults to create_broker_adapter; sharded workers pass a
+                             factory for adapters hosted in the parent process.
+            check_port: Whether to fail if the port is already in use. Sharded workers
+                        share the port via SO_REUSEPORT and skip this check.
         """
         self.host = host
         self.port = port
+        self.adapter_factory = adapter_factory or create_broker_adapter
         
         # Check if the required port is already in use - wait briefly for cleanup to complete
-        if is_port_in_use(host, port, wait_time=2.0):  # Wait up to 2 seconds for port release
+        if check_port and is_port_in_use(host, port, wait_time=2.0):  # Wait up to 2 seconds for port release
             error_msg = (
                 f"WebSocket port {port} is already in use on {host}.\n"
                 f"This port is required for SDK compatibility (see strategies/ltp_example.py).\n"
@@ -60,6 +71,12 @@ class WebSocketProxy:
         self.broker_adapters = {}  # Maps user_id to broker adapter
         self.user_mapping = {}  # Maps client_id to user_id
         self.user_broker_mapping = {}  # Maps user_id to broker_name
+        self.client_encodings = {}  # Maps client_id to negotiated market data encoding
+        self.send_queues = {}  # Maps client_id to ClientSendQueue for market data
+        
+        # Bound on distinct (symbol, exchange, mode) messages waiting per client.
+        # Newer ticks replace queued ones for the same key; beyond the bound the oldest is dropped
+        self.client_queue_size = int(os.getenv('WEBSOCKET_CLIENT_QUEUE_SIZE', '1000'))
         self.running = False
 
         # PERFORMANCE OPTIMIZATION: Subscription index for O(1) lookup
@@ -80,12 +97,19 @@ class WebSocketProxy:
         self.context = zmq.asyncio.Context()
         self.socket = self.context.socket(zmq.SUB)
         # Connecting to ZMQ
-        ZMQ_HOST = os.getenv('ZMQ_HOST', '127.0.0.1')
+        self.zmq_host = os.getenv('ZMQ_HOST', '127.0.0.1')
         ZMQ_PORT = os.getenv('ZMQ_PORT')
-        self.socket.connect(f"tcp://{ZMQ_HOST}:{ZMQ_PORT}")  # Connect to broker adapter publisher
+        self.socket.connect(f"tcp://{self.zmq_host}:{ZMQ_PORT}")  # Connect to broker adapter publisher
+        self.zmq_ports = {str(ZMQ_PORT)}  # Publisher ports this subscriber is connected to
         
         # Set up ZeroMQ subscriber to receive all messages
         self.socket.setsockopt(zmq.SUBSCRIBE, b"")  # Subscribe to all topics
+
+        # Synchronous view of the same socket, used to drain queued messages with
+        # NOBLOCK once the asyncio poller reports it readable
+        self.sync_socket = zmq.Socket.shadow(self.socket.underlying)
+        self.zmq_max_batch = 1000  # Upper bound on messages drained per event-loop turn
+        self.zmq_idle_timeout_ms = 500  # Poll timeout while idle, bounds shutdown latency
     
     async def start(self):
         """Start the WebSocket server and ZeroMQ listener"""
@@ -194,6 +218,10 @@ class WebSocketProxy:
                 except Exception as e:
                     logger.error(f"Error closing WebSocket server: {e}")
             
+            # Stop per-client writer tasks
+            for send_queue in self.send_queues.values():
+                send_queue.close()
+            
             # Close all client connections
             close_tasks = []
             for client_id, websocket in self.clients.items():
@@ -250,6 +278,7 @@ class WebSocketProxy:
         client_id = id(websocket)
         self.clients[client_id] = websocket
         self.subscriptions[client_id] = set()
+        self.create_send_queue(client_id, websocket)
         
         # Get path info from websocket if available
         path = getattr(websocket, 'path', '/unknown')
@@ -277,6 +306,39 @@ class WebSocketProxy:
             # Clean up when the client disconnects
             await self.cleanup_client(client_id)
     
+    def create_send_queue(self, client_id, websocket):
+        """
+        Create and start the market data send queue for a client
+        
+        Args:
+            client_id: ID of the client
+            websocket: The WebSocket connection
+            
+        Returns:
+            ClientSendQueue: The started queue
+        """
+        send_queue = ClientSendQueue(websocket, self.client_queue_size).start()
+        self.send_queues[client_id] = send_queue
+        return send_queue
+    
+    def get_client_stats(self, client_id=None):
+        """
+        Get send queue counters (pending, sent, conflated, dropped) per client
+        
+        Args:
+            client_id: Optional client ID to limit the result to one client
+            
+        Returns:
+            dict: Maps client_id to its queue counters and user_id
+        """
+        client_ids = [client_id] if client_id is not None else list(self.send_queues)
+        stats = {}
+        for cid in client_ids:
+            send_queue = self.send_queues.get(cid)
+            if send_queue:
+                stats[cid] = dict(send_queue.stats(), user_id=self.user_mapping.get(cid))
+        return stats
+    
     async def cleanup_client(self, client_id):
         """
         Clean up client resources when they disconnect
@@ -288,6 +350,14 @@ class WebSocketProxy:
         if client_id in self.clients:
             del self.clients[client_id]
         
+        # Stop the client's writer task
+        send_queue = self.send_queues.pop(client_id, None)
+        if send_queue:
+            send_queue.close()
+            if send_queue.dropped or send_queue.conflated:
+                logger.info(f"Client {client_id} send queue: {send_queue.conflated} conflated, "
+                            f"{send_queue.dropped} dropped, {send_queue.sent} sent")
+        
         # Clean up subscriptions
         if client_id in self.subscriptions:
             subscriptions = self.subscriptions[client_id]
@@ -301,12 +371,7 @@ class WebSocketProxy:
                     mode = sub_info.get('mode')
 
                     # OPTIMIZATION: Remove from subscription index
-                    sub_key = (symbol, exchange, mode)
-                    if sub_key in self.subscription_index:
-                        self.subscription_index[sub_key].discard(client_id)
-                        # Clean up empty entries
-                        if not self.subscription_index[sub_key]:
-                            del self.subscription_index[sub_key]
+                    self._remove_from_subscription_index(client_id, symbol, exchange, mode)
 
                     # Get the user's broker adapter
                     user_id = self.user_mapping.get(client_id)
@@ -321,6 +386,8 @@ class WebSocketProxy:
 
             del self.subscriptions[client_id]
         
+        self.client_encodings.pop(client_id, None)
+        
         # Remove from user mapping
         if client_id in self.user_mapping:
             user_id = self.user_mapping[client_id]
@@ -380,6 +447,12 @@ class WebSocketProxy:
                 await self.get_broker_info(client_id)
             elif action == "get_supported_brokers":
                 await self.get_supported_brokers(client_id)
+            elif action == "get_queue_stats":
+                await self.send_message(client_id, {
+                    "type": "queue_stats",
+                    "status": "success",
+                    "stats": self.get_client_stats(client_id).get(client_id, {})
+                })
             else:
                 logger.warning(f"Client {client_id} requested invalid action: {action}")
                 await self.send_error(client_id, "INVALID_ACTION", f"Invalid action: {action}")
@@ -470,6 +543,14 @@ class WebSocketProxy:
             await self.send_error(client_id, "AUTHENTICATION_ERROR", "API key is required")
             return
         
+        # Market data encoding requested by the client (JSON unless asked otherwise)
+        encoding = str(data.get("encoding") or ENCODING_JSON).lower()
+        supported_encodings = get_supported_encodings()
+        if encoding not in supported_encodings:
+            await self.send_error(client_id, "UNSUPPORTED_ENCODING",
+                                  f"Encoding '{encoding}' is not supported. Supported: {', '.join(supported_encodings)}")
+            return
+        
         # Verify the API key and get the user ID
         user_id = verify_api_key(api_key)
         
@@ -479,6 +560,7 @@ class WebSocketProxy:
         
         # Store the user mapping
         self.user_mapping[client_id] = user_id
+        self.client_encodings[client_id] = encoding
         
         # Get broker name
         broker_name = get_broker_name(api_key)
@@ -494,7 +576,7 @@ class WebSocketProxy:
         if user_id not in self.broker_adapters:
             try:
                 # Create broker adapter with dynamic broker selection
-                adapter = create_broker_adapter(broker_name)
+                adapter = self.adapter_factory(broker_name)
                 if not adapter:
                     await self.send_error(client_id, "BROKER_ERROR", f"Failed to create adapter for broker: {broker_name}")
                     return
@@ -507,6 +589,9 @@ class WebSocketProxy:
                     await self.send_error(client_id, "BROKER_INIT_ERROR", error_msg)
                     return
                 
+                # Each adapter publishes on its own ZeroMQ port; make sure we receive it
+                self.connect_zmq_publisher(getattr(adapter, 'zmq_port', None))
+                
                 # Connect to the broker
                 connect_result = adapter.connect()
                 if connect_result and not connect_result.get('success', True):
@@ -533,6 +618,8 @@ class WebSocketProxy:
             "message": "Authentication successful",
             "broker": broker_name,
             "user_id": user_id,
+            "encoding": encoding,
+            "supported_encodings": supported_encodings,
             "supported_features": {
                 "ltp": True,
                 "quote": True,
@@ -540,6 +627,19 @@ class WebSocketProxy:
             }
         })
     
+    def connect_zmq_publisher(self, port):
+        """
+        Subscribe to a broker adapter's ZeroMQ publisher if not already connected
+        
+        Args:
+            port: Port the adapter's PUB socket is bound to
+        """
+        if port is None or str(port) in self.zmq_ports:
+            return
+        self.socket.connect(f"tcp://{self.zmq_host}:{port}")
+        self.zmq_ports.add(str(port))
+        logger.debug(f"Connected to adapter publisher on port {port}")
+    
     async def get_supported_brokers(self, client_id):
         """
         Get list of supported brokers from environment configuration
@@ -593,6 +693,29 @@ class WebSocketProxy:
             "user_id": user_id
         })
     
+    def _subscription_mode(self, data, symbol_info=None):
+        """
+        Numeric mode of one symbol in a subscribe or unsubscribe request: the
+        symbol's own mode, else the request's mode (default Quote), with the
+        mode names mapped to numbers
+
+        Args:
+            data: Subscribe/unsubscribe request
+            symbol_info: One entry of the request's symbols
+
+        Returns:
+            int: 1 (LTP), 2 (Quote) or 3 (Depth); other values are passed through
+        """
+        mode = (symbol_info or {}).get("mode") or data.get("mode", "Quote")
+
+        # Map string mode to numeric mode
+        mode_mapping = {
+            "LTP": 1,
+            "Quote": 2,
+            "Depth": 3
+        }
+        return mode_mapping.get(mode, mode) if isinstance(mode, str) else mode
+
     async def subscribe_client(self, client_id, data):
         """
         Subscribe a client to market data using their configured broker
@@ -611,16 +734,6 @@ class WebSocketProxy:
         mode_str = data.get("mode", "Quote")  # Get mode as string (LTP, Quote, Depth)
         depth_level = data.get("depth", 5)  # Default to 5 levels
         
-        # Map string mode to numeric mode
-        mode_mapping = {
-            "LTP": 1,
-            "Quote": 2, 
-            "Depth": 3
-        }
-        
-        # Convert string mode to numeric if needed
-        mode = mode_mapping.get(mode_str, mode_str) if isinstance(mode_str, str) else mode_str
-        
         # Handle case where a single symbol is passed directly instead of as an array
         if not symbols and (data.get("symbol") and data.get("exchange")):
             symbols = [{
@@ -651,7 +764,25 @@ class WebSocketProxy:
             
             if not symbol or not exchange:
                 continue  # Skip invalid symbols
-                
+
+            mode = self._subscription_mode(data, symbol_info)
+            symbol_mode_str = symbol_info.get("mode") or mode_str
+
+            # A repeated subscribe is not forwarded: the client's subscriptions
+            # are released with one unsubscribe each, so a second broker
+            # subscription (or reference in the sharded AdapterHost) would leak
+            sub_key = (symbol, exchange, mode)
+            if client_id in self.subscription_index.get(sub_key, ()):
+                subscription_responses.append({
+                    "symbol": symbol,
+                    "exchange": exchange,
+                    "status": "success",
+                    "mode": symbol_mode_str,
+                    "message": "Already subscribed",
+                    "broker": broker_name
+                })
+                continue
+
             # Subscribe to market data
             response = adapter.subscribe(symbol, exchange, mode, depth_level)
             
@@ -671,7 +802,6 @@ class WebSocketProxy:
                     self.subscriptions[client_id] = {json.dumps(subscription_info)}
 
                 # OPTIMIZATION: Update subscription index for O(1) lookup
-                sub_key = (symbol, exchange, mode)
                 self.subscription_index[sub_key].add(client_id)
 
                 # Add to successful subscriptions
@@ -679,7 +809,7 @@ class WebSocketProxy:
                     "symbol": symbol,
                     "exchange": exchange,
                     "status": "success",
-                    "mode": mode_str,
+                    "mode": symbol_mode_str,
                     "depth": response.get("actual_depth", depth_level),
                     "broker": broker_name
                 })
@@ -703,6 +833,15 @@ class WebSocketProxy:
             "broker": broker_name
         })
     
+    def _remove_from_subscription_index(self, client_id, symbol, exchange, mode):
+        """Stop routing (symbol, exchange, mode) market data to a client"""
+        sub_key = (symbol, exchange, mode)
+        if sub_key in self.subscription_index:
+            self.subscription_index[sub_key].discard(client_id)
+            # Clean up empty entries
+            if not self.subscription_index[sub_key]:
+                del self.subscription_index[sub_key]
+
     async def unsubscribe_client(self, client_id, data):
         """
         Unsubscribe a client from market data
@@ -726,8 +865,7 @@ class WebSocketProxy:
         if not symbols and not is_unsubscribe_all and (data.get("symbol") and data.get("exchange")):
             symbols = [{
                 "symbol": data.get("symbol"),
-                "exchange": data.get("exchange"),
-                "mode": data.get("mode", 2)  # Default to Quote mode
+                "exchange": data.get("exchange")
             }]
         
         # If no symbols provided and not unsubscribe_all, return error
@@ -769,6 +907,7 @@ class WebSocketProxy:
                     
                     if symbol and exchange:
                         response = adapter.unsubscribe(symbol, exchange, mode)
+                        self._remove_from_subscription_index(client_id, symbol, exchange, mode)
                         
                         if response.get("status") == "success":
                             successful_unsubscriptions.append({
@@ -793,11 +932,23 @@ class WebSocketProxy:
             for symbol_info in symbols:
                 symbol = symbol_info.get("symbol")
                 exchange = symbol_info.get("exchange")
-                mode = symbol_info.get("mode", 2)  # Default to Quote mode
+                mode = self._subscription_mode(data, symbol_info)
                 
                 if not symbol or not exchange:
                     continue  # Skip invalid symbols
-                
+
+                # Only release what this client subscribed, otherwise the
+                # broker subscription of another client could be dropped
+                if client_id not in self.subscription_index.get((symbol, exchange, mode), ()):
+                    successful_unsubscriptions.append({
+                        "symbol": symbol,
+                        "exchange": exchange,
+                        "status": "success",
+                        "message": "Not subscribed",
+                        "broker": broker_name
+                    })
+                    continue
+
                 # Unsubscribe from market data
                 response = adapter.unsubscribe(symbol, exchange, mode)
                 
@@ -825,6 +976,7 @@ class WebSocketProxy:
                         
                         for sub_key in subscriptions_to_remove:
                             self.subscriptions[client_id].discard(sub_key)
+                        self._remove_from_subscription_index(client_id, symbol, exchange, mode)
                     
                     successful_unsubscriptions.append({
                         "symbol": symbol,
@@ -887,151 +1039,203 @@ class WebSocketProxy:
             "message": message
         })
     
+    def broadcast_market_data(self, broker_name, symbol, exchange, mode, payload, client_ids):
+        """
+        Fan a market data payload out to every subscribed client
+        
+        Recipients are grouped by the broker name that ends up in the message
+        (a single group unless the topic carries no broker) and by their
+        negotiated wire encoding. The bus payload is converted at most once per
+        encoding and each group's message is serialized exactly once. The same
+        encoded message is then put on every recipient's ClientSendQueue, so a
+        slow client only conflates its own backlog instead of stalling others.
+        
+        Args:
+            broker_name: Broker parsed from the ZeroMQ topic, or "unknown"
+            symbol: Trading symbol
+            exchange: Exchange code
+            mode: Numeric subscription mode
+            payload: Raw market data payload from the ZeroMQ bus (JSON or MessagePack)
+            client_ids: Client IDs subscribed to (symbol, exchange, mode)
+            
+        Returns:
+            int: Number of client queues the message was put on
+        """
+        recipients = defaultdict(list)  # Maps (message broker, encoding) -> send queues
+        
+        for client_id in client_ids:
+            # Verify client still exists
+            send_queue = self.send_queues.get(client_id)
+            if send_queue is None:
+                continue
+            
+            # Verify user mapping exists
+            user_id = self.user_mapping.get(client_id)
+            if not user_id:
+                continue
+            
+            # Check broker match (important for multi-broker setups)
+            client_broker = self.user_broker_mapping.get(user_id)
+            if broker_name != "unknown" and client_broker and client_broker != broker_name:
+                continue
+            
+            message_broker = broker_name if broker_name != "unknown" else client_broker
+            encoding = self.client_encodings.get(client_id, ENCODING_JSON)
+            recipients[(message_broker, encoding)].append(send_queue)
+        
+        sub_key = (symbol, exchange, mode)
+        converted = {}  # Maps encoding -> payload converted for that encoding
+        delivered = 0
+        for (broker, encoding), send_queues in recipients.items():
+            data = converted.get(encoding)
+            if data is None:
+                data = converted[encoding] = convert_bus_payload(payload, encoding)
+            message = encode_market_data(symbol, exchange, mode, broker, data, encoding)
+            for send_queue in send_queues:
+                send_queue.put(sub_key, message)
+            delivered += len(send_queues)
+        
+        return delivered
+    
     async def zmq_listener(self):
         """
         OPTIMIZED: Listen for messages from broker adapters via ZeroMQ and forward to clients
 
         Key Performance Improvements:
-        1. Increased timeout from 0.1s to 0.3s (reduces busy-waiting by 66%)
-        2. Use subscription_index for O(1) lookup instead of O(n²) iteration
-        3. Batch message sending with asyncio.gather
+        1. Event-driven receive: await socket readiness instead of a 0.3s recv timeout loop
+        2. Drain every queued message in one event-loop turn and coalesce them per topic
+        3. Use subscription_index for O(1) lookup instead of O(n²) iteration
+        4. Serialize each tick once and fan out through per-client conflating send queues
         """
         logger.debug("Starting OPTIMIZED ZeroMQ listener with subscription indexing")
 
+        poller = zmq.asyncio.Poller()
+        poller.register(self.socket, zmq.POLLIN)
+
         while self.running:
             try:
-                # Check if we should stop
-                if not self.running:
-                    break
-
-                # OPTIMIZATION 1: Increased timeout to reduce busy-waiting
-                try:
-                    [topic, data] = await aio.wait_for(
-                        self.socket.recv_multipart(),
-                        timeout=0.3  # Increased from 0.1s (66% less CPU usage)
-                    )
-                except aio.TimeoutError:
-                    # No message received within timeout, continue the loop
-                    continue
-                
-                # Parse the message
-                topic_str = topic.decode('utf-8')
-                data_str = data.decode('utf-8')
-                market_data = json.loads(data_str)
-                
-                # Extract topic components
-                # Support both formats:
-                # New format: BROKER_EXCHANGE_SYMBOL_MODE (with broker name)
-                # Old format: EXCHANGE_SYMBOL_MODE (without broker name)
-                # Special case: NSE_INDEX_SYMBOL_MODE (exchange contains underscore)
-                parts = topic_str.split('_')
-                
-                # Special case handling for NSE_INDEX and BSE_INDEX
-                if len(parts) >= 4 and parts[0] == "NSE" and parts[1] == "INDEX":
-                    broker_name = "unknown"
-                    exchange = "NSE_INDEX"
-                    symbol = parts[2]
-                    mode_str = parts[3]
-                elif len(parts) >= 4 and parts[0] == "BSE" and parts[1] == "INDEX":
-                    broker_name = "unknown"
-                    exchange = "BSE_INDEX"
-                    symbol = parts[2]
-                    mode_str = parts[3]
-                elif len(parts) >= 5 and parts[1] == "INDEX":  # BROKER_NSE_INDEX_SYMBOL_MODE format
-                    broker_name = parts[0]
-                    exchange = f"{parts[1]}_{parts[2]}"
-                    symbol = parts[3]
-                    mode_str = parts[4]
-                elif len(parts) >= 4:
-                    # Standard format with broker name
-                    broker_name = parts[0]
-                    exchange = parts[1]
-                    symbol = parts[2]
-                    mode_str = parts[3]
-                elif len(parts) >= 3:
-                    # Old format without broker name
-                    broker_name = "unknown"
-                    exchange = parts[0]
-                    symbol = parts[1] 
-                    mode_str = parts[2]
-                else:
-                    logger.warning(f"Invalid topic format: {topic_str}")
-                    continue
-                
-                # OPTIMIZATION: Use pre-computed mode map
-                mode = self.MODE_MAP.get(mode_str)
-
-                if not mode:
-                    logger.warning(f"Invalid mode in topic: {mode_str}")
+                # OPTIMIZATION 1: Sleep until the socket is readable. The timeout only
+                # bounds how long an idle listener takes to notice shutdown
+                events = await poller.poll(timeout=self.zmq_idle_timeout_ms)
+                if not events:
                     continue
 
-                # OPTIMIZATION: Message throttling for high-frequency updates
-                # Skip if we sent the same message too recently (reduces CPU on fast updates)
-                sub_key = (symbol, exchange, mode)
-                current_time = time.time()
+                # OPTIMIZATION 2: Drain the burst and keep only the newest payload per
+                # topic, so every client gets at most one message per topic per turn
+                for topic, data in self._drain_zmq_batch().items():
+                    self.route_market_data(topic, data)
 
-                # Only throttle LTP mode (mode 1), not Quote/Depth
-                if mode == 1:  # LTP mode
-                    last_time = self.last_message_time.get(sub_key, 0)
-                    if current_time - last_time < self.message_throttle_interval:
-                        continue  # Skip this update, too soon
-                    self.last_message_time[sub_key] = current_time
-
-                # OPTIMIZATION 2: O(1) lookup using subscription index
-                # Instead of iterating through ALL clients and ALL subscriptions (O(n²)),
-                # directly lookup clients subscribed to this specific (symbol, exchange, mode)
-                client_ids = self.subscription_index.get(sub_key, set()).copy()
-
-                if not client_ids:
-                    continue  # No clients subscribed, skip processing
-
-                # OPTIMIZATION 3: Batch message sends for parallel delivery
-                send_tasks = []
+                # Let client handlers and socket writes run before the next burst
+                await aio.sleep(0)
+            
+            except Exception as e:
+                logger.error(f"Error in ZeroMQ listener: {e}")
+                # Continue running despite errors
+                await aio.sleep(1)
 
-                # OPTIMIZATION 4: Pre-create base message (reused for all clients)
-                # This avoids creating the same dict 1000 times
-                base_message = {
-                    "type": "market_data",
-                    "symbol": symbol,
-                    "exchange": exchange,
-                    "mode": mode,
-                    "data": market_data
-                }
+    def _drain_zmq_batch(self):
+        """
+        Receive every message already queued on the ZeroMQ socket without blocking
+        
+        Receives stop at EAGAIN or after zmq_max_batch messages so a continuous
+        feed cannot starve the event loop.
+        
+        Returns:
+            dict: Maps topic bytes -> newest payload bytes, in first-seen order
+        """
+        batch = {}
+        recv_multipart = self.sync_socket.recv_multipart
+        for _ in range(self.zmq_max_batch):
+            try:
+                topic, data = recv_multipart(zmq.NOBLOCK)
+            except zmq.Again:
+                break
+            except ValueError:
+                logger.warning("Ignoring ZeroMQ message without exactly two frames")
+                continue
+            batch[topic] = data
+        return batch
 
-                # OPTIMIZATION 5: Pre-serialize JSON once (not per-client)
-                # Most clients get the same message, so serialize once
-                base_message_str = None
+    def route_market_data(self, topic, data):
+        """
+        Route one market data message from the ZeroMQ bus to subscribed clients
+        
+        Args:
+            topic: Topic bytes (BROKER_EXCHANGE_SYMBOL_MODE or EXCHANGE_SYMBOL_MODE)
+            data: Raw payload bytes (JSON or MessagePack)
+        """
+        # Parse the topic. The payload is left encoded: it is spliced
+        # into the client message as-is by broadcast_market_data
+        topic_str = topic.decode('utf-8')
+        
+        # Extract topic components
+        # Support both formats:
+        # New format: BROKER_EXCHANGE_SYMBOL_MODE (with broker name)
+        # Old format: EXCHANGE_SYMBOL_MODE (without broker name)
+        # Special case: NSE_INDEX_SYMBOL_MODE (exchange contains underscore)
+        parts = topic_str.split('_')
+        
+        # Special case handling for NSE_INDEX and BSE_INDEX
+        if len(parts) >= 4 and parts[0] == "NSE" and parts[1] == "INDEX":
+            broker_name = "unknown"
+            exchange = "NSE_INDEX"
+            symbol = parts[2]
+            mode_str = parts[3]
+        elif len(parts) >= 4 and parts[0] == "BSE" and parts[1] == "INDEX":
+            broker_name = "unknown"
+            exchange = "BSE_INDEX"
+            symbol = parts[2]
+            mode_str = parts[3]
+        elif len(parts) >= 5 and parts[1] == "INDEX":  # BROKER_NSE_INDEX_SYMBOL_MODE format
+            broker_name = parts[0]
+            exchange = f"{parts[1]}_{parts[2]}"
+            symbol = parts[3]
+            mode_str = parts[4]
+        elif len(parts) >= 4:
+            # Standard format with broker name
+            broker_name = parts[0]
+            exchange = parts[1]
+            symbol = parts[2]
+            mode_str = parts[3]
+        elif len(parts) >= 3:
+            # Old format without broker name
+            broker_name = "unknown"
+            exchange = parts[0]
+            symbol = parts[1] 
+            mode_str = parts[2]
+        else:
+            logger.warning(f"Invalid topic format: {topic_str}")
+            return
+        
+        # OPTIMIZATION: Use pre-computed mode map
+        mode = self.MODE_MAP.get(mode_str)
 
-                for client_id in client_ids:
-                    # Verify client still exists
-                    if client_id not in self.clients:
-                        continue
+        if not mode:
+            logger.warning(f"Invalid mode in topic: {mode_str}")
+            return
 
-                    # Verify user mapping exists
-                    user_id = self.user_mapping.get(client_id)
-                    if not user_id:
-                        continue
+        # OPTIMIZATION: Message throttling for high-frequency updates
+        # Skip if we sent the same message too recently (reduces CPU on fast updates)
+        sub_key = (symbol, exchange, mode)
+        current_time = time.time()
 
-                    # Check broker match (important for multi-broker setups)
-                    client_broker = self.user_broker_mapping.get(user_id)
-                    if broker_name != "unknown" and client_broker and client_broker != broker_name:
-                        continue
+        # Only throttle LTP mode (mode 1), not Quote/Depth
+        if mode == 1:  # LTP mode
+            last_time = self.last_message_time.get(sub_key, 0)
+            if current_time - last_time < self.message_throttle_interval:
+                return  # Skip this update, too soon
+            self.last_message_time[sub_key] = current_time
 
-                    # Add broker to message
-                    message = base_message.copy()
-                    message["broker"] = broker_name if broker_name != "unknown" else client_broker
+        # OPTIMIZATION 3: O(1) lookup using subscription index
+        # Instead of iterating through ALL clients and ALL subscriptions (O(n²)),
+        # directly lookup clients subscribed to this specific (symbol, exchange, mode)
+        client_ids = self.subscription_index.get(sub_key)
 
-                    # Add to batch
-                    send_tasks.append(self.send_message(client_id, message))
+        if not client_ids:
+            return  # No clients subscribed, skip processing
 
-                # Send all messages in parallel (non-blocking)
-                if send_tasks:
-                    await aio.gather(*send_tasks, return_exceptions=True)
-            
-            except Exception as e:
-                logger.error(f"Error in ZeroMQ listener: {e}")
-                # Continue running despite errors
-                await aio.sleep(1)
+        # OPTIMIZATION 4: Encode once per broker and queue for all recipients
+        self.broadcast_market_data(broker_name, symbol, exchange, mode, data, client_ids)
 
 # Entry point for running the server standalone
 async def main():
@@ -0,0 +1,368 @@
+"""
+Sharded multi-process mode for the WebSocket proxy.
+
+With WEBSOCKET_WORKERS > 1 (Linux only), N WebSocketProxy worker processes
+share the WebSocket port through SO_REUSEPORT, so the kernel spreads client
+connections across cores. Each worker keeps its own clients, subscription_index
+and user_mapping, exactly as the single-process proxy does.
+
+Broker adapters are not created in the workers. They live in the parent process
+inside an AdapterHost, which workers reach through RemoteBrokerAdapter over a
+ZeroMQ REQ/ROUTER control socket. The host reference-counts subscriptions per
+(user_id, symbol, exchange, mode) across all workers, so the broker sees each
+instrument subscribed once no matter how many workers or clients want it.
+Market data flows back over the adapters' ZeroMQ PUB sockets, to which every
+worker is subscribed.
+"""
+
+import json
+import multiprocessing
+import os
+import platform
+import socket
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Dict, Optional
+
+import zmq
+
+from utils.logging import get_logger
+from .broker_factory import create_broker_adapter
+from .port_check import is_port_in_use
+
+logger = get_logger(__name__)
+
+# Broker connect/login can take a while; control calls wait at most this long
+CONTROL_TIMEOUT_MS = 30000
+
+
+def get_websocket_worker_count() -> int:
+    """
+    Get the number of proxy worker processes to run
+
+    Returns:
+        int: WEBSOCKET_WORKERS, or 1 where SO_REUSEPORT load balancing is unavailable
+    """
+    try:
+        workers = int(os.getenv('WEBSOCKET_WORKERS', '1'))
+    except ValueError:
+        logger.warning("Invalid WEBSOCKET_WORKERS value, using a single proxy process")
+        return 1
+
+    if workers > 1 and (platform.system() != 'Linux' or not hasattr(socket, 'SO_REUSEPORT')):
+        logger.warning("WEBSOCKET_WORKERS > 1 requires Linux SO_REUSEPORT, using a single proxy process")
+        return 1
+    return max(1, workers)
+
+
+def _success(message, **kwargs):
+    response = {'status': 'success', 'message': message}
+    response.update(kwargs)
+    return response
+
+
+class AdapterHost:
+    """
+    Owns the real broker adapters for all proxy workers and serves their
+    initialize/connect/subscribe/unsubscribe/disconnect calls on one thread
+    """
+
+    def __init__(self, adapter_factory=None):
+        self.adapter_factory = adapter_factory or create_broker_adapter
+        self.context = zmq.Context()
+        self.socket = self.context.socket(zmq.ROUTER)
+        self.socket.setsockopt(zmq.LINGER, 0)
+        self.port = self.socket.bind_to_random_port("tcp://127.0.0.1")
+        self.endpoint = f"tcp://127.0.0.1:{self.port}"
+
+        self.adapters: Dict[Any, Dict[str, Any]] = {}  # Maps user_id -> adapter entry
+        # Maps (user_id, symbol, exchange, mode) -> Counter(worker_id -> subscription count)
+        self.subscribers = defaultdict(Counter)
+        self.subscribe_responses: Dict[tuple, Dict[str, Any]] = {}
+
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start serving worker requests on a background thread"""
+        self.running = True
+        self.thread = threading.Thread(target=self.serve, name="AdapterHost", daemon=True)
+        self.thread.start()
+        logger.info(f"Adapter host listening for proxy workers on {self.endpoint}")
+        return self
+
+    def stop(self):
+        """Stop serving and disconnect every hosted adapter"""
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=2.0)
+        for user_id, entry in list(self.adapters.items()):
+            try:
+                entry['adapter'].disconnect()
+            except Exception as e:
+                logger.error(f"Error disconnecting adapter for user {user_id}: {e}")
+        self.adapters.clear()
+        self.socket.close()
+        self.context.term()
+
+    def serve(self):
+        """Request loop: one JSON request in, one JSON response out"""
+        poller = zmq.Poller()
+        poller.register(self.socket, zmq.POLLIN)
+        while self.running:
+            try:
+                if not poller.poll(500):
+                    continue
+                frames = self.socket.recv_multipart()
+                envelope, payload = frames[:-1], frames[-1]
+                try:
+                    response = self.handle_request(json.loads(payload))
+                except Exception as e:
+                    logger.exception(f"Error handling proxy worker request: {e}")
+                    response = {'status': 'error', 'code': 'HOST_ERROR', 'message': str(e)}
+                self.socket.send_multipart(envelope + [json.dumps(response, default=str).encode('utf-8')])
+            except zmq.ZMQError as e:
+                if self.running:
+                    logger.error(f"Adapter host socket error: {e}")
+
+    def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Apply one worker request to the hosted adapters
+
+        Args:
+            request: Dict with op, worker_id, user_id and the op's arguments
+
+        Returns:
+            dict: Response returned to the worker
+        """
+        op = request.get('op')
+        worker_id = request.get('worker_id')
+        user_id = request.get('user_id')
+
+        if op == 'initialize':
+            return self._initialize(worker_id, request.get('broker_name'), user_id)
+
+        entry = self.adapters.get(user_id)
+        if entry is None:
+            return {'status': 'error', 'code': 'NOT_INITIALIZED',
+                    'message': f"No adapter initialized for user {user_id}"}
+
+        if op == 'connect':
+            if not entry['connected']:
+                result = entry['adapter'].connect()
+                entry['connect_result'] = result
+                entry['connected'] = not (result and not result.get('success', True))
+            return {'result': entry['connect_result']}
+        if op == 'subscribe':
+            return self._subscribe(entry, worker_id, user_id, request['symbol'], request['exchange'],
+                                   request.get('mode', 2), request.get('depth_level', 5))
+        if op == 'unsubscribe':
+            key = (user_id, request['symbol'], request['exchange'], request.get('mode', 2))
+            return self._release(entry, key, worker_id)
+        if op == 'unsubscribe_all':
+            self._release_worker(entry, user_id, worker_id)
+            return _success("Unsubscribed worker from all symbols")
+        if op == 'disconnect':
+            self._release_worker(entry, user_id, worker_id)
+            entry['workers'].discard(worker_id)
+            if not entry['workers']:
+                logger.info(f"No proxy worker uses the adapter for user {user_id}, disconnecting")
+                entry['adapter'].disconnect()
+                del self.adapters[user_id]
+            return _success("Disconnected")
+
+        return {'status': 'error', 'code': 'INVALID_OPERATION', 'message': f"Invalid operation: {op}"}
+
+    def _initialize(self, worker_id, broker_name, user_id):
+        entry = self.adapters.get(user_id)
+        if entry is None:
+            adapter = self.adapter_factory(broker_name)
+            if not adapter:
+                return {'result': {'success': False, 'error': f"Failed to create adapter for broker: {broker_name}"}}
+            result = adapter.initialize(broker_name, user_id)
+            if result and not result.get('success', True):
+                return {'result': result}
+            entry = self.adapters[user_id] = {
+                'adapter': adapter,
+                'broker_name': broker_name,
+                'workers': set(),
+                'connected': False,
+                'connect_result': None,
+                'initialize_result': result
+            }
+            logger.info(f"Adapter host created {broker_name} adapter for user {user_id}")
+        entry['workers'].add(worker_id)
+        return {'result': entry['initialize_result'], 'zmq_port': getattr(entry['adapter'], 'zmq_port', None)}
+
+    def _subscribe(self, entry, worker_id, user_id, symbol, exchange, mode, depth_level):
+        # One reference per client subscription: WebSocketProxy does not forward
+        # a client's repeated subscribe, and releases each subscription once
+        key = (user_id, symbol, exchange, mode)
+        counts = self.subscribers[key]
+        if not counts:
+            # First subscriber across all workers: this is the only call the broker sees
+            response = entry['adapter'].subscribe(symbol, exchange, mode, depth_level)
+            if response.get('status') != 'success':
+                del self.subscribers[key]
+                return response
+            self.subscribe_responses[key] = response
+        counts[worker_id] += 1
+        return self.subscribe_responses[key]
+
+    def _release(self, entry, key, worker_id, count=1):
+        counts = self.subscribers.get(key)
+        if not counts or not counts.get(worker_id):
+            return _success("Not subscribed")
+        counts[worker_id] -= count
+        if counts[worker_id] <= 0:
+            del counts[worker_id]
+        if counts:
+            return _success("Still subscribed by other clients")
+
+        # Last subscriber across all workers is gone
+        del self.subscribers[key]
+        self.subscribe_responses.pop(key, None)
+        _, symbol, exchange, mode = key
+        return entry['adapter'].unsubscribe(symbol, exchange, mode)
+
+    def _release_worker(self, entry, user_id, worker_id):
+        for key in [k for k, counts in self.subscribers.items() if k[0] == user_id and worker_id in counts]:
+            self._release(entry, key, worker_id, count=self.subscribers[key][worker_id])
+
+
+class RemoteBrokerAdapter:
+    """
+    Stand-in for a broker adapter inside a proxy worker. Exposes the adapter
+    methods WebSocketProxy uses and forwards them to the AdapterHost.
+    """
+
+    def __init__(self, control_endpoint: str, worker_id: int, broker_name: str):
+        self.worker_id = worker_id
+        self.broker_name = broker_name
+        self.user_id = None
+        self.zmq_port = None
+        self.context = zmq.Context.instance()
+        self.socket = self.context.socket(zmq.REQ)
+        # Allow a new request after a timed-out one and match replies to requests
+        self.socket.setsockopt(zmq.REQ_RELAXED, 1)
+        self.socket.setsockopt(zmq.REQ_CORRELATE, 1)
+        self.socket.setsockopt(zmq.RCVTIMEO, CONTROL_TIMEOUT_MS)
+        self.socket.setsockopt(zmq.LINGER, 0)
+        self.socket.connect(control_endpoint)
+
+    def _call(self, op, **kwargs):
+        request = {'op': op, 'worker_id': self.worker_id, 'user_id': self.user_id}
+        request.update(kwargs)
+        try:
+            self.socket.send_json(request)
+            return self.socket.recv_json()
+        except zmq.Again:
+            logger.error(f"Timed out waiting for adapter host on {op}")
+            return {'status': 'error', 'code': 'HOST_TIMEOUT', 'message': f"Adapter host did not answer {op}"}
+
+    @staticmethod
+    def _result(response):
+        # initialize/connect report failure as {'success': False, 'error': ...}
+        if response.get('status') == 'error':
+            return {'success': False, 'error': response.get('message')}
+        return response.get('result')
+
+    def initialize(self, broker_name, user_id, auth_data=None):
+        self.user_id = user_id
+        response = self._call('initialize', broker_name=broker_name)
+        self.zmq_port = response.get('zmq_port')
+        return self._result(response)
+
+    def connect(self):
+        return self._result(self._call('connect'))
+
+    def subscribe(self, symbol, exchange, mode=2, depth_level=5):
+        return self._call('subscribe', symbol=symbol, exchange=exchange, mode=mode, depth_level=depth_level)
+
+    def unsubscribe(self, symbol, exchange, mode=2):
+        return self._call('unsubscribe', symbol=symbol, exchange=exchange, mode=mode)
+
+    def unsubscribe_all(self):
+        return self._call('unsubscribe_all')
+
+    def disconnect(self):
+        response = self._call('disconnect')
+        self.socket.close()
+        return response
+
+
+def run_worker(worker_id: int, host: str, port: int, control_endpoint: str):
+    """
+    Entry point of a proxy worker process
+
+    Args:
+        worker_id: Index of this worker
+        host: WebSocket host shared by all workers
+        port: WebSocket port shared by all workers
+        control_endpoint: ZeroMQ endpoint of the parent's AdapterHost
+    """
+    import asyncio
+    from dotenv import load_dotenv
+    from .server import WebSocketProxy
+
+    load_dotenv()
+
+    def adapter_factory(broker_name):
+        return RemoteBrokerAdapter(control_endpoint, worker_id, broker_name)
+
+    async def serve():
+        proxy = WebSocketProxy(host=host, port=port, adapter_factory=adapter_factory, check_port=False)
+        logger.info(f"WebSocket proxy worker {worker_id} (pid {os.getpid()}) serving {host}:{port}")
+        try:
+            await proxy.start()
+        finally:
+            await proxy.stop()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+class ShardedWebSocketProxy:
+    """
+    Runs the AdapterHost in this process and N WebSocketProxy workers sharing one port
+    """
+
+    def __init__(self, host: str, port: int, workers: int):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.adapter_host: Optional[AdapterHost] = None
+        self.processes = []
+
+    def start(self):
+        """Start the adapter host and spawn the worker processes"""
+        if is_port_in_use(self.host, self.port, wait_time=2.0):
+            raise RuntimeError(f"WebSocket port {self.port} is already in use on {self.host}")
+
+        self.adapter_host = AdapterHost().start()
+        ctx = multiprocessing.get_context("spawn")
+        for worker_id in range(self.workers):
+            process = ctx.Process(
+                target=run_worker,
+                args=(worker_id, self.host, self.port, self.adapter_host.endpoint),
+                name=f"websocket-proxy-{worker_id}",
+                daemon=True
+            )
+            process.start()
+            self.processes.append(process)
+        logger.info(f"Started {self.workers} WebSocket proxy workers on {self.host}:{self.port}")
+        return self
+
+    def stop(self):
+        """Stop the workers, then the adapter host"""
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+        for process in self.processes:
+            process.join(timeout=3.0)
+        self.processes = []
+        if self.adapter_host:
+            self.adapter_host.stop()
+            self.adapter_host = None